@@ -19,14 +19,24 @@ from .note_dto import (
     NoteBase,
     NoteCreate,
     NoteSchema,
+    NoteSummarySchema,
     NoteUpdate,
     NoteWithLinksSchema,
 )
 from .note_link_dto import (
+    NoteGraphNode,
     NoteLinkBase,
     NoteLinkCreate,
     NoteLinkSchema,
     NoteLinkUpdate,
+    NoteNeighborhood,
+    NotePath,
+)
+from .pagination_dto import (
+    NoteCursor,
+    NotePage,
+    NoteQueryCursor,
+    NoteSummaryPage,
 )
 from .project_dto import (
     ProjectBase,
@@ -34,6 +44,15 @@ from .project_dto import (
     ProjectSchema,
     ProjectUpdate,
 )
+from .search_dto import (
+    KeywordMatch,
+    MetadataPredicate,
+    NoteHybridSearchResult,
+    NoteQuery,
+    NoteSearchFilters,
+    NoteSearchResult,
+    NoteTitleMatch,
+)
 from .source_dto import (
     SourceBase,
     SourceCreate,
@@ -73,10 +92,27 @@ __all__ = [
     "NoteLinkCreate",
     "NoteLinkUpdate",
     "NoteLinkSchema",
+    "NoteGraphNode",
+    "NoteNeighborhood",
+    "NotePath",
     # Note DTOs
     "NoteBase",
     "NoteCreate",
     "NoteUpdate",
     "NoteSchema",
     "NoteWithLinksSchema",
+    "NoteSummarySchema",
+    # Pagination DTOs
+    "NoteCursor",
+    "NotePage",
+    "NoteQueryCursor",
+    "NoteSummaryPage",
+    # Search DTOs
+    "NoteSearchFilters",
+    "NoteQuery",
+    "MetadataPredicate",
+    "NoteSearchResult",
+    "NoteHybridSearchResult",
+    "NoteTitleMatch",
+    "KeywordMatch",
 ]
@@ -11,6 +11,9 @@ from .source_dto import SourceSchema
 
 # --- Note Schemas ---
 
+# Characters of content returned in NoteSummarySchema.snippet unless the caller asks otherwise.
+DEFAULT_SNIPPET_LENGTH = 200
+
 
 class NoteBase(BaseModel):
     """
@@ -87,6 +90,11 @@ class NoteSchema(NoteBase):
     user_id: str = Field(description="Identifier of the user who owns this note.")
     created_at: datetime = Field(description="Timestamp of when the note was created.")
     updated_at: datetime = Field(description="Timestamp of the last update to the note.")
+    language: str | None = Field(
+        default=None,
+        description="Language used to index the note for full-text search ('es', 'en' or 'simple'). "
+        "Taken from note_metadata['language'] or detected from the text on write.",
+    )
 
     project: ProjectSchema | None = Field(
         default=None, description="The project associated with this note, if any."
@@ -105,6 +113,37 @@ class NoteSchema(NoteBase):
     )
 
 
+class NoteSummarySchema(BaseModel):
+    """
+    Lightweight view of a note for list views: title, the beginning of the content,
+    timestamps and keyword names. Listing summaries never reads the full content.
+    """
+
+    id: uuid.UUID = Field(description="Unique identifier for the note.")
+    user_id: str = Field(description="Identifier of the user who owns this note.")
+    title: str | None = Field(default=None, description="Title of the note.")
+    snippet: str = Field(description="First characters of the note content.")
+    content_truncated: bool = Field(description="Whether the content continues beyond the snippet.")
+    type: str | None = Field(default=None, description="Type of the note.")
+    project_id: uuid.UUID | None = Field(
+        default=None, description="ID of the project this note belongs to, if any."
+    )
+    language: str | None = Field(
+        default=None, description="Language used to index the note for full-text search."
+    )
+    created_at: datetime = Field(description="Timestamp of when the note was created.")
+    updated_at: datetime = Field(description="Timestamp of the last update to the note.")
+    keywords: list[str] = Field(
+        default_factory=list, description="Names of the keywords of the note, sorted."
+    )
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        frozen=True,
+        extra="forbid",
+    )
+
+
 class NoteWithLinksSchema(NoteSchema):
     """
     Extended schema for a note that includes its direct links (source of and target of).
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -71,3 +71,64 @@ class NoteLinkSchema(NoteLinkBase):
         frozen=True,  # Make instances immutable after creation
         extra="forbid",
     )
+
+
+# --- Link Graph Schemas ---
+
+# Which links are followed from a note: those it points to, those pointing to it, or both.
+LinkDirection = Literal["outgoing", "incoming", "both"]
+
+# Caps for walks over the link graph; they keep every walk bounded however large the graph.
+DEFAULT_GRAPH_DEPTH = 2
+MAX_GRAPH_DEPTH = 6
+DEFAULT_GRAPH_FANOUT = 50  # links followed from each note
+DEFAULT_GRAPH_MAX_NODES = 500
+
+
+class NoteGraphNode(BaseModel):
+    """
+    A note reached while walking the link graph, with the fewest hops it takes to reach it.
+    """
+
+    id: uuid.UUID = Field(description="ID of the note.")
+    title: str | None = Field(default=None, description="Title of the note.")
+    type: str | None = Field(default=None, description="Type of the note.")
+    depth: int = Field(ge=0, description="Hops from the starting note (0 for the note itself).")
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+
+class NoteNeighborhood(BaseModel):
+    """
+    The notes within a few hops of a note and the links between them.
+    Nodes are ordered by depth; `links` holds every link among those nodes that matches
+    the requested link types, whichever direction was walked.
+    """
+
+    root_id: uuid.UUID = Field(description="ID of the note the walk started from.")
+    nodes: list[NoteGraphNode] = Field(description="Reached notes, the root first.")
+    links: list[NoteLinkSchema] = Field(description="Links between the reached notes.")
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+
+class NotePath(BaseModel):
+    """
+    A shortest chain of links between two notes.
+    `links[i]` joins `note_ids[i]` and `note_ids[i + 1]`; when incoming links are walked it
+    may point backwards (its source is `note_ids[i + 1]`).
+    """
+
+    note_ids: list[uuid.UUID] = Field(description="Notes along the path, both ends included.")
+    links: list[NoteLinkSchema] = Field(description="Links along the path, in order.")
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
@@ -0,0 +1,136 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from .note_dto import NoteSchema, NoteSummarySchema
+from .search_dto import NoteSort
+
+# --- Keyset Pagination Schemas ---
+
+
+class NoteCursor(BaseModel):
+    """
+    Position of a note in the (updated_at DESC, id DESC) ordering used by note listings.
+    Clients only see it as an opaque string (see `encode`/`decode`).
+    """
+
+    updated_at: datetime = Field(description="updated_at of the last note of the previous page.")
+    id: uuid.UUID = Field(description="id of the last note of the previous page (tie-breaker).")
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+    @classmethod
+    def from_note(cls, note: NoteSchema | NoteSummarySchema) -> "NoteCursor":
+        return cls(updated_at=note.updated_at, id=note.id)
+
+    def encode(self) -> str:
+        """Returns the opaque, URL-safe representation of the cursor."""
+        payload = json.dumps([self.updated_at.isoformat(), str(self.id)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "NoteCursor":
+        """Parses a cursor produced by `encode`. Raises ValueError if it is malformed."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            updated_at, note_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return cls(updated_at=updated_at, id=note_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, ValidationError) as e:
+            raise ValueError("Invalid pagination cursor.") from e
+
+
+class NoteQueryCursor(BaseModel):
+    """
+    Position of a note in the ordering of a `NoteQuery`: the value of its sort key (a
+    timestamp, the title or the relevance score) and its id as tie-breaker. Opaque to clients.
+    """
+
+    sort: NoteSort = Field(description="Sort order the cursor belongs to.")
+    key: datetime | str | float = Field(description="Sort key of the last note of the page.")
+    id: uuid.UUID = Field(description="id of the last note of the previous page (tie-breaker).")
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+    def encode(self) -> str:
+        key = self.key.isoformat() if isinstance(self.key, datetime) else self.key
+        payload = json.dumps([self.sort, key, str(self.id)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str, sort: NoteSort) -> "NoteQueryCursor":
+        """
+        Parses a cursor produced by `encode` for a query sorted by `sort`.
+        Raises ValueError if it is malformed or belongs to another sort order.
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            cursor_sort, key, note_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if cursor_sort != sort:
+                raise ValueError
+            if sort in ("updated_desc", "created_desc", "created_asc"):
+                key = datetime.fromisoformat(key)
+            elif sort == "relevance":
+                key = float(key)
+            elif not isinstance(key, str):
+                raise ValueError
+            return cls(sort=sort, key=key, id=note_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, ValidationError) as e:
+            raise ValueError("Invalid pagination cursor.") from e
+
+
+class NotePage(BaseModel):
+    """
+    A page of notes plus the cursor to request the next one.
+    `next_cursor` is None when there are no more results.
+    """
+
+    items: list[NoteSchema] = Field(default_factory=list, description="Notes of this page.")
+    next_cursor: str | None = Field(
+        default=None, description="Opaque cursor for the next page, or None on the last page."
+    )
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+    @classmethod
+    def from_items(cls, items: list[NoteSchema], limit: int) -> "NotePage":
+        """Builds a page from a repository result fetched with the same `limit`."""
+        next_cursor = NoteCursor.from_note(items[-1]).encode() if len(items) == limit else None
+        return cls(items=items, next_cursor=next_cursor)
+
+
+class NoteSummaryPage(BaseModel):
+    """
+    A page of note summaries plus the cursor to request the next one.
+    Cursors are interchangeable with `NotePage`: both use the same ordering.
+    """
+
+    items: list[NoteSummarySchema] = Field(
+        default_factory=list, description="Note summaries of this page."
+    )
+    next_cursor: str | None = Field(
+        default=None, description="Opaque cursor for the next page, or None on the last page."
+    )
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+    @classmethod
+    def from_items(cls, items: list[NoteSummarySchema], limit: int) -> "NoteSummaryPage":
+        """Builds a page from a repository result fetched with the same `limit`."""
+        next_cursor = NoteCursor.from_note(items[-1]).encode() if len(items) == limit else None
+        return cls(items=items, next_cursor=next_cursor)
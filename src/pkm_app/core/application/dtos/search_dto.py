@@ -0,0 +1,212 @@
+import uuid
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from .keyword_dto import KeywordSchema
+from .note_dto import NoteSchema
+
+# --- Search Filter Schemas ---
+
+
+class NoteSearchFilters(BaseModel):
+    """
+    Optional restrictions applied to a note search, in addition to the owning user.
+    Unset fields do not filter; set fields are combined with AND.
+    """
+
+    project_id: uuid.UUID | None = Field(
+        default=None, description="Only return notes that belong to this project."
+    )
+    type: str | None = Field(
+        default=None, max_length=100, description="Only return notes of this type."
+    )
+    language: str | None = Field(
+        default=None,
+        description="Only return notes indexed in this language ('es', 'en' or 'simple').",
+    )
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+
+# --- Composable Query Schemas ---
+
+NoteSort = Literal["updated_desc", "created_desc", "created_asc", "title_asc", "relevance"]
+# 'all': notes tagged with every keyword; 'any': with at least one.
+KeywordMatchMode = Literal["all", "any"]
+
+
+class MetadataPredicate(BaseModel):
+    """
+    A condition on a top-level key of `note_metadata`.
+
+    - `eq` / `ne`: the value stored under `key` is (not) exactly `value`.
+      Notes without the key match `ne`.
+    - `contains`: the value under `key` contains `value` (JSON containment, e.g. an element
+      of a list or a subset of an object).
+    - `exists`: the key is present (`value` is ignored).
+    """
+
+    key: str = Field(min_length=1, description="Top-level key of note_metadata.")
+    op: Literal["eq", "ne", "contains", "exists"] = Field(
+        default="eq", description="Comparison applied to the value under `key`."
+    )
+    value: Any = Field(default=None, description="JSON value to compare with.")
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+
+class NoteQuery(BaseModel):
+    """
+    Composable note search: every set criterion is combined with AND and the whole query
+    runs as a single SQL statement. Unset fields do not filter.
+
+    Pages are requested with `limit` and the `next_cursor` of the previous page; a cursor is
+    only valid for the same `sort`.
+    """
+
+    text: str | None = Field(
+        default=None, description='Full-text query (web search syntax: "phrases", OR, -word).'
+    )
+    project_id: uuid.UUID | None = Field(
+        default=None, description="Only return notes that belong to this project."
+    )
+    include_subprojects: bool = Field(
+        default=False,
+        description="With project_id, also return notes of its subprojects at any depth.",
+    )
+    keywords: list[str] = Field(
+        default_factory=list, description="Keyword names the notes must be tagged with."
+    )
+    keyword_match: KeywordMatchMode = Field(
+        default="all",
+        description="'all': notes tagged with every keyword; 'any': with at least one.",
+    )
+    type: str | None = Field(
+        default=None, max_length=100, description="Only return notes of this type."
+    )
+    language: str | None = Field(
+        default=None,
+        description="Only return notes indexed in this language ('es', 'en' or 'simple').",
+    )
+    created_after: datetime | None = Field(
+        default=None, description="Only notes created at or after this instant."
+    )
+    created_before: datetime | None = Field(
+        default=None, description="Only notes created before this instant."
+    )
+    updated_after: datetime | None = Field(
+        default=None, description="Only notes updated at or after this instant."
+    )
+    updated_before: datetime | None = Field(
+        default=None, description="Only notes updated before this instant."
+    )
+    metadata: list[MetadataPredicate] = Field(
+        default_factory=list, description="Conditions on note_metadata, combined with AND."
+    )
+    sort: NoteSort = Field(
+        default="updated_desc",
+        description="Result order. 'relevance' (full-text rank) requires `text`.",
+    )
+    limit: int = Field(default=20, ge=1, le=1000, description="Maximum notes per page.")
+    cursor: str | None = Field(
+        default=None, description="Opaque cursor returned as next_cursor by the previous page."
+    )
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+    @field_validator("text")
+    @classmethod
+    def _blank_text_is_unset(cls, value: str | None) -> str | None:
+        return value if value is not None and value.strip() else None
+
+    @model_validator(mode="after")
+    def _relevance_needs_text(self) -> "NoteQuery":
+        if self.sort == "relevance" and self.text is None:
+            raise ValueError("sort='relevance' requires a text query.")
+        return self
+
+
+# --- Search Result Schemas ---
+
+
+class NoteSearchResult(BaseModel):
+    """
+    A note returned by a ranked search, together with its relevance score.
+    Higher scores are more relevant; scores are only comparable within the same search.
+    """
+
+    note: NoteSchema = Field(description="The matching note.")
+    score: float = Field(description="Relevance score assigned by the search engine.")
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+
+class NoteHybridSearchResult(BaseModel):
+    """
+    A note returned by hybrid (full-text + semantic) search. The score fuses the rank of the
+    note in each retriever with reciprocal rank fusion, optionally boosted by recency.
+    """
+
+    note: NoteSchema = Field(description="The matching note.")
+    score: float = Field(description="Fused relevance score; higher is more relevant.")
+    lexical_rank: int | None = Field(
+        default=None,
+        description="1-based position in the full-text candidates, or None if not matched.",
+    )
+    semantic_rank: int | None = Field(
+        default=None,
+        description="1-based position in the vector candidates, or None if not retrieved.",
+    )
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+
+class NoteTitleMatch(BaseModel):
+    """
+    A lightweight note reference returned by fuzzy (typo-tolerant) title lookups.
+    Only the id and title are loaded, so it is cheap enough for search-as-you-type.
+    """
+
+    id: uuid.UUID = Field(description="Unique identifier of the matching note.")
+    title: str = Field(description="Title of the matching note.")
+    score: float = Field(
+        description="Trigram word similarity between the query and the title (0 to 1)."
+    )
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
+
+
+class KeywordMatch(BaseModel):
+    """
+    A keyword returned by a fuzzy (typo-tolerant) name lookup, with its similarity score.
+    """
+
+    keyword: KeywordSchema = Field(description="The matching keyword.")
+    score: float = Field(
+        description="Trigram word similarity between the query and the keyword name (0 to 1)."
+    )
+
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+    )
@@ -0,0 +1,23 @@
+# src/pkm_app/core/application/interfaces/embedder_interface.py
+
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+
+class IEmbedder(ABC):
+    """
+    Interfaz abstracta para los modelos de embeddings de texto.
+    Las implementaciones reciben lotes de textos: un proveedor remoto cobra (en latencia)
+    por llamada, no por texto.
+    """
+
+    model: str  # Identificador del modelo (forma parte de la clave de caché de embeddings)
+    dimensions: int  # Dimensión de los vectores devueltos
+
+    @abstractmethod
+    async def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        """
+        Calcula los embeddings de un lote de textos.
+        Devuelve un vector de `dimensions` componentes por texto, en el mismo orden.
+        """
+        raise NotImplementedError
@@ -0,0 +1,91 @@
+# src/pkm_app/core/application/interfaces/link_graph_sync_interface.py
+
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+from src.pkm_app.core.application.dtos import (
+    NoteLinkCreate,
+    NoteLinkSchema,
+    NoteNeighborhood,
+    NotePath,
+)
+from src.pkm_app.core.application.dtos.note_link_dto import (
+    DEFAULT_GRAPH_DEPTH,
+    DEFAULT_GRAPH_FANOUT,
+    DEFAULT_GRAPH_MAX_NODES,
+    MAX_GRAPH_DEPTH,
+    LinkDirection,
+)
+
+
+class ISyncLinkGraphRepository(ABC):
+    """
+    Interfaz abstracta para escribir y consultar el grafo de enlaces entre notas (NoteLink) de forma
+    síncrona. Cada método es una sola consulta, sea cual sea el tamaño del grafo.
+    `link_types` None sigue enlaces de cualquier tipo.
+    """
+
+    @abstractmethod
+    def create_link(self, link_in: NoteLinkCreate, user_id: str) -> NoteLinkSchema:
+        """
+        Crea un enlace entre dos notas del usuario. Lanza ValueError si alguna nota no se
+        encuentra o no pertenece al usuario, si es la misma nota o si ya existe un enlace
+        del mismo tipo entre ellas.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_link(self, link_id: uuid.UUID, user_id: str) -> bool:
+        """
+        Elimina un enlace del usuario. Devuelve True si se eliminó, False si no se encontró.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_backlinks(
+        self,
+        note_id: uuid.UUID,
+        user_id: str,
+        link_types: Sequence[str] | None = None,
+        limit: int = 100,
+    ) -> list[NoteLinkSchema]:
+        """
+        Lista los enlaces que apuntan a la nota, los más recientes primero.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_neighborhood(
+        self,
+        note_id: uuid.UUID,
+        user_id: str,
+        depth: int = DEFAULT_GRAPH_DEPTH,
+        link_types: Sequence[str] | None = None,
+        direction: LinkDirection = "both",
+        max_fanout: int = DEFAULT_GRAPH_FANOUT,
+        max_nodes: int = DEFAULT_GRAPH_MAX_NODES,
+    ) -> NoteNeighborhood | None:
+        """
+        Obtiene las notas a `depth` saltos como mucho y los enlaces entre ellas. Desde cada
+        nota se siguen como mucho `max_fanout` enlaces (los más recientes) y se devuelven
+        como mucho `max_nodes` notas, las más cercanas. Devuelve None si la nota no se
+        encuentra o no pertenece al usuario. Lanza ValueError si algún límite no es válido.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_shortest_path(
+        self,
+        source_note_id: uuid.UUID,
+        target_note_id: uuid.UUID,
+        user_id: str,
+        link_types: Sequence[str] | None = None,
+        direction: LinkDirection = "both",
+        max_depth: int = MAX_GRAPH_DEPTH,
+    ) -> NotePath | None:
+        """
+        Busca un camino con el menor número de enlaces (como mucho `max_depth`) entre dos
+        notas. Devuelve None si no hay ninguno. Lanza ValueError si `max_depth` no es válido.
+        """
+        raise NotImplementedError
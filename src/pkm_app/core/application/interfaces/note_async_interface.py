@@ -2,15 +2,26 @@
 
 import uuid
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
 from typing import Optional
 
 # Importamos los esquemas Pydantic que hemos definido
 # Ajusta la ruta si tus esquemas Pydantic están en una ubicación diferente (ej. dtos.py)
 from src.pkm_app.core.application.dtos import (
+    KeywordMatch,  # Para sugerencias difusas de keywords
     NoteCreate,  # Para crear notas
+    NoteHybridSearchResult,  # Para resultados de búsqueda híbrida (full-text + semántica)
+    NotePage,  # Página de resultados con cursor
+    NoteQuery,  # Para búsquedas compuestas
     NoteSchema,  # Para leer notas
+    NoteSearchFilters,  # Para restringir búsquedas (proyecto, tipo, idioma)
+    NoteSearchResult,  # Para resultados de búsqueda con puntuación
+    NoteSummarySchema,  # Para vistas de lista (sin el contenido completo)
+    NoteTitleMatch,  # Para sugerencias difusas de títulos
     NoteUpdate,  # Para actualizar notas
 )
+from src.pkm_app.core.application.dtos.search_dto import KeywordMatchMode
+from src.pkm_app.core.application.dtos.note_dto import DEFAULT_SNIPPET_LENGTH
 
 # También podríamos necesitar el modelo SQLAlchemy Note aquí si decidimos que
 # los métodos del repositorio devuelvan instancias del ORM en algunos casos,
@@ -37,10 +48,13 @@ class INoteRepository(ABC):  # Renombrado de AbstractNoteInterface a INoteReposi
 
     @abstractmethod
     async def list_by_user(  # Añadido async
-        self, user_id: str, skip: int = 0, limit: int = 100
+        self, user_id: str, skip: int = 0, limit: int = 100, cursor: str | None = None
     ) -> list[NoteSchema]:
         """
         Lista las notas de un usuario específico, con paginación.
+        Ordenadas por (updated_at, id) descendente. Si se indica 'cursor'
+        (ver NoteCursor/NotePage) se usa paginación keyset en lugar de 'skip'.
+        Los métodos de búsqueda siguientes aceptan 'cursor' con la misma semántica.
         """
         raise NotImplementedError
 
@@ -55,6 +69,17 @@ class INoteRepository(ABC):  # Renombrado de AbstractNoteInterface a INoteReposi
         """
         raise NotImplementedError
 
+    @abstractmethod
+    async def create_many(
+        self, notes_in: Iterable[NoteCreate], user_id: str, batch_size: int = 1000
+    ) -> list[uuid.UUID]:
+        """
+        Ingesta masiva de notas (y sus keywords) para un usuario, por lotes de 'batch_size'.
+        Pensado para importaciones: no devuelve esquemas completos, solo los IDs
+        de las notas creadas en el mismo orden de 'notes_in'.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     async def update(  # Añadido async
         self, note_id: uuid.UUID, note_in: NoteUpdate, user_id: str
@@ -77,20 +102,100 @@ class INoteRepository(ABC):  # Renombrado de AbstractNoteInterface a INoteReposi
 
     @abstractmethod
     async def search_by_title_or_content(  # Añadido async
-        self, user_id: str, query: str, skip: int = 0, limit: int = 20
+        self,
+        user_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
     ) -> list[NoteSchema]:
         """
         Busca notas por una cadena de consulta en el título o contenido.
+        Usa búsqueda full-text (sintaxis de websearch_to_tsquery) ordenada por fecha de
+        actualización; para ordenar por relevancia usar search_full_text.
         """
         raise NotImplementedError
 
     # Podríamos añadir más métodos específicos aquí según las necesidades, por ejemplo:
+    @abstractmethod
+    async def search_full_text(
+        self, user_id: str, query: str, skip: int = 0, limit: int = 20
+    ) -> list[NoteSearchResult]:
+        """
+        Búsqueda full-text por relevancia (ts_rank_cd), con el título ponderado
+        por encima del contenido. 'query' admite sintaxis tipo buscador web:
+        "frase exacta", OR y -exclusión.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search_titles_fuzzy(
+        self, user_id: str, query: str, limit: int = 10, threshold: float = 0.4
+    ) -> list[NoteTitleMatch]:
+        """
+        Sugerencias de títulos tolerantes a erratas para "buscar mientras se escribe"
+        (similitud de trigramas). Los títulos que empiezan por 'query' van primero; después,
+        por similitud descendente. 'threshold' (0-1] es la similitud mínima.
+        Las consultas de menos de 3 caracteres devuelven una lista vacía.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search_keywords_fuzzy(
+        self, user_id: str, query: str, limit: int = 10, threshold: float = 0.4
+    ) -> list[KeywordMatch]:
+        """
+        Sugerencias de keywords del usuario tolerantes a erratas (similitud de trigramas),
+        con el mismo orden y umbral que search_titles_fuzzy.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search_semantic(
+        self,
+        user_id: str,
+        query_vector: Sequence[float],
+        k: int = 10,
+        filters: NoteSearchFilters | None = None,
+    ) -> list[NoteSearchResult]:
+        """
+        Búsqueda semántica: las k notas cuyo embedding está más cerca de 'query_vector'
+        (similitud coseno, de mayor a menor). 'query_vector' debe venir del mismo modelo de
+        embeddings que las notas; las notas sin embedding no se devuelven.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search_hybrid(
+        self,
+        user_id: str,
+        query: str,
+        query_vector: Sequence[float],
+        k: int = 10,
+        filters: NoteSearchFilters | None = None,
+        recency_half_life_days: float | None = None,
+    ) -> list[NoteHybridSearchResult]:
+        """
+        Búsqueda híbrida en una sola consulta: combina la búsqueda full-text por 'query' y la
+        semántica por 'query_vector' con reciprocal rank fusion. Si se indica
+        'recency_half_life_days', las notas editadas recientemente puntúan más (hasta el
+        doble), con esa vida media en días.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     async def search_by_project(  # Añadido async
-        self, project_id: uuid.UUID, user_id: str, skip: int = 0, limit: int = 20
+        self,
+        project_id: uuid.UUID,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        include_subprojects: bool = False,
     ) -> list[NoteSchema]:
         """
-        Lista las notas asociadas a un proyecto específico.
+        Lista las notas asociadas a un proyecto específico y, con `include_subprojects`,
+        las de todos sus subproyectos a cualquier profundidad.
         """
         raise NotImplementedError
 
@@ -102,6 +207,7 @@ class INoteRepository(ABC):  # Renombrado de AbstractNoteInterface a INoteReposi
         user_id: str,
         skip: int = 0,
         limit: int = 20,
+        cursor: str | None = None,
     ) -> list[NoteSchema]:
         """
         Lista las notas asociadas a una keyword específica en un proyecto.
@@ -112,12 +218,87 @@ class INoteRepository(ABC):  # Renombrado de AbstractNoteInterface a INoteReposi
     async def search_by_keyword_names(  # Añadido async
         self,
         keyword_names: list[str],
-        project_id: uuid.UUID,
+        project_id: uuid.UUID | None,
         user_id: str,
         skip: int = 0,
         limit: int = 20,
+        cursor: str | None = None,
+        match: KeywordMatchMode = "any",
     ) -> list[NoteSchema]:
         """
-        Lista las notas asociadas a una lista de keywords específicas en un proyecto.
+        Lista las notas etiquetadas con todas (`match="all"`) o alguna (`match="any"`) de las
+        keywords, cada una una sola vez. Con `project_id` None busca en todos los proyectos.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def query_notes(self, user_id: str, query: NoteQuery) -> NotePage:
+        """
+        Ejecuta una búsqueda compuesta (texto, proyecto, keywords, tipo, idioma, fechas,
+        metadata, orden y cursor) en una sola consulta. Devuelve la página y el cursor de
+        la siguiente. Lanza ValueError si el cursor no es válido para el orden pedido.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_summaries_by_user(
+        self,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        """
+        Como list_by_user, pero devuelve resúmenes para vistas de lista: título, los
+        primeros 'snippet_length' caracteres del contenido, fechas y nombres de keywords.
+        Nunca lee el contenido completo. Los cursores son los mismos que en list_by_user.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search_summaries_by_title_or_content(
+        self,
+        user_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        """
+        Resúmenes de search_by_title_or_content.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search_summaries_by_project(
+        self,
+        project_id: uuid.UUID,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+        include_subprojects: bool = False,
+    ) -> list[NoteSummarySchema]:
+        """
+        Resúmenes de search_by_project.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search_summaries_by_keyword_name(
+        self,
+        keyword_name: str,
+        project_id: uuid.UUID | None,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        """
+        Resúmenes de search_by_keyword_name.
         """
         raise NotImplementedError
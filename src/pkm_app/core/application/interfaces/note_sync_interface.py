@@ -2,14 +2,25 @@
 
 import uuid
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
 from typing import Optional
 
 # Importamos los esquemas Pydantic
 from src.pkm_app.core.application.dtos import (
+    KeywordMatch,
     NoteCreate,
+    NoteHybridSearchResult,
+    NotePage,
+    NoteQuery,
     NoteSchema,
+    NoteSearchFilters,
+    NoteSearchResult,
+    NoteSummarySchema,
+    NoteTitleMatch,
     NoteUpdate,
 )
+from src.pkm_app.core.application.dtos.search_dto import KeywordMatchMode
+from src.pkm_app.core.application.dtos.note_dto import DEFAULT_SNIPPET_LENGTH
 
 
 class ISyncNoteRepository(ABC):
@@ -27,9 +38,14 @@ class ISyncNoteRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def list_by_user(self, user_id: str, skip: int = 0, limit: int = 100) -> list[NoteSchema]:
+    def list_by_user(
+        self, user_id: str, skip: int = 0, limit: int = 100, cursor: str | None = None
+    ) -> list[NoteSchema]:
         """
         Lista las notas de un usuario específico, con paginación.
+        Ordenadas por (updated_at, id) descendente. Si se indica 'cursor'
+        (ver NoteCursor/NotePage) se usa paginación keyset en lugar de 'skip'.
+        Los métodos de búsqueda siguientes aceptan 'cursor' con la misma semántica.
         """
         raise NotImplementedError
 
@@ -41,6 +57,17 @@ class ISyncNoteRepository(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def create_many(
+        self, notes_in: Iterable[NoteCreate], user_id: str, batch_size: int = 1000
+    ) -> list[uuid.UUID]:
+        """
+        Ingesta masiva de notas (y sus keywords) para un usuario, por lotes de 'batch_size'.
+        Pensado para importaciones: no devuelve esquemas completos, solo los IDs
+        de las notas creadas en el mismo orden de 'notes_in'.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def update(self, note_id: uuid.UUID, note_in: NoteUpdate, user_id: str) -> NoteSchema | None:
         """
@@ -60,19 +87,99 @@ class ISyncNoteRepository(ABC):
 
     @abstractmethod
     def search_by_title_or_content(
-        self, user_id: str, query: str, skip: int = 0, limit: int = 20
+        self,
+        user_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
     ) -> list[NoteSchema]:
         """
         Busca notas por una cadena de consulta en el título o contenido.
+        Usa búsqueda full-text (sintaxis de websearch_to_tsquery) ordenada por fecha de
+        actualización; para ordenar por relevancia usar search_full_text.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_full_text(
+        self, user_id: str, query: str, skip: int = 0, limit: int = 20
+    ) -> list[NoteSearchResult]:
+        """
+        Búsqueda full-text por relevancia (ts_rank_cd), con el título ponderado
+        por encima del contenido. 'query' admite sintaxis tipo buscador web:
+        "frase exacta", OR y -exclusión.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_titles_fuzzy(
+        self, user_id: str, query: str, limit: int = 10, threshold: float = 0.4
+    ) -> list[NoteTitleMatch]:
+        """
+        Sugerencias de títulos tolerantes a erratas para "buscar mientras se escribe"
+        (similitud de trigramas). Los títulos que empiezan por 'query' van primero; después,
+        por similitud descendente. 'threshold' (0-1] es la similitud mínima.
+        Las consultas de menos de 3 caracteres devuelven una lista vacía.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_keywords_fuzzy(
+        self, user_id: str, query: str, limit: int = 10, threshold: float = 0.4
+    ) -> list[KeywordMatch]:
+        """
+        Sugerencias de keywords del usuario tolerantes a erratas (similitud de trigramas),
+        con el mismo orden y umbral que search_titles_fuzzy.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_semantic(
+        self,
+        user_id: str,
+        query_vector: Sequence[float],
+        k: int = 10,
+        filters: NoteSearchFilters | None = None,
+    ) -> list[NoteSearchResult]:
+        """
+        Búsqueda semántica: las k notas cuyo embedding está más cerca de 'query_vector'
+        (similitud coseno, de mayor a menor). 'query_vector' debe venir del mismo modelo de
+        embeddings que las notas; las notas sin embedding no se devuelven.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_hybrid(
+        self,
+        user_id: str,
+        query: str,
+        query_vector: Sequence[float],
+        k: int = 10,
+        filters: NoteSearchFilters | None = None,
+        recency_half_life_days: float | None = None,
+    ) -> list[NoteHybridSearchResult]:
+        """
+        Búsqueda híbrida en una sola consulta: combina la búsqueda full-text por 'query' y la
+        semántica por 'query_vector' con reciprocal rank fusion. Si se indica
+        'recency_half_life_days', las notas editadas recientemente puntúan más (hasta el
+        doble), con esa vida media en días.
         """
         raise NotImplementedError
 
     @abstractmethod
     def search_by_project(
-        self, project_id: uuid.UUID, user_id: str, skip: int = 0, limit: int = 20
+        self,
+        project_id: uuid.UUID,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        include_subprojects: bool = False,
     ) -> list[NoteSchema]:
         """
-        Lista las notas asociadas a un proyecto específico.
+        Lista las notas asociadas a un proyecto específico y, con `include_subprojects`,
+        las de todos sus subproyectos a cualquier profundidad.
         """
         raise NotImplementedError
 
@@ -84,6 +191,7 @@ class ISyncNoteRepository(ABC):
         user_id: str,
         skip: int = 0,
         limit: int = 20,
+        cursor: str | None = None,
     ) -> list[NoteSchema]:
         """
         Lista las notas asociadas a una keyword específica en un proyecto.
@@ -94,12 +202,87 @@ class ISyncNoteRepository(ABC):
     def search_by_keyword_names(
         self,
         keyword_names: list[str],
-        project_id: uuid.UUID,
+        project_id: uuid.UUID | None,
         user_id: str,
         skip: int = 0,
         limit: int = 20,
+        cursor: str | None = None,
+        match: KeywordMatchMode = "any",
     ) -> list[NoteSchema]:
         """
-        Lista las notas asociadas a una lista de keywords específicas en un proyecto.
+        Lista las notas etiquetadas con todas (`match="all"`) o alguna (`match="any"`) de las
+        keywords, cada una una sola vez. Con `project_id` None busca en todos los proyectos.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def query_notes(self, user_id: str, query: NoteQuery) -> NotePage:
+        """
+        Ejecuta una búsqueda compuesta (texto, proyecto, keywords, tipo, idioma, fechas,
+        metadata, orden y cursor) en una sola consulta. Devuelve la página y el cursor de
+        la siguiente. Lanza ValueError si el cursor no es válido para el orden pedido.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_summaries_by_user(
+        self,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        """
+        Como list_by_user, pero devuelve resúmenes para vistas de lista: título, los
+        primeros 'snippet_length' caracteres del contenido, fechas y nombres de keywords.
+        Nunca lee el contenido completo. Los cursores son los mismos que en list_by_user.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_summaries_by_title_or_content(
+        self,
+        user_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        """
+        Resúmenes de search_by_title_or_content.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_summaries_by_project(
+        self,
+        project_id: uuid.UUID,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+        include_subprojects: bool = False,
+    ) -> list[NoteSummarySchema]:
+        """
+        Resúmenes de search_by_project.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_summaries_by_keyword_name(
+        self,
+        keyword_name: str,
+        project_id: uuid.UUID | None,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        """
+        Resúmenes de search_by_keyword_name.
         """
         raise NotImplementedError
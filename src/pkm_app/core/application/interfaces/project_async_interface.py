@@ -0,0 +1,67 @@
+# src/pkm_app/core/application/interfaces/project_async_interface.py
+
+import uuid
+from abc import ABC, abstractmethod
+
+from src.pkm_app.core.application.dtos import ProjectCreate, ProjectSchema, ProjectUpdate
+
+
+class IProjectRepository(ABC):
+    """
+    Interfaz abstracta para gestionar proyectos y su jerarquía de forma asíncrona. Cada
+    consulta de la jerarquía (ancestros, subproyectos) es una sola sentencia, sea cual sea
+    su profundidad.
+    """
+
+    @abstractmethod
+    async def create(self, project_in: ProjectCreate, user_id: str) -> ProjectSchema:
+        """
+        Crea un proyecto del usuario. Lanza ValueError si el proyecto padre no se encuentra o
+        no pertenece al usuario.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_by_id(self, project_id: uuid.UUID, user_id: str) -> ProjectSchema | None:
+        """
+        Obtiene un proyecto por su ID, asegurando que pertenece al usuario.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update(
+        self, project_id: uuid.UUID, project_in: ProjectUpdate, user_id: str
+    ) -> ProjectSchema | None:
+        """
+        Actualiza los campos enviados de un proyecto. Cambiar `parent_project_id` mueve el
+        proyecto con todos sus subproyectos (None lo convierte en raíz). Devuelve None si no
+        se encuentra. Lanza ValueError si el nuevo padre no pertenece al usuario o está
+        dentro del propio proyecto.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, project_id: uuid.UUID, user_id: str) -> bool:
+        """
+        Elimina un proyecto. Sus subproyectos directos pasan a ser raíz y sus notas quedan
+        sin proyecto. Devuelve True si se eliminó, False si no se encontró.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_ancestors(self, project_id: uuid.UUID, user_id: str) -> list[ProjectSchema]:
+        """
+        Lista los ancestros del proyecto, desde la raíz hasta su padre. Vacío si es raíz o no
+        se encuentra.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_descendants(
+        self, project_id: uuid.UUID, user_id: str, max_depth: int | None = None
+    ) -> list[ProjectSchema]:
+        """
+        Lista los subproyectos a cualquier profundidad (o hasta `max_depth` niveles por
+        debajo), nivel a nivel y por nombre dentro de cada nivel.
+        """
+        raise NotImplementedError
@@ -2,8 +2,12 @@ from abc import abstractmethod
 from typing import Any, Protocol, TypeVar, runtime_checkable
 
 # Importar las interfaces de repositorio específicas
+from .link_graph_async_interface import ILinkGraphRepository
+from .link_graph_sync_interface import ISyncLinkGraphRepository
 from .note_async_interface import INoteRepository
 from .note_sync_interface import ISyncNoteRepository
+from .project_async_interface import IProjectRepository
+from .project_sync_interface import ISyncProjectRepository
 
 RepoType = TypeVar("RepoType", covariant=True)
 
@@ -26,6 +30,8 @@ class IAsyncUnitOfWork(Protocol):
     """
 
     notes: INoteRepository  # Repositorio de notas asíncrono
+    links: ILinkGraphRepository  # Grafo de enlaces entre notas
+    projects: IProjectRepository  # Proyectos y su jerarquía
 
     @abstractmethod
     async def __aenter__(self) -> "IAsyncUnitOfWork":
@@ -55,6 +61,8 @@ class ISyncUnitOfWork(Protocol):
     """
 
     notes: ISyncNoteRepository  # Repositorio de notas síncrono
+    links: ISyncLinkGraphRepository  # Grafo de enlaces entre notas
+    projects: ISyncProjectRepository  # Proyectos y su jerarquía
 
     @abstractmethod
     def __enter__(self) -> "ISyncUnitOfWork":
@@ -0,0 +1,505 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/cache/cached_note_repository.py
+# ---------------------------------------------------------------------------
+"""
+Repositorios de notas con caché de lectura (read-through) sobre NoteCache.
+
+Solo `get_by_id` usa la caché: es la consulta cara (notas con keywords, proyecto y fuente)
+que se repite al abrir una y otra vez las mismas notas. Los listados y búsquedas dependen
+de demasiados parámetros para cachearlos con provecho y se delegan sin más.
+
+Las escrituras no tocan la caché directamente: `create`/`update`/`delete` anotan la nota en
+`pending_invalidations` y la UoW la invalida solo después de un commit correcto (o descarta
+la anotación si hay rollback). Así una transacción revertida no vacía la caché y otra
+concurrente no puede guardar en ella datos sin confirmar.
+"""
+
+import uuid
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from src.pkm_app.core.application.dtos import (
+    KeywordMatch,
+    NoteCreate,
+    NoteHybridSearchResult,
+    NotePage,
+    NoteQuery,
+    NoteSchema,
+    NoteSearchFilters,
+    NoteSearchResult,
+    NoteSummarySchema,
+    NoteTitleMatch,
+    NoteUpdate,
+)
+from src.pkm_app.core.application.dtos.search_dto import KeywordMatchMode
+from src.pkm_app.core.application.dtos.note_dto import DEFAULT_SNIPPET_LENGTH
+from src.pkm_app.core.application.interfaces.note_async_interface import INoteRepository
+from src.pkm_app.core.application.interfaces.note_sync_interface import ISyncNoteRepository
+from src.pkm_app.infrastructure.cache.note_cache import NoteCache, NoteCacheKey
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_bulk_ingest import (
+    DEFAULT_BULK_BATCH_SIZE,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.trigram_search import (
+    DEFAULT_SIMILARITY_THRESHOLD,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.write_tracking import (
+    NOTE_ENTITY,
+)
+
+
+class CachedNoteRepository(INoteRepository):
+    """
+    INoteRepository que sirve `get_by_id` desde una NoteCache y delega el resto en el
+    repositorio envuelto. Las notas modificadas o borradas se acumulan en
+    `pending_invalidations` hasta que la UoW confirma (o descarta) la transacción.
+    """
+
+    def __init__(self, repository: INoteRepository, cache: NoteCache):
+        self._repository = repository
+        self._cache = cache
+        self.pending_invalidations: set[NoteCacheKey] = set()
+
+    def __getattr__(self, name: str) -> Any:
+        # Atributos propios de la implementación envuelta (p. ej. `session`).
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._repository, name)
+
+    def commit_invalidations(self) -> None:
+        """Invalida las notas escritas; la UoW lo llama tras un commit correcto."""
+        self._cache.invalidate(self.pending_invalidations)
+        self.pending_invalidations.clear()
+
+    def discard_invalidations(self) -> None:
+        """Olvida las notas escritas en una transacción revertida."""
+        self.pending_invalidations.clear()
+
+    def _uncommitted(self, key: NoteCacheKey) -> bool:
+        # Además de las notas escritas aquí, las que anota el repositorio envuelto (creadas,
+        # o afectadas por ediciones y borrados de proyectos) hasta que la UoW confirma.
+        if key in self.pending_invalidations:
+            return True
+        touched = getattr(self._repository, "touched", None)
+        return touched is not None and key in touched.keys(NOTE_ENTITY)
+
+    async def get_by_id(self, note_id: uuid.UUID, user_id: str) -> NoteSchema | None:
+        key = (user_id, note_id)
+        # Lo modificado en esta transacción aún no está confirmado: ni se lee de la caché
+        # (estaría obsoleto) ni se guarda en ella (otros verían datos sin confirmar).
+        if self._uncommitted(key):
+            return await self._repository.get_by_id(note_id, user_id)
+        note = self._cache.get(key)
+        if note is not None:
+            return note
+        token = self._cache.load_token()
+        note = await self._repository.get_by_id(note_id, user_id)
+        if note is not None:
+            self._cache.put(key, note, token)
+        return note
+
+    async def list_by_user(
+        self, user_id: str, skip: int = 0, limit: int = 100, cursor: str | None = None
+    ) -> list[NoteSchema]:
+        return await self._repository.list_by_user(user_id, skip, limit, cursor)
+
+    async def create(self, note_in: NoteCreate, user_id: str) -> NoteSchema:
+        note = await self._repository.create(note_in, user_id)
+        self.pending_invalidations.add((user_id, note.id))
+        return note
+
+    async def create_many(
+        self,
+        notes_in: Iterable[NoteCreate],
+        user_id: str,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+    ) -> list[uuid.UUID]:
+        note_ids = await self._repository.create_many(notes_in, user_id, batch_size)
+        self.pending_invalidations.update((user_id, note_id) for note_id in note_ids)
+        return note_ids
+
+    async def update(
+        self, note_id: uuid.UUID, note_in: NoteUpdate, user_id: str
+    ) -> NoteSchema | None:
+        self.pending_invalidations.add((user_id, note_id))
+        return await self._repository.update(note_id, note_in, user_id)
+
+    async def delete(self, note_id: uuid.UUID, user_id: str) -> bool:
+        self.pending_invalidations.add((user_id, note_id))
+        return await self._repository.delete(note_id, user_id)
+
+    async def search_by_title_or_content(
+        self,
+        user_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> list[NoteSchema]:
+        return await self._repository.search_by_title_or_content(
+            user_id, query, skip, limit, cursor
+        )
+
+    async def search_full_text(
+        self, user_id: str, query: str, skip: int = 0, limit: int = 20
+    ) -> list[NoteSearchResult]:
+        return await self._repository.search_full_text(user_id, query, skip, limit)
+
+    async def search_titles_fuzzy(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 10,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ) -> list[NoteTitleMatch]:
+        return await self._repository.search_titles_fuzzy(user_id, query, limit, threshold)
+
+    async def search_keywords_fuzzy(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 10,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ) -> list[KeywordMatch]:
+        return await self._repository.search_keywords_fuzzy(user_id, query, limit, threshold)
+
+    async def search_semantic(
+        self,
+        user_id: str,
+        query_vector: Sequence[float],
+        k: int = 10,
+        filters: NoteSearchFilters | None = None,
+    ) -> list[NoteSearchResult]:
+        return await self._repository.search_semantic(user_id, query_vector, k, filters)
+
+    async def search_hybrid(
+        self,
+        user_id: str,
+        query: str,
+        query_vector: Sequence[float],
+        k: int = 10,
+        filters: NoteSearchFilters | None = None,
+        recency_half_life_days: float | None = None,
+    ) -> list[NoteHybridSearchResult]:
+        return await self._repository.search_hybrid(
+            user_id, query, query_vector, k, filters, recency_half_life_days
+        )
+
+    async def search_by_project(
+        self,
+        project_id: uuid.UUID,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        include_subprojects: bool = False,
+    ) -> list[NoteSchema]:
+        return await self._repository.search_by_project(
+            project_id, user_id, skip, limit, cursor, include_subprojects
+        )
+
+    async def search_by_keyword_name(
+        self,
+        keyword_name: str,
+        project_id: uuid.UUID | None,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> list[NoteSchema]:
+        return await self._repository.search_by_keyword_name(
+            keyword_name, project_id, user_id, skip, limit, cursor
+        )
+
+    async def search_by_keyword_names(
+        self,
+        keyword_names: list[str],
+        project_id: uuid.UUID | None,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        match: KeywordMatchMode = "any",
+    ) -> list[NoteSchema]:
+        return await self._repository.search_by_keyword_names(
+            keyword_names, project_id, user_id, skip, limit, cursor, match
+        )
+
+    async def query_notes(self, user_id: str, query: NoteQuery) -> NotePage:
+        return await self._repository.query_notes(user_id, query)
+
+    async def list_summaries_by_user(
+        self,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        return await self._repository.list_summaries_by_user(
+            user_id, skip, limit, cursor, snippet_length
+        )
+
+    async def search_summaries_by_title_or_content(
+        self,
+        user_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        return await self._repository.search_summaries_by_title_or_content(
+            user_id, query, skip, limit, cursor, snippet_length
+        )
+
+    async def search_summaries_by_project(
+        self,
+        project_id: uuid.UUID,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+        include_subprojects: bool = False,
+    ) -> list[NoteSummarySchema]:
+        return await self._repository.search_summaries_by_project(
+            project_id, user_id, skip, limit, cursor, snippet_length, include_subprojects
+        )
+
+    async def search_summaries_by_keyword_name(
+        self,
+        keyword_name: str,
+        project_id: uuid.UUID | None,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        return await self._repository.search_summaries_by_keyword_name(
+            keyword_name, project_id, user_id, skip, limit, cursor, snippet_length
+        )
+
+
+class SyncCachedNoteRepository(ISyncNoteRepository):
+    """Versión síncrona de CachedNoteRepository, para SyncSQLAlchemyUnitOfWork."""
+
+    def __init__(self, repository: ISyncNoteRepository, cache: NoteCache):
+        self._repository = repository
+        self._cache = cache
+        self.pending_invalidations: set[NoteCacheKey] = set()
+
+    def __getattr__(self, name: str) -> Any:
+        # Atributos propios de la implementación envuelta (p. ej. `session`).
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._repository, name)
+
+    def commit_invalidations(self) -> None:
+        """Invalida las notas escritas; la UoW lo llama tras un commit correcto."""
+        self._cache.invalidate(self.pending_invalidations)
+        self.pending_invalidations.clear()
+
+    def discard_invalidations(self) -> None:
+        """Olvida las notas escritas en una transacción revertida."""
+        self.pending_invalidations.clear()
+
+    def _uncommitted(self, key: NoteCacheKey) -> bool:
+        # Además de las notas escritas aquí, las que anota el repositorio envuelto (creadas,
+        # o afectadas por ediciones y borrados de proyectos) hasta que la UoW confirma.
+        if key in self.pending_invalidations:
+            return True
+        touched = getattr(self._repository, "touched", None)
+        return touched is not None and key in touched.keys(NOTE_ENTITY)
+
+    def get_by_id(self, note_id: uuid.UUID, user_id: str) -> NoteSchema | None:
+        key = (user_id, note_id)
+        # Lo modificado en esta transacción aún no está confirmado: ni se lee de la caché
+        # (estaría obsoleto) ni se guarda en ella (otros verían datos sin confirmar).
+        if self._uncommitted(key):
+            return self._repository.get_by_id(note_id, user_id)
+        note = self._cache.get(key)
+        if note is not None:
+            return note
+        token = self._cache.load_token()
+        note = self._repository.get_by_id(note_id, user_id)
+        if note is not None:
+            self._cache.put(key, note, token)
+        return note
+
+    def list_by_user(
+        self, user_id: str, skip: int = 0, limit: int = 100, cursor: str | None = None
+    ) -> list[NoteSchema]:
+        return self._repository.list_by_user(user_id, skip, limit, cursor)
+
+    def create(self, note_in: NoteCreate, user_id: str) -> NoteSchema:
+        note = self._repository.create(note_in, user_id)
+        self.pending_invalidations.add((user_id, note.id))
+        return note
+
+    def create_many(
+        self,
+        notes_in: Iterable[NoteCreate],
+        user_id: str,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+    ) -> list[uuid.UUID]:
+        note_ids = self._repository.create_many(notes_in, user_id, batch_size)
+        self.pending_invalidations.update((user_id, note_id) for note_id in note_ids)
+        return note_ids
+
+    def update(self, note_id: uuid.UUID, note_in: NoteUpdate, user_id: str) -> NoteSchema | None:
+        self.pending_invalidations.add((user_id, note_id))
+        return self._repository.update(note_id, note_in, user_id)
+
+    def delete(self, note_id: uuid.UUID, user_id: str) -> bool:
+        self.pending_invalidations.add((user_id, note_id))
+        return self._repository.delete(note_id, user_id)
+
+    def search_by_title_or_content(
+        self,
+        user_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> list[NoteSchema]:
+        return self._repository.search_by_title_or_content(user_id, query, skip, limit, cursor)
+
+    def search_full_text(
+        self, user_id: str, query: str, skip: int = 0, limit: int = 20
+    ) -> list[NoteSearchResult]:
+        return self._repository.search_full_text(user_id, query, skip, limit)
+
+    def search_titles_fuzzy(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 10,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ) -> list[NoteTitleMatch]:
+        return self._repository.search_titles_fuzzy(user_id, query, limit, threshold)
+
+    def search_keywords_fuzzy(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 10,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ) -> list[KeywordMatch]:
+        return self._repository.search_keywords_fuzzy(user_id, query, limit, threshold)
+
+    def search_semantic(
+        self,
+        user_id: str,
+        query_vector: Sequence[float],
+        k: int = 10,
+        filters: NoteSearchFilters | None = None,
+    ) -> list[NoteSearchResult]:
+        return self._repository.search_semantic(user_id, query_vector, k, filters)
+
+    def search_hybrid(
+        self,
+        user_id: str,
+        query: str,
+        query_vector: Sequence[float],
+        k: int = 10,
+        filters: NoteSearchFilters | None = None,
+        recency_half_life_days: float | None = None,
+    ) -> list[NoteHybridSearchResult]:
+        return self._repository.search_hybrid(
+            user_id, query, query_vector, k, filters, recency_half_life_days
+        )
+
+    def search_by_project(
+        self,
+        project_id: uuid.UUID,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        include_subprojects: bool = False,
+    ) -> list[NoteSchema]:
+        return self._repository.search_by_project(
+            project_id, user_id, skip, limit, cursor, include_subprojects
+        )
+
+    def search_by_keyword_name(
+        self,
+        keyword_name: str,
+        project_id: uuid.UUID | None,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> list[NoteSchema]:
+        return self._repository.search_by_keyword_name(
+            keyword_name, project_id, user_id, skip, limit, cursor
+        )
+
+    def search_by_keyword_names(
+        self,
+        keyword_names: list[str],
+        project_id: uuid.UUID | None,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        match: KeywordMatchMode = "any",
+    ) -> list[NoteSchema]:
+        return self._repository.search_by_keyword_names(
+            keyword_names, project_id, user_id, skip, limit, cursor, match
+        )
+
+    def query_notes(self, user_id: str, query: NoteQuery) -> NotePage:
+        return self._repository.query_notes(user_id, query)
+
+    def list_summaries_by_user(
+        self,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        return self._repository.list_summaries_by_user(user_id, skip, limit, cursor, snippet_length)
+
+    def search_summaries_by_title_or_content(
+        self,
+        user_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        return self._repository.search_summaries_by_title_or_content(
+            user_id, query, skip, limit, cursor, snippet_length
+        )
+
+    def search_summaries_by_project(
+        self,
+        project_id: uuid.UUID,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+        include_subprojects: bool = False,
+    ) -> list[NoteSummarySchema]:
+        return self._repository.search_summaries_by_project(
+            project_id, user_id, skip, limit, cursor, snippet_length, include_subprojects
+        )
+
+    def search_summaries_by_keyword_name(
+        self,
+        keyword_name: str,
+        project_id: uuid.UUID | None,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        return self._repository.search_summaries_by_keyword_name(
+            keyword_name, project_id, user_id, skip, limit, cursor, snippet_length
+        )
@@ -0,0 +1,208 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/cache/invalidation_bus.py
+# ---------------------------------------------------------------------------
+"""
+Bus de invalidación de cachés entre procesos (workers de uvicorn) con LISTEN/NOTIFY de
+PostgreSQL, sin polling.
+
+Publicación: la UoW, al confirmar, ejecuta `pg_notify` dentro de la misma transacción
+justo antes del COMMIT. PostgreSQL solo entrega las notificaciones de transacciones
+confirmadas, así que un rollback no invalida nada y ningún proceso recibe el aviso antes
+de que el dato nuevo sea visible.
+
+Carga útil compacta en JSON: `{"u": user_id, "e": entidad, "i": [ids]}`. NOTIFY admite
+menos de 8000 bytes, así que las listas largas se reparten en varias notificaciones (todas
+en una sola sentencia).
+
+Suscripción: cada proceso abre una única conexión asyncpg (fuera del pool) con
+CacheInvalidationListener y registra las cachés locales. Si la conexión se pierde, pudo
+perderse algún aviso: se vacían las cachés suscritas y se reconecta.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import asyncpg
+from sqlalchemy import Select, func, select
+from sqlalchemy.engine import make_url
+
+from src.pkm_app.infrastructure.cache.note_cache import NoteCache
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.write_tracking import (
+    NOTE_ENTITY,
+    TouchedEntities,
+)
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "kairos_cache_invalidation"
+# Límite de NOTIFY (8000 bytes) con margen.
+MAX_PAYLOAD_BYTES = 7900
+RECONNECT_DELAY_SECONDS = 1.0
+MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+InvalidateHandler = Callable[[str, Sequence[uuid.UUID]], None]
+ResetHandler = Callable[[], None]
+
+
+@dataclass(frozen=True)
+class InvalidationMessage:
+    user_id: str
+    entity: str
+    ids: tuple[uuid.UUID, ...]
+
+
+def encode_invalidation_payloads(
+    user_id: str, entity: str, ids: Iterable[uuid.UUID], max_bytes: int = MAX_PAYLOAD_BYTES
+) -> list[str]:
+    """Cargas útiles de NOTIFY para `ids`, repartidas para no superar `max_bytes`."""
+    prefix = json.dumps({"u": user_id, "e": entity, "i": []}, separators=(",", ":"))[:-2]
+    # Cada id ocupa 36 caracteres + 2 comillas + 1 coma.
+    per_payload = (max_bytes - len(prefix.encode()) - 2) // 39
+    if per_payload < 1:
+        raise ValueError("max_bytes no admite ni un id con este user_id.")
+    id_strings = sorted(str(note_id) for note_id in ids)
+    return [
+        json.dumps(
+            {"u": user_id, "e": entity, "i": id_strings[start : start + per_payload]},
+            separators=(",", ":"),
+        )
+        for start in range(0, len(id_strings), per_payload)
+    ]
+
+
+def decode_invalidation_payload(payload: str) -> InvalidationMessage:
+    data = json.loads(payload)
+    return InvalidationMessage(
+        user_id=data["u"], entity=data["e"], ids=tuple(uuid.UUID(value) for value in data["i"])
+    )
+
+
+def notify_invalidations_stmt(touched: TouchedEntities) -> Select[Any] | None:
+    """
+    SELECT con un `pg_notify` por carga útil de todo lo escrito en la transacción (un solo
+    round trip), o None si no hay nada que publicar.
+    """
+    payloads = [
+        payload
+        for entity, user_id, ids in touched
+        for payload in encode_invalidation_payloads(user_id, entity, ids)
+    ]
+    if not payloads:
+        return None
+    return select(*(func.pg_notify(INVALIDATION_CHANNEL, payload) for payload in payloads))
+
+
+@dataclass
+class InvalidationListenerStats:
+    received: int = 0
+    malformed: int = 0
+    resets: int = 0  # vaciados completos por pérdida de conexión o avisos ilegibles
+
+
+class CacheInvalidationListener:
+    """
+    Conexión LISTEN de un proceso. Uso:
+
+        listener = CacheInvalidationListener(settings.ASYNC_DATABASE_URL)
+        listener.subscribe_note_cache(note_cache)
+        await listener.start()
+        ...
+        await listener.stop()
+    """
+
+    def __init__(self, database_url: str, channel: str = INVALIDATION_CHANNEL):
+        # asyncpg recibe un DSN de libpq, sin el sufijo de driver de SQLAlchemy.
+        self._dsn = (
+            make_url(database_url)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        self.channel = channel
+        self._handlers: dict[str, list[InvalidateHandler]] = {}
+        self._reset_handlers: list[ResetHandler] = []
+        self._connection: asyncpg.Connection | None = None
+        self._reconnect_task: asyncio.Task[None] | None = None
+        self._stopped = False
+        self.stats = InvalidationListenerStats()
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    def subscribe(self, entity: str, invalidate: InvalidateHandler, reset: ResetHandler) -> None:
+        """
+        Registra una caché local: `invalidate(user_id, ids)` por cada aviso de `entity` y
+        `reset()` cuando no se puede saber qué se perdió.
+        """
+        self._handlers.setdefault(entity, []).append(invalidate)
+        self._reset_handlers.append(reset)
+
+    def subscribe_note_cache(self, cache: NoteCache) -> None:
+        self.subscribe(
+            NOTE_ENTITY,
+            lambda user_id, ids: cache.invalidate((user_id, note_id) for note_id in ids),
+            cache.clear,
+        )
+
+    async def start(self) -> None:
+        self._stopped = False
+        await self._connect()
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
+
+    async def _connect(self) -> None:
+        connection = await asyncpg.connect(self._dsn)
+        connection.add_termination_listener(self._on_termination)
+        await connection.add_listener(self.channel, self._on_notification)
+        self._connection = connection
+
+    def _on_notification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self.stats.received += 1
+        try:
+            message = decode_invalidation_payload(payload)
+        except (ValueError, KeyError, TypeError):
+            self.stats.malformed += 1
+            logger.warning("Aviso de invalidación ilegible: %r", payload)
+            self._reset()
+            return
+        for invalidate in self._handlers.get(message.entity, ()):
+            invalidate(message.user_id, message.ids)
+
+    def _on_termination(self, connection: Any) -> None:
+        self._connection = None
+        if self._stopped:
+            return
+        logger.warning("Conexión LISTEN perdida: se vacían las cachés y se reconecta.")
+        self._reset()
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = RECONNECT_DELAY_SECONDS
+        while not self._stopped:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except (OSError, asyncpg.PostgresError):
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+                continue
+            # Lo escrito mientras no había conexión no se notificó a este proceso.
+            self._reset()
+            return
+
+    def _reset(self) -> None:
+        self.stats.resets += 1
+        for reset in self._reset_handlers:
+            reset()
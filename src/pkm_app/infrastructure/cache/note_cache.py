@@ -0,0 +1,115 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/cache/note_cache.py
+# ---------------------------------------------------------------------------
+"""
+Caché en memoria de `NoteSchema` por `(user_id, note_id)`, compartida por las Unidades de
+Trabajo de un proceso: LRU acotada en número de entradas y con caducidad (TTL).
+
+Las entradas solo se invalidan tras un commit correcto (ver cached_note_repository.py),
+así que la TTL acota lo que puede durar un dato obsoleto escrito por otro proceso o por
+SQL ajeno a las Unidades de Trabajo.
+
+Para que una lectura lenta no reinstale una versión anterior a una invalidación, la
+lectura pide un `load_token()` antes de ir a la base de datos y `put()` descarta el valor
+si la clave se invalidó entretanto.
+
+Es segura entre hilos (la UoW síncrona puede usarse desde varios) y no hace I/O.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from src.pkm_app.core.application.dtos import NoteSchema
+
+NoteCacheKey = tuple[str, uuid.UUID]  # (user_id, note_id)
+
+DEFAULT_NOTE_CACHE_SIZE = 2048
+DEFAULT_NOTE_CACHE_TTL_SECONDS = 60.0
+
+
+@dataclass
+class NoteCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # expulsadas por tamaño
+    expirations: int = 0  # descartadas al leerlas caducadas
+    invalidations: int = 0  # entradas borradas por escrituras confirmadas
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class NoteCache:
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_NOTE_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_NOTE_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries debe ser >= 1.")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds debe ser mayor que 0.")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[NoteCacheKey, tuple[float, NoteSchema]] = OrderedDict()
+        # Contador global de invalidaciones: basta para detectar lecturas concurrentes con
+        # una escritura (a costa de descartar alguna lectura de otra clave, nunca de servir
+        # datos obsoletos).
+        self._generation = 0
+        self.stats = NoteCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: NoteCacheKey) -> NoteSchema | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, note = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return note
+
+    def load_token(self) -> int:
+        """Marca el inicio de una lectura a la base de datos (ver `put`)."""
+        with self._lock:
+            return self._generation
+
+    def put(self, key: NoteCacheKey, note: NoteSchema, token: int) -> None:
+        """Guarda `note` salvo que haya habido invalidaciones desde `load_token()`."""
+        with self._lock:
+            if token != self._generation:
+                return
+            self._entries[key] = (self._clock() + self.ttl_seconds, note)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self, keys: Iterable[NoteCacheKey]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
@@ -1,5 +1,6 @@
-import os
-from typing import cast
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
 
 from pydantic import PostgresDsn, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -8,11 +9,39 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     # Componentes individuales de la URL de la base de datos
     # Estos valores se cargarán desde el archivo .env o las variables de entorno del sistema.
-    DB_USER: str = os.environ.get("DB_USER", "")
-    DB_PASSWORD: str = os.environ.get("DB_PASSWORD", "")
-    DB_HOST: str = os.environ.get("DB_HOST", "")
-    DB_PORT: int = int(os.environ.get("DB_PORT", 5432))
-    DB_NAME: str = os.environ.get("DB_NAME", "")
+    DB_USER: str = ""
+    DB_PASSWORD: str = ""
+    DB_HOST: str = "localhost"  # 'localhost' si la app corre en el host y la BD en Docker
+    DB_PORT: int = 5432
+    DB_NAME: str = ""
+
+    # Pool de conexiones de cada motor (QueuePool de SQLAlchemy).
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # segundos esperando una conexión libre
+    DB_POOL_RECYCLE: int = 1800  # segundos de vida de una conexión; -1 no las recicla
+    DB_POOL_PRE_PING: bool = True  # comprueba la conexión al sacarla del pool
+    # Registra cada sentencia SQL (solo para desarrollo).
+    DB_ECHO: bool = False
+    # Cachés de sentencias preparadas del motor asíncrono: la de asyncpg y la del adaptador de
+    # SQLAlchemy. 0 las desactiva (necesario detrás de PgBouncer en modo transaction).
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    # Réplica de lectura (opcional) para las UoW de solo lectura: mismas credenciales y base de
+    # datos que el primario. Sin DB_REPLICA_HOST, las lecturas van al primario.
+    DB_REPLICA_HOST: str = ""
+    DB_REPLICA_PORT: int | None = None  # por defecto, DB_PORT
+    # Instrumentación de consultas por UoW (persistence/sqlalchemy/query_stats.py). Con
+    # DB_QUERY_STATS=false los motores se crean sin los eventos (unos µs menos por sentencia).
+    # Más de DB_REPEATED_STATEMENT_LIMIT ejecuciones de una misma sentencia se avisan como
+    # posible N+1; con DB_STRICT_QUERY_CHECKS (tests) lanzan RepeatedStatementError.
+    DB_QUERY_STATS: bool = True
+    DB_REPEATED_STATEMENT_LIMIT: int = 20
+    DB_STRICT_QUERY_CHECKS: bool = False
+    # Endpoint de métricas de Prometheus (persistence/sqlalchemy/metrics.py, requiere
+    # prometheus-client): solo en local por defecto.
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 9464
 
     # Variable original para compatibilidad o usos directos si es necesario
     # Esta plantilla utilizará los valores de DB_USER, DB_PASSWORD, etc., cargados desde el entorno.
@@ -56,8 +85,25 @@ class Settings(BaseSettings):
         )
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Settings del proceso, leídos del entorno y de .env la primera vez que se piden (no al
+    importar este módulo). El .env se busca desde este directorio hacia arriba, como hacía
+    load_dotenv() en database.py, para no depender del directorio de trabajo.
+    """
+    return Settings(_env_file=_find_env_file())
+
+
+def _find_env_file() -> Path | None:
+    for directory in Path(__file__).resolve().parents:
+        if (directory / ".env").is_file():
+            return directory / ".env"
+    return None
+
 
-# Para depuración, puedes imprimir las URLs generadas:
-# print(f"ASYNC_DATABASE_URL: {settings.ASYNC_DATABASE_URL}")
-# print(f"SYNC_DATABASE_URL: {settings.SYNC_DATABASE_URL}")
+def __getattr__(name: str) -> Any:
+    # `from ...settings import settings` sigue funcionando, pero sin leer el entorno al importar.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
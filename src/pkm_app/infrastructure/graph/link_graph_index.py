@@ -0,0 +1,501 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/graph/link_graph_index.py
+# ---------------------------------------------------------------------------
+"""
+Índice en memoria del grafo de enlaces (note_links) de cada usuario, para analítica que no
+conviene calcular en SQL en cada petición: PageRank ("notas importantes"), grados ("hubs")
+y componentes conexas (grupos de notas enlazadas).
+
+Cada `UserLinkGraph` se carga con un solo recorrido de los enlaces del usuario
+(`link_edges_stmt`) y se guarda en dos formas con NumPy:
+
+- lista de aristas (COO): arrays `source`/`target` con la posición de cada nota y la clave
+  de cada enlace (su UUID como dos uint64). Es lo que se actualiza: crear un enlace añade
+  al final (capacidad que se duplica) y cada lote de borrados compacta los arrays en una
+  pasada vectorizada (`np.isin` sobre las claves);
+- CSR (`indptr`/`indices`, aristas ordenadas por origen), que se reconstruye de forma
+  perezosa con la primera consulta tras un cambio. Al reconstruirla se descartan las notas
+  que se han quedado sin enlaces (p. ej. notas borradas).
+
+Las consultas son operaciones vectorizadas sobre esos arrays y sus resultados se guardan
+hasta el siguiente cambio.
+
+`LinkGraphIndex` guarda los grafos de los usuarios de un proceso (LRU acotada en usuarios y
+con caducidad): la UoW le aplica, tras cada commit correcto, los enlaces creados y borrados
+en la transacción (`TouchedEntities.link_changes`). Los cambios de otros procesos no se
+reciben: la TTL acota cuánto puede tardar en verse uno. Como en NoteCache, una carga pide
+un `load_token()` antes de leer y `put()` la descarta si entretanto se aplicaron cambios a
+ese usuario.
+
+Es segura entre hilos.
+"""
+
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.pkm_app.core.application.dtos.note_link_dto import LinkDirection
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.link_graph import (
+    link_edges_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.write_tracking import (
+    LinkChange,
+)
+
+DEFAULT_LINK_GRAPH_USERS = 256
+DEFAULT_LINK_GRAPH_TTL_SECONDS = 600.0
+DEFAULT_PAGERANK_DAMPING = 0.85
+DEFAULT_PAGERANK_TOLERANCE = 1e-8
+DEFAULT_PAGERANK_MAX_ITERATIONS = 100
+
+_INITIAL_CAPACITY = 16
+_LOW_BITS = (1 << 64) - 1
+# Clave de enlace: el UUID como dos uint64 (se compara con np.isin).
+_LINK_KEY = np.dtype([("high", np.uint64), ("low", np.uint64)])
+# Estimación de lo que ocupa cada nota fuera de los arrays: su UUID en la lista de ids y
+# como clave (mismo objeto) del diccionario de posiciones, con su int de posición.
+_NOTE_OVERHEAD_BYTES = sys.getsizeof(uuid.UUID(int=_LOW_BITS)) + sys.getsizeof(1 << 40)
+
+
+def _link_key(link_id: uuid.UUID) -> tuple[int, int]:
+    return link_id.int >> 64, link_id.int & _LOW_BITS
+
+
+class NodeDegree(NamedTuple):
+    incoming: int
+    outgoing: int
+
+    @property
+    def total(self) -> int:
+        return self.incoming + self.outgoing
+
+
+class UserLinkGraph:
+    """
+    Grafo dirigido de los enlaces de un usuario. Cada enlace es una arista (dos enlaces de
+    distinto tipo entre las mismas notas cuentan dos veces). Solo contiene notas con algún
+    enlace.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._note_ids: list[uuid.UUID] = []
+        self._positions: dict[uuid.UUID, int] = {}
+        self._size = 0
+        self._sources = np.empty(_INITIAL_CAPACITY, dtype=np.int32)
+        self._targets = np.empty(_INITIAL_CAPACITY, dtype=np.int32)
+        self._keys = np.empty(_INITIAL_CAPACITY, dtype=_LINK_KEY)
+        # Derivados, válidos mientras no haya cambios (None si hay que recalcularlos).
+        self._indptr: np.ndarray | None = None
+        self._indices: np.ndarray | None = None
+        self._pagerank: tuple[tuple[float, float, int], np.ndarray] | None = None
+        self._labels: np.ndarray | None = None
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[Sequence[uuid.UUID]]) -> "UserLinkGraph":
+        """Grafo de filas `(link_id, source_note_id, target_note_id)`."""
+        graph = cls()
+        edges = list(edges)
+        graph._reserve(len(edges))
+        position = graph._position
+        count = len(edges)
+        graph._sources[:count] = np.fromiter(
+            (position(source) for _, source, _ in edges), np.int32, count
+        )
+        graph._targets[:count] = np.fromiter(
+            (position(target) for _, _, target in edges), np.int32, count
+        )
+        graph._keys[:count] = np.fromiter(
+            (_link_key(link_id) for link_id, _, _ in edges), _LINK_KEY, count
+        )
+        graph._size = count
+        return graph
+
+    # --- Cambios -----------------------------------------------------------------------
+
+    def _position(self, note_id: uuid.UUID) -> int:
+        position = self._positions.get(note_id)
+        if position is None:
+            position = self._positions[note_id] = len(self._note_ids)
+            self._note_ids.append(note_id)
+        return position
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        capacity = len(self._sources)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_sources", "_targets", "_keys"):
+            current = getattr(self, name)
+            grown = np.empty(capacity, dtype=current.dtype)
+            grown[: self._size] = current[: self._size]
+            setattr(self, name, grown)
+
+    def _remove(self, link_ids: Sequence[uuid.UUID]) -> None:
+        """Quita las aristas de `link_ids` (las desconocidas se ignoran)."""
+        keys = np.fromiter((_link_key(link_id) for link_id in link_ids), _LINK_KEY, len(link_ids))
+        keep = ~np.isin(self._keys[: self._size], keys)
+        kept = int(keep.sum())
+        if kept == self._size:
+            return
+        for name in ("_sources", "_targets", "_keys"):
+            array = getattr(self, name)
+            array[:kept] = array[: self._size][keep]
+        self._size = kept
+
+    def apply(self, changes: Iterable[LinkChange]) -> None:
+        """Aplica, en orden, enlaces creados y borrados."""
+        with self._lock:
+            deleted: list[uuid.UUID] = []
+            for change in changes:
+                if change.is_deletion:
+                    deleted.append(change.link_id)
+                    continue
+                if deleted:
+                    self._remove(deleted)
+                    deleted = []
+                self._reserve(1)
+                self._sources[self._size] = self._position(change.source_note_id)
+                self._targets[self._size] = self._position(change.target_note_id)
+                self._keys[self._size] = _link_key(change.link_id)
+                self._size += 1
+            if deleted:
+                self._remove(deleted)
+            self._indptr = self._indices = self._pagerank = self._labels = None
+
+    # --- Estructura --------------------------------------------------------------------
+
+    def _compact(self) -> None:
+        """Descarta las notas sin enlaces y renumera las demás."""
+        sources = self._sources[: self._size]
+        targets = self._targets[: self._size]
+        count = len(self._note_ids)
+        linked = (np.bincount(sources, minlength=count) + np.bincount(targets, minlength=count)) > 0
+        if linked.all():
+            return
+        renumbered = np.cumsum(linked, dtype=np.int32) - 1
+        sources[:] = renumbered[sources]
+        targets[:] = renumbered[targets]
+        self._note_ids = [note_id for note_id, keep in zip(self._note_ids, linked) if keep]
+        self._positions = {note_id: position for position, note_id in enumerate(self._note_ids)}
+
+    def _csr(self) -> tuple[np.ndarray, np.ndarray]:
+        """`indptr`, `indices`: destinos de las aristas que salen de cada nota."""
+        if self._indptr is None or self._indices is None:
+            self._compact()
+            sources = self._sources[: self._size]
+            order = np.argsort(sources, kind="stable")
+            self._indices = self._targets[: self._size][order]
+            self._indptr = np.zeros(len(self._note_ids) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(sources, minlength=len(self._note_ids)), out=self._indptr[1:])
+        return self._indptr, self._indices
+
+    @property
+    def node_count(self) -> int:
+        with self._lock:
+            return len(self._csr()[0]) - 1
+
+    @property
+    def link_count(self) -> int:
+        with self._lock:
+            return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria estimada: arrays (con su capacidad libre), derivados e ids de las notas."""
+        with self._lock:
+            arrays = [self._sources, self._targets, self._keys, self._indptr, self._indices]
+            arrays.append(self._labels)
+            if self._pagerank is not None:
+                arrays.append(self._pagerank[1])
+            return (
+                sum(array.nbytes for array in arrays if array is not None)
+                + sys.getsizeof(self._note_ids)
+                + sys.getsizeof(self._positions)
+                + len(self._note_ids) * _NOTE_OVERHEAD_BYTES
+            )
+
+    # --- Consultas ---------------------------------------------------------------------
+
+    def _pagerank_scores(self, damping: float, tolerance: float, max_iterations: int) -> np.ndarray:
+        settings = (damping, tolerance, max_iterations)
+        if self._pagerank is not None and self._pagerank[0] == settings:
+            return self._pagerank[1]
+        indptr, indices = self._csr()
+        count = len(indptr) - 1
+        if count == 0:
+            return np.empty(0)
+        out_degree = np.diff(indptr)
+        # Origen de cada arista, en el orden de `indices`.
+        sources = np.repeat(np.arange(count), out_degree)
+        dangling = out_degree == 0
+        scores = np.full(count, 1.0 / count)
+        for _ in range(max_iterations):
+            shares = np.divide(scores, out_degree, out=np.zeros(count), where=~dangling)
+            incoming = np.bincount(indices, weights=shares[sources], minlength=count)
+            # Las notas sin enlaces salientes reparten su puntuación entre todas.
+            updated = (1.0 - damping + damping * scores[dangling].sum()) / count
+            updated = updated + damping * incoming
+            converged = np.abs(updated - scores).sum() < tolerance
+            scores = updated
+            if converged:
+                break
+        self._pagerank = (settings, scores)
+        return scores
+
+    def pagerank(
+        self,
+        damping: float = DEFAULT_PAGERANK_DAMPING,
+        tolerance: float = DEFAULT_PAGERANK_TOLERANCE,
+        max_iterations: int = DEFAULT_PAGERANK_MAX_ITERATIONS,
+    ) -> dict[uuid.UUID, float]:
+        """PageRank de cada nota (suman 1), por iteración de potencias."""
+        if not 0 < damping < 1:
+            raise ValueError("damping debe estar entre 0 y 1.")
+        with self._lock:
+            scores = self._pagerank_scores(damping, tolerance, max_iterations)
+            return dict(zip(self._note_ids, scores.tolist()))
+
+    def top_pagerank(
+        self, limit: int = 10, damping: float = DEFAULT_PAGERANK_DAMPING
+    ) -> list[tuple[uuid.UUID, float]]:
+        """Las `limit` notas con mayor PageRank, de mayor a menor."""
+        if not 0 < damping < 1:
+            raise ValueError("damping debe estar entre 0 y 1.")
+        with self._lock:
+            scores = self._pagerank_scores(
+                damping, DEFAULT_PAGERANK_TOLERANCE, DEFAULT_PAGERANK_MAX_ITERATIONS
+            )
+            return [(self._note_ids[i], float(scores[i])) for i in _top(scores, limit)]
+
+    def _degrees(self, direction: LinkDirection) -> np.ndarray:
+        indptr, indices = self._csr()
+        count = len(indptr) - 1
+        if direction == "outgoing":
+            return np.diff(indptr)
+        incoming = np.bincount(indices, minlength=count)
+        if direction == "incoming":
+            return incoming
+        return incoming + np.diff(indptr)
+
+    def degree(self, note_id: uuid.UUID) -> NodeDegree:
+        """Enlaces que llegan a la nota y que salen de ella (0 si no tiene)."""
+        with self._lock:
+            indptr, indices = self._csr()
+            position = self._positions.get(note_id)
+            if position is None:
+                return NodeDegree(0, 0)
+            return NodeDegree(
+                incoming=int(np.count_nonzero(indices == position)),
+                outgoing=int(indptr[position + 1] - indptr[position]),
+            )
+
+    def top_degree(
+        self, limit: int = 10, direction: LinkDirection = "both"
+    ) -> list[tuple[uuid.UUID, int]]:
+        """Las `limit` notas con más enlaces en el sentido pedido (los hubs)."""
+        with self._lock:
+            degrees = self._degrees(direction)
+            return [(self._note_ids[i], int(degrees[i])) for i in _top(degrees, limit)]
+
+    def _component_labels(self) -> np.ndarray:
+        """Componente (conexa, sin tener en cuenta el sentido) de cada nota: 0, 1, ..."""
+        if self._labels is not None:
+            return self._labels
+        indptr, indices = self._csr()
+        count = len(indptr) - 1
+        sources = np.repeat(np.arange(count), np.diff(indptr))
+        labels = np.arange(count)
+        while True:
+            # Cada nota toma la menor etiqueta de sus vecinos y luego la de su etiqueta
+            # (salto de punteros), hasta que nada cambia.
+            updated = labels.copy()
+            np.minimum.at(updated, sources, labels[indices])
+            np.minimum.at(updated, indices, labels[sources])
+            updated = updated[updated]
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+        self._labels = np.unique(labels, return_inverse=True)[1]
+        return self._labels
+
+    def component_of(self, note_id: uuid.UUID) -> set[uuid.UUID]:
+        """Notas conectadas con la nota por algún camino (vacío si no tiene enlaces)."""
+        with self._lock:
+            labels = self._component_labels()
+            position = self._positions.get(note_id)
+            if position is None:
+                return set()
+            return {self._note_ids[i] for i in np.flatnonzero(labels == labels[position])}
+
+    def components(self, min_size: int = 2, limit: int | None = None) -> list[list[uuid.UUID]]:
+        """Componentes conexas con al menos `min_size` notas, de mayor a menor tamaño."""
+        with self._lock:
+            labels = self._component_labels()
+            if len(labels) == 0:
+                return []
+            sizes = np.bincount(labels)
+            selected = [
+                label for label in np.argsort(-sizes, kind="stable") if sizes[label] >= min_size
+            ][:limit]
+            order = np.argsort(labels, kind="stable")
+            starts = np.concatenate(([0], np.cumsum(sizes)))
+            return [
+                [self._note_ids[i] for i in order[starts[label] : starts[label + 1]]]
+                for label in selected
+            ]
+
+
+def _top(values: np.ndarray, limit: int) -> np.ndarray:
+    """Posiciones de los `limit` mayores valores, de mayor a menor."""
+    if limit < 1:
+        raise ValueError("limit debe ser mayor que 0.")
+    if limit < len(values):
+        candidates = np.argpartition(-values, limit - 1)[:limit]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(-values[candidates], kind="stable")]
+
+
+@dataclass
+class LinkGraphIndexStats:
+    hits: int = 0
+    misses: int = 0
+    loads: int = 0  # grafos guardados tras leerlos de la base de datos
+    evictions: int = 0  # expulsados por número de usuarios
+    expirations: int = 0  # descartados al pedirlos caducados
+    applied_changes: int = 0  # enlaces creados o borrados aplicados a grafos cargados
+
+
+class LinkGraphIndex:
+    def __init__(
+        self,
+        max_users: int = DEFAULT_LINK_GRAPH_USERS,
+        ttl_seconds: float = DEFAULT_LINK_GRAPH_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_users < 1:
+            raise ValueError("max_users debe ser >= 1.")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds debe ser mayor que 0.")
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._graphs: OrderedDict[str, tuple[float, UserLinkGraph]] = OrderedDict()
+        # Versión de cada usuario (valor del contador en su último cambio) y del último
+        # `clear`: una carga se descarta si la de su usuario cambia entretanto (ver `put`).
+        self._counter = 0
+        self._generations: dict[str, int] = {}
+        self._cleared_at = 0
+        self.stats = LinkGraphIndexStats()
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+    def get(self, user_id: str) -> UserLinkGraph | None:
+        with self._lock:
+            entry = self._graphs.get(user_id)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, graph = entry
+            if expires_at <= self._clock():
+                del self._graphs[user_id]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._graphs.move_to_end(user_id)
+            self.stats.hits += 1
+            return graph
+
+    def _version(self, user_id: str) -> int:
+        return max(self._generations.get(user_id, 0), self._cleared_at)
+
+    def _bump(self, user_id: str) -> None:
+        self._counter += 1
+        self._generations[user_id] = self._counter
+
+    def load_token(self, user_id: str) -> int:
+        """Marca el inicio de la lectura de los enlaces del usuario (ver `put`)."""
+        with self._lock:
+            return self._version(user_id)
+
+    def put(self, user_id: str, graph: UserLinkGraph, token: int) -> None:
+        """Guarda `graph` salvo que se hayan aplicado cambios al usuario desde `load_token()`."""
+        with self._lock:
+            if token != self._version(user_id):
+                return
+            self._graphs[user_id] = (self._clock() + self.ttl_seconds, graph)
+            self._graphs.move_to_end(user_id)
+            self.stats.loads += 1
+            while len(self._graphs) > self.max_users:
+                self._graphs.popitem(last=False)
+                self.stats.evictions += 1
+
+    def get_or_load(self, session: Session, user_id: str) -> UserLinkGraph:
+        """Grafo del usuario; si no está, lo carga con un solo recorrido de sus enlaces."""
+        graph = self.get(user_id)
+        if graph is None:
+            token = self.load_token(user_id)
+            graph = UserLinkGraph.from_edges(session.execute(link_edges_stmt(user_id)).all())
+            self.put(user_id, graph, token)
+        return graph
+
+    async def aget_or_load(self, session: AsyncSession, user_id: str) -> UserLinkGraph:
+        """Como `get_or_load`, con una sesión asíncrona."""
+        graph = self.get(user_id)
+        if graph is None:
+            token = self.load_token(user_id)
+            result = await session.execute(link_edges_stmt(user_id))
+            graph = UserLinkGraph.from_edges(result.all())
+            self.put(user_id, graph, token)
+        return graph
+
+    def apply(self, changes: Sequence[LinkChange]) -> None:
+        """Aplica a los grafos cargados los enlaces creados y borrados en un commit."""
+        by_user: dict[str, list[LinkChange]] = {}
+        for change in changes:
+            by_user.setdefault(change.user_id, []).append(change)
+        with self._lock:
+            graphs = []
+            for user_id, user_changes in by_user.items():
+                self._bump(user_id)
+                entry = self._graphs.get(user_id)
+                if entry is not None:
+                    graphs.append((entry[1], user_changes))
+        # Fuera del lock del índice: cada grafo tiene el suyo.
+        for graph, user_changes in graphs:
+            graph.apply(user_changes)
+            with self._lock:
+                self.stats.applied_changes += len(user_changes)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._bump(user_id)
+            self._graphs.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counter += 1
+            self._cleared_at = self._counter
+            # Todas las versiones anteriores quedan por debajo de `_cleared_at`.
+            self._generations.clear()
+            self._graphs.clear()
+
+    def memory_usage(self) -> dict[str, int]:
+        """Bytes estimados (`UserLinkGraph.nbytes`) del grafo de cada usuario cargado."""
+        with self._lock:
+            graphs = [(user_id, graph) for user_id, (_, graph) in self._graphs.items()]
+        return {user_id: graph.nbytes for user_id, graph in graphs}
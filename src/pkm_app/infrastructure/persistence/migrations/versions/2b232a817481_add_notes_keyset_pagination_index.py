@@ -0,0 +1,34 @@
+"""add_notes_keyset_pagination_index
+
+Revision ID: 2b232a817481
+Revises: e9e6a35c39f1
+Create Date: 2026-10-18 10:52:13.402518
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2b232a817481"
+down_revision: str | None = "e9e6a35c39f1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_notes_user_id_updated_at_id",
+        "notes",
+        ["user_id", sa.text("updated_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notes_user_id_updated_at_id", table_name="notes")
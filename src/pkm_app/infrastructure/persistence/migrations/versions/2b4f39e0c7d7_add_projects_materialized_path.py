@@ -0,0 +1,109 @@
+"""add_projects_materialized_path
+
+Revision ID: 2b4f39e0c7d7
+Revises: 3c634b588f2d
+Create Date: 2026-10-18 12:38:13.194041
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "2b4f39e0c7d7"
+down_revision: str | None = "3c634b588f2d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Ruta del proyecto al insertarlo o cambiar su padre. Rechaza padres de otro usuario y
+# ciclos (el padre no puede estar en el subárbol del proyecto).
+SET_PATH_FUNCTION_SQL = """
+CREATE FUNCTION projects_set_path() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    parent_path uuid[];
+BEGIN
+    IF NEW.parent_project_id IS NULL THEN
+        NEW.path := ARRAY[NEW.id];
+        RETURN NEW;
+    END IF;
+    SELECT path INTO parent_path
+      FROM projects
+     WHERE id = NEW.parent_project_id AND user_id = NEW.user_id;
+    IF parent_path IS NULL THEN
+        RAISE EXCEPTION 'El proyecto padre % no existe o es de otro usuario',
+            NEW.parent_project_id USING ERRCODE = 'foreign_key_violation';
+    END IF;
+    IF NEW.id = ANY (parent_path) THEN
+        RAISE EXCEPTION 'El proyecto % no puede estar dentro de su propio subárbol',
+            NEW.id USING ERRCODE = 'check_violation';
+    END IF;
+    NEW.path := parent_path || NEW.id;
+    RETURN NEW;
+END
+$$
+"""
+
+# Tras mover un proyecto, sus subproyectos cambian el prefijo de la ruta. Este UPDATE no
+# toca parent_project_id, así que no vuelve a disparar los triggers.
+MOVE_SUBTREE_FUNCTION_SQL = """
+CREATE FUNCTION projects_move_subtree() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE projects
+       SET path = NEW.path || path[cardinality(OLD.path) + 1:]
+     WHERE path @> ARRAY[NEW.id] AND id <> NEW.id;
+    RETURN NULL;
+END
+$$
+"""
+
+# Proyectos alcanzables desde una raíz; los que no (solo en un ciclo de padres, que antes
+# no se impedía) quedan como raíz.
+BACKFILL_SQL = """
+WITH RECURSIVE tree AS (
+    SELECT id, ARRAY[id] AS path FROM projects WHERE parent_project_id IS NULL
+    UNION ALL
+    SELECT child.id, tree.path || child.id
+      FROM projects child
+      JOIN tree ON child.parent_project_id = tree.id
+)
+UPDATE projects SET path = tree.path FROM tree WHERE projects.id = tree.id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("projects", sa.Column("path", postgresql.ARRAY(sa.UUID()), nullable=True))
+    # Un padre de otro usuario no es válido: esos proyectos pasan a ser raíz.
+    op.execute(
+        "UPDATE projects SET parent_project_id = NULL FROM projects parent "
+        "WHERE projects.parent_project_id = parent.id AND parent.user_id <> projects.user_id"
+    )
+    op.execute(BACKFILL_SQL)
+    op.execute("UPDATE projects SET parent_project_id = NULL, path = ARRAY[id] WHERE path IS NULL")
+    op.alter_column("projects", "path", nullable=False)
+    op.create_index("ix_projects_path", "projects", ["path"], unique=False, postgresql_using="gin")
+    op.execute(SET_PATH_FUNCTION_SQL)
+    op.execute(MOVE_SUBTREE_FUNCTION_SQL)
+    op.execute(
+        "CREATE TRIGGER projects_set_path BEFORE INSERT OR UPDATE OF parent_project_id "
+        "ON projects FOR EACH ROW EXECUTE FUNCTION projects_set_path()"
+    )
+    op.execute(
+        "CREATE TRIGGER projects_move_subtree AFTER UPDATE OF parent_project_id ON projects "
+        "FOR EACH ROW WHEN (OLD.path IS DISTINCT FROM NEW.path) "
+        "EXECUTE FUNCTION projects_move_subtree()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER projects_move_subtree ON projects")
+    op.execute("DROP TRIGGER projects_set_path ON projects")
+    op.execute("DROP FUNCTION projects_move_subtree()")
+    op.execute("DROP FUNCTION projects_set_path()")
+    op.drop_index("ix_projects_path", table_name="projects", postgresql_using="gin")
+    op.drop_column("projects", "path")
@@ -0,0 +1,50 @@
+"""add note_links composite indexes for graph traversal
+
+Revision ID: 3c634b588f2d
+Revises: 6cff0ae5c031
+Create Date: 2026-10-18 12:25:54.319572
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c634b588f2d"
+down_revision: str | None = "6cff0ae5c031"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Los índices simples son prefijo de los compuestos: sobran.
+    op.drop_index(op.f("ix_note_links_source_note_id"), table_name="note_links")
+    op.drop_index(op.f("ix_note_links_target_note_id"), table_name="note_links")
+    op.create_index(
+        "ix_note_links_source_note_id_link_type",
+        "note_links",
+        ["source_note_id", "link_type"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_note_links_target_note_id_link_type",
+        "note_links",
+        ["target_note_id", "link_type"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_note_links_target_note_id_link_type", table_name="note_links")
+    op.drop_index("ix_note_links_source_note_id_link_type", table_name="note_links")
+    op.create_index(
+        op.f("ix_note_links_target_note_id"), "note_links", ["target_note_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_note_links_source_note_id"), "note_links", ["source_note_id"], unique=False
+    )
@@ -0,0 +1,60 @@
+"""lock_parent_project_in_projects_set_path
+
+Revision ID: 527e0dd09dd6
+Revises: c41e7d2a9b86
+Create Date: 2026-10-18 16:12:27.530418
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "527e0dd09dd6"
+down_revision: str | None = "c41e7d2a9b86"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# projects_set_path de 2b4f39e0c7d7, con {lock} al leer la ruta del padre. Sin bloqueo, un
+# hijo insertado mientras otra transacción mueve al padre copia la ruta anterior (el UPDATE
+# del subárbol no ve al hijo aún sin confirmar), y dos movimientos cruzados pueden cerrar un
+# ciclo. FOR SHARE espera a que termine quien esté moviendo al padre y devuelve su ruta
+# nueva, e impide moverlo hasta que termine la transacción que inserta o mueve el hijo.
+SET_PATH_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION projects_set_path() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    parent_path uuid[];
+BEGIN
+    IF NEW.parent_project_id IS NULL THEN
+        NEW.path := ARRAY[NEW.id];
+        RETURN NEW;
+    END IF;
+    SELECT path INTO parent_path
+      FROM projects
+     WHERE id = NEW.parent_project_id AND user_id = NEW.user_id{lock};
+    IF parent_path IS NULL THEN
+        RAISE EXCEPTION 'El proyecto padre % no existe o es de otro usuario',
+            NEW.parent_project_id USING ERRCODE = 'foreign_key_violation';
+    END IF;
+    IF NEW.id = ANY (parent_path) THEN
+        RAISE EXCEPTION 'El proyecto % no puede estar dentro de su propio subárbol',
+            NEW.id USING ERRCODE = 'check_violation';
+    END IF;
+    NEW.path := parent_path || NEW.id;
+    RETURN NEW;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(SET_PATH_FUNCTION_SQL.format(lock="\n       FOR SHARE"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(SET_PATH_FUNCTION_SQL.format(lock=""))
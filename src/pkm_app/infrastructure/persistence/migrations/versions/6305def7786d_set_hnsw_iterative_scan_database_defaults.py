@@ -0,0 +1,45 @@
+"""set_hnsw_iterative_scan_database_defaults
+
+Revision ID: 6305def7786d
+Revises: e51951b123d8
+Create Date: 2026-10-18 11:35:55.363266
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6305def7786d"
+down_revision: str | None = "e51951b123d8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Valores por defecto de pgvector para todas las sesiones de esta base de datos (ver
+# repositories/semantic_search.py). Solo afectan a recorridos de índices HNSW.
+HNSW_SETTINGS = (
+    ("hnsw.iterative_scan", "relaxed_order"),
+    ("hnsw.ef_search", "100"),
+)
+
+
+def _alter_database(clause: str) -> None:
+    # ALTER DATABASE no admite current_database(): se compone el nombre en el servidor.
+    op.execute(
+        f"DO $$ BEGIN EXECUTE format('ALTER DATABASE %I {clause}', current_database()); END $$"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, value in HNSW_SETTINGS:
+        _alter_database(f"SET {name} = ''{value}''")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _value in reversed(HNSW_SETTINGS):
+        _alter_database(f"RESET {name}")
@@ -0,0 +1,45 @@
+"""move_hnsw_settings_to_connections
+
+Revision ID: 67429e3a6651
+Revises: 81772afede37
+Create Date: 2026-10-18 17:41:36.902154
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "67429e3a6651"
+down_revision: str | None = "81772afede37"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Valores que fijaba 6305def7786d. Ahora los fijan los motores al abrir cada conexión
+# (database.session_settings): una conexión sin ellos devolvía top-k filtrados incompletos.
+HNSW_SETTINGS = (
+    ("hnsw.iterative_scan", "relaxed_order"),
+    ("hnsw.ef_search", "100"),
+)
+
+
+def _alter_database(clause: str) -> None:
+    # ALTER DATABASE no admite current_database(): se compone el nombre en el servidor.
+    op.execute(
+        f"DO $$ BEGIN EXECUTE format('ALTER DATABASE %I {clause}', current_database()); END $$"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, _value in HNSW_SETTINGS:
+        _alter_database(f"RESET {name}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, value in HNSW_SETTINGS:
+        _alter_database(f"SET {name} = ''{value}''")
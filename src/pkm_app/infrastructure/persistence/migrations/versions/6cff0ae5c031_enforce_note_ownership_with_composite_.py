@@ -0,0 +1,84 @@
+"""enforce_note_ownership_with_composite_foreign_keys
+
+Revision ID: 6cff0ae5c031
+Revises: f337323afe48
+Create Date: 2026-10-18 12:08:08.059642
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6cff0ae5c031"
+down_revision: str | None = "f337323afe48"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_unique_constraint("uq_projects_id_user_id", "projects", ["id", "user_id"])
+    op.create_unique_constraint("uq_sources_id_user_id", "sources", ["id", "user_id"])
+    # Referencias a proyectos o fuentes de otro usuario (solo posibles antes de esta
+    # migración, con escrituras fuera del repositorio): se desvinculan para que las FK
+    # compuestas sean válidas.
+    op.execute("""
+        UPDATE notes SET project_id = NULL
+        WHERE project_id IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM projects
+            WHERE projects.id = notes.project_id AND projects.user_id = notes.user_id
+        )
+    """)
+    op.execute("""
+        UPDATE notes SET source_id = NULL
+        WHERE source_id IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM sources
+            WHERE sources.id = notes.source_id AND sources.user_id = notes.user_id
+        )
+    """)
+    op.drop_constraint(op.f("fk_notes_project_id_projects"), "notes", type_="foreignkey")
+    op.drop_constraint(op.f("fk_notes_source_id_sources"), "notes", type_="foreignkey")
+    op.create_foreign_key(
+        op.f("fk_notes_project_id_projects"),
+        "notes",
+        "projects",
+        ["project_id", "user_id"],
+        ["id", "user_id"],
+        ondelete="SET NULL (project_id)",
+    )
+    op.create_foreign_key(
+        op.f("fk_notes_source_id_sources"),
+        "notes",
+        "sources",
+        ["source_id", "user_id"],
+        ["id", "user_id"],
+        ondelete="SET NULL (source_id)",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(op.f("fk_notes_project_id_projects"), "notes", type_="foreignkey")
+    op.drop_constraint(op.f("fk_notes_source_id_sources"), "notes", type_="foreignkey")
+    op.create_foreign_key(
+        op.f("fk_notes_project_id_projects"),
+        "notes",
+        "projects",
+        ["project_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_foreign_key(
+        op.f("fk_notes_source_id_sources"),
+        "notes",
+        "sources",
+        ["source_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.drop_constraint("uq_sources_id_user_id", "sources", type_="unique")
+    op.drop_constraint("uq_projects_id_user_id", "projects", type_="unique")
@@ -0,0 +1,51 @@
+"""add_notes_content_hash_for_embedding_pipeline
+
+Revision ID: 6f784e639aa7
+Revises: 6305def7786d
+Create Date: 2026-10-18 11:44:29.141421
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6f784e639aa7"
+down_revision: str | None = "6305def7786d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Copia literal de models.NOTE_CONTENT_HASH_SQL en el momento de esta revisión.
+NOTE_CONTENT_HASH_SQL = "md5(coalesce(title, '') || E'\\n\\n' || content)"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "notes",
+        sa.Column(
+            "content_hash",
+            sa.Text(),
+            sa.Computed(NOTE_CONTENT_HASH_SQL, persisted=True),
+            nullable=False,
+        ),
+    )
+    # Los embeddings existentes no tienen huella: todos quedan pendientes de recalcular.
+    op.add_column("notes", sa.Column("embedding_content_hash", sa.Text(), nullable=True))
+    op.create_index(
+        "ix_notes_embedding_stale",
+        "notes",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("embedding_content_hash IS DISTINCT FROM content_hash"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notes_embedding_stale", table_name="notes")
+    op.drop_column("notes", "embedding_content_hash")
+    op.drop_column("notes", "content_hash")
@@ -0,0 +1,47 @@
+"""add_trigram_indexes_for_fuzzy_lookup
+
+Revision ID: 6fd73af4dd81
+Revises: 82b68978356d
+Create Date: 2026-10-18 11:52:07.418236
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6fd73af4dd81"
+down_revision: str | None = "82b68978356d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_notes_title_trgm",
+        "notes",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_keywords_name_trgm",
+        "keywords",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_keywords_name_trgm", table_name="keywords", postgresql_using="gin")
+    op.drop_index("ix_notes_title_trgm", table_name="notes", postgresql_using="gin")
+    # La extensión pg_trgm se conserva: otras consultas pueden depender de ella.
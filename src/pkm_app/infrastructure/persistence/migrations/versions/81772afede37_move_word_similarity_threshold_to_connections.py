@@ -0,0 +1,41 @@
+"""move_word_similarity_threshold_to_connections
+
+Revision ID: 81772afede37
+Revises: 527e0dd09dd6
+Create Date: 2026-10-18 17:03:12.418925
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "81772afede37"
+down_revision: str | None = "527e0dd09dd6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Valor que fijaba c41e7d2a9b86. Ahora lo fijan los motores al abrir cada conexión
+# (database.session_settings): el valor por defecto de la base de datos no llega a las
+# conexiones ya abiertas, ni a un pg_dump sin --create, y exige ser dueño de la base de datos.
+WORD_SIMILARITY_THRESHOLD = "0.4"
+
+
+def _alter_database(clause: str) -> None:
+    # ALTER DATABASE no admite current_database(): se compone el nombre en el servidor.
+    op.execute(
+        f"DO $$ BEGIN EXECUTE format('ALTER DATABASE %I {clause}', current_database()); END $$"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _alter_database("RESET pg_trgm.word_similarity_threshold")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _alter_database(f"SET pg_trgm.word_similarity_threshold = ''{WORD_SIMILARITY_THRESHOLD}''")
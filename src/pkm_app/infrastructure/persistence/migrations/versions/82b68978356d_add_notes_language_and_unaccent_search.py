@@ -0,0 +1,111 @@
+"""add_notes_language_and_unaccent_search
+
+Revision ID: 82b68978356d
+Revises: f71c52a9a3ba
+Create Date: 2026-10-18 11:24:52.976799
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "82b68978356d"
+down_revision: str | None = "f71c52a9a3ba"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Configuraciones de text search por idioma: (nombre, configuración base, diccionario final).
+# `unaccent` es un diccionario de filtrado: normaliza la palabra y la pasa al siguiente.
+SEARCH_CONFIGS = (
+    ("kairos_es", "spanish", "spanish_stem"),
+    ("kairos_en", "english", "english_stem"),
+    ("kairos_simple", "simple", "simple"),
+)
+
+# Copias literales de models.NOTE_SEARCH_VECTOR_SQL en el momento de esta revisión y de la
+# anterior: las migraciones no deben depender de la versión actual de los modelos.
+SEARCH_CONFIG_SQL = (
+    "CASE language WHEN 'es' THEN 'kairos_es'::regconfig "
+    "WHEN 'en' THEN 'kairos_en'::regconfig "
+    "WHEN 'simple' THEN 'kairos_simple'::regconfig END"
+)
+NOTE_SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector({SEARCH_CONFIG_SQL}, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector({SEARCH_CONFIG_SQL}, coalesce(content, '')), 'B')"
+)
+PREVIOUS_NOTE_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(content, '')), 'B')"
+)
+
+
+def _replace_search_vector(expression: str) -> None:
+    # Una columna generada no puede cambiar de expresión en todas las versiones soportadas:
+    # se recrea junto con su índice GIN.
+    op.drop_index("ix_notes_search_vector", table_name="notes", postgresql_using="gin")
+    op.drop_column("notes", "search_vector")
+    op.add_column(
+        "notes",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(expression, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_notes_search_vector",
+        "notes",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    for name, base, dictionary in SEARCH_CONFIGS:
+        op.execute(f"CREATE TEXT SEARCH CONFIGURATION {name} (COPY = pg_catalog.{base})")
+        op.execute(
+            f"ALTER TEXT SEARCH CONFIGURATION {name} "
+            f"ALTER MAPPING FOR hword, hword_part, word WITH unaccent, {dictionary}"
+        )
+
+    op.add_column(
+        "notes",
+        sa.Column("language", sa.VARCHAR(length=16), server_default="es", nullable=False),
+    )
+    op.create_check_constraint(
+        op.f("ck_notes_language"), "notes", "language IN ('es', 'en', 'simple')"
+    )
+    # Notas existentes: se respeta el idioma explícito de la metadata; la detección por
+    # texto se aplica en la siguiente escritura de cada nota.
+    op.execute("""
+        UPDATE notes
+        SET language = CASE
+            WHEN split_part(replace(lower(note_metadata->>'language'), '_', '-'), '-', 1)
+                IN ('en', 'eng', 'english', 'inglés', 'ingles') THEN 'en'
+            ELSE 'simple'
+        END
+        WHERE coalesce(trim(note_metadata->>'language'), '') <> ''
+          AND split_part(replace(lower(note_metadata->>'language'), '_', '-'), '-', 1)
+              NOT IN ('es', 'spa', 'spanish', 'español', 'espanol', 'castellano')
+        """)
+
+    _replace_search_vector(NOTE_SEARCH_VECTOR_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_search_vector(PREVIOUS_NOTE_SEARCH_VECTOR_SQL)
+    op.drop_constraint(op.f("ck_notes_language"), "notes", type_="check")
+    op.drop_column("notes", "language")
+    for name, _base, _dictionary in reversed(SEARCH_CONFIGS):
+        op.execute(f"DROP TEXT SEARCH CONFIGURATION {name}")
+    # La extensión unaccent se conserva: otras consultas pueden depender de ella.
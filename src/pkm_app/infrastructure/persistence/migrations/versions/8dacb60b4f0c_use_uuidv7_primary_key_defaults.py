@@ -0,0 +1,59 @@
+"""use_uuidv7_primary_key_defaults
+
+Revision ID: 8dacb60b4f0c
+Revises: 2b4f39e0c7d7
+Create Date: 2026-10-18 12:46:18.893202
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8dacb60b4f0c"
+down_revision: str | None = "2b4f39e0c7d7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("projects", "sources", "notes", "keywords", "note_links")
+
+# UUIDv7 (RFC 9562) con el mismo formato que models.uuid7(): milisegundos desde epoch, versión
+# 7, la fracción de milisegundo en los 12 bits siguientes (así las filas de un mismo INSERT
+# quedan ordenadas) y la parte aleatoria, con su variante, de gen_random_uuid().
+UUID_V7_FUNCTION_SQL = """
+CREATE FUNCTION uuid_generate_v7() RETURNS uuid
+LANGUAGE sql VOLATILE PARALLEL SAFE AS $$
+    SELECT (
+        lpad(to_hex(floor(now_ms)::bigint), 12, '0')
+        || '7'
+        || lpad(to_hex(floor((now_ms - floor(now_ms)) * 4096)::int), 3, '0')
+        || right(replace(gen_random_uuid()::text, '-', ''), 16)
+    )::uuid
+    FROM (SELECT extract(epoch FROM clock_timestamp()) * 1000 AS now_ms) AS clock
+$$
+"""
+
+# Desde PostgreSQL 18 hay un uuidv7() nativo con el mismo formato, más rápido y creciente
+# dentro de cada sesión.
+NATIVE_UUID_V7_FUNCTION_SQL = """
+CREATE FUNCTION uuid_generate_v7() RETURNS uuid
+LANGUAGE sql VOLATILE PARALLEL SAFE AS $$ SELECT uuidv7() $$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    native = op.get_bind().dialect.server_version_info >= (18,)
+    op.execute(NATIVE_UUID_V7_FUNCTION_SQL if native else UUID_V7_FUNCTION_SQL)
+    for table in TABLES:
+        op.alter_column(table, "id", server_default=sa.text("uuid_generate_v7()"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.alter_column(table, "id", server_default=None)
+    op.execute("DROP FUNCTION uuid_generate_v7()")
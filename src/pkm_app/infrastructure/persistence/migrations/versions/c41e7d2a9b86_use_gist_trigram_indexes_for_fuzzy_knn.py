@@ -0,0 +1,72 @@
+"""use_gist_trigram_indexes_for_fuzzy_knn
+
+Revision ID: c41e7d2a9b86
+Revises: 8dacb60b4f0c
+Create Date: 2026-10-18 14:05:41.207913
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41e7d2a9b86"
+down_revision: str | None = "8dacb60b4f0c"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Igual que models.TRGM_GIST_OPS.
+TRGM_GIST_OPS = "gist_trgm_ops(siglen=64)"
+
+# Umbral de `<%` para todas las sesiones de esta base de datos: el
+# DEFAULT_SIMILARITY_THRESHOLD de repositories/trigram_search.py (el de pg_trgm es 0.6).
+WORD_SIMILARITY_THRESHOLD = "0.4"
+
+# (tabla, columna, índice GIN anterior, índice GiST nuevo)
+TRIGRAM_INDEXES = (
+    ("notes", "title", "ix_notes_title_trgm", "ix_notes_user_id_title_trgm"),
+    ("keywords", "name", "ix_keywords_name_trgm", "ix_keywords_user_id_name_trgm"),
+)
+
+
+def _alter_database(clause: str) -> None:
+    # ALTER DATABASE no admite current_database(): se compone el nombre en el servidor.
+    op.execute(
+        f"DO $$ BEGIN EXECUTE format('ALTER DATABASE %I {clause}', current_database()); END $$"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gist: user_id (text) en el mismo índice GiST que los trigramas.
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    for table, column, gin_index, gist_index in TRIGRAM_INDEXES:
+        op.create_index(
+            gist_index,
+            table,
+            ["user_id", column],
+            unique=False,
+            postgresql_using="gist",
+            postgresql_ops={column: TRGM_GIST_OPS},
+        )
+        op.drop_index(gin_index, table_name=table, postgresql_using="gin")
+    _alter_database(f"SET pg_trgm.word_similarity_threshold = ''{WORD_SIMILARITY_THRESHOLD}''")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _alter_database("RESET pg_trgm.word_similarity_threshold")
+    for table, column, gin_index, gist_index in reversed(TRIGRAM_INDEXES):
+        op.create_index(
+            gin_index,
+            table,
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+        op.drop_index(gist_index, table_name=table, postgresql_using="gist")
+    # Las extensiones se conservan: otras consultas pueden depender de ellas.
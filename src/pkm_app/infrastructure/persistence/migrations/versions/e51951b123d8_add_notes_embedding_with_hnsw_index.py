@@ -0,0 +1,45 @@
+"""add_notes_embedding_with_hnsw_index
+
+Revision ID: e51951b123d8
+Revises: 6fd73af4dd81
+Create Date: 2026-10-18 11:17:06.527276
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision: str = "e51951b123d8"
+down_revision: str | None = "6fd73af4dd81"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Copia literal de models.EMBEDDING_DIMENSIONS en el momento de esta revisión.
+EMBEDDING_DIMENSIONS = 768
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.add_column("notes", sa.Column("embedding", Vector(EMBEDDING_DIMENSIONS), nullable=True))
+    op.create_index(
+        "ix_notes_embedding_hnsw",
+        "notes",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notes_embedding_hnsw", table_name="notes", postgresql_using="hnsw")
+    op.drop_column("notes", "embedding")
+    # La extensión vector se conserva: otras consultas pueden depender de ella.
@@ -0,0 +1,53 @@
+"""add_embedding_cache_table
+
+Revision ID: f337323afe48
+Revises: 6f784e639aa7
+Create Date: 2026-10-18 11:49:08.603210
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "f337323afe48"
+down_revision: str | None = "6f784e639aa7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "embedding_cache",
+        sa.Column("model", sa.VARCHAR(length=200), nullable=False),
+        sa.Column("dimensions", sa.Integer(), nullable=False),
+        sa.Column("text_hash", postgresql.BYTEA(), nullable=False),
+        sa.Column("embedding", Vector(), nullable=False),
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "octet_length(text_hash) = 32", name=op.f("ck_embedding_cache_text_hash_sha256")
+        ),
+        sa.CheckConstraint(
+            "vector_dims(embedding) = dimensions",
+            name=op.f("ck_embedding_cache_embedding_dimensions"),
+        ),
+        sa.PrimaryKeyConstraint(
+            "model", "dimensions", "text_hash", name=op.f("pk_embedding_cache")
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("embedding_cache")
@@ -0,0 +1,53 @@
+"""add_notes_full_text_search_vector
+
+Revision ID: f71c52a9a3ba
+Revises: 2b232a817481
+Create Date: 2026-10-18 11:08:41.771904
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "f71c52a9a3ba"
+down_revision: str | None = "2b232a817481"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Copia literal de models.NOTE_SEARCH_VECTOR_SQL en el momento de esta revisión:
+# las migraciones no deben depender de la versión actual de los modelos.
+NOTE_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(content, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "notes",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(NOTE_SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_notes_search_vector",
+        "notes",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notes_search_vector", table_name="notes", postgresql_using="gin")
+    op.drop_column("notes", "search_vector")
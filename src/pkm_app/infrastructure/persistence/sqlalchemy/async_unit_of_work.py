@@ -1,15 +1,24 @@
 # ---------------------------------------------------------------------------
 # Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/async_unit_of_work.py
 # ---------------------------------------------------------------------------
+import logging
+import time
 from collections.abc import Callable
+from contextvars import Token
 from types import TracebackType  # Para __aexit__ y __exit__
 from typing import Any, Optional  # Any para los tipos de __exit__ de la interfaz
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.pkm_app.core.application.interfaces.link_graph_async_interface import (
+    ILinkGraphRepository,
+)
 from src.pkm_app.core.application.interfaces.note_async_interface import (
     INoteRepository,
 )  # Necesario para el tipado de self.notes
+from src.pkm_app.core.application.interfaces.project_async_interface import (
+    IProjectRepository,
+)
 
 # Importar la interfaz de UoW
 from src.pkm_app.core.application.interfaces.unit_of_work_interface import (
@@ -17,23 +26,79 @@ from src.pkm_app.core.application.interfaces.unit_of_work_interface import (
 )
 
 # Importar la fábrica de sesiones de database.py
-from src.pkm_app.infrastructure.persistence.sqlalchemy.database import AsyncSessionLocal
+from src.pkm_app.infrastructure.cache.cached_note_repository import CachedNoteRepository
+from src.pkm_app.infrastructure.cache.invalidation_bus import notify_invalidations_stmt
+from src.pkm_app.infrastructure.cache.note_cache import NoteCache
+from src.pkm_app.infrastructure.graph.link_graph_index import LinkGraphIndex
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import (
+    AsyncReadOnlySessionLocal,
+    AsyncSessionLocal,
+    engines,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.metrics import record_unit_of_work
+from src.pkm_app.infrastructure.persistence.sqlalchemy.query_stats import (
+    QueryStats,
+    start_recording,
+    stop_recording,
+)
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.link_graph_async_repository import (
+    AsyncSQLAlchemyLinkGraphRepository,
+)
 
 # Importar la implementación concreta del NoteRepository
 from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_async_repository import (
     AsyncSQLAlchemyNoteRepository,
 )
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.project_async_repository import (
+    AsyncSQLAlchemyProjectRepository,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.write_tracking import (
+    NOTE_ENTITY,
+)
+
+from src.pkm_app.infrastructure.search.embedding_pipeline import EmbeddingPipeline
 
 # Cuando tengas más repositorios, importarás sus implementaciones aquí:
 # from src.pkm_app.infrastructure.persistence.sqlalchemy.keyword_repository import SQLAlchemyKeywordRepository
-# from src.pkm_app.infrastructure.persistence.sqlalchemy.project_repository import SQLAlchemyProjectRepository
+
+logger = logging.getLogger(__name__)
 
 
 class AsyncSQLAlchemyUnitOfWork(IAsyncUnitOfWork):
-    def __init__(self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal):
+    # Etiqueta unit_of_work de las métricas (metrics.py).
+    metrics_name = "async"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        embedding_pipeline: EmbeddingPipeline | None = None,
+        note_cache: NoteCache | None = None,
+        publish_invalidations: bool = False,
+        link_graph_index: LinkGraphIndex | None = None,
+        query_stats_factory: Callable[[], QueryStats] = engines.new_query_stats,
+    ):
         self._session_factory: Callable[[], AsyncSession] = session_factory
         self._session: AsyncSession | None = None
+        # Si se proporciona, las notas creadas o editadas se encolan para recalcular su
+        # embedding, solo después de que el commit haya tenido éxito.
+        self._embedding_pipeline = embedding_pipeline
+        # Caché de lectura de notas compartida entre UoW (ver infrastructure/cache).
+        self._note_cache = note_cache
+        # Si es True, el commit avisa a los demás procesos (NOTIFY) de lo escrito.
+        self._publish_invalidations = publish_invalidations
+        # Índice en memoria del grafo de enlaces: recibe los enlaces creados y borrados.
+        self._link_graph_index = link_graph_index
+        self._note_repository: AsyncSQLAlchemyNoteRepository | None = None
+        self._cached_notes: CachedNoteRepository | None = None
         self.notes: INoteRepository  # Tipado según IAsyncUnitOfWork
+        self.links: ILinkGraphRepository
+        self.projects: IProjectRepository
+        # Sentencias del último bloque 'async with' (ver query_stats.py).
+        self._query_stats_factory = query_stats_factory
+        self.query_stats: QueryStats | None = None
+        self._query_stats_token: Token[tuple[QueryStats, ...]] | None = None
+        self._started = 0.0
 
     async def __aenter__(self) -> "IAsyncUnitOfWork":  # Devuelve el tipo de la interfaz
         """
@@ -42,13 +107,23 @@ class AsyncSQLAlchemyUnitOfWork(IAsyncUnitOfWork):
         """
         self._session = self._session_factory()
         assert self._session is not None, "La sesión no debería ser None después de la creación"
+        self.query_stats = self._query_stats_factory()
+        self._query_stats_token = start_recording(self.query_stats)
+        self._started = time.perf_counter()
 
         # Instanciar los repositorios con la sesión actual
-        self.notes = AsyncSQLAlchemyNoteRepository(
-            self._session
-        )  # Cambiado a AsyncSQLAlchemyNoteRepository
+        self._note_repository = AsyncSQLAlchemyNoteRepository(self._session)
+        self.notes = self._note_repository
+        if self._note_cache is not None:
+            self._cached_notes = CachedNoteRepository(self._note_repository, self._note_cache)
+            self.notes = self._cached_notes
+        self.links = AsyncSQLAlchemyLinkGraphRepository(
+            self._session, self._note_repository.touched
+        )
+        self.projects = AsyncSQLAlchemyProjectRepository(
+            self._session, self._note_repository.touched
+        )
         # self.keywords = SQLAlchemyKeywordRepository(self._session) # Ejemplo para futuro
-        # self.projects = SQLAlchemyProjectRepository(self._session) # Ejemplo para futuro
 
         return self  # Devuelve la instancia de UoW para ser usada en el bloque 'async with'
 
@@ -71,18 +146,79 @@ class AsyncSQLAlchemyUnitOfWork(IAsyncUnitOfWork):
         finally:
             await self._session.close()  # Siempre cierra la sesión
             self._session = None  # Limpia la referencia a la sesión
+            self._stop_query_stats()
+            self._record_metrics(failed=exc_type is not None)
+
+    def _stop_query_stats(self) -> None:
+        if self._query_stats_token is None:
+            return
+        stop_recording(self._query_stats_token)
+        self._query_stats_token = None
+        if self.query_stats is not None:
+            logger.debug("Unidad de Trabajo: %s", self.query_stats.summary())
+
+    def _record_metrics(self, failed: bool) -> None:
+        statements = self.query_stats.statements if self.query_stats is not None else None
+        record_unit_of_work(
+            self.metrics_name, time.perf_counter() - self._started, failed, statements
+        )
 
     async def commit(self) -> None:
         """Confirma los cambios pendientes en la sesión actual."""
         if not self._session:
             raise RuntimeError("Session no inicializada. La UoW debe usarse con 'async with'.")
+        if self._publish_invalidations and self._note_repository is not None:
+            # En la misma transacción: PostgreSQL solo entrega el aviso si el commit tiene éxito.
+            notify_stmt = notify_invalidations_stmt(self._note_repository.touched)
+            if notify_stmt is not None:
+                await self._session.execute(notify_stmt)
         await self._session.commit()
+        if self._cached_notes is not None:
+            if self._note_repository is not None:
+                # Incluye las notas de los proyectos editados o borrados.
+                self._cached_notes.pending_invalidations.update(
+                    self._note_repository.touched.keys(NOTE_ENTITY)
+                )
+            self._cached_notes.commit_invalidations()
+        if self._note_repository is not None:
+            changed_note_ids = self._note_repository.changed_note_ids
+            if self._embedding_pipeline is not None:
+                self._embedding_pipeline.enqueue(changed_note_ids)
+            changed_note_ids.clear()
+            if self._link_graph_index is not None:
+                self._link_graph_index.apply(self._note_repository.touched.link_changes)
+            self._note_repository.touched.clear()
 
     async def rollback(self) -> None:
         """Revierte los cambios pendientes en la sesión actual."""
         if not self._session:
             raise RuntimeError("Session no inicializada. La UoW debe usarse con 'async with'.")
         await self._session.rollback()
+        if self._note_repository is not None:
+            self._note_repository.changed_note_ids.clear()
+            self._note_repository.touched.clear()
+        if self._cached_notes is not None:
+            self._cached_notes.discard_invalidations()
 
     # Los métodos síncronos (__enter__, __exit__, sync_commit, sync_rollback)
     # ya no son parte de IAsyncUnitOfWork, por lo que se eliminan de esta clase.
+
+
+class AsyncSQLAlchemyReadOnlyUnitOfWork(AsyncSQLAlchemyUnitOfWork):
+    """
+    UoW de solo lectura. Por defecto sus sesiones salen de AsyncReadOnlySessionLocal: la
+    réplica (DB_REPLICA_HOST) o, si no hay, el primario, con transacciones de solo lectura
+    (PostgreSQL rechaza cualquier escritura) y sin autoflush.
+
+    No admite caché de notas, pipeline de embeddings ni índice de enlaces: no hay escrituras
+    que propagar, y con una réplica con retraso la caché compartida podría volver a guardar
+    versiones que un commit en el primario ya ha invalidado. commit() y rollback() solo
+    terminan la transacción de lectura.
+    """
+
+    metrics_name = "async_read_only"
+
+    def __init__(
+        self, session_factory: Callable[[], AsyncSession] = AsyncReadOnlySessionLocal
+    ) -> None:
+        super().__init__(session_factory=session_factory)
@@ -1,56 +1,402 @@
-import os
-from collections.abc import AsyncGenerator, Iterator
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/database.py
+# ---------------------------------------------------------------------------
+"""
+Motores y fábricas de sesiones de SQLAlchemy, construidos a partir de Settings
+(infrastructure/config/settings.py) la primera vez que se usan.
+
+Importar este módulo no lee el entorno ni .env, no valida la configuración y no crea
+motores ni carga el driver de la base de datos: todo eso ocurre en `engines`
+(EngineRegistry) al pedir el primer motor o la primera sesión. Los nombres de siempre
+siguen disponibles: AsyncSessionLocal y SyncSessionLocal son fábricas que delegan en el
+registro, y ASYNC_DATABASE_URL, SYNC_DATABASE_URL_STR, async_engine y sync_engine se
+resuelven al leerlos. AsyncReadOnlySessionLocal y SyncReadOnlySessionLocal abren sesiones
+de solo lectura en la réplica (DB_REPLICA_HOST) o, si no hay, en el primario.
+"""
+
+import threading
+from collections.abc import AsyncGenerator, Callable, Iterator
 from contextlib import contextmanager  # Añadido
+from typing import TYPE_CHECKING, Any, Generic, TypeVar, cast
 
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.engine import URL
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
-# Cargar variables de entorno desde el archivo .env
-# Esto asegura que las variables de DB_USER, DB_PASSWORD, etc., estén disponibles.
-load_dotenv()
-
-# Construir la URL de la base de datos asíncrona desde las variables de entorno
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST", "localhost")  # 'localhost' si la app corre en el host y DB en Docker
-DB_PORT = os.getenv("DB_PORT", "5432")
-DB_NAME = os.getenv("DB_NAME")
-
-if not all([DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME]):
-    raise ValueError(
-        "Faltan variables de entorno para la base de datos en .env: "
-        "DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME."
+from src.pkm_app.infrastructure.persistence.sqlalchemy.metrics import (
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.query_stats import (
+    QueryStats,
+    instrument_engine,
+)
+
+if TYPE_CHECKING:
+    # pydantic-settings tarda en importarse: el módulo de configuración se importa al
+    # pedir los settings (EngineRegistry.settings), no al importar este módulo.
+    from src.pkm_app.infrastructure.config.settings import Settings
+
+ASYNC_DRIVER = "postgresql+asyncpg"
+SYNC_DRIVER = "postgresql+psycopg2"  # Driver síncrono (scripts, Alembic, tareas sin async)
+
+SessionT = TypeVar("SessionT", AsyncSession, Session)
+T = TypeVar("T")
+
+
+def database_url(settings: "Settings", drivername: str, replica: bool = False) -> str:
+    """
+    URL completa (con contraseña) de la base de datos para el driver dado. Con `replica`, la
+    de la réplica de lectura (DB_REPLICA_HOST y DB_REPLICA_PORT, mismas credenciales y base
+    de datos que el primario).
+    """
+    required = {
+        "DB_USER": settings.DB_USER,
+        "DB_PASSWORD": settings.DB_PASSWORD,
+        "DB_HOST": settings.DB_HOST,
+        "DB_NAME": settings.DB_NAME,
+    }
+    if not all(required.values()):
+        raise ValueError(
+            "Faltan variables de entorno para la base de datos en .env: "
+            "DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME."
+        )
+    host, port = settings.DB_HOST, settings.DB_PORT
+    if replica:
+        host = settings.DB_REPLICA_HOST
+        port = settings.DB_REPLICA_PORT or settings.DB_PORT
+    return URL.create(
+        drivername=drivername,
+        username=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        host=host,
+        port=port,
+        database=settings.DB_NAME,
+    ).render_as_string(hide_password=False)
+
+
+def session_settings(read_only: bool = False) -> dict[str, str]:
+    """
+    Parámetros de PostgreSQL que las consultas de los repositorios dan por supuestos. Se fijan
+    al abrir cada conexión (sin round trips y sin depender de los valores por defecto de la
+    base de datos); con `read_only`, también default_transaction_read_only.
+
+    - hnsw.iterative_scan y hnsw.ef_search: top-k completo en las búsquedas por vector con
+      filtros (semantic_search.py).
+    - pg_trgm.word_similarity_threshold: el umbral de `<%` en trigram_search.py.
+    """
+    from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.semantic_search import (
+        DEFAULT_EF_SEARCH,
+    )
+    from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.trigram_search import (
+        DEFAULT_SIMILARITY_THRESHOLD,
     )
 
-# URL para SQLAlchemy con asyncpg
-ASYNC_DATABASE_URL = URL.create(
-    drivername="postgresql+asyncpg",
-    username=DB_USER,
-    password=DB_PASSWORD,
-    host=DB_HOST,
-    port=int(DB_PORT),
-    database=DB_NAME,
-).render_as_string(
-    hide_password=False
-)  # hide_password=False para que esté completa la URL
-
-# Crear el motor asíncrono de SQLAlchemy
-# echo=True es útil para desarrollo para ver las sentencias SQL generadas.
-# Considera ponerlo en False o controlarlo con una variable de entorno para producción.
-async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=True)
-
-# Crear una fábrica de sesiones asíncronas (SessionLocal)
-# Esta fábrica se usará para crear nuevas instancias de AsyncSession.
-AsyncSessionLocal = async_sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,  # Común para evitar problemas con objetos desasociados después del commit
-    autoflush=False,  # Control manual del flush para operaciones asíncronas
-    autocommit=False,  # Control manual del commit
+    values = {
+        "hnsw.iterative_scan": "relaxed_order",
+        "hnsw.ef_search": str(DEFAULT_EF_SEARCH),
+        "pg_trgm.word_similarity_threshold": str(DEFAULT_SIMILARITY_THRESHOLD),
+    }
+    if read_only:
+        values["default_transaction_read_only"] = "on"
+    return values
+
+
+def sync_connect_args(read_only: bool = False) -> dict[str, Any]:
+    """connect_args de psycopg2 con `session_settings` (opciones -c del arranque)."""
+    options = " ".join(f"-c {name}={value}" for name, value in session_settings(read_only).items())
+    return {"options": options}
+
+
+def async_connect_args(read_only: bool = False) -> dict[str, Any]:
+    """connect_args de asyncpg con `session_settings` (server_settings del arranque)."""
+    return {"server_settings": session_settings(read_only)}
+
+
+def engine_options(settings: "Settings") -> dict[str, Any]:
+    """Argumentos de create_engine comunes a todos los motores: pool y echo."""
+    return {
+        "echo": settings.DB_ECHO,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def sync_engine_options(settings: "Settings", read_only: bool = False) -> dict[str, Any]:
+    """engine_options más los parámetros de cada conexión de psycopg2."""
+    return {**engine_options(settings), "connect_args": sync_connect_args(read_only)}
+
+
+def async_engine_options(settings: "Settings", read_only: bool = False) -> dict[str, Any]:
+    """engine_options más la caché de sentencias y los parámetros de conexión de asyncpg."""
+    return {
+        **engine_options(settings),
+        "connect_args": {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            **async_connect_args(read_only),
+        },
+    }
+
+
+# Motores con pool propio, por nombre; el resto de lo que construye el registro son vistas
+# sobre ellos (execution_options) o fábricas de sesiones, que no hay que cerrar.
+_ASYNC_ENGINES = ("async_engine", "async_replica_engine")
+_SYNC_ENGINES = ("sync_engine", "sync_replica_engine")
+
+
+class EngineRegistry:
+    """
+    Motores y fábricas de sesiones del proceso. Cada uno se construye la primera vez que se
+    pide (una sola vez aunque lo pidan varios hilos a la vez) y se reutiliza hasta `dispose`.
+    Sin `settings`, usa get_settings().
+
+    Todas las conexiones se abren con `session_settings()`. Los motores llevan la
+    instrumentación de query_stats.py salvo con DB_QUERY_STATS=false,
+    y sus pools publican las métricas de metrics.py con engine="asyncpg", "psycopg2",
+    "asyncpg_replica" o "psycopg2_replica".
+
+    Las sesiones de lectura (`*_read_session_factory`) van a la réplica si hay
+    DB_REPLICA_HOST y, si no, al pool del primario; en ambos casos sus transacciones son de
+    solo lectura.
+    """
+
+    def __init__(self, settings: "Settings | None" = None) -> None:
+        self._settings = settings
+        # Reentrante: construir una fábrica de sesiones construye antes su motor.
+        self._lock = threading.RLock()
+        self._built: dict[str, Any] = {}
+
+    def _get(self, name: str, build: Callable[[], T]) -> T:
+        value = self._built.get(name)
+        if value is None:
+            with self._lock:
+                value = self._built.get(name)
+                if value is None:
+                    value = self._built[name] = build()
+        return cast(T, value)
+
+    @property
+    def settings(self) -> "Settings":
+        if self._settings is None:
+            from src.pkm_app.infrastructure.config.settings import get_settings
+
+            self._settings = get_settings()
+        return self._settings
+
+    @property
+    def async_url(self) -> str:
+        return database_url(self.settings, ASYNC_DRIVER)
+
+    @property
+    def sync_url(self) -> str:
+        return database_url(self.settings, SYNC_DRIVER)
+
+    @property
+    def has_replica(self) -> bool:
+        return bool(self.settings.DB_REPLICA_HOST)
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        return self._get("async_engine", lambda: self._create_async_engine(self.async_url))
+
+    @property
+    def sync_engine(self) -> Engine:
+        return self._get("sync_engine", lambda: self._create_sync_engine(self.sync_url))
+
+    @property
+    def async_read_engine(self) -> AsyncEngine:
+        """Réplica (o primario) con transacciones de solo lectura."""
+
+        def build() -> AsyncEngine:
+            if not self.has_replica:
+                return self.async_engine.execution_options(postgresql_readonly=True)
+            return self._get(
+                "async_replica_engine",
+                lambda: self._create_async_engine(
+                    database_url(self.settings, ASYNC_DRIVER, replica=True), read_only=True
+                ),
+            )
+
+        return self._get("async_read_engine", build)
+
+    @property
+    def sync_read_engine(self) -> Engine:
+        """Réplica (o primario) con transacciones de solo lectura."""
+
+        def build() -> Engine:
+            if not self.has_replica:
+                return self.sync_engine.execution_options(postgresql_readonly=True)
+            return self._get(
+                "sync_replica_engine",
+                lambda: self._create_sync_engine(
+                    database_url(self.settings, SYNC_DRIVER, replica=True), read_only=True
+                ),
+            )
+
+        return self._get("sync_read_engine", build)
+
+    @property
+    def async_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        return self._get(
+            "async_session_factory",
+            lambda: async_sessionmaker(
+                bind=self.async_engine,
+                class_=AsyncSession,
+                expire_on_commit=False,  # Común para evitar problemas con objetos desasociados después del commit
+                autoflush=False,  # Control manual del flush para operaciones asíncronas
+                autocommit=False,  # Control manual del commit
+            ),
+        )
+
+    @property
+    def sync_session_factory(self) -> sessionmaker[Session]:
+        return self._get(
+            "sync_session_factory",
+            lambda: sessionmaker(
+                autocommit=False, autoflush=False, bind=self.sync_engine, class_=Session
+            ),
+        )
+
+    @property
+    def async_read_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        # Sin autoflush ni expiración al terminar: no hay cambios que volcar.
+        return self._get(
+            "async_read_session_factory",
+            lambda: async_sessionmaker(
+                bind=self.async_read_engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+                autoflush=False,
+            ),
+        )
+
+    @property
+    def sync_read_session_factory(self) -> sessionmaker[Session]:
+        return self._get(
+            "sync_read_session_factory",
+            lambda: sessionmaker(
+                bind=self.sync_read_engine,
+                class_=Session,
+                expire_on_commit=False,
+                autoflush=False,
+            ),
+        )
+
+    def new_query_stats(self) -> QueryStats:
+        """QueryStats para una Unidad de Trabajo, con los límites de Settings."""
+        return QueryStats(
+            repeat_limit=self.settings.DB_REPEATED_STATEMENT_LIMIT,
+            strict=self.settings.DB_STRICT_QUERY_CHECKS,
+        )
+
+    @property
+    def initialized(self) -> bool:
+        """True si ya se ha construido algún motor."""
+        return any(name in self._built for name in _ASYNC_ENGINES + _SYNC_ENGINES)
+
+    # Los motores de la réplica abren las conexiones con default_transaction_read_only: todas
+    # sus transacciones son de solo lectura sin coste por transacción. Sin réplica, las
+    # lecturas comparten el pool del primario y se marcan con postgresql_readonly, que
+    # SQLAlchemy aplica y deshace en cada checkout (BEGIN READ ONLY).
+
+    def _create_async_engine(self, url: str, read_only: bool = False) -> AsyncEngine:
+        options = async_engine_options(self.settings, read_only)
+        options["poolclass"] = TimedAsyncAdaptedQueuePool
+        options["pool_logging_name"] = "asyncpg_replica" if read_only else "asyncpg"
+        # La caché del adaptador de SQLAlchemy se configura en la URL del motor (no en
+        # ASYNC_DATABASE_URL, que también se usa como DSN de asyncpg).
+        engine_url = make_url(url).update_query_dict(
+            {"prepared_statement_cache_size": str(self.settings.DB_PREPARED_STATEMENT_CACHE_SIZE)}
+        )
+        engine = create_async_engine(engine_url, **options)
+        if self.settings.DB_QUERY_STATS:
+            instrument_engine(engine.sync_engine)
+        return engine
+
+    def _create_sync_engine(self, url: str, read_only: bool = False) -> Engine:
+        options = sync_engine_options(self.settings, read_only)
+        options["poolclass"] = TimedQueuePool
+        options["pool_logging_name"] = "psycopg2_replica" if read_only else "psycopg2"
+        engine = create_engine(url, **options)
+        return instrument_engine(engine) if self.settings.DB_QUERY_STATS else engine
+
+    def _forget(self) -> dict[str, Any]:
+        with self._lock:
+            built, self._built = self._built, {}
+        return built
+
+    async def dispose(self) -> None:
+        """
+        Cierra las conexiones de todos los motores y los olvida: el siguiente uso los vuelve a
+        construir (p. ej. tras cambiar la configuración en los tests).
+        """
+        built = self._forget()
+        for name in _SYNC_ENGINES:
+            if name in built:
+                built[name].dispose()
+        for name in _ASYNC_ENGINES:
+            if name in built:
+                await built[name].dispose()
+
+    def dispose_sync(self) -> None:
+        """Como `dispose`, sin bucle de eventos: los motores asíncronos solo se olvidan."""
+        built = self._forget()
+        for name in _SYNC_ENGINES:
+            if name in built:
+                built[name].dispose()
+
+
+class LazySessionFactory(Generic[SessionT]):
+    """
+    Callable con la interfaz de una fábrica de sesiones que resuelve la del registro en cada
+    llamada: se puede importar y usar como valor por defecto sin construir el motor.
+    """
+
+    def __init__(self, resolve: Callable[[], Callable[..., SessionT]]) -> None:
+        self._resolve = resolve
+
+    def __call__(self, **kwargs: Any) -> SessionT:
+        return self._resolve()(**kwargs)
+
+
+engines = EngineRegistry()
+
+AsyncSessionLocal: LazySessionFactory[AsyncSession] = LazySessionFactory(
+    lambda: engines.async_session_factory
+)
+SyncSessionLocal: LazySessionFactory[Session] = LazySessionFactory(
+    lambda: engines.sync_session_factory
+)
+# Sesiones de solo lectura: réplica si hay DB_REPLICA_HOST, si no el primario.
+AsyncReadOnlySessionLocal: LazySessionFactory[AsyncSession] = LazySessionFactory(
+    lambda: engines.async_read_session_factory
 )
+SyncReadOnlySessionLocal: LazySessionFactory[Session] = LazySessionFactory(
+    lambda: engines.sync_read_session_factory
+)
+
+_LAZY_ATTRIBUTES: dict[str, Callable[[], Any]] = {
+    "ASYNC_DATABASE_URL": lambda: engines.async_url,
+    "SYNC_DATABASE_URL_STR": lambda: engines.sync_url,
+    "async_engine": lambda: engines.async_engine,
+    "sync_engine": lambda: engines.sync_engine,
+}
+
+
+def __getattr__(name: str) -> Any:
+    # URLs y motores de versiones anteriores del módulo, resueltos al leerlos (PEP 562).
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # (Opcional, para uso futuro con FastAPI o gestión de dependencias)
@@ -73,27 +419,6 @@ async def get_async_db_session() -> AsyncGenerator[AsyncSession]:
             await session.close()
 
 
-# --- Configuración Síncrona (para scripts, Alembic, tareas que no requieren async) ---
-
-SYNC_DATABASE_URL_STR = URL.create(
-    drivername="postgresql+psycopg2",  # Driver síncrono
-    username=DB_USER,
-    password=DB_PASSWORD,
-    host=DB_HOST,
-    port=int(DB_PORT),
-    database=DB_NAME,
-).render_as_string(hide_password=False)
-
-sync_engine = create_engine(SYNC_DATABASE_URL_STR, echo=True)  # echo=True para desarrollo
-
-SyncSessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=sync_engine,
-    class_=Session,  # Usando la clase correcta de sqlalchemy.orm
-)
-
-
 @contextmanager
 def get_sync_db_session() -> Iterator[Session]:
     """
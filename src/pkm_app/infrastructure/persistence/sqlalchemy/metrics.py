@@ -0,0 +1,294 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/metrics.py
+# ---------------------------------------------------------------------------
+"""
+Métricas de la capa de persistencia en formato Prometheus:
+
+- pkm_repository_call_seconds{repository, method}: latencia de cada método público de los
+  repositorios de notas (histograma), y pkm_repository_calls_total{..., outcome} con las
+  llamadas terminadas bien ("ok") o con excepción ("error").
+- pkm_unit_of_work_seconds{unit_of_work, outcome} y pkm_unit_of_work_statements: duración de
+  cada bloque 'with' de una UoW y sentencias que lanza (las de query_stats.py).
+- pkm_pool_checkout_seconds{engine}: espera para sacar una conexión del pool (incluye el
+  pre-ping y abrir la conexión si hace falta; también cuenta los checkouts que fallan por
+  DB_POOL_TIMEOUT).
+- pkm_pool_size, pkm_pool_checked_out, pkm_pool_checked_in y pkm_pool_overflow{engine}:
+  estado de los pools de los motores de EngineRegistry, leído al hacer el scrape.
+
+prometheus-client es opcional (pip install prometheus-client): sin él, todas las métricas
+son no-op y start_metrics_server lanza RuntimeError. La librería se importa al registrar la
+primera medida, no al importar este módulo. Las métricas van a un CollectorRegistry propio,
+que start_metrics_server sirve en formato de texto en METRICS_HOST:METRICS_PORT.
+"""
+
+import functools
+import inspect
+import logging
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+
+logger = logging.getLogger(__name__)
+
+ClassT = TypeVar("ClassT", bound=type)
+
+# Latencias de base de datos: de medio milisegundo a unos segundos.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Pools vivos por nombre (pool_logging_name): al recrear un pool (engine.dispose()) el
+# nuevo sustituye al anterior.
+_pools: "weakref.WeakValueDictionary[str, QueuePool]" = weakref.WeakValueDictionary()
+
+
+class _NoOpMetric:
+    """Sustituto de Counter e Histogram cuando prometheus-client no está instalado."""
+
+    def labels(self, *labelvalues: str, **labelkwargs: str) -> "_NoOpMetric":
+        return self
+
+    def observe(self, amount: float) -> None:
+        pass
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+
+@dataclass(frozen=True)
+class PersistenceMetrics:
+    registry: Any  # CollectorRegistry, o None sin prometheus-client
+    repository_seconds: Any
+    repository_calls: Any
+    unit_of_work_seconds: Any
+    unit_of_work_statements: Any
+    pool_checkout_seconds: Any
+
+    @property
+    def enabled(self) -> bool:
+        return self.registry is not None
+
+
+class _PoolCollector:
+    """Gauges del estado de los pools, leídos de `_pools` en cada scrape."""
+
+    def collect(self) -> Iterator[Any]:
+        from prometheus_client.core import GaugeMetricFamily
+
+        gauges = {
+            "size": GaugeMetricFamily(
+                "pkm_pool_size", "Conexiones permanentes del pool (pool_size).", labels=["engine"]
+            ),
+            "checked_out": GaugeMetricFamily(
+                "pkm_pool_checked_out", "Conexiones prestadas ahora mismo.", labels=["engine"]
+            ),
+            "checked_in": GaugeMetricFamily(
+                "pkm_pool_checked_in", "Conexiones abiertas y libres en el pool.", labels=["engine"]
+            ),
+            "overflow": GaugeMetricFamily(
+                "pkm_pool_overflow",
+                "Conexiones abiertas por encima de pool_size (hasta max_overflow).",
+                labels=["engine"],
+            ),
+        }
+        for name, pool in sorted(_pools.items()):
+            gauges["size"].add_metric([name], pool.size())
+            gauges["checked_out"].add_metric([name], pool.checkedout())
+            gauges["checked_in"].add_metric([name], pool.checkedin())
+            gauges["overflow"].add_metric([name], max(pool.overflow(), 0))
+        yield from gauges.values()
+
+
+_metrics: PersistenceMetrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def metrics() -> PersistenceMetrics:
+    """Las métricas del proceso; la primera llamada importa prometheus-client si está."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = _build_metrics()
+    return _metrics
+
+
+def _build_metrics() -> PersistenceMetrics:
+    try:
+        from prometheus_client import CollectorRegistry, Counter, Histogram
+    except ImportError:  # Dependencia opcional
+        logger.debug("prometheus-client no está instalado: métricas desactivadas.")
+        noop = _NoOpMetric()
+        return PersistenceMetrics(None, noop, noop, noop, noop, noop)
+
+    registry = CollectorRegistry()
+    registry.register(_PoolCollector())
+    return PersistenceMetrics(
+        registry=registry,
+        repository_seconds=Histogram(
+            "pkm_repository_call_seconds",
+            "Duración de las llamadas a los repositorios.",
+            ["repository", "method"],
+            buckets=LATENCY_BUCKETS,
+            registry=registry,
+        ),
+        repository_calls=Counter(
+            "pkm_repository_calls",
+            "Llamadas a los repositorios, por resultado.",
+            ["repository", "method", "outcome"],
+            registry=registry,
+        ),
+        unit_of_work_seconds=Histogram(
+            "pkm_unit_of_work_seconds",
+            "Duración de los bloques 'with' de las Unidades de Trabajo.",
+            ["unit_of_work", "outcome"],
+            buckets=LATENCY_BUCKETS,
+            registry=registry,
+        ),
+        unit_of_work_statements=Histogram(
+            "pkm_unit_of_work_statements",
+            "Sentencias SQL lanzadas por cada Unidad de Trabajo.",
+            ["unit_of_work"],
+            buckets=STATEMENT_BUCKETS,
+            registry=registry,
+        ),
+        pool_checkout_seconds=Histogram(
+            "pkm_pool_checkout_seconds",
+            "Espera para obtener una conexión del pool.",
+            ["engine"],
+            buckets=LATENCY_BUCKETS,
+            registry=registry,
+        ),
+    )
+
+
+def _outcome(failed: bool) -> str:
+    return "error" if failed else "ok"
+
+
+@functools.cache
+def _call_recorder(repository: str, method: str) -> Callable[[float, bool], None]:
+    # Hijos de las métricas resueltos una sola vez por método (labels() toma un lock).
+    current = metrics()
+    observe = current.repository_seconds.labels(repository, method).observe
+    count = {
+        failed: current.repository_calls.labels(repository, method, _outcome(failed)).inc
+        for failed in (False, True)
+    }
+
+    def record(seconds: float, failed: bool) -> None:
+        observe(seconds)
+        count[failed]()
+
+    return record
+
+
+def _instrument_method(repository: str, name: str, method: Callable[..., Any]) -> Any:
+    if inspect.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = await method(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                _call_recorder(repository, name)(time.perf_counter() - started, failed)
+
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = method(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            _call_recorder(repository, name)(time.perf_counter() - started, failed)
+
+    return wrapper
+
+
+def instrument_repository(cls: ClassT) -> ClassT:
+    """
+    Decorador de clase: mide la latencia y cuenta las llamadas de los métodos públicos
+    definidos en la clase (síncronos o async), con repository=<nombre de la clase>.
+    """
+    for name, member in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.isfunction(member):
+            setattr(cls, name, _instrument_method(cls.__name__, name, member))
+    return cls
+
+
+def record_unit_of_work(
+    unit_of_work: str, seconds: float, failed: bool, statements: int | None
+) -> None:
+    current = metrics()
+    current.unit_of_work_seconds.labels(unit_of_work, _outcome(failed)).observe(seconds)
+    if statements is not None:
+        current.unit_of_work_statements.labels(unit_of_work).observe(statements)
+
+
+class _CheckoutTimingMixin:
+    """
+    Pool que mide cuánto tarda cada checkout y se registra para los gauges de estado. Se
+    identifica por su pool_logging_name (se conserva al recrearlo en engine.dispose()).
+    """
+
+    logging_name: str | None
+    # Los registros del pool siguen bajo el logger "sqlalchemy" (WARNING por defecto).
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.QueuePool"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics_name = self.logging_name or "default"
+        _pools[self.metrics_name] = self  # type: ignore[assignment]
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            return super().connect()  # type: ignore[misc, no-any-return]
+        finally:
+            metrics().pool_checkout_seconds.labels(self.metrics_name).observe(
+                time.perf_counter() - started
+            )
+
+
+class TimedQueuePool(_CheckoutTimingMixin, QueuePool):
+    """QueuePool (motores síncronos, psycopg2) con métricas."""
+
+
+class TimedAsyncAdaptedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool (motores asíncronos, asyncpg) con métricas."""
+
+
+def start_metrics_server(port: int | None = None, host: str | None = None) -> Any:
+    """
+    Sirve las métricas en formato de texto de Prometheus en http://host:port/ (por defecto
+    METRICS_HOST y METRICS_PORT) desde un hilo en segundo plano. Devuelve el servidor HTTP
+    (server.shutdown() lo para).
+    """
+    try:
+        from prometheus_client import start_http_server
+    except ImportError as exc:  # Dependencia opcional
+        raise RuntimeError(
+            "start_metrics_server requiere el paquete 'prometheus-client' "
+            "(pip install prometheus-client)."
+        ) from exc
+    if port is None or host is None:
+        from src.pkm_app.infrastructure.config.settings import get_settings
+
+        settings = get_settings()
+        port = settings.METRICS_PORT if port is None else port
+        host = settings.METRICS_HOST if host is None else host
+    server, _thread = start_http_server(port, addr=host, registry=metrics().registry)
+    logger.info("Métricas de Prometheus en http://%s:%d/metrics", host, server.server_port)
+    return server
@@ -1,4 +1,7 @@
 # src/pkm_app/infrastructure/persistence/sqlalchemy/models.py
+import secrets
+import threading
+import time
 import uuid  # Para el default de UUID en Python si es necesario
 from datetime import datetime
 from typing import Any, Optional
@@ -6,22 +9,28 @@ from typing import Any, Optional
 from sqlalchemy import (
     CheckConstraint,
     Column,
+    Computed,
+    FetchedValue,
     ForeignKey,
+    ForeignKeyConstraint,
     Index,
+    Integer,
     MetaData,
     Table,
     Text,
     UniqueConstraint,
+    text,
 )
+from pgvector.sqlalchemy import Vector
 from sqlalchemy.dialects.postgresql import (
+    ARRAY,
+    BYTEA,
     JSONB,
     TIMESTAMP,
+    TSVECTOR,
     UUID,
     VARCHAR,
 )  # Específicos de PostgreSQL
-
-# Descomenta la siguiente línea cuando vayas a implementar embeddings
-# from pgvector.sqlalchemy import Vector
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -43,12 +52,86 @@ class Base(DeclarativeBase):
     metadata = metadata_obj
 
 
-# --- Función para el default de UUID si se genera en Python ---
-# Aunque en el SQL usamos uuid_generate_v4() como default en la BD,
-# si necesitas generar el UUID en la aplicación antes de insertar,
-# esta función puede ser útil.
+# --- Claves primarias ---
+# UUIDv7 (RFC 9562): los 48 bits más altos son el instante en milisegundos, así que los ids
+# nuevos caen al final de los índices btree (pk_*, note_keywords, note_links...) en lugar de
+# repartirse por todas sus páginas como los v4. Los ids v4 ya guardados siguen siendo
+# válidos; solo cambia cómo se generan los nuevos. La base de datos genera ids con el mismo
+# formato con uuid_generate_v7() (server_default), que crea la migración.
+UUID_SERVER_DEFAULT = text("uuid_generate_v7()")
+
+_uuid7_lock = threading.Lock()
+_last_uuid7 = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    UUIDv7 con la fracción de milisegundo en los 12 bits de `rand_a` (método 3 de RFC 9562)
+    y 62 bits aleatorios. Crecientes dentro del proceso aunque el reloj retroceda o se
+    generen varios en el mismo instante.
+    """
+    global _last_uuid7
+    milliseconds, nanoseconds = divmod(time.time_ns(), 1_000_000)
+    value = (
+        milliseconds << 80
+        | 0x7 << 76
+        | (nanoseconds * 4096 // 1_000_000) << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+    with _uuid7_lock:
+        if value <= _last_uuid7:
+            value = _last_uuid7 + 1
+        _last_uuid7 = value
+    return uuid.UUID(int=value)
+
+
 def generate_uuid() -> uuid.UUID:
-    return uuid.uuid4()
+    return uuid7()
+
+
+# --- Búsqueda full-text ---
+# Idioma asignado a las notas sin metadata de idioma ni señal clara en el texto:
+# el corpus es mayoritariamente en español.
+DEFAULT_NOTE_LANGUAGE = "es"
+# Configuración de text search por idioma de nota (notes.language). Son copias de
+# spanish/english/simple que pasan cada palabra por el diccionario `unaccent` antes del
+# stemmer, de modo que "gestion" y "Gestión" producen el mismo lexema. Las crea la migración.
+NOTE_SEARCH_CONFIGS = {
+    "es": "kairos_es",
+    "en": "kairos_en",
+    "simple": "kairos_simple",
+}
+NOTE_LANGUAGES = tuple(NOTE_SEARCH_CONFIGS)
+# Selección de la configuración según el idioma de la fila (inmutable: válida en una columna
+# generada). El CHECK ck_notes_language garantiza que siempre hay una rama que coincide.
+NOTE_SEARCH_CONFIG_SQL = (
+    "CASE language "
+    + " ".join(
+        f"WHEN '{language}' THEN '{config}'::regconfig"
+        for language, config in NOTE_SEARCH_CONFIGS.items()
+    )
+    + " END"
+)
+# Expresión de la columna generada notes.search_vector (peso A: título, B: contenido).
+NOTE_SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector({NOTE_SEARCH_CONFIG_SQL}, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector({NOTE_SEARCH_CONFIG_SQL}, coalesce(content, '')), 'B')"
+)
+
+# --- Búsqueda semántica ---
+# Dimensión de notes.embedding (pgvector). Todos los embeddings de la tabla deben venir
+# del mismo modelo: cambiar de modelo implica una migración y recalcularlos.
+EMBEDDING_DIMENSIONS = 768
+# Huella del texto que se embebe (título + contenido), mantenida por PostgreSQL en
+# notes.content_hash para cualquier escritor (ORM, COPY, SQL manual). md5 basta para
+# detectar cambios y, a diferencia de sha256(convert_to(...)), es IMMUTABLE.
+NOTE_CONTENT_HASH_SQL = "md5(coalesce(title, '') || E'\\n\\n' || content)"
+
+# --- Búsqueda difusa ---
+# Clase de operadores de los índices GiST de trigramas. La firma por defecto (12 bytes) se
+# satura con títulos de varias palabras y el recorrido apenas poda ramas del índice.
+TRGM_GIST_OPS = "gist_trgm_ops(siglen=64)"
 
 
 # --- Tablas de Asociación (para relaciones Many-to-Many) ---
@@ -115,7 +198,10 @@ class Project(Base):
     __tablename__ = "projects"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=generate_uuid
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=generate_uuid,
+        server_default=UUID_SERVER_DEFAULT,
     )
     user_id: Mapped[str] = mapped_column(
         Text,
@@ -131,6 +217,17 @@ class Project(Base):
         nullable=True,
         index=True,
     )
+    # Ruta materializada: ids desde el proyecto raíz hasta este (incluido). La calculan los
+    # triggers de la tabla al insertar o cambiar parent_project_id (también con ON DELETE
+    # SET NULL) y reescriben la de los subproyectos al mover uno; nunca se escribe desde
+    # aquí. Con ix_projects_path, `path @> ARRAY[id]` son los proyectos del subárbol.
+    path: Mapped[list[uuid.UUID]] = mapped_column(
+        ARRAY(UUID(as_uuid=True)),
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+        nullable=False,
+        deferred=True,
+    )
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
     )
@@ -143,7 +240,9 @@ class Project(Base):
 
     # Relaciones
     user: Mapped["UserProfile"] = relationship(back_populates="projects")
-    notes: Mapped[list["Note"]] = relationship(back_populates="project")
+    notes: Mapped[list["Note"]] = relationship(
+        back_populates="project", foreign_keys="Note.project_id"
+    )
 
     parent_project: Mapped[Optional["Project"]] = relationship(
         back_populates="child_projects", remote_side=[id]
@@ -153,15 +252,26 @@ class Project(Base):
     )  # templates_associated: Mapped[List["ProjectTemplate"]] =
     # relationship(back_populates="project", cascade="all, delete-orphan")
 
+    # Destino de la FK compuesta notes(project_id, user_id): una nota solo puede apuntar a
+    # un proyecto de su mismo usuario.
+    __table_args__ = (UniqueConstraint("id", "user_id", name="uq_projects_id_user_id"),)
+
     def __repr__(self) -> str:
         return f"<Project(id='{self.id}', name='{self.name}')>"
 
 
+# Índice GIN de las rutas de proyecto: subárboles (path @> ARRAY[id]) sin recorrer la jerarquía.
+Index("ix_projects_path", Project.path, postgresql_using="gin")
+
+
 class Source(Base):
     __tablename__ = "sources"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=generate_uuid
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=generate_uuid,
+        server_default=UUID_SERVER_DEFAULT,
     )
     user_id: Mapped[str] = mapped_column(
         Text,
@@ -184,7 +294,12 @@ class Source(Base):
         nullable=False,
     )  # Relaciones
     user: Mapped["UserProfile"] = relationship(back_populates="sources")
-    notes: Mapped[list["Note"]] = relationship(back_populates="source")
+    notes: Mapped[list["Note"]] = relationship(
+        back_populates="source", foreign_keys="Note.source_id"
+    )
+
+    # Destino de la FK compuesta notes(source_id, user_id), como en projects.
+    __table_args__ = (UniqueConstraint("id", "user_id", name="uq_sources_id_user_id"),)
 
     def __repr__(self) -> str:
         return f"<Source(id='{self.id}', title='{self.title}', type='{self.type}')>"
@@ -194,7 +309,10 @@ class Note(Base):
     __tablename__ = "notes"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=generate_uuid
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=generate_uuid,
+        server_default=UUID_SERVER_DEFAULT,
     )
     user_id: Mapped[str] = mapped_column(
         Text,
@@ -202,26 +320,25 @@ class Note(Base):
         nullable=False,
         index=True,
     )
+    # FK compuestas con user_id (ver __table_args__): la base de datos garantiza que el
+    # proyecto y la fuente son del mismo usuario que la nota.
     project_id: Mapped[uuid.UUID | None] = mapped_column(
-        UUID(as_uuid=True),
-        ForeignKey("projects.id", ondelete="SET NULL"),
-        nullable=True,
-        index=True,
+        UUID(as_uuid=True), nullable=True, index=True
     )
     source_id: Mapped[uuid.UUID | None] = mapped_column(
-        UUID(as_uuid=True),
-        ForeignKey("sources.id", ondelete="SET NULL"),
-        nullable=True,
-        index=True,
+        UUID(as_uuid=True), nullable=True, index=True
     )
     title: Mapped[str | None] = mapped_column(Text, nullable=True, index=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     type: Mapped[str | None] = mapped_column(VARCHAR(100), nullable=True, index=True)
-    # embedding: Mapped[Optional[list[float]]] =
-    # mapped_column(Vector(768), nullable=True)
     # Utilizamos un nombre diferente para evitar
     # conflicto con el atributo 'metadata' de Base
     note_metadata: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    # Idioma de la nota ('es', 'en' o 'simple'): decide la configuración de text search
+    # con la que se indexa. Lo asignan los repositorios al escribir (metadata o detección).
+    language: Mapped[str] = mapped_column(
+        VARCHAR(16), nullable=False, server_default=DEFAULT_NOTE_LANGUAGE
+    )
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, index=True
     )
@@ -232,11 +349,56 @@ class Note(Base):
         nullable=False,
         index=True,
     )
+    # Vector de búsqueda full-text mantenido por PostgreSQL (columna generada),
+    # con el título ponderado por encima del contenido. Se difiere para no
+    # leerlo (ni destostarlo) al cargar notas; solo lo usan las consultas de búsqueda.
+    search_vector: Mapped[Any] = mapped_column(
+        TSVECTOR,
+        Computed(NOTE_SEARCH_VECTOR_SQL, persisted=True),
+        nullable=True,
+        deferred=True,
+    )
+    # Embedding del texto de la nota para la búsqueda semántica (NULL hasta que se calcula).
+    # Se difiere como search_vector: son 3 KB por nota que solo usa search_semantic.
+    embedding: Mapped[list[float] | None] = mapped_column(
+        Vector(EMBEDDING_DIMENSIONS), nullable=True, deferred=True
+    )
+    # content_hash del texto con el que se calculó `embedding`. Si difiere del actual, el
+    # embedding está desactualizado (o falta) y el pipeline de embeddings lo recalcula.
+    content_hash: Mapped[str] = mapped_column(
+        Text, Computed(NOTE_CONTENT_HASH_SQL, persisted=True), deferred=True
+    )
+    embedding_content_hash: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
+
+    __table_args__ = (
+        CheckConstraint(
+            "language IN (" + ", ".join(f"'{language}'" for language in NOTE_LANGUAGES) + ")",
+            name="language",
+        ),
+        # Al borrar el proyecto o la fuente solo se anula su columna, no user_id
+        # (SET NULL con lista de columnas, PostgreSQL >= 15).
+        ForeignKeyConstraint(
+            ["project_id", "user_id"],
+            ["projects.id", "projects.user_id"],
+            ondelete="SET NULL (project_id)",
+        ),
+        ForeignKeyConstraint(
+            ["source_id", "user_id"],
+            ["sources.id", "sources.user_id"],
+            ondelete="SET NULL (source_id)",
+        ),
+    )
 
     # Relaciones
     user: Mapped["UserProfile"] = relationship(back_populates="notes")
-    project: Mapped[Optional["Project"]] = relationship(back_populates="notes")
-    source: Mapped[Optional["Source"]] = relationship(back_populates="notes")
+    # user_id forma parte de las FK compuestas, pero estas relaciones solo escriben
+    # project_id / source_id: user_id lo gestiona la relación `user`.
+    project: Mapped[Optional["Project"]] = relationship(
+        back_populates="notes", foreign_keys=[project_id]
+    )
+    source: Mapped[Optional["Source"]] = relationship(
+        back_populates="notes", foreign_keys=[source_id]
+    )
 
     keywords: Mapped[list["Keyword"]] = relationship(
         secondary=note_keywords_association_table, back_populates="notes"
@@ -264,11 +426,57 @@ class Note(Base):
         return f"<Note(id='{self.id}', title='{self.title}')>"
 
 
+# Índice GIN para las búsquedas full-text (search_vector @@ tsquery).
+Index("ix_notes_search_vector", Note.search_vector, postgresql_using="gin")
+
+# Índice GiST de trigramas (pg_trgm + btree_gist para user_id) para las sugerencias difusas
+# de títulos: filtra por usuario y q <% title y recorre por distancia (ORDER BY q <<-> title),
+# ver repositories/trigram_search.py. El btree ix_notes_title solo sirve igualdad y prefijos.
+Index(
+    "ix_notes_user_id_title_trgm",
+    Note.user_id,
+    Note.title,
+    postgresql_using="gist",
+    postgresql_ops={"title": TRGM_GIST_OPS},
+)
+
+# Índice HNSW (pgvector) para la búsqueda semántica por distancia coseno (embedding <=> q).
+# Los filtros de usuario/proyecto se aplican durante el recorrido del índice gracias a los
+# iterative index scans de pgvector >= 0.8 (ver semantic_search.py).
+Index(
+    "ix_notes_embedding_hnsw",
+    Note.embedding,
+    postgresql_using="hnsw",
+    postgresql_with={"m": 16, "ef_construction": 64},
+    postgresql_ops={"embedding": "vector_cosine_ops"},
+)
+
+# Índice parcial con las notas pendientes de (re)calcular embedding: solo contiene esas filas,
+# así que encontrarlas no recorre la tabla aunque casi todas estén al día.
+Index(
+    "ix_notes_embedding_stale",
+    Note.id,
+    postgresql_where=Note.embedding_content_hash.is_distinct_from(Note.content_hash),
+)
+
+# Índice compuesto para la paginación keyset de notas: sirve tanto el filtro por usuario
+# como el orden (updated_at DESC, id DESC) y la condición (updated_at, id) < (cursor).
+Index(
+    "ix_notes_user_id_updated_at_id",
+    Note.user_id,
+    Note.updated_at.desc(),
+    Note.id.desc(),
+)
+
+
 class Keyword(Base):
     __tablename__ = "keywords"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=generate_uuid
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=generate_uuid,
+        server_default=UUID_SERVER_DEFAULT,
     )
     user_id: Mapped[str] = mapped_column(
         Text, ForeignKey("user_profiles.user_id", ondelete="CASCADE"), nullable=False
@@ -295,23 +503,35 @@ class Keyword(Base):
         return f"<Keyword(id='{self.id}', name='{self.name}')>"
 
 
+# Índice GiST de trigramas para las sugerencias difusas de keywords (como el de títulos).
+Index(
+    "ix_keywords_user_id_name_trgm",
+    Keyword.user_id,
+    Keyword.name,
+    postgresql_using="gist",
+    postgresql_ops={"name": TRGM_GIST_OPS},
+)
+
+
 class NoteLink(Base):
     __tablename__ = "note_links"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=generate_uuid
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=generate_uuid,
+        server_default=UUID_SERVER_DEFAULT,
     )
+    # Indexados con link_type en los índices compuestos definidos tras la clase.
     source_note_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("notes.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     target_note_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("notes.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     link_type: Mapped[str | None] = mapped_column(
         VARCHAR(100), default="related", nullable=True, index=True
@@ -357,3 +577,38 @@ class NoteLink(Base):
             f"<NoteLink(id='{self.id}', source='{self.source_note_id}', "
             f"target='{self.target_note_id}', type='{self.link_type}')>"
         )
+
+
+# Índices compuestos para recorrer el grafo de enlaces en los dos sentidos filtrando por tipo
+# (link_graph.py): cada salto es un Index Scan por (nota, link_type). Sustituyen a los
+# índices simples de source_note_id y target_note_id, que eran su prefijo.
+Index("ix_note_links_source_note_id_link_type", NoteLink.source_note_id, NoteLink.link_type)
+Index("ix_note_links_target_note_id_link_type", NoteLink.target_note_id, NoteLink.link_type)
+
+
+class EmbeddingCache(Base):
+    """
+    Embeddings ya calculados, por modelo y texto. No depende de ninguna nota ni usuario:
+    el mismo texto (notas duplicadas, ediciones revertidas, consultas repetidas) se embebe
+    una sola vez por modelo, aunque se borre la nota que lo originó.
+    """
+
+    __tablename__ = "embedding_cache"
+
+    model: Mapped[str] = mapped_column(VARCHAR(200), primary_key=True)
+    dimensions: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # sha256 del texto normalizado (32 bytes; ver infrastructure/search/embedding_cache.py)
+    text_hash: Mapped[bytes] = mapped_column(BYTEA, primary_key=True)
+    # Sin dimensión fija: cada modelo guarda vectores de su tamaño (comprobado por el CHECK).
+    embedding: Mapped[list[float]] = mapped_column(Vector(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        CheckConstraint("vector_dims(embedding) = dimensions", name="embedding_dimensions"),
+        CheckConstraint("octet_length(text_hash) = 32", name="text_hash_sha256"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<EmbeddingCache(model='{self.model}', dimensions={self.dimensions})>"
@@ -0,0 +1,203 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/query_stats.py
+# ---------------------------------------------------------------------------
+"""
+Instrumentación de consultas por Unidad de Trabajo (o por petición): cuántas sentencias
+se lanzan, cuánto tiempo pasan en la base de datos, cuántas filas devuelven o modifican y
+cuáles son las más lentas, más un detector de N+1.
+
+`instrument_engine` registra los eventos before/after_cursor_execute en un motor
+(EngineRegistry lo hace con todos los que construye). Los eventos apuntan cada sentencia
+en los QueryStats activos en el contexto actual (ContextVar, así que cada tarea de asyncio
+y cada hilo tiene los suyos): la UoW activa uno en __aenter__/__enter__, y `recording()`
+permite abrir otro alrededor de una petición entera. Sin ninguno activo, los eventos solo
+leen la ContextVar.
+
+La "forma" de una sentencia es su SQL compilado con los parámetros sin sustituir, así que
+un mismo SELECT con distintos ids (o con listas IN de distinta longitud) cuenta como la
+misma sentencia. Si una forma se repite más de `repeat_limit` veces en un mismo QueryStats
+se registra un aviso (una vez por forma); en modo estricto (DB_STRICT_QUERY_CHECKS, pensado
+para los tests) se lanza RepeatedStatementError antes de ejecutarla. Los bucles por lotes
+intencionados se marcan con `repeats_expected()`, y las sentencias que van directamente al
+driver (COPY) se registran con `driver_statement()`.
+"""
+
+import heapq
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPEAT_LIMIT = 20
+SLOWEST_KEPT = 5
+
+_active_stats: ContextVar[tuple["QueryStats", ...]] = ContextVar("query_stats", default=())
+_repeats_expected: ContextVar[bool] = ContextVar("query_stats_repeats_expected", default=False)
+
+
+class RepeatedStatementError(RuntimeError):
+    """Una misma sentencia se ha repetido más veces de las permitidas (modo estricto)."""
+
+
+@dataclass(frozen=True)
+class StatementTiming:
+    statement: str
+    seconds: float
+    rows: int
+
+
+@dataclass
+class QueryStats:
+    repeat_limit: int = DEFAULT_REPEAT_LIMIT
+    strict: bool = False
+    statements: int = 0
+    seconds: float = 0.0  # tiempo total en la base de datos
+    rows: int = 0  # filas devueltas (SELECT, RETURNING) o modificadas
+    shapes: Counter[str] = field(default_factory=Counter)
+    # Montículo de mínimos con las SLOWEST_KEPT sentencias más lentas: (segundos, orden, ...).
+    _slowest: list[tuple[float, int, StatementTiming]] = field(default_factory=list, repr=False)
+
+    @property
+    def slowest(self) -> list[StatementTiming]:
+        """Las sentencias más lentas, de más a menos lenta."""
+        return [timing for _, _, timing in sorted(self._slowest, reverse=True)]
+
+    def repeated(self) -> dict[str, int]:
+        """Formas que superan repeat_limit, con su número de ejecuciones."""
+        return {shape: count for shape, count in self.shapes.items() if count > self.repeat_limit}
+
+    def _count(self, shape: str) -> None:
+        self.shapes[shape] += 1
+        count = self.shapes[shape]
+        if count <= self.repeat_limit:
+            return
+        if self.strict:
+            raise RepeatedStatementError(
+                f"La misma sentencia se ha ejecutado {count} veces (límite {self.repeat_limit}); "
+                f"posible N+1: {shape}"
+            )
+        if count == self.repeat_limit + 1:
+            logger.warning(
+                "Posible N+1: la misma sentencia se ha ejecutado más de %d veces: %s",
+                self.repeat_limit,
+                shape,
+            )
+
+    def _record(self, shape: str, seconds: float, rows: int) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        self.rows += rows
+        timing = (seconds, self.statements, StatementTiming(shape, seconds, rows))
+        if len(self._slowest) < SLOWEST_KEPT:
+            heapq.heappush(self._slowest, timing)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, timing)
+
+    def summary(self) -> str:
+        return (
+            f"{self.statements} sentencias, {self.seconds * 1000:.1f} ms en la base de datos, "
+            f"{self.rows} filas"
+        )
+
+
+def start_recording(stats: QueryStats) -> Token[tuple[QueryStats, ...]]:
+    """Activa `stats` en el contexto actual (sin desactivar los que ya lo estuvieran)."""
+    return _active_stats.set((*_active_stats.get(), stats))
+
+
+def stop_recording(token: Token[tuple[QueryStats, ...]]) -> None:
+    _active_stats.reset(token)
+
+
+@contextmanager
+def recording(stats: QueryStats | None = None) -> Iterator[QueryStats]:
+    """Registra en `stats` (o en uno nuevo) las sentencias ejecutadas dentro del bloque."""
+    stats = stats if stats is not None else QueryStats()
+    token = start_recording(stats)
+    try:
+        yield stats
+    finally:
+        stop_recording(token)
+
+
+@contextmanager
+def repeats_expected() -> Iterator[None]:
+    """
+    Dentro del bloque las sentencias se registran pero no cuentan como repeticiones: para
+    bucles por lotes intencionados (create_many), que no son N+1.
+    """
+    token = _repeats_expected.set(True)
+    try:
+        yield
+    finally:
+        _repeats_expected.reset(token)
+
+
+@contextmanager
+def driver_statement(statement: str, rows: int) -> Iterator[None]:
+    """
+    Registra una sentencia lanzada directamente con el driver (COPY de create_many), que no
+    pasa por los eventos de SQLAlchemy.
+    """
+    active = _active_stats.get()
+    if not active:
+        yield
+        return
+    if not _repeats_expected.get():
+        for stats in active:
+            stats._count(statement)
+    started = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - started
+    for stats in active:
+        stats._record(statement, seconds, rows)
+
+
+def _statement_shape(statement: str, context: Any) -> str:
+    compiled = getattr(context, "compiled", None)
+    return compiled.string if compiled is not None else statement
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    active = _active_stats.get()
+    if not active:
+        return
+    shape = _statement_shape(statement, context)
+    if not _repeats_expected.get():
+        for stats in active:
+            stats._count(shape)
+    context._query_stats = (shape, time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    started = getattr(context, "_query_stats", None)
+    if started is None:
+        return
+    shape, start = started
+    seconds = time.perf_counter() - start
+    rows = max(cursor.rowcount, 0)
+    for stats in _active_stats.get():
+        stats._record(shape, seconds, rows)
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    """
+    Registra los eventos de instrumentación en `engine` (para un AsyncEngine, pasar
+    `async_engine.sync_engine`). Es idempotente.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
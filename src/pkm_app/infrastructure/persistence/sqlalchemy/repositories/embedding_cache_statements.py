@@ -0,0 +1,52 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/embedding_cache_statements.py
+# ---------------------------------------------------------------------------
+"""
+Sentencias de la caché persistente de embeddings (tabla `embedding_cache`), usadas por
+infrastructure/search/embedding_cache.py. Leen y escriben un lote de textos por sentencia.
+"""
+
+from collections.abc import Collection, Sequence
+from typing import Any
+
+from sqlalchemy import Select, select
+from sqlalchemy.dialects.postgresql import Insert, insert
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    EmbeddingCache as EmbeddingCacheModel,
+)
+
+
+def cached_embeddings_stmt(
+    model: str, dimensions: int, text_hashes: Collection[bytes]
+) -> Select[Any]:
+    """SELECT `(text_hash, embedding)` de los textos de `text_hashes` ya calculados."""
+    return select(EmbeddingCacheModel.text_hash, EmbeddingCacheModel.embedding).where(
+        EmbeddingCacheModel.model == model,
+        EmbeddingCacheModel.dimensions == dimensions,
+        EmbeddingCacheModel.text_hash.in_(text_hashes),
+    )
+
+
+def store_embeddings_stmt(
+    model: str, dimensions: int, entries: Sequence[tuple[bytes, Sequence[float]]]
+) -> Insert:
+    """
+    INSERT multi-fila de `(text_hash, embedding)`. Si otro proceso guardó el mismo texto
+    entretanto, se conserva su fila (el embedding es el mismo).
+    """
+    return (
+        insert(EmbeddingCacheModel)
+        .values(
+            [
+                {
+                    "model": model,
+                    "dimensions": dimensions,
+                    "text_hash": text_hash,
+                    "embedding": list(embedding),
+                }
+                for text_hash, embedding in entries
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["model", "dimensions", "text_hash"])
+    )
@@ -0,0 +1,142 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/hybrid_search.py
+# ---------------------------------------------------------------------------
+"""
+Búsqueda híbrida: full-text (note_search.py) + vectorial (semantic_search.py) fusionadas con
+reciprocal rank fusion (RRF), en una sola sentencia:
+
+    lexical  -> las N mejores notas por ts_rank_cd (índice GIN) y su posición
+    semantic -> las N más cercanas por distancia coseno (índice HNSW) y su posición
+    fused    -> FULL OUTER JOIN por id; score = Σ 1 / (RRF_K + posición)
+    SELECT   -> notas completas (con keywords, proyecto y fuente por JOIN) ordenadas por score
+
+RRF solo usa posiciones, así que no hay que normalizar ts_rank_cd frente a la similitud
+coseno. Todo se resuelve en un round trip: las keywords se cargan con joinedload en la
+misma consulta (no con selectinload, que lanzaría una segunda).
+
+Opcionalmente, el score se multiplica por `1 + 0.5 ^ (antigüedad / vida media)` según
+`updated_at`: una nota recién editada puntúa el doble que una muy antigua con las mismas
+posiciones.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, Float, Select, extract, false, func, select, type_coerce
+from sqlalchemy.orm import joinedload
+
+from src.pkm_app.core.application.dtos import NoteSearchFilters
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_search import (
+    full_text_match,
+    full_text_rank,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.semantic_search import (
+    check_k,
+    check_query_vector,
+    nearest_notes_subquery,
+    search_filter_criteria,
+)
+
+# Constante de RRF (valor habitual en la literatura): amortigua la ventaja de las primeras
+# posiciones para que una nota bien situada en ambas listas supere a la primera de una sola.
+RRF_K = 60
+# Candidatos que aporta cada búsqueda a la fusión: como mínimo este valor y 2 * k. Más
+# profundidad apenas cambia el top-k fusionado y encarece el recorrido HNSW filtrado.
+HYBRID_CANDIDATE_LIMIT = 20
+
+_SECONDS_PER_DAY = 86400
+
+
+def candidate_depth(k: int) -> int:
+    """Candidatos que aporta cada búsqueda a la fusión para un top-k."""
+    return max(HYBRID_CANDIDATE_LIMIT, 2 * k)
+
+
+def _recency_boost(half_life_days: float) -> ColumnElement[float]:
+    age_seconds = type_coerce(extract("epoch", func.now() - NoteModel.updated_at), Float)
+    return 1 + func.power(0.5, age_seconds / float(half_life_days * _SECONDS_PER_DAY), type_=Float)
+
+
+def _reciprocal_rank(position: ColumnElement[Any]) -> ColumnElement[float]:
+    # Las notas ausentes de una lista no suman nada por ella.
+    return func.coalesce(1.0 / (position + float(RRF_K)), 0.0)
+
+
+def hybrid_search_stmt(
+    user_id: str,
+    query: str,
+    query_vector: Sequence[float],
+    k: int,
+    filters: NoteSearchFilters | None = None,
+    recency_half_life_days: float | None = None,
+) -> Select[Any]:
+    """
+    SELECT `(NoteModel, score, lexical_rank, semantic_rank)` de las k mejores notas según
+    RRF. Las filas se repiten por keyword (joinedload): consumir con `.unique()`.
+    """
+    check_k(k)
+    check_query_vector(query_vector)
+    if recency_half_life_days is not None and recency_half_life_days <= 0:
+        raise ValueError("recency_half_life_days debe ser mayor que 0.")
+
+    depth = candidate_depth(k)
+    criteria = [NoteModel.user_id == user_id, *search_filter_criteria(filters)]
+
+    # Las posiciones se numeran fuera de la subconsulta con LIMIT para no impedir que el
+    # ORDER BY ... LIMIT use el índice (y porque el HNSW puede devolverlas desordenadas).
+    rank = full_text_rank(query).label("rank")
+    lexical_top = (
+        select(NoteModel.id, rank)
+        .where(*criteria, full_text_match(query) if query.strip() else false())
+        .order_by(rank.desc(), NoteModel.id)
+        .limit(depth)
+        .subquery("lexical_top")
+    )
+    lexical = select(
+        lexical_top.c.id,
+        func.row_number()
+        .over(order_by=(lexical_top.c.rank.desc(), lexical_top.c.id))
+        .label("position"),
+    ).cte("lexical")
+
+    semantic_top = nearest_notes_subquery(
+        user_id, query_vector, depth, filters, name="semantic_top"
+    )
+    semantic = select(
+        semantic_top.c.id,
+        func.row_number()
+        .over(order_by=(semantic_top.c.distance, semantic_top.c.id))
+        .label("position"),
+    ).cte("semantic")
+
+    fused = (
+        select(
+            func.coalesce(lexical.c.id, semantic.c.id).label("id"),
+            lexical.c.position.label("lexical_rank"),
+            semantic.c.position.label("semantic_rank"),
+            (_reciprocal_rank(lexical.c.position) + _reciprocal_rank(semantic.c.position)).label(
+                "rrf"
+            ),
+        )
+        .select_from(lexical.join(semantic, lexical.c.id == semantic.c.id, full=True))
+        .cte("fused")
+    )
+
+    score = fused.c.rrf
+    if recency_half_life_days is not None:
+        score = score * _recency_boost(recency_half_life_days)
+    score = score.label("score")
+    return (
+        select(NoteModel, score, fused.c.lexical_rank, fused.c.semantic_rank)
+        .join(fused, NoteModel.id == fused.c.id)
+        .order_by(score.desc(), NoteModel.id)
+        .limit(k)
+        .options(
+            joinedload(NoteModel.keywords),
+            joinedload(NoteModel.project),
+            joinedload(NoteModel.source),
+        )
+    )
@@ -0,0 +1,65 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/keyword_statements.py
+# ---------------------------------------------------------------------------
+"""
+Sentencias compartidas por los repositorios síncrono y asíncrono para resolver
+nombres de keywords a filas de `keywords` en bloque (en lugar de un SELECT por nombre).
+"""
+
+import uuid
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import Select, Text, any_, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, Insert, insert
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Keyword as KeywordModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import generate_uuid
+
+
+def normalize_keyword_names(keyword_names: Iterable[str]) -> list[str]:
+    """
+    Elimina duplicados y nombres vacíos.
+    El orden es determinista para que escritores concurrentes bloqueen las filas
+    de `uq_keywords_user_id_name` en el mismo orden y no se produzcan deadlocks.
+    """
+    return sorted({name for name in keyword_names if name.strip()})
+
+
+def insert_missing_keyword_ids_stmt(user_id: str, names: list[str]) -> Insert:
+    """
+    INSERT ... ON CONFLICT DO NOTHING ... RETURNING `(id, name)` de todos los nombres en una
+    sola sentencia. Los nombres viajan como dos arrays (`unnest`), de modo que el número de
+    parámetros no crece con el lote. Solo devuelve las keywords creadas por esta sentencia;
+    las que ya existían (o que otra transacción acaba de confirmar) se recuperan con
+    `select_keyword_ids_stmt`.
+    """
+    rows = select(
+        func.unnest(literal([generate_uuid() for _ in names], ARRAY(UUID(as_uuid=True)))),
+        literal(user_id, Text),
+        func.unnest(literal(names, ARRAY(Text))),
+    )
+    return (
+        insert(KeywordModel)
+        .from_select(["id", "user_id", "name"], rows)
+        .on_conflict_do_nothing(constraint="uq_keywords_user_id_name")
+        .returning(KeywordModel.id, KeywordModel.name)
+    )
+
+
+def select_keyword_ids_stmt(user_id: str, names: list[str]) -> Select[tuple[uuid.UUID, str]]:
+    """SELECT `(id, name)` de keywords existentes, con los nombres en un único parámetro array."""
+    return select(KeywordModel.id, KeywordModel.name).where(
+        KeywordModel.user_id == user_id, KeywordModel.name == any_(literal(names, ARRAY(Text)))
+    )
+
+
+def missing_keyword_names(names: list[str], resolved: Iterable[Any]) -> list[str]:
+    """
+    Nombres que no han sido devueltos por el INSERT y hay que buscar.
+    'resolved' son filas `(id, name)` (o cualquier objeto con `name`).
+    """
+    resolved_names = {keyword.name for keyword in resolved}
+    return [name for name in names if name not in resolved_names]
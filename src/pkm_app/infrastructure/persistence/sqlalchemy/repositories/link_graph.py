@@ -0,0 +1,364 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/link_graph.py
+# ---------------------------------------------------------------------------
+"""
+Consultas sobre el grafo de enlaces entre notas (note_links), compartidas por los
+repositorios síncrono y asíncrono. Cada una es una sola sentencia, sea cual sea el
+tamaño del grafo.
+
+Los recorridos son un CTE recursivo `walk(note_id, depth, path, link_ids)` en anchura:
+
+- la fila inicial es la nota de partida (solo si es del usuario);
+- cada iteración sigue, desde las notas del nivel anterior, los enlaces del usuario en el
+  sentido pedido (LATERAL sobre ix_note_links_source/target_note_id_link_type), como mucho
+  `max_fanout` por nota (los más recientes) y sin volver a notas del propio camino;
+- DISTINCT ON (note_id) deja una sola fila por nota en cada nivel, así que cada nivel
+  tiene como mucho tantas filas como notas y el recorrido no crece con el número de
+  caminos.
+
+PostgreSQL produce las filas de un CTE recursivo nivel a nivel y solo calcula las que pide
+la consulta externa: en el camino más corto, `LIMIT 1` sobre la nota destino se queda con
+la primera aparición (la de menos saltos) y deja de recorrer el grafo.
+
+También están aquí la creación y el borrado de enlaces y la lectura de todas las aristas
+del usuario con la que se carga el índice en memoria (infrastructure/graph).
+"""
+
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import (
+    CTE,
+    ColumnElement,
+    Delete,
+    Insert,
+    Integer,
+    Row,
+    Select,
+    Text,
+    any_,
+    delete,
+    exists,
+    func,
+    literal,
+    literal_column,
+    not_,
+    select,
+    true,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSON, UUID, aggregate_order_by, array, insert
+
+try:  # SQLAlchemy >= 2.1; en 2.0, DISTINCT ON se genera con Select.distinct(columna).
+    from sqlalchemy.dialects.postgresql import distinct_on
+except ImportError:  # pragma: no cover
+    distinct_on = None
+
+from src.pkm_app.core.application.dtos import (
+    NoteGraphNode,
+    NoteLinkCreate,
+    NoteLinkSchema,
+    NoteNeighborhood,
+    NotePath,
+)
+from src.pkm_app.core.application.dtos.note_link_dto import MAX_GRAPH_DEPTH, LinkDirection
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    NoteLink as NoteLinkModel,
+)
+
+_LINK_FIELDS = (
+    "id",
+    "source_note_id",
+    "target_note_id",
+    "link_type",
+    "description",
+    "user_id",
+    "created_at",
+)
+_UUID_ARRAY = ARRAY(UUID(as_uuid=True))
+
+
+def check_graph_limits(depth: int, max_fanout: int = 1, max_nodes: int = 1) -> None:
+    """Lanza ValueError si algún límite del recorrido no es válido."""
+    if not 1 <= depth <= MAX_GRAPH_DEPTH:
+        raise ValueError(f"La profundidad debe estar entre 1 y {MAX_GRAPH_DEPTH}.")
+    if max_fanout < 1:
+        raise ValueError("max_fanout debe ser mayor que 0.")
+    if max_nodes < 1:
+        raise ValueError("max_nodes debe ser mayor que 0.")
+
+
+def _link_criteria(user_id: str, link_types: Sequence[str] | None) -> list[ColumnElement[bool]]:
+    """Enlaces del usuario y, si se indican (lista no vacía), de esos tipos."""
+    criteria = [NoteLinkModel.user_id == user_id]
+    if link_types:
+        criteria.append(NoteLinkModel.link_type == any_(literal(list(link_types), ARRAY(Text))))
+    return criteria
+
+
+def backlinks_stmt(
+    note_id: uuid.UUID, user_id: str, link_types: Sequence[str] | None, limit: int
+) -> Select[Any]:
+    """Enlaces que apuntan a la nota, los más recientes primero."""
+    return (
+        select(*(getattr(NoteLinkModel, field) for field in _LINK_FIELDS))
+        .where(NoteLinkModel.target_note_id == note_id, *_link_criteria(user_id, link_types))
+        .order_by(NoteLinkModel.created_at.desc(), NoteLinkModel.id)
+        .limit(limit)
+    )
+
+
+def _walk_cte(
+    root_id: uuid.UUID,
+    user_id: str,
+    max_depth: int,
+    link_types: Sequence[str] | None,
+    direction: LinkDirection,
+    max_fanout: int | None,
+) -> CTE:
+    """CTE recursivo del recorrido en anchura desde `root_id` (ver el docstring del módulo)."""
+    root = (
+        select(
+            NoteModel.id.label("note_id"),
+            literal(0, Integer).label("depth"),
+            array([NoteModel.id]).label("path"),
+            literal_column("ARRAY[]::uuid[]", _UUID_ARRAY).label("link_ids"),
+        )
+        .where(NoteModel.id == root_id, NoteModel.user_id == user_id)
+        .cte("walk", recursive=True)
+    )
+    previous = root.alias("previous")
+    criteria = _link_criteria(user_id, link_types)
+    # Enlaces que salen de cada nota del nivel anterior, con la nota a la que llevan.
+    steps = []
+    if direction in ("outgoing", "both"):
+        steps.append(
+            select(
+                NoteLinkModel.target_note_id.label("neighbor_id"),
+                NoteLinkModel.id.label("link_id"),
+                NoteLinkModel.created_at,
+            )
+            .where(
+                NoteLinkModel.source_note_id == previous.c.note_id,
+                not_(NoteLinkModel.target_note_id == any_(previous.c.path)),
+                *criteria,
+            )
+            .correlate(previous)
+        )
+    if direction in ("incoming", "both"):
+        steps.append(
+            select(
+                NoteLinkModel.source_note_id.label("neighbor_id"),
+                NoteLinkModel.id.label("link_id"),
+                NoteLinkModel.created_at,
+            )
+            .where(
+                NoteLinkModel.target_note_id == previous.c.note_id,
+                not_(NoteLinkModel.source_note_id == any_(previous.c.path)),
+                *criteria,
+            )
+            .correlate(previous)
+        )
+    links = steps[0].subquery() if len(steps) == 1 else union_all(*steps).subquery()
+    step = select(links.c.neighbor_id, links.c.link_id)
+    if max_fanout is not None:
+        step = step.order_by(links.c.created_at.desc(), links.c.link_id).limit(max_fanout)
+    step = step.lateral("step")
+    level = (
+        select(
+            step.c.neighbor_id,
+            previous.c.depth + 1,
+            func.array_append(previous.c.path, step.c.neighbor_id, type_=_UUID_ARRAY),
+            func.array_append(previous.c.link_ids, step.c.link_id, type_=_UUID_ARRAY),
+        )
+        .select_from(previous)
+        .join(step, true())
+        .where(previous.c.depth < max_depth)
+    )
+    if distinct_on is not None:
+        level = level.ext(distinct_on(step.c.neighbor_id))
+    else:  # pragma: no cover
+        level = level.distinct(step.c.neighbor_id)
+    return root.union_all(level)
+
+
+def _links_json(links: Any) -> ColumnElement[Any]:
+    """Enlaces (columnas de `links`) como array JSON (`[]` si no hay), por fecha."""
+    link = func.json_build_object(
+        *(item for field in _LINK_FIELDS for item in (field, links.c[field]))
+    )
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(link, links.c.created_at, links.c.id)),
+        literal_column("'[]'::json"),
+        type_=JSON,
+    )
+
+
+def neighborhood_stmt(
+    note_id: uuid.UUID,
+    user_id: str,
+    depth: int,
+    link_types: Sequence[str] | None,
+    direction: LinkDirection,
+    max_fanout: int,
+    max_nodes: int,
+) -> Select[Any]:
+    """
+    Una fila por nota alcanzada (la de partida primero): id, título, tipo, saltos y sus
+    enlaces salientes hacia otras notas alcanzadas (columna JSON `links`).
+    """
+    walk = _walk_cte(note_id, user_id, depth, link_types, direction, max_fanout)
+    nodes = (
+        select(walk.c.note_id, func.min(walk.c.depth).label("depth"))
+        .group_by(walk.c.note_id)
+        .order_by(func.min(walk.c.depth), walk.c.note_id)
+        .limit(max_nodes)
+        .cte("nodes")
+    )
+    targets = nodes.alias("targets")
+    links = (
+        select(_links_json(NoteLinkModel.__table__))
+        .join(targets, targets.c.note_id == NoteLinkModel.target_note_id)
+        .where(
+            NoteLinkModel.source_note_id == nodes.c.note_id,
+            *_link_criteria(user_id, link_types),
+        )
+        .scalar_subquery()
+    )
+    return (
+        select(
+            nodes.c.note_id,
+            nodes.c.depth,
+            NoteModel.title,
+            NoteModel.type,
+            links.label("links"),
+        )
+        .join_from(nodes, NoteModel, NoteModel.id == nodes.c.note_id)
+        .order_by(nodes.c.depth, nodes.c.note_id)
+    )
+
+
+def shortest_path_stmt(
+    source_note_id: uuid.UUID,
+    target_note_id: uuid.UUID,
+    user_id: str,
+    link_types: Sequence[str] | None,
+    direction: LinkDirection,
+    max_depth: int,
+) -> Select[Any]:
+    """
+    Una fila por enlace del camino más corto, en orden, con las notas del camino (`path`);
+    una sola fila sin enlace si origen y destino coinciden, y ninguna si no hay camino.
+    Sin límite de enlaces por nota: limitarlos podría esconder el camino más corto.
+    """
+    walk = _walk_cte(source_note_id, user_id, max_depth, link_types, direction, None)
+    # Sin ORDER BY: el primer resultado es el de menos saltos (ver el docstring del módulo).
+    found = (
+        select(walk.c.path, walk.c.link_ids)
+        .where(walk.c.note_id == target_note_id)
+        .limit(1)
+        .cte("found")
+    )
+    step = (
+        func.unnest(found.c.link_ids)
+        .table_valued("link_id", with_ordinality="position")
+        .render_derived()
+        .lateral("step")
+    )
+    return (
+        select(found.c.path, *(getattr(NoteLinkModel, field) for field in _LINK_FIELDS))
+        .select_from(found)
+        .outerjoin(step, true())
+        .outerjoin(NoteLinkModel, NoteLinkModel.id == step.c.link_id)
+        .order_by(step.c.position)
+    )
+
+
+def link_edges_stmt(user_id: str) -> Select[Any]:
+    """id, nota de origen y nota de destino de todos los enlaces del usuario."""
+    return select(
+        NoteLinkModel.id, NoteLinkModel.source_note_id, NoteLinkModel.target_note_id
+    ).where(NoteLinkModel.user_id == user_id)
+
+
+def _owned_note(note_id: uuid.UUID, user_id: str) -> ColumnElement[bool]:
+    return exists().where(NoteModel.id == note_id, NoteModel.user_id == user_id)
+
+
+def create_link_stmt(link_id: uuid.UUID, user_id: str, link: NoteLinkCreate) -> Insert:
+    """
+    INSERT ... RETURNING del enlace, solo si las dos notas son del usuario; sin filas si
+    alguna no lo es o el enlace ya existe (ver `link_rejection_stmt`).
+    """
+    row = {"id": link_id, "user_id": user_id, **link.model_dump()}
+    values = select(
+        *(literal(value, NoteLinkModel.__table__.c[name].type) for name, value in row.items())
+    ).where(_owned_note(link.source_note_id, user_id), _owned_note(link.target_note_id, user_id))
+    return (
+        insert(NoteLinkModel)
+        .from_select(list(row), values)
+        .on_conflict_do_nothing(constraint="uq_note_links_source_target_user_type")
+        .returning(*(getattr(NoteLinkModel, field) for field in _LINK_FIELDS))
+    )
+
+
+def link_rejection_stmt(user_id: str, link: NoteLinkCreate) -> Select[Any]:
+    """Diagnóstico de `create_link_stmt` sin filas: si cada nota es del usuario."""
+    return select(
+        _owned_note(link.source_note_id, user_id).label("source"),
+        _owned_note(link.target_note_id, user_id).label("target"),
+    )
+
+
+def raise_for_rejected_link(link: NoteLinkCreate, rejection: Row[Any]) -> None:
+    if not rejection.source:
+        raise ValueError(f"Nota con id {link.source_note_id} no encontrada para el usuario.")
+    if not rejection.target:
+        raise ValueError(f"Nota con id {link.target_note_id} no encontrada para el usuario.")
+    raise ValueError("Ya existe un enlace de ese tipo entre las dos notas.")
+
+
+def delete_link_stmt(link_id: uuid.UUID, user_id: str) -> Delete:
+    """DELETE ... RETURNING id del enlace del usuario."""
+    return (
+        delete(NoteLinkModel)
+        .where(NoteLinkModel.id == link_id, NoteLinkModel.user_id == user_id)
+        .returning(NoteLinkModel.id)
+    )
+
+
+def _link_from_mapping(mapping: Any) -> NoteLinkSchema:
+    return NoteLinkSchema.model_validate({field: mapping[field] for field in _LINK_FIELDS})
+
+
+def links_from_rows(rows: Sequence[Row[Any]]) -> list[NoteLinkSchema]:
+    """NoteLinkSchema de las filas de `backlinks_stmt`."""
+    return [_link_from_mapping(row._mapping) for row in rows]
+
+
+def neighborhood_from_rows(note_id: uuid.UUID, rows: Sequence[Row[Any]]) -> NoteNeighborhood | None:
+    """NoteNeighborhood de las filas de `neighborhood_stmt`; None si no hay (nota ajena)."""
+    if not rows:
+        return None
+    return NoteNeighborhood(
+        root_id=note_id,
+        nodes=[
+            NoteGraphNode(id=row.note_id, title=row.title, type=row.type, depth=row.depth)
+            for row in rows
+        ],
+        links=[NoteLinkSchema.model_validate(link) for row in rows for link in row.links],
+    )
+
+
+def path_from_rows(rows: Sequence[Row[Any]]) -> NotePath | None:
+    """NotePath de las filas de `shortest_path_stmt`; None si no hay camino."""
+    if not rows:
+        return None
+    return NotePath(
+        note_ids=rows[0].path,
+        links=[_link_from_mapping(row._mapping) for row in rows if row.id is not None],
+    )
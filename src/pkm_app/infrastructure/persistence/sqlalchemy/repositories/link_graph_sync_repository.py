@@ -0,0 +1,113 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/link_graph_sync_repository.py
+# ---------------------------------------------------------------------------
+import uuid
+from collections.abc import Sequence
+
+from sqlalchemy.orm import Session
+
+from src.pkm_app.core.application.dtos import (
+    NoteLinkCreate,
+    NoteLinkSchema,
+    NoteNeighborhood,
+    NotePath,
+)
+from src.pkm_app.core.application.dtos.note_link_dto import (
+    DEFAULT_GRAPH_DEPTH,
+    DEFAULT_GRAPH_FANOUT,
+    DEFAULT_GRAPH_MAX_NODES,
+    MAX_GRAPH_DEPTH,
+    LinkDirection,
+)
+from src.pkm_app.core.application.interfaces.link_graph_sync_interface import (
+    ISyncLinkGraphRepository,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import generate_uuid
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.link_graph import (
+    backlinks_stmt,
+    check_graph_limits,
+    create_link_stmt,
+    delete_link_stmt,
+    link_rejection_stmt,
+    links_from_rows,
+    neighborhood_from_rows,
+    neighborhood_stmt,
+    path_from_rows,
+    raise_for_rejected_link,
+    shortest_path_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.write_tracking import (
+    LinkChange,
+    TouchedEntities,
+)
+
+
+class SyncSQLAlchemyLinkGraphRepository(ISyncLinkGraphRepository):
+    def __init__(self, session: Session, touched: TouchedEntities | None = None):
+        self.session = session
+        # Enlaces creados y borrados; la UoW comparte el registro del repositorio de notas.
+        self.touched = touched if touched is not None else TouchedEntities()
+
+    def create_link(self, link_in: NoteLinkCreate, user_id: str) -> NoteLinkSchema:
+        if link_in.source_note_id == link_in.target_note_id:
+            raise ValueError("Un enlace no puede unir una nota consigo misma.")
+        row = self.session.execute(create_link_stmt(generate_uuid(), user_id, link_in)).first()
+        if row is None:
+            rejection = self.session.execute(link_rejection_stmt(user_id, link_in)).one()
+            raise_for_rejected_link(link_in, rejection)
+        link = links_from_rows([row])[0]
+        self.touched.add_link_change(
+            LinkChange(user_id, link.id, link.source_note_id, link.target_note_id)
+        )
+        return link
+
+    def delete_link(self, link_id: uuid.UUID, user_id: str) -> bool:
+        deleted = self.session.execute(delete_link_stmt(link_id, user_id)).first()
+        if deleted is None:
+            return False
+        self.touched.add_link_change(LinkChange(user_id, link_id))
+        return True
+
+    def get_backlinks(
+        self,
+        note_id: uuid.UUID,
+        user_id: str,
+        link_types: Sequence[str] | None = None,
+        limit: int = 100,
+    ) -> list[NoteLinkSchema]:
+        result = self.session.execute(backlinks_stmt(note_id, user_id, link_types, limit))
+        return links_from_rows(result.all())
+
+    def get_neighborhood(
+        self,
+        note_id: uuid.UUID,
+        user_id: str,
+        depth: int = DEFAULT_GRAPH_DEPTH,
+        link_types: Sequence[str] | None = None,
+        direction: LinkDirection = "both",
+        max_fanout: int = DEFAULT_GRAPH_FANOUT,
+        max_nodes: int = DEFAULT_GRAPH_MAX_NODES,
+    ) -> NoteNeighborhood | None:
+        check_graph_limits(depth, max_fanout, max_nodes)
+        # Recorrido, notas y enlaces en una sola consulta (ver link_graph.py).
+        result = self.session.execute(
+            neighborhood_stmt(note_id, user_id, depth, link_types, direction, max_fanout, max_nodes)
+        )
+        return neighborhood_from_rows(note_id, result.all())
+
+    def find_shortest_path(
+        self,
+        source_note_id: uuid.UUID,
+        target_note_id: uuid.UUID,
+        user_id: str,
+        link_types: Sequence[str] | None = None,
+        direction: LinkDirection = "both",
+        max_depth: int = MAX_GRAPH_DEPTH,
+    ) -> NotePath | None:
+        check_graph_limits(max_depth)
+        result = self.session.execute(
+            shortest_path_stmt(
+                source_note_id, target_note_id, user_id, link_types, direction, max_depth
+            )
+        )
+        return path_from_rows(result.all())
@@ -3,17 +3,31 @@
 # ---------------------------------------------------------------------------
 
 import uuid
-from collections.abc import Sequence
-from typing import Optional
+from collections.abc import Iterable, Sequence
+from typing import Any, Optional
 
 from sqlalchemy import delete as sqlalchemy_delete
-from sqlalchemy import or_, select, true
+from sqlalchemy import Row, Select, or_, true
 from sqlalchemy import update as sqlalchemy_update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, selectinload
 
 # Esquemas Pydantic
-from src.pkm_app.core.application.dtos import NoteCreate, NoteSchema, NoteUpdate
+from src.pkm_app.core.application.dtos import (
+    KeywordMatch,
+    KeywordSchema,
+    NoteCreate,
+    NoteHybridSearchResult,
+    NotePage,
+    NoteQuery,
+    NoteSchema,
+    NoteSearchFilters,
+    NoteSearchResult,
+    NoteSummarySchema,
+    NoteTitleMatch,
+    NoteUpdate,
+)
+from src.pkm_app.core.application.dtos.note_dto import DEFAULT_SNIPPET_LENGTH
+from src.pkm_app.core.application.dtos.search_dto import KeywordMatchMode
 
 # Interfaz del Repositorio
 from src.pkm_app.core.application.interfaces.note_async_interface import INoteRepository
@@ -26,218 +40,391 @@ from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
     Note as NoteModel,
 )
 from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
-    Project as ProjectModel,  # Necesario para validar/asignar project_id
+    UserProfile as UserProfileModel,  # Necesario si se valida existencia de user_id
 )
-from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
-    Source as SourceModel,  # Necesario para validar/asignar source_id
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import generate_uuid
+from src.pkm_app.infrastructure.persistence.sqlalchemy.metrics import instrument_repository
+from src.pkm_app.infrastructure.persistence.sqlalchemy.query_stats import (
+    driver_statement,
+    repeats_expected,
 )
-from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
-    UserProfile as UserProfileModel,  # Necesario si se valida existencia de user_id
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.hybrid_search import (
+    candidate_depth,
+    hybrid_search_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.keyword_statements import (
+    insert_missing_keyword_ids_stmt,
+    missing_keyword_names,
+    normalize_keyword_names,
+    select_keyword_ids_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_bulk_ingest import (
+    DEFAULT_BULK_BATCH_SIZE,
+    NOTE_COPY_COLUMNS,
+    NOTE_KEYWORD_COPY_COLUMNS,
+    PreparedNoteBatch,
+    copy_sql,
+    ensure_references_owned,
+    iter_note_batches,
+    note_keyword_records,
+    owned_project_ids_stmt,
+    owned_source_ids_stmt,
+    prepare_note_batch,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_embeddings import (
+    EMBEDDING_SOURCE_FIELDS,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_language import (
+    LANGUAGE_SOURCE_FIELDS,
+    language_from_update,
+    resolve_note_language,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_pagination import (
+    paginate_notes_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_projection import (
+    note_columns_stmt,
+    note_from_row,
+    notes_from_rows,
+    projected_notes_stmt,
+    projected_summaries_stmt,
+    summaries_from_rows,
+    summary_columns_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_query import (
+    keyword_search_stmt,
+    note_page_from_rows,
+    note_query_params,
+    note_query_shape,
+    note_query_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_search import (
+    full_text_match,
+    ranked_full_text_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_writes import (
+    create_note_stmt,
+    delete_note_stmt,
+    language_sources_stmt,
+    link_keywords_stmt,
+    raise_for_rejected_write,
+    update_note_stmt,
+    with_linked_keywords,
+    write_rejection_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.project_tree import (
+    project_notes_filter,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.semantic_search import (
+    ef_search_stmt,
+    semantic_search_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.trigram_search import (
+    DEFAULT_SIMILARITY_THRESHOLD,
+    MIN_FUZZY_QUERY_LENGTH,
+    fuzzy_keyword_stmt,
+    fuzzy_title_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.write_tracking import (
+    KEYWORD_ENTITY,
+    NOTE_ENTITY,
+    LinkChange,
+    TouchedEntities,
 )
 
 
+@instrument_repository
 class AsyncSQLAlchemyNoteRepository(INoteRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
-
-    async def _get_note_instance(self, note_id: uuid.UUID, user_id: str) -> NoteModel | None:
-        """Método helper para obtener una instancia de NoteModel."""
-        stmt = (
-            select(NoteModel)
-            .where(NoteModel.id == note_id, NoteModel.user_id == user_id)
-            .options(
-                selectinload(NoteModel.keywords),  # Carga ansiosa de keywords
-                joinedload(NoteModel.project),  # Carga ansiosa del proyecto (si existe)
-                joinedload(NoteModel.source),  # Carga ansiosa de la fuente (si existe)
-            )
-        )
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
-
-    async def _manage_keywords(
-        self, note_instance: NoteModel, keyword_names: list[str] | None, user_id: str
-    ) -> None:
-        """Método helper para gestionar los keywords de una nota."""
-        if keyword_names is None:  # Si es None, no se hace nada con los keywords
-            return
-
-        # Eliminar keywords actuales de la nota para luego añadir los nuevos
-        note_instance.keywords.clear()
-
-        if not keyword_names:  # Si la lista está vacía, se eliminan todos los keywords
-            return
-
-        final_keywords: list[KeywordModel] = []
-        for name in set(keyword_names):  # Usar set para evitar duplicados en la entrada
-            if not name.strip():  # Omitir keywords vacíos
-                continue
-
-            # Buscar si el keyword ya existe para este usuario
-            stmt_keyword = select(KeywordModel).where(
-                KeywordModel.user_id == user_id, KeywordModel.name == name
-            )
-            result_keyword = await self.session.execute(stmt_keyword)
-            keyword_instance = result_keyword.scalar_one_or_none()
-
-            if not keyword_instance:
-                # Crear keyword si no existe
-                keyword_instance = KeywordModel(user_id=user_id, name=name)
-                self.session.add(keyword_instance)
-            final_keywords.append(keyword_instance)
-
-        note_instance.keywords.extend(final_keywords)
+        # Notas creadas o con título/contenido modificado en esta sesión: la UoW las pasa al
+        # pipeline de embeddings tras un commit correcto.
+        self.changed_note_ids: set[uuid.UUID] = set()
+        # Notas y keywords escritas en la transacción: la UoW publica su invalidación.
+        self.touched = TouchedEntities()
 
     async def get_by_id(self, note_id: uuid.UUID, user_id: str) -> NoteSchema | None:
-        note_instance = await self._get_note_instance(note_id, user_id)
-        if note_instance:
-            return NoteSchema.model_validate(note_instance)
-        return None
-
-    async def list_by_user(self, user_id: str, skip: int = 0, limit: int = 100) -> list[NoteSchema]:
-        stmt = (
-            select(NoteModel)
-            .where(NoteModel.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .order_by(NoteModel.updated_at.desc())  # Ejemplo de ordenación
-            .options(
-                selectinload(NoteModel.keywords),  # Carga ansiosa de keywords
-                joinedload(NoteModel.project),  # Carga ansiosa del proyecto (si existe)
-                # joinedload(NoteModel.source)    # Decidir si cargar source aquí o bajo demanda
-            )
-        )
-        result = await self.session.execute(stmt)
-        notes_orm = result.scalars().all()
-        return [NoteSchema.model_validate(note) for note in notes_orm]
+        stmt = note_columns_stmt(NoteModel.id == note_id, NoteModel.user_id == user_id)
+        row = (await self.session.execute(projected_notes_stmt(stmt))).one_or_none()
+        return note_from_row(row) if row is not None else None
+
+    async def _finish_write(
+        self, row: Row[Any], user_id: str, keyword_names: list[str] | None
+    ) -> NoteSchema:
+        """DTO de la fila escrita; enlaza las keywords que la sentencia no vio (ver note_writes)."""
+        note = note_from_row(row)
+        self.touched.add(KEYWORD_ENTITY, user_id, row.inserted_keyword_ids or ())
+        missing = missing_keyword_names(keyword_names or [], note.keywords)
+        if missing:
+            linked = await self.session.execute(link_keywords_stmt(note.id, user_id, missing))
+            note = with_linked_keywords(note, linked.all())
+        self.touched.add(NOTE_ENTITY, user_id, [note.id])
+        return note
+
+    async def list_by_user(
+        self, user_id: str, skip: int = 0, limit: int = 100, cursor: str | None = None
+    ) -> list[NoteSchema]:
+        stmt = note_columns_stmt(NoteModel.user_id == user_id)
+        stmt = paginate_notes_stmt(stmt, skip=skip, limit=limit, cursor=cursor)
+        result = await self.session.execute(projected_notes_stmt(stmt))
+        return notes_from_rows(result.all())
 
     async def create(self, note_in: NoteCreate, user_id: str) -> NoteSchema:
-        # Validar existencia de project_id y source_id si se proporcionan
-        if note_in.project_id:
-            project_stmt = select(ProjectModel.id).where(
-                ProjectModel.id == note_in.project_id, ProjectModel.user_id == user_id
-            )
-            project_exists = await self.session.execute(project_stmt)
-            if not project_exists.scalar_one_or_none():
-                raise ValueError(
-                    f"Proyecto con id {note_in.project_id} no encontrado para el usuario."
-                )
-
-        if note_in.source_id:
-            source_stmt = select(SourceModel.id).where(
-                SourceModel.id == note_in.source_id, SourceModel.user_id == user_id
-            )
-            source_exists = await self.session.execute(source_stmt)
-            if not source_exists.scalar_one_or_none():
-                raise ValueError(
-                    f"Fuente con id {note_in.source_id} no encontrada para el usuario."
-                )
-
-        # Crear la instancia del modelo NoteModel
-        db_note_data = note_in.model_dump(
-            exclude_unset=True, exclude={"keywords"}
-        )  # Excluir keywords del dump inicial
-
-        note_instance = NoteModel(**db_note_data, user_id=user_id)
-
-        # Gestionar keywords
-        await self._manage_keywords(note_instance, note_in.keywords, user_id)
-
-        self.session.add(note_instance)
-        await self.session.flush()  # Para obtener el ID y otros defaults de la BD antes de refresh
-        await self.session.refresh(
-            note_instance, attribute_names=["id", "created_at", "updated_at"]
-        )  # Refrescar solo campos necesarios
-        await self.session.refresh(
-            note_instance, attribute_names=["keywords", "project", "source"]
-        )  # Refrescar relaciones
-
-        return NoteSchema.model_validate(note_instance)
+        values = note_in.model_dump(exclude_unset=True, exclude={"keywords"})
+        values["language"] = resolve_note_language(
+            note_in.title, note_in.content, values.get("note_metadata")
+        )
+        names = normalize_keyword_names(note_in.keywords or [])
+        # Nota, keywords y enlaces en una sola sentencia (ver note_writes.py).
+        result = await self.session.execute(
+            create_note_stmt(generate_uuid(), user_id, values, names)
+        )
+        row = result.one_or_none()
+        if row is None:
+            rejection = (await self.session.execute(write_rejection_stmt(user_id, values))).one()
+            raise_for_rejected_write(values, rejection)
+            raise RuntimeError("La nota no se pudo crear.")
+
+        note = await self._finish_write(row, user_id, names)
+        self.changed_note_ids.add(note.id)
+        return note
+
+    async def _resolve_keyword_ids(self, names: list[str], user_id: str) -> dict[str, uuid.UUID]:
+        """Crea las keywords que faltan de un lote y devuelve `{nombre: id}` de todas."""
+        if not names:
+            return {}
+        inserted = (
+            await self.session.execute(insert_missing_keyword_ids_stmt(user_id, names))
+        ).all()
+        keyword_ids = {row.name: row.id for row in inserted}
+        self.touched.add(KEYWORD_ENTITY, user_id, keyword_ids.values())
+        missing = missing_keyword_names(names, inserted)
+        if missing:
+            existing = await self.session.execute(select_keyword_ids_stmt(user_id, missing))
+            keyword_ids.update({row.name: row.id for row in existing})
+        return keyword_ids
+
+    async def _check_batch_references(self, batch: PreparedNoteBatch, user_id: str) -> None:
+        found_projects: Sequence[uuid.UUID] = []
+        found_sources: Sequence[uuid.UUID] = []
+        if batch.project_ids:
+            found_projects = (
+                await self.session.scalars(owned_project_ids_stmt(user_id, batch.project_ids))
+            ).all()
+        if batch.source_ids:
+            found_sources = (
+                await self.session.scalars(owned_source_ids_stmt(user_id, batch.source_ids))
+            ).all()
+        ensure_references_owned(batch, found_projects, found_sources)
+
+    async def create_many(
+        self,
+        notes_in: Iterable[NoteCreate],
+        user_id: str,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+    ) -> list[uuid.UUID]:
+        # Lo pendiente en la sesión (ej. un proyecto recién creado) debe existir antes del COPY.
+        await self.session.flush()
+        connection = await self.session.connection()
+        # Conexión asyncpg de la transacción actual de la sesión
+        raw_connection = (await connection.get_raw_connection()).driver_connection
+
+        created_ids: list[uuid.UUID] = []
+        with repeats_expected():  # Mismas sentencias en cada lote: no es un N+1
+            for notes_batch in iter_note_batches(notes_in, batch_size):
+                batch = prepare_note_batch(notes_batch, user_id)
+                await self._check_batch_references(batch, user_id)
+                with driver_statement(
+                    copy_sql("notes", NOTE_COPY_COLUMNS), len(batch.note_records)
+                ):
+                    await raw_connection.copy_records_to_table(
+                        "notes", records=batch.note_records, columns=NOTE_COPY_COLUMNS
+                    )
+                keyword_ids = await self._resolve_keyword_ids(batch.keyword_names, user_id)
+                link_records = note_keyword_records(batch, keyword_ids)
+                if link_records:
+                    with driver_statement(
+                        copy_sql("note_keywords", NOTE_KEYWORD_COPY_COLUMNS), len(link_records)
+                    ):
+                        await raw_connection.copy_records_to_table(
+                            "note_keywords",
+                            records=link_records,
+                            columns=NOTE_KEYWORD_COPY_COLUMNS,
+                        )
+                created_ids.extend(batch.note_ids)
+        self.changed_note_ids.update(created_ids)
+        self.touched.add(NOTE_ENTITY, user_id, created_ids)
+        return created_ids
 
     async def update(
         self, note_id: uuid.UUID, note_in: NoteUpdate, user_id: str
     ) -> NoteSchema | None:
-        note_instance = await self._get_note_instance(note_id, user_id)
-        if not note_instance:
-            return None
-
         update_data = note_in.model_dump(exclude_unset=True, exclude={"keywords"})
-        for field, value in update_data.items():
-            # Validar project_id y source_id si se están actualizando
-            if field == "project_id" and value is not None:
-                project_stmt = select(ProjectModel.id).where(
-                    ProjectModel.id == value, ProjectModel.user_id == user_id
-                )
-                project_exists = await self.session.execute(project_stmt)
-                if not project_exists.scalar_one_or_none():
-                    raise ValueError(f"Proyecto con id {value} no encontrado para el usuario.")
-            elif field == "source_id" and value is not None:
-                source_stmt = select(SourceModel.id).where(
-                    SourceModel.id == value, SourceModel.user_id == user_id
+        # Chequeo explícito de None: una lista vacía elimina todas las keywords.
+        names = normalize_keyword_names(note_in.keywords) if note_in.keywords is not None else None
+        if not update_data and names is None:
+            return await self.get_by_id(note_id, user_id)
+
+        values = dict(update_data)
+        # El idioma decide con qué configuración se indexa la nota: se recalcula si cambia
+        # el texto o la metadata (que puede fijarlo explícitamente). Solo se lee la nota
+        # cuando la edición no basta para decidirlo.
+        if LANGUAGE_SOURCE_FIELDS.intersection(update_data):
+            language = language_from_update(update_data)
+            if language is None:
+                current = (
+                    await self.session.execute(language_sources_stmt(note_id, user_id))
+                ).one_or_none()
+                if current is None:
+                    return None
+                merged = {**current._asdict(), **update_data}
+                language = resolve_note_language(
+                    merged["title"], merged["content"], merged["note_metadata"]
                 )
-                source_exists = await self.session.execute(source_stmt)
-                if not source_exists.scalar_one_or_none():
-                    raise ValueError(f"Fuente con id {value} no encontrada para el usuario.")
-            setattr(note_instance, field, value)
-
-        # Gestionar keywords si se proporcionan en la actualización
-        if note_in.keywords is not None:  # Chequeo explícito de None para permitir lista vacía
-            await self._manage_keywords(note_instance, note_in.keywords, user_id)
-
-        self.session.add(note_instance)  # SQLAlchemy rastrea los cambios
-        await self.session.flush()
-        await self.session.refresh(
-            note_instance, attribute_names=["updated_at"]
-        )  # Refrescar campos afectados
-        await self.session.refresh(
-            note_instance, attribute_names=["keywords", "project", "source"]
-        )  # Refrescar relaciones
-
-        return NoteSchema.model_validate(note_instance)
+            values["language"] = language
+
+        result = await self.session.execute(update_note_stmt(note_id, user_id, values, names))
+        row = result.one_or_none()
+        if row is None:
+            rejection = (
+                await self.session.execute(write_rejection_stmt(user_id, values, note_id))
+            ).one()
+            if not rejection.note:
+                return None
+            raise_for_rejected_write(values, rejection)
+            raise RuntimeError(f"La nota {note_id} no se pudo actualizar.")
+
+        note = await self._finish_write(row, user_id, names)
+        if EMBEDDING_SOURCE_FIELDS.intersection(update_data):
+            self.changed_note_ids.add(note_id)
+        return note
 
     async def delete(self, note_id: uuid.UUID, user_id: str) -> bool:
-        note_instance = await self._get_note_instance(note_id, user_id)
-        if note_instance:
-            await self.session.delete(note_instance)
-            await self.session.flush()
-            return True
-        return False
+        deleted = (await self.session.execute(delete_note_stmt(note_id, user_id))).first()
+        if deleted is None:
+            return False
+        self.touched.add(NOTE_ENTITY, user_id, [note_id])
+        for link_id in deleted.dropped_link_ids or ():
+            self.touched.add_link_change(LinkChange(user_id, link_id))
+        return True
 
     async def search_by_title_or_content(
-        self, user_id: str, query: str, skip: int = 0, limit: int = 20
+        self,
+        user_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
     ) -> list[NoteSchema]:
-        search_term = f"%{query}%"
-        stmt = (
-            select(NoteModel)
-            .where(
-                NoteModel.user_id == user_id,
-                or_(
-                    NoteModel.title.ilike(search_term),  # Búsqueda case-insensitive
-                    NoteModel.content.ilike(search_term),
-                ),
-            )
-            .offset(skip)
-            .limit(limit)
-            .order_by(NoteModel.updated_at.desc())
-            .options(selectinload(NoteModel.keywords))  # Cargar keywords
-        )
+        if not query.strip():
+            return []
+        # Búsqueda por términos sobre el índice GIN de search_vector (antes ILIKE '%q%').
+        stmt = note_columns_stmt(NoteModel.user_id == user_id, full_text_match(query))
+        stmt = paginate_notes_stmt(stmt, skip=skip, limit=limit, cursor=cursor)
+        result = await self.session.execute(projected_notes_stmt(stmt))
+        return notes_from_rows(result.all())
+
+    async def search_full_text(
+        self, user_id: str, query: str, skip: int = 0, limit: int = 20
+    ) -> list[NoteSearchResult]:
+        if not query.strip():
+            return []
+        result = await self.session.execute(ranked_full_text_stmt(user_id, query, skip, limit))
+        return [
+            NoteSearchResult(note=NoteSchema.model_validate(note), score=score)
+            for note, score in result.all()
+        ]
+
+    async def search_titles_fuzzy(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 10,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ) -> list[NoteTitleMatch]:
+        query = query.strip()
+        if len(query) < MIN_FUZZY_QUERY_LENGTH:
+            return []
+        stmt = fuzzy_title_stmt(user_id, query, limit, threshold)
+        rows = (await self.session.execute(stmt)).all()
+        return [NoteTitleMatch(id=row.id, title=row.title, score=row.score) for row in rows]
+
+    async def search_keywords_fuzzy(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 10,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ) -> list[KeywordMatch]:
+        query = query.strip()
+        if len(query) < MIN_FUZZY_QUERY_LENGTH:
+            return []
+        stmt = fuzzy_keyword_stmt(user_id, query, limit, threshold)
+        rows = (await self.session.execute(stmt)).all()
+        return [
+            KeywordMatch(keyword=KeywordSchema.model_validate(keyword), score=score)
+            for keyword, score in rows
+        ]
+
+    async def _widen_ef_search(self, candidates: int) -> None:
+        # Un round trip más solo si la búsqueda pide más candidatos que la conexión.
+        stmt = ef_search_stmt(candidates)
+        if stmt is not None:
+            await self.session.execute(stmt)
+
+    async def search_semantic(
+        self,
+        user_id: str,
+        query_vector: Sequence[float],
+        k: int = 10,
+        filters: NoteSearchFilters | None = None,
+    ) -> list[NoteSearchResult]:
+        stmt = semantic_search_stmt(user_id, query_vector, k, filters)
+        await self._widen_ef_search(k)
         result = await self.session.execute(stmt)
-        notes_orm = result.scalars().all()
-        return [NoteSchema.model_validate(note) for note in notes_orm]
+        return [
+            NoteSearchResult(note=NoteSchema.model_validate(note), score=score)
+            for note, score in result.all()
+        ]
+
+    async def search_hybrid(
+        self,
+        user_id: str,
+        query: str,
+        query_vector: Sequence[float],
+        k: int = 10,
+        filters: NoteSearchFilters | None = None,
+        recency_half_life_days: float | None = None,
+    ) -> list[NoteHybridSearchResult]:
+        stmt = hybrid_search_stmt(user_id, query, query_vector, k, filters, recency_half_life_days)
+        await self._widen_ef_search(candidate_depth(k))
+        result = await self.session.execute(stmt)
+        return [
+            NoteHybridSearchResult(
+                note=NoteSchema.model_validate(note),
+                score=score,
+                lexical_rank=lexical_rank,
+                semantic_rank=semantic_rank,
+            )
+            for note, score, lexical_rank, semantic_rank in result.unique().all()
+        ]
 
     async def search_by_project(
-        self, project_id: uuid.UUID, user_id: str, skip: int = 0, limit: int = 20
+        self,
+        project_id: uuid.UUID,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        include_subprojects: bool = False,
     ) -> list[NoteSchema]:
-        stmt = (
-            select(NoteModel)
-            .where(NoteModel.user_id == user_id, NoteModel.project_id == project_id)
-            .offset(skip)
-            .limit(limit)
-            .order_by(NoteModel.updated_at.desc())
-            .options(selectinload(NoteModel.keywords))  # Cargar keywords
+        stmt = note_columns_stmt(
+            NoteModel.user_id == user_id,
+            project_notes_filter(user_id, project_id, include_subprojects),
         )
-        result = await self.session.execute(stmt)
-        notes_orm = result.scalars().all()
-        return [NoteSchema.model_validate(note) for note in notes_orm]
+        stmt = paginate_notes_stmt(stmt, skip=skip, limit=limit, cursor=cursor)
+        result = await self.session.execute(projected_notes_stmt(stmt))
+        return notes_from_rows(result.all())
 
     async def search_by_keyword_name(
         self,
@@ -246,6 +433,7 @@ class AsyncSQLAlchemyNoteRepository(INoteRepository):
         user_id: str,
         skip: int = 0,
         limit: int = 20,
+        cursor: str | None = None,
     ) -> list[NoteSchema]:
         if not keyword_name.strip():
             return []  # Si el keyword está vacío, retornar lista vacía
@@ -257,45 +445,98 @@ class AsyncSQLAlchemyNoteRepository(INoteRepository):
         if project_id is not None:
             filters.append(NoteModel.project_id == project_id)
 
-        stmt = (
-            select(NoteModel)
-            .join(NoteModel.keywords)  # Hacer join con la tabla de keywords
-            .where(*filters)
-            .offset(skip)
-            .limit(limit)
-            .order_by(NoteModel.updated_at.desc())
-            .options(selectinload(NoteModel.keywords))  # Cargar keywords
-        )
-        result = await self.session.execute(stmt)
-        notes_orm = result.scalars().all()
-        return [NoteSchema.model_validate(note) for note in notes_orm]
+        # Join con keywords solo para filtrar; las de cada nota las agrega la proyección.
+        stmt = note_columns_stmt(*filters).join(NoteModel.keywords)
+        stmt = paginate_notes_stmt(stmt, skip=skip, limit=limit, cursor=cursor)
+        result = await self.session.execute(projected_notes_stmt(stmt))
+        return notes_from_rows(result.all())
 
     async def search_by_keyword_names(
         self,
         keyword_names: list[str],
-        project_id: uuid.UUID,
+        project_id: uuid.UUID | None,
         user_id: str,
         skip: int = 0,
         limit: int = 20,
+        cursor: str | None = None,
+        match: KeywordMatchMode = "any",
     ) -> list[NoteSchema]:
-        if not keyword_names:
-            return []  # Si no hay keywords, retornar lista vacía
-
-        filters = [
+        # Semi-join con las keywords: cada nota una sola vez, sin gastar huecos del LIMIT.
+        stmt = keyword_search_stmt(user_id, keyword_names, match, project_id)
+        if stmt is None:
+            return []
+        stmt = paginate_notes_stmt(stmt, skip=skip, limit=limit, cursor=cursor)
+        result = await self.session.execute(projected_notes_stmt(stmt))
+        return notes_from_rows(result.all())
+
+    async def query_notes(self, user_id: str, query: NoteQuery) -> NotePage:
+        # Una sentencia por forma de consulta, construida una vez (ver note_query.py).
+        stmt = note_query_stmt(note_query_shape(query))
+        result = await self.session.execute(stmt, note_query_params(user_id, query))
+        return note_page_from_rows(result.all(), query)
+
+    async def _summary_page(
+        self, stmt: Select[Any], skip: int, limit: int, cursor: str | None, snippet_length: int
+    ) -> list[NoteSummarySchema]:
+        stmt = paginate_notes_stmt(stmt, skip=skip, limit=limit, cursor=cursor)
+        result = await self.session.execute(projected_summaries_stmt(stmt, snippet_length))
+        return summaries_from_rows(result.all(), snippet_length)
+
+    async def list_summaries_by_user(
+        self,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        stmt = summary_columns_stmt(NoteModel.user_id == user_id)
+        return await self._summary_page(stmt, skip, limit, cursor, snippet_length)
+
+    async def search_summaries_by_title_or_content(
+        self,
+        user_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        if not query.strip():
+            return []
+        stmt = summary_columns_stmt(NoteModel.user_id == user_id, full_text_match(query))
+        return await self._summary_page(stmt, skip, limit, cursor, snippet_length)
+
+    async def search_summaries_by_project(
+        self,
+        project_id: uuid.UUID,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+        include_subprojects: bool = False,
+    ) -> list[NoteSummarySchema]:
+        stmt = summary_columns_stmt(
             NoteModel.user_id == user_id,
-            KeywordModel.name.in_(keyword_names),
-            NoteModel.project_id == project_id,  # project_id ya no es opcional
-        ]
-
-        stmt = (
-            select(NoteModel)
-            .join(NoteModel.keywords)  # Hacer join con la tabla de keywords
-            .where(*filters)
-            .offset(skip)
-            .limit(limit)
-            .order_by(NoteModel.updated_at.desc())
-            .options(selectinload(NoteModel.keywords))  # Cargar keywords
+            project_notes_filter(user_id, project_id, include_subprojects),
         )
-        result = await self.session.execute(stmt)
-        notes_orm = result.scalars().all()
-        return [NoteSchema.model_validate(note) for note in notes_orm]
+        return await self._summary_page(stmt, skip, limit, cursor, snippet_length)
+
+    async def search_summaries_by_keyword_name(
+        self,
+        keyword_name: str,
+        project_id: uuid.UUID | None,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        snippet_length: int = DEFAULT_SNIPPET_LENGTH,
+    ) -> list[NoteSummarySchema]:
+        if not keyword_name.strip():
+            return []
+        filters = [NoteModel.user_id == user_id, KeywordModel.name == keyword_name]
+        if project_id is not None:
+            filters.append(NoteModel.project_id == project_id)
+        stmt = summary_columns_stmt(*filters).join(NoteModel.keywords)
+        return await self._summary_page(stmt, skip, limit, cursor, snippet_length)
@@ -0,0 +1,191 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/note_bulk_ingest.py
+# ---------------------------------------------------------------------------
+"""
+Preparación de lotes para la ingesta masiva de notas con COPY.
+
+La lógica es independiente del driver: los repositorios asíncrono (asyncpg,
+`copy_records_to_table`) y síncrono (psycopg2, `copy_expert`) solo cambian la forma
+de enviar los registros que se construyen aquí.
+"""
+
+import io
+import json
+import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any
+
+from sqlalchemy import Select, select
+
+from src.pkm_app.core.application.dtos import NoteCreate
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Project as ProjectModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Source as SourceModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import generate_uuid
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.keyword_statements import (
+    normalize_keyword_names,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_language import (
+    resolve_note_language,
+)
+
+DEFAULT_BULK_BATCH_SIZE = 1000
+
+# created_at/updated_at no se envían: COPY aplica los server_default (now()) de la tabla.
+NOTE_COPY_COLUMNS = (
+    "id",
+    "user_id",
+    "project_id",
+    "source_id",
+    "title",
+    "content",
+    "type",
+    "note_metadata",
+    "language",
+)
+NOTE_KEYWORD_COPY_COLUMNS = ("note_id", "keyword_id")
+
+
+@dataclass(frozen=True)
+class PreparedNoteBatch:
+    """Registros listos para COPY de un lote de `NoteCreate`."""
+
+    note_ids: list[uuid.UUID]
+    note_records: list[tuple[Any, ...]]
+    keyword_names_by_note: list[list[str]]
+    project_ids: set[uuid.UUID]
+    source_ids: set[uuid.UUID]
+
+    @property
+    def keyword_names(self) -> list[str]:
+        """Nombres de keywords distintos de todo el lote."""
+        return normalize_keyword_names(
+            name for names in self.keyword_names_by_note for name in names
+        )
+
+
+def iter_note_batches(
+    notes_in: Iterable[NoteCreate], batch_size: int = DEFAULT_BULK_BATCH_SIZE
+) -> Iterator[list[NoteCreate]]:
+    """Divide un iterable (posiblemente un generador) de notas en lotes de `batch_size`."""
+    if batch_size < 1:
+        raise ValueError("batch_size debe ser mayor que 0.")
+    iterator = iter(notes_in)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def prepare_note_batch(notes_in: list[NoteCreate], user_id: str) -> PreparedNoteBatch:
+    """Genera los ids en Python y construye los registros en el orden de `NOTE_COPY_COLUMNS`."""
+    note_ids: list[uuid.UUID] = []
+    note_records: list[tuple[Any, ...]] = []
+    keyword_names_by_note: list[list[str]] = []
+    project_ids: set[uuid.UUID] = set()
+    source_ids: set[uuid.UUID] = set()
+
+    for note_in in notes_in:
+        # Mismo criterio que create() (model_dump(exclude_unset=True)): la metadata por defecto
+        # no se envía a la BD. Se leen los atributos directamente porque model_dump()
+        # por nota domina el coste en Python de la ingesta.
+        metadata = note_in.note_metadata if "note_metadata" in note_in.model_fields_set else None
+        note_id = generate_uuid()
+        note_ids.append(note_id)
+        note_records.append(
+            (
+                note_id,
+                user_id,
+                note_in.project_id,
+                note_in.source_id,
+                note_in.title,
+                note_in.content,
+                note_in.type,
+                json.dumps(metadata) if metadata is not None else None,
+                resolve_note_language(note_in.title, note_in.content, metadata),
+            )
+        )
+        keyword_names_by_note.append(normalize_keyword_names(note_in.keywords or []))
+        if note_in.project_id:
+            project_ids.add(note_in.project_id)
+        if note_in.source_id:
+            source_ids.add(note_in.source_id)
+
+    return PreparedNoteBatch(
+        note_ids=note_ids,
+        note_records=note_records,
+        keyword_names_by_note=keyword_names_by_note,
+        project_ids=project_ids,
+        source_ids=source_ids,
+    )
+
+
+def note_keyword_records(
+    batch: PreparedNoteBatch, keyword_ids: dict[str, uuid.UUID]
+) -> list[tuple[uuid.UUID, uuid.UUID]]:
+    """Registros `(note_id, keyword_id)` para la tabla de asociación."""
+    return [
+        (note_id, keyword_ids[name])
+        for note_id, names in zip(batch.note_ids, batch.keyword_names_by_note, strict=True)
+        for name in names
+    ]
+
+
+def owned_project_ids_stmt(user_id: str, project_ids: set[uuid.UUID]) -> Select[tuple[uuid.UUID]]:
+    return select(ProjectModel.id).where(
+        ProjectModel.user_id == user_id, ProjectModel.id.in_(project_ids)
+    )
+
+
+def owned_source_ids_stmt(user_id: str, source_ids: set[uuid.UUID]) -> Select[tuple[uuid.UUID]]:
+    return select(SourceModel.id).where(
+        SourceModel.user_id == user_id, SourceModel.id.in_(source_ids)
+    )
+
+
+def ensure_references_owned(
+    batch: PreparedNoteBatch,
+    found_project_ids: Iterable[uuid.UUID],
+    found_source_ids: Iterable[uuid.UUID],
+) -> None:
+    """Lanza ValueError (igual que create()) si algún proyecto o fuente no es del usuario."""
+    missing_projects = batch.project_ids - set(found_project_ids)
+    if missing_projects:
+        raise ValueError(
+            f"Proyecto con id {sorted(missing_projects)[0]} no encontrado para el usuario."
+        )
+    missing_sources = batch.source_ids - set(found_source_ids)
+    if missing_sources:
+        raise ValueError(
+            f"Fuente con id {sorted(missing_sources)[0]} no encontrada para el usuario."
+        )
+
+
+def copy_sql(table_name: str, columns: tuple[str, ...]) -> str:
+    """Sentencia COPY ... FROM STDIN en formato texto (usada con psycopg2)."""
+    return f"COPY {table_name} ({', '.join(columns)}) FROM STDIN"
+
+
+def _copy_text_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_text_buffer(records: Iterable[tuple[Any, ...]]) -> io.StringIO:
+    """Serializa los registros al formato de texto de COPY (tabuladores, `\\N` para NULL)."""
+    buffer = io.StringIO()
+    for record in records:
+        buffer.write("\t".join(_copy_text_value(value) for value in record))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
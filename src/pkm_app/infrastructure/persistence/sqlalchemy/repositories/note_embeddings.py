@@ -0,0 +1,85 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/note_embeddings.py
+# ---------------------------------------------------------------------------
+"""
+Sentencias del pipeline de embeddings (infrastructure/search/embedding_pipeline.py).
+
+Cada nota tiene `content_hash` (columna generada: md5 de título + contenido) y
+`embedding_content_hash` (el content_hash con el que se calculó su embedding). Una nota
+necesita (re)calcular el embedding cuando ambos difieren; el índice parcial
+`ix_notes_embedding_stale` contiene exactamente esas notas.
+
+La escritura solo aplica el vector si el content_hash sigue siendo el leído: si la nota se
+editó mientras se calculaba, la fila no se toca y la edición vuelve a encolarla.
+"""
+
+import uuid
+from collections.abc import Collection
+from typing import Any
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Select, Text, Update, bindparam, select, update
+from sqlalchemy.dialects.postgresql import UUID
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import EMBEDDING_DIMENSIONS
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+
+# Campos de NoteUpdate que cambian el texto embebido (y por tanto content_hash).
+EMBEDDING_SOURCE_FIELDS = frozenset({"title", "content"})
+
+
+def embedding_text(title: str | None, content: str) -> str:
+    """Texto que se envía al modelo: el mismo que resume NOTE_CONTENT_HASH_SQL."""
+    return f"{title or ''}\n\n{content}"
+
+
+def notes_for_embedding_stmt(note_ids: Collection[uuid.UUID]) -> Select[Any]:
+    """SELECT `(id, title, content, content_hash, embedding_content_hash)` de `note_ids`."""
+    return select(
+        NoteModel.id,
+        NoteModel.title,
+        NoteModel.content,
+        NoteModel.content_hash,
+        NoteModel.embedding_content_hash,
+    ).where(NoteModel.id.in_(note_ids))
+
+
+def stale_embedding_ids_stmt(after_id: uuid.UUID | None, limit: int) -> Select[Any]:
+    """
+    Ids de las notas con embedding ausente o desactualizado, por orden de id y a partir de
+    `after_id` (keyset), servidos por el índice parcial `ix_notes_embedding_stale`.
+    """
+    stmt = (
+        select(NoteModel.id)
+        .where(NoteModel.embedding_content_hash.is_distinct_from(NoteModel.content_hash))
+        .order_by(NoteModel.id)
+        .limit(limit)
+    )
+    if after_id is not None:
+        stmt = stmt.where(NoteModel.id > after_id)
+    return stmt
+
+
+def write_embeddings_stmt() -> Update:
+    """
+    UPDATE para executemany con parámetros `{note_id, hash, vector}`, con
+    `hash` = content_hash leído junto al texto embebido.
+    Es una sentencia Core sobre la tabla: no carga las notas en la sesión y todas las filas
+    del lote viajan en una sola llamada (executemany por lotes del driver).
+    `updated_at` se conserva: calcular el embedding no es una edición de la nota.
+    """
+    notes = NoteModel.__table__
+    return (
+        update(notes)
+        .where(
+            notes.c.id == bindparam("note_id", type_=UUID(as_uuid=True)),
+            notes.c.content_hash == bindparam("hash", type_=Text),
+        )
+        .values(
+            embedding=bindparam("vector", type_=Vector(EMBEDDING_DIMENSIONS)),
+            embedding_content_hash=bindparam("hash", type_=Text),
+            updated_at=notes.c.updated_at,
+        )
+    )
@@ -0,0 +1,112 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/note_language.py
+# ---------------------------------------------------------------------------
+"""
+Resolución del idioma de una nota (`notes.language`) al escribirla.
+
+Orden de prioridad:
+1. `note_metadata["language"]` si el usuario lo indica ("es", "es-ES", "spanish", "inglés"...).
+   Un idioma explícito sin configuración propia se indexa como 'simple' (sin stemming).
+2. Detección ligera por palabras vacías frecuentes de cada idioma sobre título y contenido.
+3. `DEFAULT_NOTE_LANGUAGE` si el texto no da ninguna señal.
+"""
+
+import re
+from collections.abc import Mapping
+from typing import Any
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    DEFAULT_NOTE_LANGUAGE,
+    NOTE_LANGUAGES,
+)
+
+LANGUAGE_METADATA_KEY = "language"
+# Campos de NoteUpdate que obligan a recalcular el idioma de una nota existente.
+LANGUAGE_SOURCE_FIELDS = frozenset({"title", "content", "note_metadata"})
+
+# Solo se analiza el comienzo de notas muy largas: basta para decidir y acota el coste.
+_DETECTION_SAMPLE_CHARS = 4000
+
+_LANGUAGE_ALIASES = {
+    "es": "es",
+    "spa": "es",
+    "spanish": "es",
+    "español": "es",
+    "espanol": "es",
+    "castellano": "es",
+    "en": "en",
+    "eng": "en",
+    "english": "en",
+    "inglés": "en",
+    "ingles": "en",
+    "simple": "simple",
+}
+
+# Palabras vacías muy frecuentes y exclusivas de cada idioma (se omiten las ambiguas
+# como "a", "no" o "me").
+_SPANISH_MARKERS = frozenset(
+    "el la los las de del que y en un una unos unas por para con sin se su sus es son "
+    "está están este esta estos estas pero como más muy también cuando donde porque "
+    "hay ser sobre entre hasta desde al lo le les ya o u".split()
+)
+_ENGLISH_MARKERS = frozenset(
+    "the of and to in is are was were be been this that these those with without for "
+    "from by on at it its as but or not have has had will would can could should which "
+    "what when where there their they you we".split()
+)
+_SPANISH_CHARACTERS = frozenset("ñáéíóúü¿¡")
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+
+def normalize_language(value: Any) -> str | None:
+    """
+    Código de idioma soportado para un valor de metadata, o None si no hay valor usable.
+    Acepta códigos con región ("es-ES", "en_US") y nombres en español o inglés.
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    code = value.strip().lower().replace("_", "-")
+    language = _LANGUAGE_ALIASES.get(code) or _LANGUAGE_ALIASES.get(code.split("-", 1)[0])
+    return language if language in NOTE_LANGUAGES else "simple"
+
+
+def detect_language(text: str) -> str:
+    """Idioma más probable del texto ('es' o 'en'); `DEFAULT_NOTE_LANGUAGE` si no hay señal."""
+    sample = text[:_DETECTION_SAMPLE_CHARS].lower()
+    words = _WORD_PATTERN.findall(sample)
+    spanish_score = sum(word in _SPANISH_MARKERS for word in words)
+    spanish_score += sum(char in _SPANISH_CHARACTERS for char in sample)
+    english_score = sum(word in _ENGLISH_MARKERS for word in words)
+    if english_score > spanish_score:
+        return "en"
+    if spanish_score > english_score:
+        return "es"
+    return DEFAULT_NOTE_LANGUAGE
+
+
+def resolve_note_language(
+    title: str | None, content: str | None, note_metadata: Mapping[str, Any] | None
+) -> str:
+    """Idioma con el que se indexará la nota (ver prioridades en el docstring del módulo)."""
+    if note_metadata:
+        explicit = normalize_language(note_metadata.get(LANGUAGE_METADATA_KEY))
+        if explicit is not None:
+            return explicit
+    return detect_language(f"{title or ''}\n{content or ''}")
+
+
+def language_from_update(update_data: Mapping[str, Any]) -> str | None:
+    """
+    Idioma de una nota tras aplicar `update_data` (campos de NoteUpdate) cuando no depende
+    de sus valores actuales: la actualización trae un idioma explícito en la metadata o los
+    tres campos de LANGUAGE_SOURCE_FIELDS. None si hay que leer la nota para decidirlo.
+    """
+    if LANGUAGE_SOURCE_FIELDS <= update_data.keys():
+        return resolve_note_language(
+            update_data["title"], update_data["content"], update_data["note_metadata"]
+        )
+    note_metadata = update_data.get("note_metadata")
+    if note_metadata:
+        return normalize_language(note_metadata.get(LANGUAGE_METADATA_KEY))
+    return None
@@ -0,0 +1,36 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/note_pagination.py
+# ---------------------------------------------------------------------------
+"""
+Paginación por cursor (keyset) compartida por los repositorios de notas.
+
+El orden `(updated_at DESC, id DESC)` coincide con el índice
+`ix_notes_user_id_updated_at_id`, de modo que la página N cuesta lo mismo que la página 1
+(no hay OFFSET que recorrer) y editar una nota no desplaza las páginas siguientes.
+"""
+
+from typing import Any
+
+from sqlalchemy import Select, tuple_
+
+from src.pkm_app.core.application.dtos import NoteCursor
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+
+
+def paginate_notes_stmt(
+    stmt: Select[Any], *, skip: int, limit: int, cursor: str | None
+) -> Select[Any]:
+    """
+    Ordena y limita una consulta de notas.
+    Con `cursor` se continúa justo después de la última nota de la página anterior;
+    sin él se mantiene el comportamiento OFFSET/LIMIT (`skip`).
+    """
+    stmt = stmt.order_by(NoteModel.updated_at.desc(), NoteModel.id.desc()).limit(limit)
+    if cursor is None:
+        return stmt.offset(skip)
+    position = NoteCursor.decode(cursor)
+    return stmt.where(
+        tuple_(NoteModel.updated_at, NoteModel.id) < tuple_(position.updated_at, position.id)
+    )
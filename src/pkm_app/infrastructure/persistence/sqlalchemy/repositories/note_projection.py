@@ -0,0 +1,248 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/note_projection.py
+# ---------------------------------------------------------------------------
+"""
+Lectura rápida de listados de notas: SELECT Core de columnas explícitas, sin pasar por el
+ORM, mapeado directamente a `NoteSchema`.
+
+Con `select(NoteModel)` cada fila se hidrata como objeto ORM (identity map, estado de
+instancia, relaciones), las keywords llegan en una segunda consulta (selectinload) y
+después `NoteSchema.model_validate(note)` lee atributo a atributo con `from_attributes`.
+Aquí, en una sola consulta:
+
+- la página de notas (filtrada, ordenada y limitada) en una subconsulta,
+- proyecto y fuente con LEFT JOIN, y
+- las keywords agregadas con `json_agg`, ordenadas por nombre (por la clave primaria de
+  note_keywords).
+
+Cada fila se convierte en un dict y se valida de una vez en pydantic-core, que también
+interpreta los ids y fechas de las keywords que llegan como texto JSON.
+
+Los resúmenes (NoteSummarySchema) no leen `content`: solo `substr(content, 1, n + 1)`.
+Con `substr`, PostgreSQL extrae un trozo de un valor TOAST sin leer ni descomprimir el
+resto (`left` y `length` sí lo leen entero). El carácter extra indica si hay más texto.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, FromClause, Row, Select, Text, func, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY, JSON, aggregate_order_by
+
+from src.pkm_app.core.application.dtos import NoteSchema, NoteSummarySchema
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Keyword as KeywordModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Project as ProjectModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Source as SourceModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    note_keywords_association_table as note_keywords,
+)
+
+_NOTE_FIELDS = (
+    "id",
+    "user_id",
+    "title",
+    "content",
+    "type",
+    "note_metadata",
+    "project_id",
+    "source_id",
+    "language",
+    "created_at",
+    "updated_at",
+)
+_PROJECT_FIELDS = (
+    "id",
+    "user_id",
+    "name",
+    "description",
+    "parent_project_id",
+    "created_at",
+    "updated_at",
+)
+_SOURCE_FIELDS = (
+    "id",
+    "user_id",
+    "type",
+    "title",
+    "description",
+    "url",
+    "link_metadata",
+    "created_at",
+    "updated_at",
+)
+# Posición de cada bloque en las filas de note_row_stmt. Después de las keywords puede haber
+# columnas propias de cada sentencia.
+_PROJECT_OFFSET = len(_NOTE_FIELDS)
+_SOURCE_OFFSET = _PROJECT_OFFSET + len(_PROJECT_FIELDS)
+_KEYWORDS_INDEX = _SOURCE_OFFSET + len(_SOURCE_FIELDS)
+_SUMMARY_FIELDS = (
+    "id",
+    "user_id",
+    "title",
+    "type",
+    "project_id",
+    "language",
+    "created_at",
+    "updated_at",
+)
+
+
+def note_columns_stmt(*criteria: ColumnElement[bool]) -> Select[Any]:
+    """
+    SELECT de las columnas de notas que cumplen `criteria`, para ordenar y paginar con
+    `paginate_notes_stmt` antes de pasarlo a `projected_notes_stmt`.
+    """
+    return select(*(getattr(NoteModel, field) for field in _NOTE_FIELDS)).where(*criteria)
+
+
+def keywords_json_aggregate(
+    keyword_id: ColumnElement[Any],
+    name: ColumnElement[Any],
+    user_id: ColumnElement[Any],
+    created_at: ColumnElement[Any],
+) -> ColumnElement[Any]:
+    """Agregado de keywords como array JSON (`[]` si no hay filas), ordenado por nombre."""
+    keyword = func.json_build_object(
+        "id", keyword_id, "name", name, "user_id", user_id, "created_at", created_at
+    )
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(keyword, name)),
+        literal_column("'[]'::json"),
+        type_=JSON,
+    )
+
+
+def _keywords_json_column(note_id: ColumnElement[Any]) -> ColumnElement[Any]:
+    """Keywords de la nota como array JSON (`[]` si no tiene), ordenadas por nombre."""
+    return (
+        select(
+            keywords_json_aggregate(
+                KeywordModel.id, KeywordModel.name, KeywordModel.user_id, KeywordModel.created_at
+            )
+        )
+        .select_from(
+            note_keywords.join(KeywordModel, KeywordModel.id == note_keywords.c.keyword_id)
+        )
+        .where(note_keywords.c.note_id == note_id)
+        .scalar_subquery()
+    )
+
+
+def note_row_stmt(notes: FromClause, keywords: ColumnElement[Any] | None = None) -> Select[Any]:
+    """
+    Columnas de nota, proyecto, fuente y keywords sobre `notes`, una subconsulta o CTE con
+    las columnas de `note_columns_stmt` (también el RETURNING de note_writes.py).
+    `keywords` sustituye a la subconsulta de keywords por nota si ya se conocen.
+    """
+    if keywords is None:
+        keywords = _keywords_json_column(notes.c.id)
+    return (
+        select(
+            *(notes.c[field] for field in _NOTE_FIELDS),
+            *(getattr(ProjectModel, field).label(f"project__{field}") for field in _PROJECT_FIELDS),
+            *(getattr(SourceModel, field).label(f"source__{field}") for field in _SOURCE_FIELDS),
+            keywords.label("keywords"),
+        )
+        .select_from(notes)
+        .outerjoin(ProjectModel, ProjectModel.id == notes.c.project_id)
+        .outerjoin(SourceModel, SourceModel.id == notes.c.source_id)
+    )
+
+
+def projected_notes_stmt(page: Select[Any]) -> Select[Any]:
+    """
+    Completa una página de `note_columns_stmt` (ya filtrada, ordenada y limitada) con
+    proyecto, fuente y keywords, en el mismo orden.
+
+    La página va en una subconsulta para que los JOIN y la agregación de keywords solo se
+    calculen para sus filas: sobre la consulta sin anidar, PostgreSQL evalúa la subconsulta
+    de keywords también para las filas que descarta OFFSET.
+    """
+    notes = page.subquery("page")
+    return note_row_stmt(notes).order_by(notes.c.updated_at.desc(), notes.c.id.desc())
+
+
+def summary_columns_stmt(*criteria: ColumnElement[bool]) -> Select[Any]:
+    """Como `note_columns_stmt` para resúmenes: sin `content` ni `note_metadata`."""
+    return select(*(getattr(NoteModel, field) for field in _SUMMARY_FIELDS)).where(*criteria)
+
+
+def _keyword_names_column(note_id: ColumnElement[Any]) -> ColumnElement[Any]:
+    """Nombres de las keywords de la nota, ordenados (`{}` si no tiene)."""
+    return (
+        select(
+            func.coalesce(
+                func.array_agg(aggregate_order_by(KeywordModel.name, KeywordModel.name)),
+                literal_column("'{}'::varchar[]"),
+                type_=ARRAY(Text),
+            )
+        )
+        .select_from(
+            note_keywords.join(KeywordModel, KeywordModel.id == note_keywords.c.keyword_id)
+        )
+        .where(note_keywords.c.note_id == note_id)
+        .scalar_subquery()
+        .label("keywords")
+    )
+
+
+def projected_summaries_stmt(page: Select[Any], snippet_length: int) -> Select[Any]:
+    """
+    Completa una página de `summary_columns_stmt` con los primeros `snippet_length + 1`
+    caracteres del contenido (columna `head`) y los nombres de sus keywords.
+
+    El trozo de contenido se lee aquí, uniendo notes por clave primaria, y no dentro de la
+    página: así solo se extrae para las notas de la página y no para todas las candidatas
+    que ordena el LIMIT.
+    """
+    if snippet_length < 1:
+        raise ValueError("snippet_length debe ser mayor que 0.")
+    summaries = page.subquery("page")
+    return (
+        select(
+            *(summaries.c[field] for field in _SUMMARY_FIELDS),
+            func.substr(NoteModel.content, 1, snippet_length + 1).label("head"),
+            _keyword_names_column(summaries.c.id),
+        )
+        .join_from(summaries, NoteModel, NoteModel.id == summaries.c.id)
+        .order_by(summaries.c.updated_at.desc(), summaries.c.id.desc())
+    )
+
+
+def note_from_row(row: Row[Any]) -> NoteSchema:
+    """NoteSchema a partir de una fila de `note_row_stmt` (o `projected_notes_stmt`)."""
+    note = dict(zip(_NOTE_FIELDS, row[:_PROJECT_OFFSET], strict=True))
+    if note["project_id"] is not None:
+        note["project"] = dict(
+            zip(_PROJECT_FIELDS, row[_PROJECT_OFFSET:_SOURCE_OFFSET], strict=True)
+        )
+    if note["source_id"] is not None:
+        note["source"] = dict(zip(_SOURCE_FIELDS, row[_SOURCE_OFFSET:_KEYWORDS_INDEX], strict=True))
+    note["keywords"] = row[_KEYWORDS_INDEX]
+    return NoteSchema.model_validate(note)
+
+
+def notes_from_rows(rows: Sequence[Row[Any]]) -> list[NoteSchema]:
+    return [note_from_row(row) for row in rows]
+
+
+def summaries_from_rows(rows: Sequence[Row[Any]], snippet_length: int) -> list[NoteSummarySchema]:
+    """NoteSummarySchema de las filas de `projected_summaries_stmt`."""
+    summaries = []
+    for row in rows:
+        summary = dict(zip(_SUMMARY_FIELDS, row, strict=False))
+        head = row.head
+        summary["snippet"] = head[:snippet_length]
+        summary["content_truncated"] = len(head) > snippet_length
+        summary["keywords"] = row.keywords
+        summaries.append(NoteSummarySchema.model_validate(summary))
+    return summaries
@@ -0,0 +1,298 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/note_query.py
+# ---------------------------------------------------------------------------
+"""
+Compilación de `NoteQuery` a una sola sentencia SQL, compartida por los repositorios
+síncrono y asíncrono.
+
+La sentencia depende solo de la forma de la consulta (`NoteQueryShape`: qué criterios hay,
+qué operadores de metadata, el orden y si hay cursor), nunca de sus valores: texto, ids,
+keywords, fechas y valores de metadata viajan como parámetros. Así, cada forma se construye
+una vez (`note_query_stmt`, caché LRU) y al reutilizar el mismo objeto Select:
+
+- SQLAlchemy no vuelve a construir la sentencia ni a calcular su clave de caché (queda
+  memorizada en el objeto) y toma el SQL ya compilado de su caché de compilación, y
+- el SQL es idéntico entre ejecuciones, así que asyncpg reutiliza la sentencia preparada.
+
+Estructura: la página (filtros, orden y LIMIT) en una subconsulta y, encima, las columnas
+de note_row_stmt (proyecto, fuente y keywords agregadas) más la clave de orden, que sirve
+para construir el cursor de la página siguiente.
+"""
+
+import uuid
+from collections.abc import Sequence
+from functools import lru_cache
+from operator import ge, lt
+from typing import Any, NamedTuple
+
+from sqlalchemy import (
+    Boolean,
+    ColumnElement,
+    DateTime,
+    Integer,
+    Row,
+    Select,
+    Text,
+    any_,
+    bindparam,
+    cast,
+    false,
+    func,
+    literal,
+    not_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION, JSONB, UUID
+
+from src.pkm_app.core.application.dtos import NotePage, NoteQuery, NoteQueryCursor
+from src.pkm_app.core.application.dtos.search_dto import KeywordMatchMode, NoteSort
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Keyword as KeywordModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    note_keywords_association_table as note_keywords,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.keyword_statements import (
+    normalize_keyword_names,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_projection import (
+    note_columns_stmt,
+    note_from_row,
+    note_row_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_search import (
+    full_text_match,
+    full_text_rank,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.project_tree import (
+    project_notes_filter,
+)
+
+# Formas distintas que se conservan compiladas (cada una es un objeto Select pequeño).
+NOTE_QUERY_CACHE_SIZE = 256
+
+_TIMESTAMP = DateTime(timezone=True)
+# Rangos de fechas de NoteQuery: [after, before).
+_DATE_BOUNDS = (
+    ("created_after", NoteModel.created_at, ge),
+    ("created_before", NoteModel.created_at, lt),
+    ("updated_after", NoteModel.updated_at, ge),
+    ("updated_before", NoteModel.updated_at, lt),
+)
+
+
+class NoteQueryShape(NamedTuple):
+    """Lo que determina el SQL de una NoteQuery (sin sus valores)."""
+
+    text: bool
+    project: bool
+    project_subtree: bool  # include_subprojects
+    keyword_match: str | None  # None si la consulta no filtra por keywords
+    type: bool
+    language: bool
+    date_bounds: tuple[str, ...]
+    metadata_ops: tuple[str, ...]
+    sort: NoteSort
+    cursor: bool
+
+
+def note_query_shape(query: NoteQuery) -> NoteQueryShape:
+    return NoteQueryShape(
+        text=query.text is not None,
+        project=query.project_id is not None,
+        project_subtree=query.project_id is not None and query.include_subprojects,
+        keyword_match=query.keyword_match if normalize_keyword_names(query.keywords) else None,
+        type=query.type is not None,
+        language=query.language is not None,
+        date_bounds=tuple(name for name, _, _ in _DATE_BOUNDS if getattr(query, name) is not None),
+        metadata_ops=tuple(predicate.op for predicate in query.metadata),
+        sort=query.sort,
+        cursor=query.cursor is not None,
+    )
+
+
+def keyword_filter(
+    user_id: str | ColumnElement[str],
+    names: ColumnElement[Any],
+    match: KeywordMatchMode,
+    name_count: int | ColumnElement[int] | None = None,
+) -> ColumnElement[bool]:
+    """
+    Semi-join con las notas etiquetadas con alguna (`any`) o todas (`all`, GROUP BY ...
+    HAVING count = número de nombres distintos) las keywords de `names` (array de texto,
+    sin repetidos). Cada nota aparece una sola vez, a diferencia de un JOIN con note_keywords.
+
+    Los ids de las keywords se resuelven una vez en un array (`ARRAY(SELECT ...)`): si el
+    plan genérico de la sentencia preparada recorre las notas del usuario, cada comprobación
+    es una sola búsqueda en pk_note_keywords y no una resolución de nombres por nota.
+    """
+    keyword_ids = func.array(
+        select(KeywordModel.id)
+        .where(KeywordModel.user_id == user_id, KeywordModel.name == any_(names))
+        .scalar_subquery(),
+        type_=ARRAY(UUID(as_uuid=True)),
+    )
+    tagged = select(note_keywords.c.note_id).where(note_keywords.c.keyword_id == any_(keyword_ids))
+    if match == "all":
+        if name_count is None:
+            name_count = func.cardinality(names)
+        tagged = tagged.group_by(note_keywords.c.note_id).having(func.count() == name_count)
+    return NoteModel.id.in_(tagged)
+
+
+def keyword_search_stmt(
+    user_id: str, keyword_names: list[str], match: KeywordMatchMode, project_id: uuid.UUID | None
+) -> Select[Any] | None:
+    """
+    Columnas de las notas etiquetadas con `keyword_names` según `match`, opcionalmente
+    en un proyecto, para paginar con `paginate_notes_stmt`. None si no hay nombres.
+    """
+    names = normalize_keyword_names(keyword_names)
+    if not names:
+        return None
+    criteria = [
+        NoteModel.user_id == user_id,
+        keyword_filter(user_id, literal(names, ARRAY(Text)), match, len(names)),
+    ]
+    if project_id is not None:
+        criteria.append(NoteModel.project_id == project_id)
+    return note_columns_stmt(*criteria)
+
+
+def _metadata_predicate(index: int, op: str) -> ColumnElement[bool]:
+    key = bindparam(f"metadata_key_{index}", type_=Text)
+    stored = NoteModel.note_metadata.op("->", return_type=JSONB)(key)
+    if op == "exists":
+        return NoteModel.note_metadata.has_key(key)
+    value = bindparam(f"metadata_value_{index}", type_=JSONB)
+    if op == "contains":
+        return stored.contains(value)
+    equal = stored.op("=", return_type=Boolean)(value)
+    if op == "ne":
+        return not_(func.coalesce(equal, false()))
+    return equal
+
+
+def _sort_key(sort: NoteSort) -> ColumnElement[Any]:
+    if sort == "relevance":
+        # ts_rank_cd devuelve real; en double precision el valor que vuelve en el cursor
+        # es exactamente el que se compara (el texto de un real no lo es tras promoverlo).
+        return cast(full_text_rank(bindparam("text", type_=Text)), DOUBLE_PRECISION)
+    if sort == "title_asc":
+        # Sin NULL en la clave: el cursor siempre es comparable.
+        return func.coalesce(NoteModel.title, "")
+    if sort == "updated_desc":
+        return NoteModel.updated_at
+    return NoteModel.created_at
+
+
+def _cursor_key_type(sort: NoteSort) -> Any:
+    if sort == "relevance":
+        return DOUBLE_PRECISION
+    if sort == "title_asc":
+        return Text
+    return _TIMESTAMP
+
+
+@lru_cache(maxsize=NOTE_QUERY_CACHE_SIZE)
+def note_query_stmt(shape: NoteQueryShape) -> Select[Any]:
+    """
+    Sentencia (con parámetros sin valor) para todas las NoteQuery con esta forma. Se
+    ejecuta con `note_query_params`.
+    """
+    user_id = bindparam("user_id", type_=Text)
+    criteria: list[ColumnElement[bool]] = [NoteModel.user_id == user_id]
+    if shape.text:
+        criteria.append(full_text_match(bindparam("text", type_=Text)))
+    if shape.project:
+        project_id = bindparam("project_id", type_=UUID(as_uuid=True))
+        criteria.append(project_notes_filter(user_id, project_id, shape.project_subtree))
+    if shape.keyword_match is not None:
+        criteria.append(
+            keyword_filter(
+                user_id,
+                bindparam("keywords", type_=ARRAY(Text)),
+                shape.keyword_match,
+                bindparam("keyword_count", type_=Integer),
+            )
+        )
+    if shape.type:
+        criteria.append(NoteModel.type == bindparam("type", type_=Text))
+    if shape.language:
+        criteria.append(NoteModel.language == bindparam("language", type_=Text))
+    for name, column, comparison in _DATE_BOUNDS:
+        if name in shape.date_bounds:
+            criteria.append(comparison(column, bindparam(name, type_=_TIMESTAMP)))
+    criteria.extend(_metadata_predicate(index, op) for index, op in enumerate(shape.metadata_ops))
+
+    sort_key = _sort_key(shape.sort)
+    ascending = shape.sort in ("created_asc", "title_asc")
+    if shape.cursor:
+        position = tuple_(
+            bindparam("cursor_key", type_=_cursor_key_type(shape.sort)),
+            bindparam("cursor_id", type_=UUID(as_uuid=True)),
+        )
+        current = tuple_(sort_key, NoteModel.id)
+        criteria.append(current > position if ascending else current < position)
+
+    order = (
+        (sort_key.asc(), NoteModel.id.asc())
+        if ascending
+        else (sort_key.desc(), NoteModel.id.desc())
+    )
+    page = (
+        note_columns_stmt(*criteria)
+        .add_columns(sort_key.label("sort_key"))
+        .order_by(*order)
+        .limit(bindparam("limit", type_=Integer))
+        .subquery("page")
+    )
+    page_order = (
+        (page.c.sort_key.asc(), page.c.id.asc())
+        if ascending
+        else (page.c.sort_key.desc(), page.c.id.desc())
+    )
+    return note_row_stmt(page).add_columns(page.c.sort_key).order_by(*page_order)
+
+
+def note_query_params(user_id: str, query: NoteQuery) -> dict[str, Any]:
+    """Valores de los parámetros de `note_query_stmt(note_query_shape(query))`."""
+    params: dict[str, Any] = {"user_id": user_id, "limit": query.limit}
+    if query.text is not None:
+        params["text"] = query.text
+    if query.project_id is not None:
+        params["project_id"] = query.project_id
+    names = normalize_keyword_names(query.keywords)
+    if names:
+        params["keywords"] = names
+        params["keyword_count"] = len(names)
+    if query.type is not None:
+        params["type"] = query.type
+    if query.language is not None:
+        params["language"] = query.language
+    for name, _, _ in _DATE_BOUNDS:
+        if getattr(query, name) is not None:
+            params[name] = getattr(query, name)
+    for index, predicate in enumerate(query.metadata):
+        params[f"metadata_key_{index}"] = predicate.key
+        if predicate.op != "exists":
+            params[f"metadata_value_{index}"] = predicate.value
+    if query.cursor is not None:
+        position = NoteQueryCursor.decode(query.cursor, query.sort)
+        params["cursor_key"] = position.key
+        params["cursor_id"] = position.id
+    return params
+
+
+def note_page_from_rows(rows: Sequence[Row[Any]], query: NoteQuery) -> NotePage:
+    """NotePage de las filas de `note_query_stmt`, con el cursor de la página siguiente."""
+    items = [note_from_row(row) for row in rows]
+    next_cursor = None
+    if len(rows) == query.limit:
+        last = rows[-1]
+        next_cursor = NoteQueryCursor(sort=query.sort, key=last.sort_key, id=last.id).encode()
+    return NotePage(items=items, next_cursor=next_cursor)
@@ -0,0 +1,71 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/note_search.py
+# ---------------------------------------------------------------------------
+"""
+Expresiones de búsqueda full-text sobre `notes.search_vector`, compartidas por los
+repositorios síncrono y asíncrono. Todas se resuelven con el índice GIN
+`ix_notes_search_vector` en lugar de un ILIKE '%q%' (que obliga a un seq scan).
+
+Cada nota se indexa con la configuración de su idioma (`notes.language`), así que la
+consulta del usuario se convierte a tsquery una vez por idioma y cada tsquery solo se
+compara con las notas de ese idioma (BitmapOr de búsquedas en el mismo índice GIN).
+Todas las configuraciones aplican `unaccent`: "gestion" encuentra "Gestión".
+"""
+
+from typing import Any
+
+from sqlalchemy import ColumnElement, Float, Select, and_, case, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import selectinload
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import NOTE_SEARCH_CONFIGS
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+
+
+def note_tsquery(query: str | ColumnElement[str], language: str) -> ColumnElement[Any]:
+    """
+    Convierte el texto del usuario con `websearch_to_tsquery` (admite "frases",
+    OR y -exclusiones, y nunca lanza error de sintaxis) usando la configuración de `language`.
+    """
+    config = literal(NOTE_SEARCH_CONFIGS[language], REGCONFIG)
+    return func.websearch_to_tsquery(config, query)
+
+
+def full_text_match(query: str | ColumnElement[str]) -> ColumnElement[bool]:
+    """
+    Predicado `(language = x AND search_vector @@ tsquery_x) OR ...` para cada idioma,
+    servido por el índice GIN.
+    """
+    return or_(
+        *(
+            and_(
+                NoteModel.language == language,
+                NoteModel.search_vector.bool_op("@@")(note_tsquery(query, language)),
+            )
+            for language in NOTE_SEARCH_CONFIGS
+        )
+    )
+
+
+def full_text_rank(query: str | ColumnElement[str]) -> ColumnElement[float]:
+    """Relevancia con `ts_rank_cd` (densidad de cobertura, respeta los pesos A/B)."""
+    tsquery = case(
+        {language: note_tsquery(query, language) for language in NOTE_SEARCH_CONFIGS},
+        value=NoteModel.language,
+    )
+    return func.ts_rank_cd(NoteModel.search_vector, tsquery, type_=Float)
+
+
+def ranked_full_text_stmt(user_id: str, query: str, skip: int, limit: int) -> Select[Any]:
+    """SELECT `(NoteModel, score)` de las notas que coinciden, de mayor a menor relevancia."""
+    score = full_text_rank(query).label("score")
+    return (
+        select(NoteModel, score)
+        .where(NoteModel.user_id == user_id, full_text_match(query))
+        .order_by(score.desc(), NoteModel.updated_at.desc(), NoteModel.id.desc())
+        .offset(skip)
+        .limit(limit)
+        .options(selectinload(NoteModel.keywords))
+    )
@@ -0,0 +1,319 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/note_writes.py
+# ---------------------------------------------------------------------------
+"""
+Creación y edición de una nota en un solo round trip, compartidas por los repositorios
+síncrono y asíncrono.
+
+Cada escritura es una única sentencia con CTE que modifican datos:
+
+    written_note        INSERT/UPDATE notes ... RETURNING (solo si el proyecto y la
+                        fuente son del usuario)
+    inserted_keywords   INSERT keywords ... ON CONFLICT DO NOTHING RETURNING
+    resolved_keywords   las insertadas UNION ALL las que ya existían
+    linked_keywords     INSERT note_keywords (y en la edición, DELETE de las que sobran)
+    SELECT final        la fila de note_row_stmt (nota, proyecto, fuente y keywords)
+
+La propiedad del proyecto y de la fuente la garantizan las FK compuestas
+`(project_id, user_id)` / `(source_id, user_id)`. Además, la fila de la nota se escribe
+con la condición EXISTS correspondiente: con un id ajeno la sentencia no devuelve filas en
+lugar de violar la FK y abortar la transacción, y el repositorio responde con ValueError
+como antes (con una consulta de diagnóstico, solo en ese caso).
+
+Todas las CTE ven la misma instantánea: una keyword que otra transacción confirma mientras
+el INSERT espera en ON CONFLICT no aparece ni en inserted_keywords ni en la lectura de las
+existentes. La fila devuelta trae entonces menos keywords de las pedidas y el repositorio
+las enlaza con `link_keywords_stmt` (segundo round trip, solo en esa carrera).
+"""
+
+import uuid
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from sqlalchemy import (
+    CTE,
+    ColumnElement,
+    Delete,
+    Row,
+    Select,
+    Text,
+    any_,
+    delete,
+    exists,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    true,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
+
+from src.pkm_app.core.application.dtos import KeywordSchema, NoteSchema
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Keyword as KeywordModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    NoteLink as NoteLinkModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Project as ProjectModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Source as SourceModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    generate_uuid,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    note_keywords_association_table as note_keywords,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_projection import (
+    keywords_json_aggregate,
+    note_columns_stmt,
+    note_row_stmt,
+)
+
+_KEYWORD_FIELDS = ("id", "name", "user_id", "created_at")
+_OWNED_REFERENCES = (("project_id", ProjectModel), ("source_id", SourceModel))
+
+
+def _owned(model: Any, reference_id: Any, user_id: str) -> ColumnElement[bool]:
+    """EXISTS del proyecto o fuente del usuario; true si no se asigna ninguno."""
+    if reference_id is None:
+        return true()
+    return exists().where(model.id == reference_id, model.user_id == user_id)
+
+
+def _owned_references(user_id: str, values: Mapping[str, Any]) -> list[ColumnElement[bool]]:
+    """Condiciones de propiedad del proyecto y la fuente que se asignan en `values`."""
+    return [
+        _owned(model, values[field], user_id)
+        for field, model in _OWNED_REFERENCES
+        if values.get(field) is not None
+    ]
+
+
+def _written_note_stmt(
+    note: CTE, user_id: str, keyword_names: list[str] | None, replace_links: bool
+) -> Select[Any]:
+    """
+    SELECT final sobre la nota escrita (`note`) con la sincronización de keywords como CTE.
+    `keyword_names` None deja las keywords como están; con `replace_links` se desenlazan
+    las que no estén en la lista.
+    """
+    if keyword_names is None:
+        return note_row_stmt(note).add_columns(
+            null().cast(ARRAY(UUID(as_uuid=True))).label("inserted_keyword_ids")
+        )
+
+    note_written = exists(select(note.c.id))
+    names = literal(keyword_names, ARRAY(Text))
+    inserted = (
+        insert(KeywordModel)
+        .from_select(
+            ["id", "user_id", "name"],
+            select(
+                func.unnest(
+                    literal([generate_uuid() for _ in keyword_names], ARRAY(UUID(as_uuid=True)))
+                ),
+                literal(user_id, Text),
+                func.unnest(names),
+            ).where(note_written),
+        )
+        .on_conflict_do_nothing(constraint="uq_keywords_user_id_name")
+        .returning(*(getattr(KeywordModel, field) for field in _KEYWORD_FIELDS))
+        .cte("inserted_keywords")
+    )
+    resolved = union_all(
+        select(*(inserted.c[field] for field in _KEYWORD_FIELDS)),
+        select(*(getattr(KeywordModel, field) for field in _KEYWORD_FIELDS)).where(
+            KeywordModel.user_id == user_id, KeywordModel.name == any_(names)
+        ),
+    ).cte("resolved_keywords")
+    linked = (
+        insert(note_keywords)
+        .from_select(
+            ["note_id", "keyword_id"],
+            # Producto cartesiano explícito: la nota escrita (una fila o ninguna) por cada keyword.
+            select(note.c.id, resolved.c.id).join_from(note, resolved, true()),
+        )
+        .on_conflict_do_nothing()
+        .cte("linked_keywords")
+    )
+    stmt = note_row_stmt(
+        note,
+        select(
+            keywords_json_aggregate(*(resolved.c[field] for field in _KEYWORD_FIELDS))
+        ).scalar_subquery(),
+    ).add_columns(
+        select(func.array_agg(inserted.c.id, type_=ARRAY(UUID(as_uuid=True))))
+        .scalar_subquery()
+        .label("inserted_keyword_ids")
+    )
+    stmt = stmt.add_cte(linked)
+    if replace_links:
+        unlinked = (
+            delete(note_keywords)
+            .where(
+                note_keywords.c.note_id.in_(select(note.c.id)),
+                note_keywords.c.keyword_id.not_in(select(resolved.c.id)),
+            )
+            .cte("unlinked_keywords")
+        )
+        stmt = stmt.add_cte(unlinked)
+    return stmt
+
+
+def create_note_stmt(
+    note_id: uuid.UUID, user_id: str, values: Mapping[str, Any], keyword_names: list[str]
+) -> Select[Any]:
+    """
+    Crea la nota `note_id` con `values` (columnas de notes) y sus keywords
+    (`normalize_keyword_names`). Devuelve la fila de note_row_stmt más
+    `inserted_keyword_ids`, o ninguna si el proyecto o la fuente no son del usuario.
+    """
+    row = {"id": note_id, "user_id": user_id, **values}
+    note_values = select(
+        *(literal(value, NoteModel.__table__.c[name].type) for name, value in row.items())
+    ).where(*_owned_references(user_id, values))
+    note = (
+        insert(NoteModel)
+        .from_select(list(row), note_values)
+        .returning(*note_columns_stmt().selected_columns)
+        .cte("written_note")
+    )
+    return _written_note_stmt(note, user_id, keyword_names or None, replace_links=False)
+
+
+def update_note_stmt(
+    note_id: uuid.UUID,
+    user_id: str,
+    values: Mapping[str, Any],
+    keyword_names: list[str] | None,
+) -> Select[Any]:
+    """
+    Actualiza `values` de la nota y, si `keyword_names` no es None, deja exactamente esas
+    keywords. Sin filas si la nota no existe o el proyecto o la fuente no son del usuario.
+    """
+    criteria = [
+        NoteModel.id == note_id,
+        NoteModel.user_id == user_id,
+        *_owned_references(user_id, values),
+    ]
+    if values:
+        note = (
+            update(NoteModel)
+            .where(*criteria)
+            .values(**values)
+            .returning(*note_columns_stmt().selected_columns)
+            .cte("written_note")
+        )
+    else:
+        # Solo cambian las keywords: updated_at no se toca (como antes). FOR NO KEY UPDATE
+        # ordena esta edición con las demás de la misma nota, igual que el UPDATE.
+        note = note_columns_stmt(*criteria).with_for_update(key_share=True).cte("written_note")
+    return _written_note_stmt(note, user_id, keyword_names, replace_links=True)
+
+
+def delete_note_stmt(note_id: uuid.UUID, user_id: str) -> Delete:
+    """
+    DELETE ... RETURNING id y `dropped_link_ids`, los enlaces del usuario que tocaban la
+    nota (se borran en una CTE para conocerlos; el resto, y las keywords enlazadas, por
+    ON DELETE CASCADE).
+    """
+    dropped = (
+        delete(NoteLinkModel)
+        .where(
+            or_(NoteLinkModel.source_note_id == note_id, NoteLinkModel.target_note_id == note_id),
+            NoteLinkModel.user_id == user_id,
+            exists().where(NoteModel.id == note_id, NoteModel.user_id == user_id),
+        )
+        .returning(NoteLinkModel.id)
+        .cte("dropped_links")
+    )
+    return (
+        delete(NoteModel)
+        .where(NoteModel.id == note_id, NoteModel.user_id == user_id)
+        .returning(
+            NoteModel.id,
+            select(func.array_agg(dropped.c.id, type_=ARRAY(UUID(as_uuid=True))))
+            .scalar_subquery()
+            .label("dropped_link_ids"),
+        )
+        .add_cte(dropped)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def language_sources_stmt(note_id: uuid.UUID, user_id: str) -> Select[Any]:
+    """
+    Título, contenido y metadata actuales, para recalcular el idioma en una edición parcial.
+    La fila queda bloqueada hasta el UPDATE para que no cambie entretanto.
+    """
+    return (
+        select(NoteModel.title, NoteModel.content, NoteModel.note_metadata)
+        .where(NoteModel.id == note_id, NoteModel.user_id == user_id)
+        .with_for_update(key_share=True)
+    )
+
+
+def write_rejection_stmt(
+    user_id: str, values: Mapping[str, Any], note_id: uuid.UUID | None = None
+) -> Select[Any]:
+    """
+    Diagnóstico de una escritura sin filas: si la nota existe (en ediciones) y si el
+    proyecto y la fuente asignados son del usuario (true si no se asignan).
+    """
+    columns = [
+        _owned(model, values.get(field), user_id).label(field) for field, model in _OWNED_REFERENCES
+    ]
+    if note_id is not None:
+        columns.append(
+            exists().where(NoteModel.id == note_id, NoteModel.user_id == user_id).label("note")
+        )
+    return select(*columns)
+
+
+def raise_for_rejected_write(values: Mapping[str, Any], rejection: Row[Any]) -> None:
+    """Lanza ValueError, con los mensajes de siempre, si la referencia no es del usuario."""
+    if not rejection.project_id:
+        raise ValueError(f"Proyecto con id {values['project_id']} no encontrado para el usuario.")
+    if not rejection.source_id:
+        raise ValueError(f"Fuente con id {values['source_id']} no encontrada para el usuario.")
+
+
+def link_keywords_stmt(note_id: uuid.UUID, user_id: str, keyword_names: list[str]) -> Select[Any]:
+    """
+    Enlaza a la nota keywords que ya existen (las que la escritura no vio por una carrera
+    con otra transacción) y las devuelve.
+    """
+    found = (
+        select(*(getattr(KeywordModel, field) for field in _KEYWORD_FIELDS))
+        .where(
+            KeywordModel.user_id == user_id,
+            KeywordModel.name == any_(literal(keyword_names, ARRAY(Text))),
+        )
+        .cte("found_keywords")
+    )
+    linked = (
+        insert(note_keywords)
+        .from_select(
+            ["note_id", "keyword_id"],
+            select(literal(note_id, UUID(as_uuid=True)), found.c.id),
+        )
+        .on_conflict_do_nothing()
+        .cte("linked_keywords")
+    )
+    return select(found).add_cte(linked)
+
+
+def with_linked_keywords(note: NoteSchema, rows: Sequence[Row[Any]]) -> NoteSchema:
+    """`note` con las keywords de `link_keywords_stmt` añadidas, ordenadas por nombre."""
+    keywords = [*note.keywords, *(KeywordSchema.model_validate(row._mapping) for row in rows)]
+    return note.model_copy(update={"keywords": sorted(keywords, key=lambda kw: kw.name)})
@@ -0,0 +1,91 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/project_async_repository.py
+# ---------------------------------------------------------------------------
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.pkm_app.core.application.dtos import ProjectCreate, ProjectSchema, ProjectUpdate
+from src.pkm_app.core.application.interfaces.project_async_interface import (
+    IProjectRepository,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import generate_uuid
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.project_tree import (
+    ancestors_stmt,
+    create_project_stmt,
+    delete_project_stmt,
+    descendants_stmt,
+    get_project_stmt,
+    project_rejection_stmt,
+    projects_from_rows,
+    raise_for_rejected_parent,
+    update_project_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.write_tracking import (
+    NOTE_ENTITY,
+    TouchedEntities,
+)
+
+
+class AsyncSQLAlchemyProjectRepository(IProjectRepository):
+    def __init__(self, session: AsyncSession, touched: TouchedEntities | None = None):
+        self.session = session
+        # Las notas incrustan su proyecto: al editarlo o borrarlo se anotan para invalidarlas.
+        self.touched = touched if touched is not None else TouchedEntities()
+
+    async def create(self, project_in: ProjectCreate, user_id: str) -> ProjectSchema:
+        values = project_in.model_dump()
+        stmt = create_project_stmt(generate_uuid(), user_id, values)
+        row = (await self.session.execute(stmt)).first()
+        if row is None:
+            parent_id = project_in.parent_project_id
+            assert parent_id is not None  # sin padre el INSERT siempre devuelve la fila
+            rejection = (
+                await self.session.execute(project_rejection_stmt(None, user_id, parent_id))
+            ).one()
+            raise_for_rejected_parent(parent_id, rejection)
+        return projects_from_rows([row])[0]
+
+    async def get_by_id(self, project_id: uuid.UUID, user_id: str) -> ProjectSchema | None:
+        row = (await self.session.execute(get_project_stmt(project_id, user_id))).first()
+        return projects_from_rows([row])[0] if row is not None else None
+
+    async def update(
+        self, project_id: uuid.UUID, project_in: ProjectUpdate, user_id: str
+    ) -> ProjectSchema | None:
+        values = project_in.model_dump(exclude_unset=True)
+        if not values:
+            return await self.get_by_id(project_id, user_id)
+        stmt = update_project_stmt(project_id, user_id, values)
+        row = (await self.session.execute(stmt)).first()
+        if row is None:
+            parent_id = values.get("parent_project_id")
+            if parent_id is None:
+                return None
+            rejection = (
+                await self.session.execute(project_rejection_stmt(project_id, user_id, parent_id))
+            ).one()
+            if not rejection.project:
+                return None
+            raise_for_rejected_parent(parent_id, rejection)
+        self.touched.add(NOTE_ENTITY, user_id, row.note_ids)
+        return projects_from_rows([row])[0]
+
+    async def delete(self, project_id: uuid.UUID, user_id: str) -> bool:
+        row = (await self.session.execute(delete_project_stmt(project_id, user_id))).first()
+        if row is None:
+            return False
+        self.touched.add(NOTE_ENTITY, user_id, row.note_ids)
+        return True
+
+    async def get_ancestors(self, project_id: uuid.UUID, user_id: str) -> list[ProjectSchema]:
+        result = await self.session.execute(ancestors_stmt(project_id, user_id))
+        return projects_from_rows(result.all())
+
+    async def get_descendants(
+        self, project_id: uuid.UUID, user_id: str, max_depth: int | None = None
+    ) -> list[ProjectSchema]:
+        if max_depth is not None and max_depth < 1:
+            raise ValueError("max_depth debe ser al menos 1.")
+        result = await self.session.execute(descendants_stmt(project_id, user_id, max_depth))
+        return projects_from_rows(result.all())
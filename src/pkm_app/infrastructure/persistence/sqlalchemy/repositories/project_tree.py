@@ -0,0 +1,252 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/project_tree.py
+# ---------------------------------------------------------------------------
+"""
+Sentencias de proyectos y de su jerarquía, compartidas por los repositorios síncrono y
+asíncrono.
+
+La jerarquía se consulta con la ruta materializada `projects.path` (ids desde la raíz
+hasta el proyecto, incluido), que mantienen los triggers de la tabla (ver models.py):
+
+- subárbol: `path @> ARRAY[id]`, una búsqueda en el índice GIN ix_projects_path, sin
+  recorrer la jerarquía nivel a nivel como un CTE recursivo;
+- ancestros: `id = ANY(path del proyecto)`, búsquedas por clave primaria;
+- profundidad: `cardinality(path)`.
+
+Mover un proyecto es un UPDATE de parent_project_id: los triggers reescriben las rutas del
+subárbol en la misma sentencia. Como en note_writes.py, las escrituras llevan la condición
+de que el padre sea del usuario (y, al mover, de que no esté en el propio subárbol): con un
+padre no válido no devuelven filas, en lugar de que el trigger aborte la transacción, y el
+repositorio responde con ValueError tras una consulta de diagnóstico.
+"""
+
+import uuid
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Delete,
+    Insert,
+    Row,
+    Select,
+    Update,
+    any_,
+    cast,
+    delete,
+    exists,
+    func,
+    literal,
+    not_,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, array, insert
+from sqlalchemy.orm import aliased
+
+from src.pkm_app.core.application.dtos import ProjectSchema
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Project as ProjectModel,
+)
+
+_PROJECT_FIELDS = (
+    "id",
+    "user_id",
+    "name",
+    "description",
+    "parent_project_id",
+    "created_at",
+    "updated_at",
+)
+
+
+def _project_columns() -> list[Any]:
+    return [getattr(ProjectModel, field) for field in _PROJECT_FIELDS]
+
+
+def _project_note_ids() -> ColumnElement[Any]:
+    """
+    Ids de las notas del proyecto escrito, para RETURNING: llevan el proyecto incrustado
+    (note_projection.py) y hay que invalidarlas en la caché. La subconsulta ve el estado
+    previo a la sentencia, así que en un DELETE aún incluye las notas que pasan a SET NULL.
+    """
+    return func.array(
+        select(NoteModel.id).where(NoteModel.project_id == ProjectModel.id).scalar_subquery()
+    ).label("note_ids")
+
+
+def _uuid_value(value: uuid.UUID | ColumnElement[Any]) -> ColumnElement[Any]:
+    return value if isinstance(value, ColumnElement) else literal(value, UUID(as_uuid=True))
+
+
+def subtree_project_ids(
+    user_id: str | ColumnElement[str], project_id: uuid.UUID | ColumnElement[Any]
+) -> Select[Any]:
+    """Ids del proyecto y de todos sus subproyectos (ix_projects_path)."""
+    return select(ProjectModel.id).where(
+        ProjectModel.user_id == user_id,
+        ProjectModel.path.contains(array([_uuid_value(project_id)])),
+    )
+
+
+def project_notes_filter(
+    user_id: str | ColumnElement[str],
+    project_id: uuid.UUID | ColumnElement[Any],
+    include_subprojects: bool,
+) -> ColumnElement[bool]:
+    """
+    Notas del proyecto y, con `include_subprojects`, de todo su subárbol. Los ids del
+    subárbol se resuelven una vez en un array (`ARRAY(SELECT ...)`, como keyword_filter en
+    note_query.py): con `IN (SELECT ...)` el plan genérico de la sentencia preparada puede
+    recorrer todas las notas del usuario en un hash join, en lugar de buscar cada proyecto
+    en ix_notes_project_id.
+    """
+    if not include_subprojects:
+        return NoteModel.project_id == project_id
+    subtree = subtree_project_ids(user_id, project_id).scalar_subquery()
+    return NoteModel.project_id == any_(func.array(subtree))
+
+
+def _parent_allowed(
+    user_id: str, parent_id: uuid.UUID | None, project_id: uuid.UUID | None = None
+) -> ColumnElement[bool]:
+    """
+    EXISTS del padre del usuario y, si se mueve `project_id`, fuera de su subárbol (la ruta
+    del padre no lo contiene). true si no hay padre.
+    """
+    if parent_id is None:
+        return true()
+    parent = aliased(ProjectModel, name="parent")
+    criteria = [parent.id == parent_id, parent.user_id == user_id]
+    if project_id is not None:
+        criteria.append(not_(_uuid_value(project_id) == any_(parent.path)))
+    return exists().where(*criteria)
+
+
+def get_project_stmt(project_id: uuid.UUID, user_id: str) -> Select[Any]:
+    return select(*_project_columns()).where(
+        ProjectModel.id == project_id, ProjectModel.user_id == user_id
+    )
+
+
+def create_project_stmt(project_id: uuid.UUID, user_id: str, values: Mapping[str, Any]) -> Insert:
+    """INSERT ... RETURNING del proyecto; sin filas si el padre no es del usuario."""
+    row = {"id": project_id, "user_id": user_id, **values}
+    project_values = select(
+        *(literal(value, ProjectModel.__table__.c[name].type) for name, value in row.items())
+    ).where(_parent_allowed(user_id, values.get("parent_project_id")))
+    return (
+        insert(ProjectModel).from_select(list(row), project_values).returning(*_project_columns())
+    )
+
+
+def update_project_stmt(project_id: uuid.UUID, user_id: str, values: Mapping[str, Any]) -> Update:
+    """
+    UPDATE ... RETURNING del proyecto y de sus notas (`note_ids`). Sin filas si no existe o
+    el nuevo padre no es del usuario o está en el subárbol del proyecto (también si es el
+    propio proyecto).
+    """
+    criteria = [ProjectModel.id == project_id, ProjectModel.user_id == user_id]
+    if values.get("parent_project_id") is not None:
+        criteria.append(_parent_allowed(user_id, values["parent_project_id"], project_id))
+    return (
+        update(ProjectModel)
+        .where(*criteria)
+        .values(**values)
+        .returning(*_project_columns(), _project_note_ids())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_project_stmt(project_id: uuid.UUID, user_id: str) -> Delete:
+    """
+    DELETE ... RETURNING id y las notas del proyecto (`note_ids`). Los subproyectos directos
+    pasan a ser raíz y las notas quedan sin proyecto (ON DELETE SET NULL).
+    """
+    return (
+        delete(ProjectModel)
+        .where(ProjectModel.id == project_id, ProjectModel.user_id == user_id)
+        .returning(ProjectModel.id, _project_note_ids())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def project_rejection_stmt(
+    project_id: uuid.UUID | None, user_id: str, parent_id: uuid.UUID
+) -> Select[Any]:
+    """
+    Diagnóstico de una escritura sin filas: si el proyecto existe (en ediciones) y si el
+    padre es del usuario.
+    """
+    columns = [_parent_allowed(user_id, parent_id).label("parent")]
+    if project_id is not None:
+        columns.append(
+            exists()
+            .where(ProjectModel.id == project_id, ProjectModel.user_id == user_id)
+            .label("project")
+        )
+    return select(*columns)
+
+
+def raise_for_rejected_parent(parent_id: uuid.UUID, rejection: Row[Any]) -> None:
+    """Lanza ValueError: el padre no es del usuario o (si lo es) crearía un ciclo."""
+    if not rejection.parent:
+        raise ValueError(f"Proyecto padre con id {parent_id} no encontrado para el usuario.")
+    raise ValueError("Un proyecto no puede moverse dentro de sí mismo ni de sus subproyectos.")
+
+
+def ancestors_stmt(project_id: uuid.UUID, user_id: str) -> Select[Any]:
+    """Ancestros del proyecto, desde la raíz hasta su padre."""
+    target = aliased(ProjectModel, name="target")
+    # cast: con `= ANY (SELECT ...)` cada fila de la subconsulta sería un elemento; aquí
+    # la única fila es el array.
+    path = cast(
+        select(target.path)
+        .where(target.id == project_id, target.user_id == user_id)
+        .scalar_subquery(),
+        ARRAY(UUID(as_uuid=True)),
+    )
+    return (
+        select(*_project_columns())
+        .where(
+            ProjectModel.id == any_(path),
+            ProjectModel.id != project_id,
+            ProjectModel.user_id == user_id,
+        )
+        .order_by(func.cardinality(ProjectModel.path))
+    )
+
+
+def descendants_stmt(project_id: uuid.UUID, user_id: str, max_depth: int | None) -> Select[Any]:
+    """
+    Subproyectos a cualquier profundidad (o hasta `max_depth` niveles por debajo), nivel a
+    nivel y por nombre dentro de cada nivel.
+    """
+    depth = func.cardinality(ProjectModel.path)
+    stmt = (
+        select(*_project_columns())
+        .where(
+            ProjectModel.user_id == user_id,
+            ProjectModel.path.contains(array([_uuid_value(project_id)])),
+            ProjectModel.id != project_id,
+        )
+        .order_by(depth, ProjectModel.name, ProjectModel.id)
+    )
+    if max_depth is not None:
+        root = aliased(ProjectModel, name="root")
+        root_depth = (
+            select(func.cardinality(root.path)).where(root.id == project_id).scalar_subquery()
+        )
+        stmt = stmt.where(depth <= root_depth + max_depth)
+    return stmt
+
+
+def projects_from_rows(rows: Sequence[Row[Any]]) -> list[ProjectSchema]:
+    return [
+        ProjectSchema.model_validate({field: getattr(row, field) for field in _PROJECT_FIELDS})
+        for row in rows
+    ]
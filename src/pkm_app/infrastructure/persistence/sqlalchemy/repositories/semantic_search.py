@@ -0,0 +1,127 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/semantic_search.py
+# ---------------------------------------------------------------------------
+"""
+Búsqueda semántica (k vecinos más cercanos) sobre `notes.embedding`, compartida por los
+repositorios síncrono y asíncrono. El ORDER BY `embedding <=> q` LIMIT k lo sirve el
+índice HNSW `ix_notes_embedding_hnsw` (distancia coseno).
+
+Un índice HNSW devuelve los `hnsw.ef_search` candidatos más cercanos de toda la tabla y los
+filtros (usuario, proyecto...) se aplican después: con muchos usuarios, casi ninguno de esos
+candidatos es del usuario y el top-k sale incompleto. Con `hnsw.iterative_scan`
+(pgvector >= 0.8) el recorrido del índice continúa hasta reunir k filas que cumplen los
+filtros (o hasta `hnsw.max_scan_tuples`), así que el filtrado ocurre dentro del index scan.
+Cuando el filtro es muy selectivo (un usuario o proyecto con pocas notas) el planificador
+prefiere el índice btree del filtro y ordena las pocas filas resultantes, que es exacto.
+
+`hnsw.iterative_scan = relaxed_order` y `hnsw.ef_search = DEFAULT_EF_SEARCH` los fijan los
+motores al abrir cada conexión (database.session_settings), así que una búsqueda no paga un
+round trip extra. Solo cuando pide más candidatos que DEFAULT_EF_SEARCH (k grandes), el
+repositorio amplía `hnsw.ef_search` para la transacción con `ef_search_stmt` antes de
+buscar. 'relaxed_order' puede devolver el top-k ligeramente desordenado, así que las
+sentencias vuelven a ordenar por distancia fuera del recorrido del índice.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select, Subquery, func, select
+from sqlalchemy.orm import selectinload
+
+from src.pkm_app.core.application.dtos import NoteSearchFilters
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import EMBEDDING_DIMENSIONS
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+
+# Tope de resultados por búsqueda.
+MAX_SEMANTIC_K = 1000
+# hnsw.ef_search de cada conexión (database.session_settings); el de pgvector es 40.
+DEFAULT_EF_SEARCH = 100
+# Límite de hnsw.ef_search en pgvector.
+MAX_EF_SEARCH = 1000
+
+
+def ef_search_stmt(candidates: int) -> Select[Any] | None:
+    """
+    Amplía `hnsw.ef_search` hasta `candidates` (como mucho MAX_EF_SEARCH) solo para la
+    transacción actual, o None si basta con el valor de la conexión.
+    """
+    if candidates <= DEFAULT_EF_SEARCH:
+        return None
+    return select(func.set_config("hnsw.ef_search", str(min(candidates, MAX_EF_SEARCH)), True))
+
+
+def check_k(k: int) -> None:
+    """Valida el número de resultados pedido a una búsqueda por similitud."""
+    if not 1 <= k <= MAX_SEMANTIC_K:
+        raise ValueError(f"k debe estar entre 1 y {MAX_SEMANTIC_K}.")
+
+
+def check_query_vector(query_vector: Sequence[float]) -> None:
+    """Valida que el vector de consulta tenga la dimensión de notes.embedding."""
+    if len(query_vector) != EMBEDDING_DIMENSIONS:
+        raise ValueError(
+            f"query_vector debe tener {EMBEDDING_DIMENSIONS} dimensiones "
+            f"(tiene {len(query_vector)})."
+        )
+
+
+def search_filter_criteria(filters: NoteSearchFilters | None) -> list[ColumnElement[bool]]:
+    """Condiciones WHERE de los campos informados en `filters` (vacía si no hay filtros)."""
+    if filters is None:
+        return []
+    criteria = []
+    if filters.project_id is not None:
+        criteria.append(NoteModel.project_id == filters.project_id)
+    if filters.type is not None:
+        criteria.append(NoteModel.type == filters.type)
+    if filters.language is not None:
+        criteria.append(NoteModel.language == filters.language)
+    return criteria
+
+
+def nearest_notes_subquery(
+    user_id: str,
+    query_vector: Sequence[float],
+    limit: int,
+    filters: NoteSearchFilters | None = None,
+    name: str = "nearest",
+) -> Subquery:
+    """
+    Subconsulta `(id, distance)` de las `limit` notas más cercanas a `query_vector`, servida
+    por el índice HNSW. Solo lee ids y distancias; las notas se cargan fuera.
+    """
+    distance = NoteModel.embedding.cosine_distance(list(query_vector))
+    return (
+        select(NoteModel.id, distance.label("distance"))
+        .where(
+            NoteModel.user_id == user_id,
+            NoteModel.embedding.is_not(None),
+            *search_filter_criteria(filters),
+        )
+        .order_by(distance)
+        .limit(limit)
+        .subquery(name)
+    )
+
+
+def semantic_search_stmt(
+    user_id: str,
+    query_vector: Sequence[float],
+    k: int,
+    filters: NoteSearchFilters | None = None,
+) -> Select[Any]:
+    """
+    SELECT `(NoteModel, score)` de las k notas más cercanas a `query_vector`, con
+    score = similitud coseno (1 - distancia), de mayor a menor.
+    """
+    check_k(k)
+    check_query_vector(query_vector)
+    nearest = nearest_notes_subquery(user_id, query_vector, k, filters)
+    return (
+        select(NoteModel, (1 - nearest.c.distance).label("score"))
+        .join(nearest, NoteModel.id == nearest.c.id)
+        .order_by(nearest.c.distance, NoteModel.id)
+        .options(selectinload(NoteModel.keywords))
+    )
@@ -0,0 +1,111 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/trigram_search.py
+# ---------------------------------------------------------------------------
+"""
+Búsqueda difusa por trigramas (pg_trgm) sobre títulos de notas y nombres de keywords,
+pensada para "buscar mientras se escribe": tolera erratas y prefijos incompletos.
+
+Se usa `word_similarity(q, texto)`, que compara la consulta con el fragmento más
+parecido del texto (no con el texto entero). Cada búsqueda es un top-k exacto en una sola
+consulta, servido por los índices GiST `ix_notes_user_id_title_trgm` /
+`ix_keywords_user_id_name_trgm` (user_id con btree_gist + texto con gist_trgm_ops):
+- `q <% texto` filtra por `word_similarity >= pg_trgm.word_similarity_threshold`, que los
+  motores de database.py fijan en cada conexión a `DEFAULT_SIMILARITY_THRESHOLD`, y poda
+  ramas enteras del índice.
+- `ORDER BY q <<-> texto LIMIT k` recorre el índice por distancia (1 - word_similarity):
+  devuelve las k filas más parecidas sin puntuar el resto, por muchas que coincidan.
+- Dentro de ese top-k, los textos que empiezan por la consulta van primero.
+
+Un umbral distinto del de la conexión se aplica en línea (`word_similarity >= t`).
+Por encima del valor por defecto basta con añadirlo al filtro; por debajo, `<%` lo
+recortaría, así que se filtra solo en línea y el recorrido por distancia ya no se poda: si
+hay menos de k coincidencias, recorre todas las filas del usuario en el índice.
+
+Las consultas de menos de `MIN_FUZZY_QUERY_LENGTH` caracteres apenas generan trigramas
+selectivos y no se buscan.
+"""
+
+from typing import Any
+
+from sqlalchemy import ColumnElement, Float, Select, Text, func, literal, select
+from sqlalchemy.orm import aliased
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Keyword as KeywordModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+
+# pg_trgm.word_similarity_threshold de cada conexión (database.session_settings), que es
+# el umbral que aplica `<%`.
+DEFAULT_SIMILARITY_THRESHOLD = 0.4
+MIN_FUZZY_QUERY_LENGTH = 3
+
+
+def word_similar(query: str, column: ColumnElement[Any]) -> ColumnElement[bool]:
+    """Predicado `q <% columna`, servido por el índice GiST de trigramas."""
+    return literal(query, Text).bool_op("<%")(column)
+
+
+def word_distance(query: str, column: ColumnElement[Any]) -> ColumnElement[float]:
+    """`q <<-> columna` (1 - word_similarity): orden del recorrido KNN del índice GiST."""
+    return literal(query, Text).op("<<->", return_type=Float)(column)
+
+
+def _similarity_filter(
+    query: str, column: ColumnElement[Any], threshold: float
+) -> list[ColumnElement[bool]]:
+    if not 0 < threshold <= 1:
+        raise ValueError("threshold debe estar en el intervalo (0, 1].")
+    conditions = []
+    if threshold >= DEFAULT_SIMILARITY_THRESHOLD:
+        conditions.append(word_similar(query, column))
+    if threshold != DEFAULT_SIMILARITY_THRESHOLD:
+        conditions.append(func.word_similarity(query, column, type_=Float) >= threshold)
+    return conditions
+
+
+def _ranking(query: str, column: ColumnElement[Any]) -> tuple[Any, ...]:
+    # Primero los textos que empiezan por la consulta; después, por similitud.
+    score = func.word_similarity(query, column, type_=Float).label("score")
+    return score, func.starts_with(func.lower(column), query.lower()).desc(), score.desc()
+
+
+def fuzzy_title_stmt(
+    user_id: str, query: str, limit: int, threshold: float = DEFAULT_SIMILARITY_THRESHOLD
+) -> Select[Any]:
+    """SELECT `(id, title, score)` de las `limit` notas con título más parecido a `query`."""
+    top_k = (
+        select(NoteModel.id, NoteModel.title)
+        .where(
+            NoteModel.user_id == user_id,
+            *_similarity_filter(query, NoteModel.title, threshold),
+        )
+        .order_by(word_distance(query, NoteModel.title))
+        .limit(limit)
+        .subquery("top_k")
+    )
+    score, prefix_first, by_score = _ranking(query, top_k.c.title)
+    return select(top_k.c.id, top_k.c.title, score).order_by(
+        prefix_first, by_score, top_k.c.title, top_k.c.id
+    )
+
+
+def fuzzy_keyword_stmt(
+    user_id: str, query: str, limit: int, threshold: float = DEFAULT_SIMILARITY_THRESHOLD
+) -> Select[Any]:
+    """SELECT `(KeywordModel, score)` de las `limit` keywords más parecidas a `query`."""
+    top_k = (
+        select(KeywordModel)
+        .where(
+            KeywordModel.user_id == user_id,
+            *_similarity_filter(query, KeywordModel.name, threshold),
+        )
+        .order_by(word_distance(query, KeywordModel.name))
+        .limit(limit)
+        .subquery("top_k")
+    )
+    keyword = aliased(KeywordModel, top_k)
+    score, prefix_first, by_score = _ranking(query, keyword.name)
+    return select(keyword, score).order_by(prefix_first, by_score, keyword.name)
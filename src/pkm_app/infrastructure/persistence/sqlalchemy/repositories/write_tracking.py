@@ -0,0 +1,68 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/persistence/sqlalchemy/repositories/write_tracking.py
+# ---------------------------------------------------------------------------
+"""
+Registro de las entidades escritas por un repositorio durante una transacción, por
+usuario. La UoW lo consulta al confirmar para publicar invalidaciones de caché
+(infrastructure/cache/invalidation_bus.py) y aplicar los enlaces creados y borrados al
+índice del grafo (infrastructure/graph/link_graph_index.py), y lo vacía al confirmar o
+revertir.
+"""
+
+import uuid
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple
+
+NOTE_ENTITY = "note"
+KEYWORD_ENTITY = "keyword"
+LINK_ENTITY = "link"
+
+
+class LinkChange(NamedTuple):
+    """Enlace creado (con sus notas) o borrado (sin ellas) en la transacción."""
+
+    user_id: str
+    link_id: uuid.UUID
+    source_note_id: uuid.UUID | None = None
+    target_note_id: uuid.UUID | None = None
+
+    @property
+    def is_deletion(self) -> bool:
+        return self.source_note_id is None
+
+
+class TouchedEntities:
+    def __init__(self) -> None:
+        self._ids: dict[tuple[str, str], set[uuid.UUID]] = {}
+        # En orden: un enlace puede crearse y borrarse en la misma transacción.
+        self.link_changes: list[LinkChange] = []
+
+    def add(self, entity: str, user_id: str, ids: Iterable[uuid.UUID]) -> None:
+        ids = set(ids)
+        if ids:
+            self._ids.setdefault((entity, user_id), set()).update(ids)
+
+    def add_link_change(self, change: LinkChange) -> None:
+        self.link_changes.append(change)
+        self.add(LINK_ENTITY, change.user_id, [change.link_id])
+
+    def keys(self, entity: str) -> set[tuple[str, uuid.UUID]]:
+        """`(user_id, id)` de las entidades de un tipo (claves de NoteCache para notas)."""
+        return {
+            (user_id, entity_id)
+            for (kind, user_id), ids in self._ids.items()
+            if kind == entity
+            for entity_id in ids
+        }
+
+    def __bool__(self) -> bool:
+        return bool(self._ids)
+
+    def __iter__(self) -> Iterator[tuple[str, str, set[uuid.UUID]]]:
+        """Recorre `(entity, user_id, ids)`."""
+        for (entity, user_id), ids in self._ids.items():
+            yield entity, user_id, ids
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self.link_changes.clear()
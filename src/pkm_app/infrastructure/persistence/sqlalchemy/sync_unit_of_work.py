@@ -1,18 +1,48 @@
 # src/pkm_app/infrastructure/persistence/sqlalchemy/sync_unit_of_work.py
+import logging
+import time
+from collections.abc import Callable
+from contextvars import Token
 from typing import Any
 
 from sqlalchemy.orm import Session
 
+from src.pkm_app.core.application.interfaces.link_graph_sync_interface import (
+    ISyncLinkGraphRepository,
+)
 from src.pkm_app.core.application.interfaces.note_sync_interface import (
     ISyncNoteRepository,
 )  # Importar ISyncNoteRepository
+from src.pkm_app.core.application.interfaces.project_sync_interface import (
+    ISyncProjectRepository,
+)
 from src.pkm_app.core.application.interfaces.unit_of_work_interface import (
     ISyncUnitOfWork,
 )
-from src.pkm_app.infrastructure.persistence.sqlalchemy.database import SyncSessionLocal
+from src.pkm_app.infrastructure.cache.cached_note_repository import SyncCachedNoteRepository
+from src.pkm_app.infrastructure.cache.invalidation_bus import notify_invalidations_stmt
+from src.pkm_app.infrastructure.cache.note_cache import NoteCache
+from src.pkm_app.infrastructure.graph.link_graph_index import LinkGraphIndex
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import (
+    SyncReadOnlySessionLocal,
+    SyncSessionLocal,
+    engines,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.metrics import record_unit_of_work
+from src.pkm_app.infrastructure.persistence.sqlalchemy.query_stats import (
+    QueryStats,
+    start_recording,
+    stop_recording,
+)
+
+from .repositories.link_graph_sync_repository import SyncSQLAlchemyLinkGraphRepository
 
 # Importar la implementación concreta del NoteRepository síncrono
 from .repositories.note_sync_repository import SyncSQLAlchemyNoteRepository
+from .repositories.project_sync_repository import SyncSQLAlchemyProjectRepository
+from .repositories.write_tracking import NOTE_ENTITY
+
+logger = logging.getLogger(__name__)
 
 
 class SyncSQLAlchemyUnitOfWork(ISyncUnitOfWork):
@@ -20,10 +50,35 @@ class SyncSQLAlchemyUnitOfWork(ISyncUnitOfWork):
     Implementación síncrona del patrón Unit of Work utilizando SQLAlchemy Session.
     """
 
-    def __init__(self, session_factory: Any = SyncSessionLocal):
+    # Etiqueta unit_of_work de las métricas (metrics.py).
+    metrics_name = "sync"
+
+    def __init__(
+        self,
+        session_factory: Any = SyncSessionLocal,
+        note_cache: NoteCache | None = None,
+        publish_invalidations: bool = False,
+        link_graph_index: LinkGraphIndex | None = None,
+        query_stats_factory: Callable[[], QueryStats] = engines.new_query_stats,
+    ):
         self._session_factory = session_factory
         self._session: Session | None = None
+        # Caché de lectura de notas compartida entre UoW (ver infrastructure/cache).
+        self._note_cache = note_cache
+        # Si es True, el commit avisa a los demás procesos (NOTIFY) de lo escrito.
+        self._publish_invalidations = publish_invalidations
+        # Índice en memoria del grafo de enlaces: recibe los enlaces creados y borrados.
+        self._link_graph_index = link_graph_index
+        self._note_repository: SyncSQLAlchemyNoteRepository | None = None
+        self._cached_notes: SyncCachedNoteRepository | None = None
         self.notes: ISyncNoteRepository  # Declarar el tipo de repositorio síncrono
+        self.links: ISyncLinkGraphRepository
+        self.projects: ISyncProjectRepository
+        # Sentencias del último bloque 'with' (ver query_stats.py).
+        self._query_stats_factory = query_stats_factory
+        self.query_stats: QueryStats | None = None
+        self._query_stats_token: Token[tuple[QueryStats, ...]] | None = None
+        self._started = 0.0
 
     def __enter__(self) -> "ISyncUnitOfWork":  # Devuelve el tipo de la interfaz
         """
@@ -33,9 +88,20 @@ class SyncSQLAlchemyUnitOfWork(ISyncUnitOfWork):
 
         if self._session is None:  # Verificación para mypy, aunque __enter__ siempre crea la sesión
             raise ConnectionError("No se pudo crear la sesión de base de datos síncrona.")
+        self.query_stats = self._query_stats_factory()
+        self._query_stats_token = start_recording(self.query_stats)
+        self._started = time.perf_counter()
 
         # Instanciar el repositorio síncrono con la sesión actual
-        self.notes = SyncSQLAlchemyNoteRepository(self._session)
+        self._note_repository = SyncSQLAlchemyNoteRepository(self._session)
+        self.notes = self._note_repository
+        if self._note_cache is not None:
+            self._cached_notes = SyncCachedNoteRepository(self._note_repository, self._note_cache)
+            self.notes = self._cached_notes
+        self.links = SyncSQLAlchemyLinkGraphRepository(self._session, self._note_repository.touched)
+        self.projects = SyncSQLAlchemyProjectRepository(
+            self._session, self._note_repository.touched
+        )
         return self
 
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
@@ -54,6 +120,22 @@ class SyncSQLAlchemyUnitOfWork(ISyncUnitOfWork):
         finally:
             self._session.close()
             self._session = None  # Limpiar la sesión
+            self._stop_query_stats()
+            self._record_metrics(failed=exc_type is not None)
+
+    def _stop_query_stats(self) -> None:
+        if self._query_stats_token is None:
+            return
+        stop_recording(self._query_stats_token)
+        self._query_stats_token = None
+        if self.query_stats is not None:
+            logger.debug("Unidad de Trabajo: %s", self.query_stats.summary())
+
+    def _record_metrics(self, failed: bool) -> None:
+        statements = self.query_stats.statements if self.query_stats is not None else None
+        record_unit_of_work(
+            self.metrics_name, time.perf_counter() - self._started, failed, statements
+        )
 
     def sync_commit(self) -> None:
         """
@@ -62,10 +144,26 @@ class SyncSQLAlchemyUnitOfWork(ISyncUnitOfWork):
         if self._session is None:
             raise ConnectionError("La sesión no está activa. ¿Olvidaste usar 'with'?")
         try:
+            if self._publish_invalidations and self._note_repository is not None:
+                # En la misma transacción: solo se entrega si el commit tiene éxito.
+                notify_stmt = notify_invalidations_stmt(self._note_repository.touched)
+                if notify_stmt is not None:
+                    self._session.execute(notify_stmt)
             self._session.commit()
         except Exception:
-            self._session.rollback()
+            self.sync_rollback()
             raise
+        if self._note_repository is not None:
+            if self._link_graph_index is not None:
+                self._link_graph_index.apply(self._note_repository.touched.link_changes)
+            if self._cached_notes is not None:
+                # Incluye las notas de los proyectos editados o borrados.
+                self._cached_notes.pending_invalidations.update(
+                    self._note_repository.touched.keys(NOTE_ENTITY)
+                )
+            self._note_repository.touched.clear()
+        if self._cached_notes is not None:
+            self._cached_notes.commit_invalidations()
 
     def sync_rollback(self) -> None:
         """
@@ -74,6 +172,23 @@ class SyncSQLAlchemyUnitOfWork(ISyncUnitOfWork):
         if self._session is None:
             raise ConnectionError("La sesión no está activa. ¿Olvidaste usar 'with'?")
         self._session.rollback()
+        if self._note_repository is not None:
+            self._note_repository.touched.clear()
+        if self._cached_notes is not None:
+            self._cached_notes.discard_invalidations()
 
     # Los métodos asíncronos (__aenter__, __aexit__, commit, rollback)
     # ya no son parte de ISyncUnitOfWork, por lo que se eliminan de esta clase.
+
+
+class SyncSQLAlchemyReadOnlyUnitOfWork(SyncSQLAlchemyUnitOfWork):
+    """
+    UoW síncrona de solo lectura: sesiones de SyncReadOnlySessionLocal (réplica o primario,
+    solo lectura, sin autoflush) y sin caché de notas ni índice de enlaces, como
+    AsyncSQLAlchemyReadOnlyUnitOfWork.
+    """
+
+    metrics_name = "sync_read_only"
+
+    def __init__(self, session_factory: Any = SyncReadOnlySessionLocal) -> None:
+        super().__init__(session_factory=session_factory)
@@ -0,0 +1,87 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/search/embedders.py
+# ---------------------------------------------------------------------------
+"""
+Implementaciones de IEmbedder:
+
+- HashingEmbedder: local y determinista (bolsa de palabras con hashing), sin modelo ni red.
+  Sirve para tests y desarrollo offline: textos que comparten palabras quedan cerca en
+  distancia coseno, pero no captura significado.
+- GoogleGenAIEmbedder: API de embeddings de Gemini (paquete opcional `google-genai`).
+"""
+
+import hashlib
+import math
+import re
+from collections.abc import Sequence
+from typing import Any
+
+from src.pkm_app.core.application.interfaces.embedder_interface import IEmbedder
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import EMBEDDING_DIMENSIONS
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbedder(IEmbedder):
+    model = "local-hashing-v1"
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def embed_text(self, text: str) -> list[float]:
+        """Embedding normalizado de un texto (versión síncrona, sin lotes)."""
+        vector = [0.0] * self.dimensions
+        for word in _WORD_PATTERN.findall(text.lower()):
+            digest = hashlib.sha256(word.encode()).digest()
+            index = int.from_bytes(digest[:4], "big") % self.dimensions
+            vector[index] += 1.0 if digest[4] % 2 == 0 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    async def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        return [self.embed_text(text) for text in texts]
+
+
+class GoogleGenAIEmbedder(IEmbedder):
+    """
+    Embeddings de Gemini con el cliente asíncrono de `google-genai`: un lote de textos por
+    llamada a `embed_content`. La clave de API se toma del entorno (GOOGLE_API_KEY /
+    GEMINI_API_KEY) si no se pasa un cliente.
+    """
+
+    def __init__(
+        self,
+        model: str = "text-embedding-004",
+        dimensions: int = EMBEDDING_DIMENSIONS,
+        task_type: str = "RETRIEVAL_DOCUMENT",
+        client: Any | None = None,
+    ):
+        try:
+            from google import genai
+            from google.genai import types
+        except ImportError as exc:  # Dependencia opcional
+            raise RuntimeError(
+                "GoogleGenAIEmbedder requiere el paquete 'google-genai' (pip install google-genai)."
+            ) from exc
+        self._model_name = model
+        # El tipo de tarea cambia el vector: forma parte del identificador (clave de caché).
+        self.model = f"{model}:{task_type.lower()}"
+        self.dimensions = dimensions
+        self._client = client if client is not None else genai.Client()
+        self._config = types.EmbedContentConfig(
+            output_dimensionality=dimensions, task_type=task_type
+        )
+
+    async def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        response = await self._client.aio.models.embed_content(
+            model=self._model_name, contents=list(texts), config=self._config
+        )
+        vectors = [list(embedding.values) for embedding in response.embeddings]
+        if len(vectors) != len(texts):
+            raise RuntimeError(
+                f"El modelo {self.model} devolvió {len(vectors)} embeddings para "
+                f"{len(texts)} textos."
+            )
+        return vectors
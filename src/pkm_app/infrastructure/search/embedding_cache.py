@@ -0,0 +1,175 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/search/embedding_cache.py
+# ---------------------------------------------------------------------------
+"""
+Caché de embeddings en dos niveles delante de cualquier IEmbedder:
+
+    LRU en memoria (por proceso) -> tabla `embedding_cache` (compartida) -> modelo
+
+La clave es `(modelo, dimensiones, sha256(texto normalizado))`: notas duplicadas,
+ediciones revertidas, recálculos con el mismo modelo y consultas repetidas no vuelven a
+llamar al modelo. La normalización (Unicode NFC y espacios colapsados) solo elimina
+diferencias que no cambian el significado; el modelo recibe el texto normalizado, así que
+el vector guardado corresponde exactamente a la clave.
+
+Cada llamada a `embed` hace como mucho una consulta a la tabla (todos los fallos del LRU a
+la vez), una llamada al modelo (los fallos restantes) y un INSERT multi-fila.
+
+La caché es una optimización: si la base de datos falla se registra un aviso y se sigue
+con el modelo, nunca se pierde el embedding.
+"""
+
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.pkm_app.core.application.interfaces.embedder_interface import IEmbedder
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import AsyncSessionLocal
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.embedding_cache_statements import (
+    cached_embeddings_stmt,
+    store_embeddings_stmt,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_CACHE_SIZE = 10_000
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_embedding_text(text: str) -> str:
+    """Texto canónico de la clave de caché: NFC, espacios colapsados y sin extremos."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def embedding_text_hash(normalized_text: str) -> bytes:
+    """sha256 (32 bytes) de un texto ya normalizado."""
+    return hashlib.sha256(normalized_text.encode("utf-8")).digest()
+
+
+@dataclass
+class EmbeddingCacheStats:
+    """
+    Contadores acumulados, por texto distinto de cada llamada. La latencia de búsqueda
+    mide solo la caché (LRU + tabla), no la llamada al modelo.
+    """
+
+    memory_hits: int = 0
+    store_hits: int = 0
+    misses: int = 0
+    store_errors: int = 0
+    lookups: int = 0  # llamadas a embed
+    lookup_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fracción de textos servidos por la caché (memoria o tabla)."""
+        total = self.memory_hits + self.store_hits + self.misses
+        return (self.memory_hits + self.store_hits) / total if total else 0.0
+
+    @property
+    def mean_lookup_ms(self) -> float:
+        return self.lookup_seconds * 1000 / self.lookups if self.lookups else 0.0
+
+
+class CachedEmbedder(IEmbedder):
+    """
+    IEmbedder que envuelve a otro y cachea sus resultados. Se usa igual que el embedder
+    original, tanto en EmbeddingPipeline como para embeber consultas de búsqueda.
+    """
+
+    def __init__(
+        self,
+        embedder: IEmbedder,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        max_memory_entries: int = DEFAULT_MEMORY_CACHE_SIZE,
+        persistent: bool = True,
+    ):
+        if max_memory_entries < 0:
+            raise ValueError("max_memory_entries no puede ser negativo.")
+        self.embedder = embedder
+        self.model = embedder.model
+        self.dimensions = embedder.dimensions
+        self._session_factory = session_factory
+        self._max_memory_entries = max_memory_entries
+        self._persistent = persistent
+        self._memory: OrderedDict[bytes, list[float]] = OrderedDict()
+        self.stats = EmbeddingCacheStats()
+
+    def _remember(self, text_hash: bytes, vector: list[float]) -> None:
+        if self._max_memory_entries == 0:
+            return
+        self._memory[text_hash] = vector
+        self._memory.move_to_end(text_hash)
+        while len(self._memory) > self._max_memory_entries:
+            self._memory.popitem(last=False)
+
+    async def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        started = time.perf_counter()
+        normalized = [normalize_embedding_text(text) for text in texts]
+        hashes = [embedding_text_hash(text) for text in normalized]
+        text_by_hash = dict(zip(hashes, normalized, strict=True))
+
+        vectors: dict[bytes, list[float]] = {}
+        for text_hash in text_by_hash:
+            vector = self._memory.get(text_hash)
+            if vector is not None:
+                self._memory.move_to_end(text_hash)
+                vectors[text_hash] = vector
+        self.stats.memory_hits += len(vectors)
+
+        missing = [text_hash for text_hash in text_by_hash if text_hash not in vectors]
+        if missing and self._persistent:
+            stored = await self._load(missing)
+            self.stats.store_hits += len(stored)
+            for text_hash, vector in stored.items():
+                vectors[text_hash] = vector
+                self._remember(text_hash, vector)
+            missing = [text_hash for text_hash in missing if text_hash not in stored]
+        self.stats.lookups += 1
+        self.stats.lookup_seconds += time.perf_counter() - started
+
+        if missing:
+            self.stats.misses += len(missing)
+            computed = await self.embedder.embed([text_by_hash[h] for h in missing])
+            if len(computed) != len(missing):
+                raise RuntimeError(
+                    f"El embedder devolvió {len(computed)} vectores para {len(missing)} textos."
+                )
+            entries = list(zip(missing, computed, strict=True))
+            for text_hash, vector in entries:
+                vectors[text_hash] = vector
+                self._remember(text_hash, vector)
+            if self._persistent:
+                await self._store(entries)
+
+        return [vectors[text_hash] for text_hash in hashes]
+
+    async def _load(self, text_hashes: list[bytes]) -> dict[bytes, list[float]]:
+        try:
+            async with self._session_factory() as session:
+                rows = await session.execute(
+                    cached_embeddings_stmt(self.model, self.dimensions, text_hashes)
+                )
+                return {row.text_hash: [float(value) for value in row.embedding] for row in rows}
+        except SQLAlchemyError:
+            self.stats.store_errors += 1
+            logger.warning("No se pudo leer la caché de embeddings.", exc_info=True)
+            return {}
+
+    async def _store(self, entries: list[tuple[bytes, list[float]]]) -> None:
+        try:
+            async with self._session_factory() as session:
+                await session.execute(store_embeddings_stmt(self.model, self.dimensions, entries))
+                await session.commit()
+        except SQLAlchemyError:
+            self.stats.store_errors += 1
+            logger.warning("No se pudo guardar en la caché de embeddings.", exc_info=True)
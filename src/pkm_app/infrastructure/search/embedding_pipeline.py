@@ -0,0 +1,249 @@
+# ---------------------------------------------------------------------------
+# Archivo: src/pkm_app/infrastructure/search/embedding_pipeline.py
+# ---------------------------------------------------------------------------
+"""
+Pipeline asíncrono que mantiene `notes.embedding` al día sin bloquear las escrituras.
+
+    escritura (UoW.commit) -> enqueue(ids) -> cola -> worker:
+        1. lee (id, texto, content_hash) del lote en una sesión corta
+        2. descarta las notas cuyo embedding ya corresponde a su content_hash
+        3. agrupa los textos idénticos (un embedding por content_hash)
+        4. llama al embedder por sub-lotes, con como mucho `max_concurrency` llamadas a la vez
+        5. escribe todos los vectores con un único UPDATE executemany y confirma
+
+Para no pagar dos veces el mismo texto entre notas, ediciones revertidas o reinicios, el
+embedder suele ser un CachedEmbedder (embedding_cache.py) que envuelve al modelo real.
+
+El worker espera hasta `linger_seconds` a que se acumulen ids para llenar un lote: con
+ráfagas de escrituras hay menos llamadas al modelo y menos round trips.
+
+La cola vive en memoria: si el proceso termina con ids pendientes, esas notas siguen
+marcadas como desactualizadas en la base de datos (content_hash != embedding_content_hash)
+y `enqueue_stale()` las recupera al arrancar. Lo mismo cubre a los escritores que no
+encolan (repositorio síncrono, COPY, SQL manual).
+"""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.pkm_app.core.application.interfaces.embedder_interface import IEmbedder
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import AsyncSessionLocal
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import EMBEDDING_DIMENSIONS
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_embeddings import (
+    embedding_text,
+    notes_for_embedding_stmt,
+    stale_embedding_ids_stmt,
+    write_embeddings_stmt,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PIPELINE_BATCH_SIZE = 64
+DEFAULT_EMBED_BATCH_SIZE = 16
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_LINGER_SECONDS = 0.05
+STALE_SCAN_PAGE_SIZE = 1000
+
+
+@dataclass
+class EmbeddingPipelineStats:
+    """Contadores acumulados del pipeline (en número de notas, salvo embedder_calls)."""
+
+    enqueued: int = 0  # ids aceptados en la cola (sin contar los ya pendientes)
+    embedded: int = 0  # notas con embedding escrito
+    unchanged: int = 0  # notas descartadas porque su embedding ya estaba al día
+    deduplicated: int = 0  # notas que reutilizaron el embedding de un texto idéntico
+    superseded: int = 0  # notas editadas mientras se calculaba su embedding (no se escriben)
+    failed: int = 0  # notas de sub-lotes o lotes que fallaron (siguen pendientes en BD)
+    embedder_calls: int = 0
+
+
+class EmbeddingPipeline:
+    def __init__(
+        self,
+        embedder: IEmbedder,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        batch_size: int = DEFAULT_PIPELINE_BATCH_SIZE,
+        embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        linger_seconds: float = DEFAULT_LINGER_SECONDS,
+    ):
+        if embedder.dimensions != EMBEDDING_DIMENSIONS:
+            raise ValueError(
+                f"El embedder {embedder.model} produce vectores de {embedder.dimensions} "
+                f"dimensiones; notes.embedding tiene {EMBEDDING_DIMENSIONS}."
+            )
+        if min(batch_size, embed_batch_size, max_concurrency) < 1:
+            raise ValueError("batch_size, embed_batch_size y max_concurrency deben ser >= 1.")
+        if linger_seconds < 0:
+            raise ValueError("linger_seconds no puede ser negativo.")
+        self.embedder = embedder
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.embed_batch_size = embed_batch_size
+        self.linger_seconds = linger_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queue: asyncio.Queue[uuid.UUID] = asyncio.Queue()
+        # Ids en cola: encolar dos veces la misma nota antes de procesarla no duplica trabajo.
+        self._queued: set[uuid.UUID] = set()
+        self.stats = EmbeddingPipelineStats()
+
+    @property
+    def pending(self) -> int:
+        """Notas en cola pendientes de procesar."""
+        return self._queue.qsize()
+
+    def enqueue(self, note_ids: Iterable[uuid.UUID]) -> None:
+        """Encola notas cuyo texto pudo cambiar. No bloquea ni hace I/O."""
+        for note_id in note_ids:
+            if note_id in self._queued:
+                continue
+            self._queued.add(note_id)
+            self._queue.put_nowait(note_id)
+            self.stats.enqueued += 1
+
+    async def enqueue_stale(self, page_size: int = STALE_SCAN_PAGE_SIZE) -> int:
+        """
+        Encola todas las notas con embedding ausente o desactualizado (backfill y
+        recuperación tras reinicios). Devuelve cuántas había.
+        """
+        found = 0
+        after_id: uuid.UUID | None = None
+        while True:
+            async with self._session_factory() as session:
+                ids = (await session.scalars(stale_embedding_ids_stmt(after_id, page_size))).all()
+            self.enqueue(ids)
+            found += len(ids)
+            if len(ids) < page_size:
+                return found
+            after_id = ids[-1]
+
+    def _take(self) -> uuid.UUID:
+        note_id = self._queue.get_nowait()
+        # Sale del conjunto al sacarlo: si se edita otra vez durante el proceso, se reencola.
+        self._queued.discard(note_id)
+        return note_id
+
+    async def _next_batch(self) -> list[uuid.UUID]:
+        """Espera al primer id y, si el lote no está lleno, `linger_seconds` más."""
+        first = await self._queue.get()
+        self._queued.discard(first)
+        if self._queue.qsize() < self.batch_size - 1 and self.linger_seconds > 0:
+            await asyncio.sleep(self.linger_seconds)
+        return [first] + [
+            self._take() for _ in range(min(self.batch_size - 1, self._queue.qsize()))
+        ]
+
+    async def run(self) -> None:
+        """
+        Bucle del worker: procesa lotes hasta que se cancela la tarea
+        (`asyncio.create_task(pipeline.run())`). Un lote fallido se registra y no detiene
+        el worker; sus notas siguen pendientes en la base de datos.
+        """
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self.process_batch(batch)
+            except Exception:
+                self.stats.failed += len(batch)
+                logger.exception("Error al calcular embeddings de %d notas.", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def join(self) -> None:
+        """Espera a que el worker procese todo lo encolado."""
+        await self._queue.join()
+
+    async def drain(self) -> None:
+        """
+        Procesa en la tarea actual todo lo encolado, sin worker en segundo plano
+        (scripts de backfill, tests). No debe usarse a la vez que `run()`.
+        """
+        while not self._queue.empty():
+            batch = [self._take() for _ in range(min(self.batch_size, self._queue.qsize()))]
+            try:
+                await self.process_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def process_batch(self, note_ids: Sequence[uuid.UUID]) -> None:
+        """Calcula y guarda los embeddings desactualizados de `note_ids`."""
+        async with self._session_factory() as session:
+            rows = (await session.execute(notes_for_embedding_stmt(note_ids))).all()
+
+        # Un texto por content_hash: notas idénticas (plantillas, duplicados) comparten vector.
+        texts_by_hash: dict[str, str] = {}
+        ids_by_hash: dict[str, list[uuid.UUID]] = {}
+        for row in rows:
+            if row.embedding_content_hash == row.content_hash:
+                self.stats.unchanged += 1
+                continue
+            if row.content_hash in texts_by_hash:
+                self.stats.deduplicated += 1
+            else:
+                texts_by_hash[row.content_hash] = embedding_text(row.title, row.content)
+            ids_by_hash.setdefault(row.content_hash, []).append(row.id)
+        if not texts_by_hash:
+            return
+
+        vectors_by_hash = await self._embed_all(texts_by_hash)
+        self.stats.failed += sum(
+            len(ids)
+            for content_hash, ids in ids_by_hash.items()
+            if content_hash not in vectors_by_hash
+        )
+        params: list[dict[str, Any]] = [
+            {"note_id": note_id, "hash": content_hash, "vector": vector}
+            for content_hash, vector in vectors_by_hash.items()
+            for note_id in ids_by_hash[content_hash]
+        ]
+        if not params:
+            return
+        async with self._session_factory() as session:
+            result = await session.execute(write_embeddings_stmt(), params)
+            await session.commit()
+        # rowcount en executemany: filas actualizadas; el resto cambió de texto entretanto.
+        written = result.rowcount if result.rowcount >= 0 else len(params)
+        self.stats.embedded += written
+        self.stats.superseded += len(params) - written
+
+    async def _embed_all(self, texts_by_hash: dict[str, str]) -> dict[str, list[float]]:
+        hashes = list(texts_by_hash)
+        chunks = [
+            hashes[start : start + self.embed_batch_size]
+            for start in range(0, len(hashes), self.embed_batch_size)
+        ]
+        results = await asyncio.gather(
+            *(self._embed_chunk([texts_by_hash[h] for h in chunk]) for chunk in chunks),
+            return_exceptions=True,
+        )
+        vectors_by_hash: dict[str, list[float]] = {}
+        for chunk, result in zip(chunks, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error(
+                    "El embedder %s falló con un sub-lote de %d textos: %r",
+                    self.embedder.model,
+                    len(chunk),
+                    result,
+                )
+                continue
+            vectors_by_hash.update(zip(chunk, result, strict=True))
+        return vectors_by_hash
+
+    async def _embed_chunk(self, texts: list[str]) -> list[list[float]]:
+        async with self._semaphore:
+            self.stats.embedder_calls += 1
+            vectors = await self.embedder.embed(texts)
+        if len(vectors) != len(texts):
+            raise RuntimeError(
+                f"El embedder devolvió {len(vectors)} vectores para {len(texts)} textos."
+            )
+        return vectors
@@ -0,0 +1,84 @@
+# src/pkm_app/tests/benchmarks/bench_bulk_ingest.py
+"""
+Benchmark de ingesta: create() nota a nota frente a create_many() con COPY.
+
+Requiere una base de datos PostgreSQL migrada (mismas variables DB_* que la aplicación).
+Todo se ejecuta dentro de una transacción que se revierte al final.
+
+Uso:
+    python -m src.pkm_app.tests.benchmarks.bench_bulk_ingest --notes 20000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.pkm_app.core.application.dtos import NoteCreate
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import ASYNC_DATABASE_URL
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    UserProfile as UserProfileModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_async_repository import (
+    AsyncSQLAlchemyNoteRepository,
+)
+
+
+def _notes(count: int) -> list[NoteCreate]:
+    return [
+        NoteCreate(
+            title=f"Nota {i}",
+            content=f"Contenido de la nota {i}. " * 20,
+            note_metadata={"index": i},
+            keywords=[f"tag_{i % 50}", f"tag_{i % 7}", "bench"],
+        )
+        for i in range(count)
+    ]
+
+
+async def _run(note_count: int, single_count: int, batch_size: int) -> None:
+    engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, expire_on_commit=False)
+        user_id = f"bench_user_{uuid.uuid4()}"
+        session.add(UserProfileModel(user_id=user_id, name="Benchmark"))
+        await session.flush()
+        repository = AsyncSQLAlchemyNoteRepository(session)
+
+        start = time.perf_counter()
+        for note_in in _notes(single_count):
+            await repository.create(note_in, user_id)
+        elapsed = time.perf_counter() - start
+        print(
+            f"create():      {single_count:>7} notas en {elapsed:6.2f}s "
+            f"-> {single_count / elapsed:10.0f} notas/s"
+        )
+
+        notes_in = _notes(note_count)
+        start = time.perf_counter()
+        created = await repository.create_many(notes_in, user_id, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(
+            f"create_many(): {len(created):>7} notas en {elapsed:6.2f}s "
+            f"-> {len(created) / elapsed:10.0f} notas/s (batch_size={batch_size})"
+        )
+
+        await session.close()
+        await transaction.rollback()
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=20000)
+    parser.add_argument("--single", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.notes, args.single, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
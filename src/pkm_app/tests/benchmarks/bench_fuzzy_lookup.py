@@ -0,0 +1,157 @@
+# src/pkm_app/tests/benchmarks/bench_fuzzy_lookup.py
+"""
+Benchmark de "buscar mientras se escribe": latencia por pulsación de
+search_titles_fuzzy() y search_keywords_fuzzy() para un usuario con muchas notas.
+
+Los títulos se generan con un vocabulario real (palabras del código de la biblioteca
+estándar de Python, con su frecuencia) para que la distribución de trigramas se parezca a
+la de un corpus real. Se simula escribir palabras letra a letra, más una errata por palabra.
+
+Requiere una base de datos PostgreSQL migrada (mismas variables DB_* que la aplicación).
+A diferencia de otros benchmarks, las notas se confirman y se pasa VACUUM ANALYZE antes de
+medir (como haría autovacuum tras una importación): sin estadísticas de la tabla, el
+planificador no elige el recorrido KNN del índice GiST. El usuario de prueba y sus datos se
+borran al final.
+
+Uso:
+    python -m src.pkm_app.tests.benchmarks.bench_fuzzy_lookup --notes 100000
+"""
+
+import argparse
+import asyncio
+import collections
+import pathlib
+import random
+import re
+import sysconfig
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.pkm_app.core.application.dtos import NoteCreate
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import (
+    ASYNC_DATABASE_URL,
+    async_connect_args,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    UserProfile as UserProfileModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_async_repository import (
+    AsyncSQLAlchemyNoteRepository,
+)
+
+
+def _vocabulary() -> tuple[list[str], list[int]]:
+    counter: collections.Counter[str] = collections.Counter()
+    for path in sorted(pathlib.Path(sysconfig.get_paths()["stdlib"]).glob("*.py")):
+        words = re.findall(r"\b[a-z]{4,14}\b", path.read_text(errors="ignore").lower())
+        counter.update(words)
+    words, weights = zip(*counter.most_common(20000), strict=True)
+    return list(words), list(weights)
+
+
+def _notes(count: int, rng: random.Random) -> list[NoteCreate]:
+    words, weights = _vocabulary()
+    notes = []
+    for _ in range(count):
+        title_words = rng.choices(words, weights, k=rng.randint(2, 6))
+        notes.append(
+            NoteCreate(
+                title=" ".join(title_words).capitalize(),
+                content="Contenido de prueba",
+                keywords=rng.choices(words, k=rng.randint(0, 2)),
+            )
+        )
+    return notes
+
+
+def _keystrokes(words: list[str], rng: random.Random) -> list[str]:
+    queries = []
+    for word in words:
+        queries.extend(word[:length] for length in range(1, len(word) + 1))
+        position = rng.randrange(len(word) - 1)
+        queries.append(  # errata: dos letras intercambiadas
+            word[:position] + word[position + 1] + word[position] + word[position + 2 :]
+        )
+    return queries
+
+
+async def _measure(
+    label: str, queries: list[str], lookup: Callable[[str], Awaitable[list]]
+) -> None:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        await lookup(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    print(
+        f"{label}: {len(latencies):>5} pulsaciones | p50 {percentile(0.50):6.2f} ms | "
+        f"p95 {percentile(0.95):6.2f} ms | p99 {percentile(0.99):6.2f} ms | "
+        f"máx {latencies[-1]:6.2f} ms"
+    )
+
+
+async def _run(note_count: int, word_count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, connect_args=async_connect_args())
+    user_id = f"bench_user_{uuid.uuid4()}"
+    notes_in = _notes(note_count, rng)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(UserProfileModel(user_id=user_id, name="Benchmark"))
+        await session.flush()
+        await AsyncSQLAlchemyNoteRepository(session).create_many(notes_in, user_id)
+        await session.commit()
+    async with engine.connect() as connection:
+        autocommit = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await autocommit.execute(text("VACUUM ANALYZE notes"))
+        await autocommit.execute(text("VACUUM ANALYZE keywords"))
+
+    title_words = [
+        rng.choice(note.title.lower().split()) for note in rng.sample(notes_in, word_count)
+    ]
+    keyword_words = [
+        rng.choice(note.keywords) for note in rng.sample(notes_in, word_count * 4) if note.keywords
+    ][:word_count]
+
+    try:
+        async with AsyncSession(engine) as session:
+            repository = AsyncSQLAlchemyNoteRepository(session)
+            print(f"{note_count} notas")
+            await _measure(
+                "títulos ",
+                _keystrokes(title_words, rng),
+                lambda query: repository.search_titles_fuzzy(user_id, query),
+            )
+            await _measure(
+                "keywords",
+                _keystrokes(keyword_words, rng),
+                lambda query: repository.search_keywords_fuzzy(user_id, query),
+            )
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.execute(
+                delete(UserProfileModel).where(UserProfileModel.user_id == user_id)
+            )
+            await session.commit()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(_run(args.notes, args.words, args.seed))
+
+
+if __name__ == "__main__":
+    main()
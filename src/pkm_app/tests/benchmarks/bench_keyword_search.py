@@ -0,0 +1,185 @@
+# src/pkm_app/tests/benchmarks/bench_keyword_search.py
+"""
+Benchmark de búsqueda por varias keywords sobre un conjunto muy etiquetado (cada nota con
+`--min-tags` a `--max-tags` keywords de un vocabulario de `--vocabulary`).
+
+    join      JOIN note_keywords + name IN (...) (la ruta anterior de
+              search_by_keyword_names): una fila por keyword coincidente
+    any       semi-join notes.id IN (SELECT note_id ... WHERE name = ANY(...))
+    all       semi-join con GROUP BY note_id HAVING count(*) = número de keywords
+
+Se mide la página completa (consulta y DTOs) con una sesión nueva por búsqueda, y se
+cuenta cuántas notas distintas trae cada página: con el JOIN, las repetidas ocupan huecos
+del LIMIT.
+
+Requiere una base de datos PostgreSQL migrada (mismas variables DB_* que la aplicación).
+El usuario de prueba y sus datos se borran al final.
+
+Uso:
+    python -m src.pkm_app.tests.benchmarks.bench_keyword_search --notes 20000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.pkm_app.core.application.dtos import NoteCreate, NoteSchema
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import ASYNC_DATABASE_URL
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Keyword as KeywordModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    UserProfile as UserProfileModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_async_repository import (
+    AsyncSQLAlchemyNoteRepository,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_pagination import (
+    paginate_notes_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_projection import (
+    note_columns_stmt,
+    notes_from_rows,
+    projected_notes_stmt,
+)
+
+
+async def _join_page(
+    session: AsyncSession, user_id: str, names: list[str], limit: int
+) -> list[NoteSchema]:
+    stmt = note_columns_stmt(NoteModel.user_id == user_id, KeywordModel.name.in_(names)).join(
+        NoteModel.keywords
+    )
+    stmt = paginate_notes_stmt(stmt, skip=0, limit=limit, cursor=None)
+    return notes_from_rows((await session.execute(projected_notes_stmt(stmt))).all())
+
+
+async def _measure(
+    label: str,
+    engine,
+    searches: list[list[str]],
+    search: Callable[[AsyncSession, list[str]], Awaitable[list[NoteSchema]]],
+) -> float:
+    latencies = []
+    returned = distinct = 0
+    for names in searches:
+        async with AsyncSession(engine) as session:
+            start = time.perf_counter()
+            notes = await search(session, names)
+            latencies.append((time.perf_counter() - start) * 1000)
+        returned += len(notes)
+        distinct += len({note.id for note in notes})
+    latencies.sort()
+    mean = statistics.fmean(latencies)
+    print(
+        f"{label}: {len(latencies)} búsquedas | media {mean:7.2f} ms | "
+        f"p50 {latencies[len(latencies) // 2]:7.2f} ms | "
+        f"p95 {latencies[int(len(latencies) * 0.95)]:7.2f} ms | "
+        f"filas {returned} ({distinct} notas distintas)"
+    )
+    return mean
+
+
+async def _run(
+    note_count: int,
+    vocabulary: int,
+    min_tags: int,
+    max_tags: int,
+    searches: int,
+    page_size: int,
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+    user_id = f"bench_user_{uuid.uuid4()}"
+    words = [f"kw_{i}" for i in range(vocabulary)]
+    async with AsyncSession(engine) as session:
+        session.add(UserProfileModel(user_id=user_id, name="Benchmark"))
+        await session.flush()
+        await AsyncSQLAlchemyNoteRepository(session).create_many(
+            (
+                NoteCreate(
+                    title=f"Nota {i}",
+                    content="Contenido de prueba",
+                    keywords=rng.sample(words, rng.randint(min_tags, max_tags)),
+                )
+                for i in range(note_count)
+            ),
+            user_id,
+        )
+        await session.commit()
+    async with engine.connect() as connection:
+        autocommit = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("notes", "keywords", "note_keywords"):
+            await autocommit.execute(text(f"VACUUM ANALYZE {table}"))
+
+    queries = [rng.sample(words, rng.randint(2, 4)) for _ in range(searches)]
+    try:
+        print(
+            f"{note_count} notas, {min_tags}-{max_tags} keywords por nota de {vocabulary}, "
+            f"páginas de {page_size}"
+        )
+
+        def repository_search(match: str):
+            return lambda session, names: AsyncSQLAlchemyNoteRepository(
+                session
+            ).search_by_keyword_names(names, None, user_id, limit=page_size, match=match)
+
+        # Calentamiento: caché de compilación de SQLAlchemy y de sentencias de asyncpg.
+        async with AsyncSession(engine) as session:
+            await _join_page(session, user_id, queries[0], page_size)
+            for match in ("any", "all"):
+                await repository_search(match)(session, queries[0])
+        join = await _measure(
+            "join",
+            engine,
+            queries,
+            lambda session, names: _join_page(session, user_id, names, page_size),
+        )
+        semi_join = await _measure("any ", engine, queries, repository_search("any"))
+        await _measure("all ", engine, queries, repository_search("all"))
+        print(f"any frente a join: x{join / semi_join:.2f}")
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.execute(
+                delete(UserProfileModel).where(UserProfileModel.user_id == user_id)
+            )
+            await session.commit()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=20000)
+    parser.add_argument("--vocabulary", type=int, default=200)
+    parser.add_argument("--min-tags", type=int, default=10)
+    parser.add_argument("--max-tags", type=int, default=30)
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(
+        _run(
+            args.notes,
+            args.vocabulary,
+            args.min_tags,
+            args.max_tags,
+            args.searches,
+            args.page_size,
+            args.seed,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# src/pkm_app/tests/benchmarks/bench_note_projection.py
+"""
+Benchmark de listados: páginas de `--page-size` notas con keywords, proyecto y fuente.
+
+    orm        select(NoteModel) + selectinload(keywords) + joinedload(project, source)
+               + NoteSchema.model_validate (la ruta anterior de list_by_user)
+    proyección list_by_user: columnas explícitas, keywords con json_agg, filas -> DTO
+
+Cada página se lee con una sesión nueva, como en una petición real (sin identity map
+caliente). Se mide la página completa: consulta, hidratación y DTOs.
+
+Requiere una base de datos PostgreSQL migrada (mismas variables DB_* que la aplicación).
+El usuario de prueba y sus datos se borran al final.
+
+Uso:
+    python -m src.pkm_app.tests.benchmarks.bench_note_projection --notes 5000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import joinedload, selectinload
+
+from src.pkm_app.core.application.dtos import NoteCreate, NoteSchema
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import ASYNC_DATABASE_URL
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Project as ProjectModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Source as SourceModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    UserProfile as UserProfileModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_async_repository import (
+    AsyncSQLAlchemyNoteRepository,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_pagination import (
+    paginate_notes_stmt,
+)
+
+
+async def _orm_page(session: AsyncSession, user_id: str, skip: int, limit: int) -> list:
+    stmt = (
+        select(NoteModel)
+        .where(NoteModel.user_id == user_id)
+        .options(
+            selectinload(NoteModel.keywords),
+            joinedload(NoteModel.project),
+            joinedload(NoteModel.source),
+        )
+    )
+    stmt = paginate_notes_stmt(stmt, skip=skip, limit=limit, cursor=None)
+    notes = (await session.execute(stmt)).scalars().all()
+    return [NoteSchema.model_validate(note) for note in notes]
+
+
+async def _measure(
+    label: str,
+    engine,
+    offsets: list[int],
+    read_page: Callable[[AsyncSession, int], Awaitable[list]],
+) -> float:
+    latencies = []
+    for skip in offsets:
+        async with AsyncSession(engine) as session:
+            start = time.perf_counter()
+            await read_page(session, skip)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    mean = statistics.fmean(latencies)
+    print(
+        f"{label}: {len(latencies)} páginas | media {mean:6.2f} ms | "
+        f"p50 {latencies[len(latencies) // 2]:6.2f} ms | "
+        f"p95 {latencies[int(len(latencies) * 0.95)]:6.2f} ms"
+    )
+    return mean
+
+
+async def _run(note_count: int, page_size: int, pages: int, seed: int) -> None:
+    rng = random.Random(seed)
+    engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+    user_id = f"bench_user_{uuid.uuid4()}"
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(UserProfileModel(user_id=user_id, name="Benchmark"))
+        await session.flush()
+        projects = [ProjectModel(user_id=user_id, name=f"Proyecto {i}") for i in range(20)]
+        sources = [
+            SourceModel(user_id=user_id, type="web", url=f"https://example.com/{i}")
+            for i in range(50)
+        ]
+        session.add_all([*projects, *sources])
+        await session.flush()
+        await AsyncSQLAlchemyNoteRepository(session).create_many(
+            (
+                NoteCreate(
+                    title=f"Nota {i}",
+                    content="Contenido de prueba " * rng.randint(5, 50),
+                    note_metadata={"index": i},
+                    project_id=rng.choice(projects).id if rng.random() < 0.7 else None,
+                    source_id=rng.choice(sources).id if rng.random() < 0.3 else None,
+                    keywords=[f"kw_{rng.randrange(500)}" for _ in range(rng.randint(0, 6))],
+                )
+                for i in range(note_count)
+            ),
+            user_id,
+        )
+        await session.commit()
+    async with engine.connect() as connection:
+        autocommit = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await autocommit.execute(text("VACUUM ANALYZE notes"))
+        await autocommit.execute(text("VACUUM ANALYZE note_keywords"))
+
+    offsets = [
+        rng.randrange(max(1, note_count - page_size)) // page_size * page_size for _ in range(pages)
+    ]
+    try:
+        print(f"{note_count} notas, páginas de {page_size}")
+        # Calentamiento: caché de compilación de SQLAlchemy y de sentencias de asyncpg.
+        async with AsyncSession(engine) as session:
+            await _orm_page(session, user_id, 0, page_size)
+            await AsyncSQLAlchemyNoteRepository(session).list_by_user(user_id, limit=page_size)
+        orm = await _measure(
+            "orm       ",
+            engine,
+            offsets,
+            lambda session, skip: _orm_page(session, user_id, skip, page_size),
+        )
+        projection = await _measure(
+            "proyección",
+            engine,
+            offsets,
+            lambda session, skip: AsyncSQLAlchemyNoteRepository(session).list_by_user(
+                user_id, skip=skip, limit=page_size
+            ),
+        )
+        print(f"mejora: x{orm / projection:.2f}")
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.execute(
+                delete(UserProfileModel).where(UserProfileModel.user_id == user_id)
+            )
+            await session.commit()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(_run(args.notes, args.page_size, args.pages, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+# src/pkm_app/tests/benchmarks/bench_project_tree.py
+"""
+Benchmark de consultas sobre la jerarquía de proyectos: `--projects` proyectos en
+`--depth` niveles bajo una sola raíz (cada proyecto cuelga de uno al azar del nivel
+anterior), con `--notes-per-project` notas cada uno.
+
+    cte       CTE recursivo sobre parent_project_id, un nivel por iteración
+    path      ruta materializada projects.path (índice GIN, repositorio actual)
+
+Para cada forma se miden tres consultas con una sesión nueva por búsqueda: subproyectos
+de proyectos de los niveles 1 y 2 (subárboles grandes), ancestros de hojas y la primera
+página de notas de un subárbol (search_by_project con include_subprojects).
+
+Requiere una base de datos PostgreSQL migrada (mismas variables DB_* que la aplicación).
+El usuario de prueba y sus datos se borran al final.
+
+Uso:
+    python -m src.pkm_app.tests.benchmarks.bench_project_tree --projects 10000 --depth 12
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import Select, delete, insert, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.pkm_app.core.application.dtos import NoteCreate
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import ASYNC_DATABASE_URL
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Project as ProjectModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    UserProfile as UserProfileModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import generate_uuid
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_async_repository import (
+    AsyncSQLAlchemyNoteRepository,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_pagination import (
+    paginate_notes_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_projection import (
+    note_columns_stmt,
+    notes_from_rows,
+    projected_notes_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.project_async_repository import (
+    AsyncSQLAlchemyProjectRepository,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.project_tree import (
+    projects_from_rows,
+)
+
+_COLUMNS = (
+    ProjectModel.id,
+    ProjectModel.user_id,
+    ProjectModel.name,
+    ProjectModel.description,
+    ProjectModel.parent_project_id,
+    ProjectModel.created_at,
+    ProjectModel.updated_at,
+)
+
+
+def _cte_subtree(user_id: str, project_id: uuid.UUID) -> Any:
+    tree = (
+        select(ProjectModel.id, literal(1).label("depth"))
+        .where(ProjectModel.user_id == user_id, ProjectModel.parent_project_id == project_id)
+        .cte("tree", recursive=True)
+    )
+    return tree.union_all(
+        select(ProjectModel.id, tree.c.depth + 1).join(
+            tree, ProjectModel.parent_project_id == tree.c.id
+        )
+    )
+
+
+def _cte_descendants_stmt(user_id: str, project_id: uuid.UUID) -> Select[Any]:
+    tree = _cte_subtree(user_id, project_id)
+    return (
+        select(*_COLUMNS)
+        .join(tree, tree.c.id == ProjectModel.id)
+        .order_by(tree.c.depth, ProjectModel.name, ProjectModel.id)
+    )
+
+
+def _cte_ancestors_stmt(user_id: str, project_id: uuid.UUID) -> Select[Any]:
+    chain = (
+        select(ProjectModel.parent_project_id.label("id"), literal(1).label("height"))
+        .where(ProjectModel.user_id == user_id, ProjectModel.id == project_id)
+        .cte("chain", recursive=True)
+    )
+    chain = chain.union_all(
+        select(ProjectModel.parent_project_id, chain.c.height + 1).join(
+            chain, ProjectModel.id == chain.c.id
+        )
+    )
+    return (
+        select(*_COLUMNS).join(chain, chain.c.id == ProjectModel.id).order_by(chain.c.height.desc())
+    )
+
+
+async def _cte_notes_page(
+    session: AsyncSession, user_id: str, project_id: uuid.UUID, limit: int
+) -> list[Any]:
+    tree = _cte_subtree(user_id, project_id)
+    subtree_ids = select(tree.c.id).union_all(select(literal(project_id)))
+    stmt = note_columns_stmt(NoteModel.user_id == user_id, NoteModel.project_id.in_(subtree_ids))
+    stmt = paginate_notes_stmt(stmt, skip=0, limit=limit, cursor=None)
+    return notes_from_rows((await session.execute(projected_notes_stmt(stmt))).all())
+
+
+async def _measure(
+    label: str,
+    engine,
+    project_ids: list[uuid.UUID],
+    query: Callable[[AsyncSession, uuid.UUID], Awaitable[list[Any]]],
+) -> float:
+    latencies = []
+    returned = 0
+    for project_id in project_ids:
+        async with AsyncSession(engine) as session:
+            start = time.perf_counter()
+            rows = await query(session, project_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+        returned += len(rows)
+    latencies.sort()
+    mean = statistics.fmean(latencies)
+    print(
+        f"{label}: {len(latencies)} consultas | media {mean:7.2f} ms | "
+        f"p50 {latencies[len(latencies) // 2]:7.2f} ms | "
+        f"p95 {latencies[int(len(latencies) * 0.95)]:7.2f} ms | filas {returned}"
+    )
+    return mean
+
+
+async def _create_tree(
+    session: AsyncSession, user_id: str, project_count: int, depth: int, rng: random.Random
+) -> list[list[uuid.UUID]]:
+    """Crea el árbol nivel a nivel (más proyectos cuanto más profundo) y devuelve los niveles."""
+    weights = range(1, depth)
+    sizes = [1] + [max(1, round((project_count - 1) * weight / sum(weights))) for weight in weights]
+    levels: list[list[uuid.UUID]] = []
+    for level, size in enumerate(sizes):
+        rows = [
+            {
+                "id": generate_uuid(),
+                "user_id": user_id,
+                "name": f"Proyecto {level}.{i}",
+                "parent_project_id": rng.choice(levels[-1]) if levels else None,
+            }
+            for i in range(size)
+        ]
+        await session.execute(insert(ProjectModel), rows)
+        levels.append([row["id"] for row in rows])
+    return levels
+
+
+async def _run(
+    project_count: int,
+    depth: int,
+    notes_per_project: int,
+    queries: int,
+    page_size: int,
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+    user_id = f"bench_user_{uuid.uuid4()}"
+    async with AsyncSession(engine) as session:
+        session.add(UserProfileModel(user_id=user_id, name="Benchmark"))
+        await session.flush()
+        levels = await _create_tree(session, user_id, project_count, depth, rng)
+        all_projects = [project_id for level in levels for project_id in level]
+        await AsyncSQLAlchemyNoteRepository(session).create_many(
+            (
+                NoteCreate(title=f"Nota {i}", content="Contenido de prueba", project_id=project_id)
+                for project_id in all_projects
+                for i in range(notes_per_project)
+            ),
+            user_id,
+        )
+        await session.commit()
+    async with engine.connect() as connection:
+        autocommit = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("projects", "notes"):
+            await autocommit.execute(text(f"VACUUM ANALYZE {table}"))
+
+    upper = [project_id for level in levels[1:3] for project_id in level]
+    subtrees = [rng.choice(upper) for _ in range(queries)]
+    leaves = [rng.choice(levels[-1]) for _ in range(queries)]
+    try:
+        print(
+            f"{sum(map(len, levels))} proyectos en {len(levels)} niveles, "
+            f"{notes_per_project} notas por proyecto, páginas de {page_size}"
+        )
+
+        async def cte_descendants(session: AsyncSession, project_id: uuid.UUID) -> list[Any]:
+            result = await session.execute(_cte_descendants_stmt(user_id, project_id))
+            return projects_from_rows(result.all())
+
+        async def cte_ancestors(session: AsyncSession, project_id: uuid.UUID) -> list[Any]:
+            result = await session.execute(_cte_ancestors_stmt(user_id, project_id))
+            return projects_from_rows(result.all())
+
+        shapes: dict[str, list[tuple[str, Callable[..., Awaitable[list[Any]]]]]] = {
+            "subproyectos": [
+                ("cte ", cte_descendants),
+                (
+                    "path",
+                    lambda session, pid: AsyncSQLAlchemyProjectRepository(session).get_descendants(
+                        pid, user_id
+                    ),
+                ),
+            ],
+            "ancestros": [
+                ("cte ", cte_ancestors),
+                (
+                    "path",
+                    lambda session, pid: AsyncSQLAlchemyProjectRepository(session).get_ancestors(
+                        pid, user_id
+                    ),
+                ),
+            ],
+            "notas del subárbol": [
+                ("cte ", lambda session, pid: _cte_notes_page(session, user_id, pid, page_size)),
+                (
+                    "path",
+                    lambda session, pid: AsyncSQLAlchemyNoteRepository(session).search_by_project(
+                        pid, user_id, limit=page_size, include_subprojects=True
+                    ),
+                ),
+            ],
+        }
+        for name, variants in shapes.items():
+            project_ids = leaves if name == "ancestros" else subtrees
+            print(f"-- {name}")
+            # Calentamiento: caché de compilación de SQLAlchemy y de sentencias de asyncpg.
+            async with AsyncSession(engine) as session:
+                for _, query in variants:
+                    await query(session, project_ids[0])
+            means = [await _measure(label, engine, project_ids, query) for label, query in variants]
+            print(f"path frente a cte: x{means[0] / means[1]:.2f}")
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.execute(
+                delete(UserProfileModel).where(UserProfileModel.user_id == user_id)
+            )
+            await session.commit()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--projects", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--notes-per-project", type=int, default=2)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(
+        _run(
+            args.projects,
+            args.depth,
+            args.notes_per_project,
+            args.queries,
+            args.page_size,
+            args.seed,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# src/pkm_app/tests/benchmarks/bench_uuid_keys.py
+"""
+Benchmark de claves primarias UUIDv4 frente a UUIDv7: velocidad de inserción y tamaño de
+los índices tras cargar `--rows` filas en lotes de `--batch-size`.
+
+    v4         ids aleatorios generados en Python (uuid.uuid4, el generate_uuid anterior)
+    v7         ids ordenados por tiempo generados en Python (generate_uuid actual)
+    v7-server  ids del server_default (uuid_generate_v7() de la migración)
+
+Cada variante carga dos tablas con la forma de notes y note_keywords: una con
+clave primaria `id` y filas de `--row-width` bytes, y otra con clave primaria compuesta
+`(note_id, keyword_id)` y `--keywords-per-row` filas por nota sobre un vocabulario de
+`--vocabulary` keywords. Con v4 cada lote escribe en páginas repartidas por todo el btree
+(y las parte a la mitad); con v7 escribe al final del índice, que queda más compacto.
+
+Las tablas son normales (no temporales): pasan por shared_buffers y el WAL, donde se nota
+el coste de las páginas partidas y de las escrituras de página completa tras cada
+checkpoint.
+
+Requiere una base de datos PostgreSQL migrada (mismas variables DB_* que la aplicación).
+Las tablas de prueba se borran al terminar cada variante.
+
+Uso:
+    python -m src.pkm_app.tests.benchmarks.bench_uuid_keys --rows 5000000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections.abc import Callable
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import ASYNC_DATABASE_URL
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import uuid7
+
+_UUIDS = ARRAY(UUID(as_uuid=True))
+_GENERATORS: dict[str, Callable[[], uuid.UUID] | None] = {
+    "v4": uuid.uuid4,
+    "v7": uuid7,
+    "v7-server": None,
+}
+
+
+async def _create_tables(connection: AsyncConnection, variant: str) -> tuple[str, str]:
+    suffix = variant.replace("-", "_")
+    notes, links = f"bench_notes_{suffix}", f"bench_links_{suffix}"
+    await connection.execute(
+        text(
+            f"CREATE TABLE {notes} ("
+            "id uuid PRIMARY KEY DEFAULT uuid_generate_v7(), "
+            "created_at timestamptz NOT NULL DEFAULT now(), "
+            "content text NOT NULL)"
+        )
+    )
+    await connection.execute(
+        text(
+            f"CREATE TABLE {links} ("
+            "note_id uuid NOT NULL, keyword_id uuid NOT NULL, "
+            "PRIMARY KEY (note_id, keyword_id))"
+        )
+    )
+    return notes, links
+
+
+async def _load(
+    connection: AsyncConnection,
+    variant: str,
+    rows: int,
+    batch_size: int,
+    row_width: int,
+    keywords_per_row: int,
+    keyword_ids: list[uuid.UUID],
+    rng: random.Random,
+) -> None:
+    notes, links = await _create_tables(connection, variant)
+    await connection.commit()
+    try:
+        await _insert_batches(
+            connection,
+            variant,
+            notes,
+            links,
+            rows,
+            batch_size,
+            row_width,
+            keywords_per_row,
+            keyword_ids,
+            rng,
+        )
+    finally:
+        await connection.rollback()
+        await connection.execute(text(f"DROP TABLE {notes}, {links}"))
+        await connection.commit()
+
+
+async def _insert_batches(
+    connection: AsyncConnection,
+    variant: str,
+    notes: str,
+    links: str,
+    rows: int,
+    batch_size: int,
+    row_width: int,
+    keywords_per_row: int,
+    keyword_ids: list[uuid.UUID],
+    rng: random.Random,
+) -> None:
+    generate = _GENERATORS[variant]
+    if generate is None:
+        insert_notes = text(
+            f"INSERT INTO {notes} (content) "
+            "SELECT repeat('x', :width) FROM generate_series(1, :count) RETURNING id"
+        )
+    else:
+        insert_notes = text(
+            f"INSERT INTO {notes} (id, content) "
+            "SELECT id, repeat('x', :width) FROM unnest(:ids) AS id RETURNING id"
+        ).bindparams(bindparam("ids", type_=_UUIDS))
+    insert_links = text(
+        f"INSERT INTO {links} (note_id, keyword_id) "
+        "SELECT * FROM unnest(:note_ids, :keyword_ids)"
+    ).bindparams(bindparam("note_ids", type_=_UUIDS), bindparam("keyword_ids", type_=_UUIDS))
+
+    start = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        count = min(batch_size, rows - offset)
+        params: dict[str, object] = {"width": row_width}
+        if generate is None:
+            params["count"] = count
+        else:
+            params["ids"] = [generate() for _ in range(count)]
+        note_ids = (await connection.execute(insert_notes, params)).scalars().all()
+        if keywords_per_row:
+            pairs = [
+                (note_id, keyword_id)
+                for note_id in note_ids
+                for keyword_id in rng.sample(keyword_ids, keywords_per_row)
+            ]
+            await connection.execute(
+                insert_links,
+                {
+                    "note_ids": [note_id for note_id, _ in pairs],
+                    "keyword_ids": [keyword_id for _, keyword_id in pairs],
+                },
+            )
+        await connection.commit()
+    elapsed = time.perf_counter() - start
+
+    sizes = (
+        await connection.execute(
+            text(
+                "SELECT pg_relation_size(:notes_pk), pg_relation_size(:links_pk), "
+                "pg_relation_size(:notes)"
+            ),
+            {"notes_pk": f"{notes}_pkey", "links_pk": f"{links}_pkey", "notes": notes},
+        )
+    ).one()
+    print(
+        f"{variant:9}: {rows / elapsed:9.0f} filas/s ({elapsed:7.1f} s) | "
+        f"pk notas {sizes[0] / 2**20:8.1f} MiB | pk note_keywords {sizes[1] / 2**20:8.1f} MiB | "
+        f"tabla {sizes[2] / 2**20:8.1f} MiB"
+    )
+
+
+async def _run(
+    rows: int,
+    batch_size: int,
+    row_width: int,
+    keywords_per_row: int,
+    vocabulary: int,
+    variants: list[str],
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+    keyword_ids = [uuid.uuid4() for _ in range(vocabulary)]
+    try:
+        print(
+            f"{rows} filas en lotes de {batch_size}, {keywords_per_row} keywords por fila "
+            f"de {vocabulary}"
+        )
+        async with engine.connect() as connection:
+            for variant in variants:
+                await _load(
+                    connection,
+                    variant,
+                    rows,
+                    batch_size,
+                    row_width,
+                    keywords_per_row,
+                    keyword_ids,
+                    rng,
+                )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--row-width", type=int, default=200)
+    parser.add_argument("--keywords-per-row", type=int, default=2)
+    parser.add_argument("--vocabulary", type=int, default=1000)
+    parser.add_argument(
+        "--variants", nargs="+", choices=list(_GENERATORS), default=list(_GENERATORS)
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(
+        _run(
+            args.rows,
+            args.batch_size,
+            args.row_width,
+            args.keywords_per_row,
+            args.vocabulary,
+            args.variants,
+            args.seed,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
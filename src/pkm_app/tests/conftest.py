@@ -1,7 +1,12 @@
 # src/pkm_app/tests/conftest.py
 import asyncio
+import os
 import sys
 
+# Los tests lanzan RepeatedStatementError en vez de solo avisar cuando una misma sentencia se
+# repite demasiado dentro de una Unidad de Trabajo (ver persistence/sqlalchemy/query_stats.py).
+os.environ.setdefault("DB_STRICT_QUERY_CHECKS", "true")
+
 if sys.platform == "win32":
     # Cambiar a SelectorEventLoopPolicy en Windows para intentar resolver
     # problemas con ProactorEventLoop y asyncpg/SQLAlchemy al cerrar conexiones.
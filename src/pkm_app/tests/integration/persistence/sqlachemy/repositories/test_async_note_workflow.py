@@ -1,25 +1,41 @@
 # tests/integration/persistence/test_note_workflow.py
 
+import asyncio
+
 import pytest
 import pytest_asyncio  # For async fixtures
 import uuid
 from typing import AsyncIterator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 # Importaciones de la aplicación
 # Ajusta las rutas si es necesario según tu estructura exacta
-from src.pkm_app.infrastructure.persistence.sqlalchemy.database import ASYNC_DATABASE_URL
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import (
+    ASYNC_DATABASE_URL,
+    async_connect_args,
+)
 from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
     Base,
 )  # Importa Base para asegurarte de que los modelos están registrados
 from src.pkm_app.infrastructure.persistence.sqlalchemy.async_unit_of_work import (
+    AsyncSQLAlchemyReadOnlyUnitOfWork,
     AsyncSQLAlchemyUnitOfWork,
 )
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import EngineRegistry
+from src.pkm_app.infrastructure.persistence.sqlalchemy.query_stats import (
+    QueryStats,
+    RepeatedStatementError,
+    instrument_engine,
+)
+from src.pkm_app.infrastructure.config.settings import Settings, get_settings
 from src.pkm_app.core.application.dtos import (
     NoteCreate,
     NoteSchema,
+    NoteUpdate,
     UserProfileCreate,
 )  # Pydantic schemas
 from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
@@ -28,12 +44,44 @@ from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
 from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
     Note as NoteModel,
 )  # Para verificar directamente si es necesario
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_embeddings import (
+    embedding_text,
+)
+from src.pkm_app.infrastructure.cache.invalidation_bus import CacheInvalidationListener
+from src.pkm_app.infrastructure.cache.note_cache import NoteCache
+from src.pkm_app.infrastructure.search.embedders import HashingEmbedder
+from src.pkm_app.infrastructure.search.embedding_cache import CachedEmbedder
+from src.pkm_app.infrastructure.search.embedding_pipeline import EmbeddingPipeline
+
+
+# Embedder local y determinista: los tests de búsqueda semántica no dependen de la red.
+embedder = HashingEmbedder()
+
+
+class RecordingEmbedder(HashingEmbedder):
+    """HashingEmbedder que registra los textos recibidos y las llamadas simultáneas."""
+
+    def __init__(self):
+        super().__init__()
+        self.texts: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def embed(self, texts):
+        self.texts.extend(texts)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)  # Simula la latencia de una API remota
+            return await super().embed(texts)
+        finally:
+            self.in_flight -= 1
 
 
 # --- Fixtures de Pytest ---
 
 
-@pytest_asyncio.fixture(scope="session")
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def test_engine_instance():
     """
     Fixture de sesión para crear un motor de base de datos para las pruebas.
@@ -42,13 +90,14 @@ async def test_engine_instance():
     (creado por tu seed.sql). No intenta crear/eliminar tablas.
     """
     engine = create_async_engine(
-        ASYNC_DATABASE_URL, echo=False
+        ASYNC_DATABASE_URL, echo=False, connect_args=async_connect_args()
     )  # echo=False para tests más limpios
+    instrument_engine(engine.sync_engine)  # Contadores por UoW y detector de N+1 (estricto)
     yield engine
     await engine.dispose()  # Cierra las conexiones del motor al final de la sesión de tests
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(loop_scope="session")
 async def db_transactional_session(test_engine_instance) -> AsyncIterator[AsyncSession]:
     """
     Fixture que proporciona una sesión de base de datos SQLAlchemy AsyncSession.
@@ -71,7 +120,7 @@ async def db_transactional_session(test_engine_instance) -> AsyncIterator[AsyncS
                 await session.close()
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(loop_scope="session")
 async def uow(db_transactional_session: AsyncSession) -> AsyncSQLAlchemyUnitOfWork:
     """
     Fixture que proporciona una instancia de AsyncSQLAlchemyUnitOfWork.
@@ -83,7 +132,7 @@ async def uow(db_transactional_session: AsyncSession) -> AsyncSQLAlchemyUnitOfWo
     return uow_instance
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(loop_scope="session")
 async def test_user(db_transactional_session: AsyncSession) -> UserProfileModel:
     """
     Fixture para crear un usuario de prueba dentro de la transacción del test.
@@ -104,7 +153,7 @@ async def test_user(db_transactional_session: AsyncSession) -> UserProfileModel:
 # --- Test Cases ---
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_create_and_retrieve_note_with_uow(
     uow: AsyncSQLAlchemyUnitOfWork, test_user: UserProfileModel
 ):
@@ -172,3 +221,442 @@ async def test_create_and_retrieve_note_with_uow(
     # Verificar metadatos de la nota recuperada
     assert retrieved_note_schema.note_metadata is not None
     assert retrieved_note_schema.note_metadata.get("status") == "draft"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_create_many_with_uow(uow: AsyncSQLAlchemyUnitOfWork, test_user: UserProfileModel):
+    """
+    La ingesta masiva (COPY vía asyncpg) crea notas y keywords en lotes
+    y devuelve los IDs en el orden de entrada.
+    """
+    user_id = test_user.user_id
+    notes_in = (
+        NoteCreate(
+            title=f"Nota masiva {i}",
+            content=f"Contenido {i}",
+            note_metadata={"index": i},
+            keywords=["bulk", f"bulk_{i % 3}"],
+        )
+        for i in range(7)
+    )
+
+    async with uow:
+        created_ids = await uow.notes.create_many(notes_in, user_id=user_id, batch_size=3)
+        await uow.commit()
+
+    assert len(created_ids) == 7
+    async with uow:
+        note = await uow.notes.get_by_id(note_id=created_ids[5], user_id=user_id)
+
+    assert note is not None
+    assert note.title == "Nota masiva 5"
+    assert note.note_metadata == {"index": 5}
+    assert {kw.name for kw in note.keywords} == {"bulk", "bulk_2"}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_list_and_search_project_rows_with_uow(
+    uow: AsyncSQLAlchemyUnitOfWork, test_user: UserProfileModel
+):
+    """Los listados (proyección de columnas vía asyncpg) devuelven lo mismo que get_by_id."""
+    user_id = test_user.user_id
+    async with uow:
+        note = await uow.notes.create(
+            NoteCreate(
+                title="Nota proyectada",
+                content="Contenido",
+                note_metadata={"status": "draft"},
+                keywords=["zeta", "alfa"],
+            ),
+            user_id=user_id,
+        )
+        await uow.commit()
+
+    async with uow:
+        expected = await uow.notes.get_by_id(note.id, user_id)
+        listed = await uow.notes.list_by_user(user_id=user_id)
+        by_keyword = await uow.notes.search_by_keyword_name("zeta", None, user_id)
+
+    expected.keywords.sort(key=lambda keyword: keyword.name)
+    assert listed == by_keyword == [expected]
+    assert [kw.name for kw in listed[0].keywords] == ["alfa", "zeta"]
+
+    async with uow:
+        summaries = await uow.notes.list_summaries_by_user(user_id=user_id, snippet_length=4)
+        by_project = await uow.notes.search_summaries_by_project(uuid.uuid4(), user_id)
+
+    assert [(s.id, s.snippet, s.content_truncated, s.keywords) for s in summaries] == [
+        (note.id, "Cont", True, ["alfa", "zeta"])
+    ]
+    assert by_project == []
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_search_semantic_with_uow(uow: AsyncSQLAlchemyUnitOfWork, test_user: UserProfileModel):
+    """Búsqueda semántica (HNSW) con embeddings de un embedder determinista."""
+    user_id = test_user.user_id
+    texts = ["gatos perros mascotas", "impuestos renta hacienda", "perros paseo parque"]
+
+    async with uow:
+        created_ids = await uow.notes.create_many(
+            (NoteCreate(title=f"Nota {i}", content=content) for i, content in enumerate(texts)),
+            user_id=user_id,
+        )
+        for note_id, content in zip(created_ids, texts):
+            await uow.notes.session.execute(
+                update(NoteModel)
+                .where(NoteModel.id == note_id)
+                .values(embedding=embedder.embed_text(content))
+            )
+        await uow.commit()
+
+    async with uow:
+        show = lambda name: uow.notes.session.scalar(text(f"SHOW {name}"))
+        # Fijados al abrir la conexión, no por la base de datos
+        connection_settings = (await show("hnsw.iterative_scan"), await show("hnsw.ef_search"))
+        results = await uow.notes.search_semantic(
+            user_id=user_id, query_vector=embedder.embed_text("perros y gatos"), k=2
+        )
+        assert await show("hnsw.ef_search") == "100"
+        # k por encima de ef_search: se amplía solo para esta transacción
+        wide = await uow.notes.search_semantic(
+            user_id=user_id, query_vector=embedder.embed_text("perros y gatos"), k=150
+        )
+        assert await show("hnsw.ef_search") == "150"
+
+    assert connection_settings == ("relaxed_order", "100")
+    assert [result.note.id for result in results] == [created_ids[0], created_ids[2]]
+    assert all(-1 <= result.score <= 1 for result in results)
+    assert {result.note.id for result in wide} == set(created_ids)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_search_hybrid_with_uow(uow: AsyncSQLAlchemyUnitOfWork, test_user: UserProfileModel):
+    """Búsqueda híbrida (full-text + semántica, RRF) con asyncpg."""
+    user_id = test_user.user_id
+    texts = ["presupuesto gastos ingresos", "gastos ingresos ahorro"]
+
+    async with uow:
+        created_ids = await uow.notes.create_many(
+            (NoteCreate(title=f"Nota {i}", content=content) for i, content in enumerate(texts)),
+            user_id=user_id,
+        )
+        for note_id, content in zip(created_ids, texts):
+            await uow.notes.session.execute(
+                update(NoteModel)
+                .where(NoteModel.id == note_id)
+                .values(embedding=embedder.embed_text(content))
+            )
+        await uow.commit()
+
+    async with uow:
+        results = await uow.notes.search_hybrid(
+            user_id=user_id,
+            query="presupuesto",
+            query_vector=embedder.embed_text("gastos ingresos presupuesto"),
+            recency_half_life_days=7,
+        )
+
+    assert [result.note.id for result in results] == created_ids
+    assert (results[0].lexical_rank, results[0].semantic_rank) == (1, 1)
+    assert (results[1].lexical_rank, results[1].semantic_rank) == (None, 2)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_embedding_pipeline_embeds_notes_after_commit(
+    db_transactional_session: AsyncSession, test_user: UserProfileModel
+):
+    """
+    Las notas se encolan al confirmar la UoW; el pipeline embebe cada texto distinto una
+    vez, respeta el límite de concurrencia y no repite notas cuyo texto no cambió.
+    """
+    user_id = test_user.user_id
+    recording_embedder = RecordingEmbedder()
+    pipeline = EmbeddingPipeline(
+        recording_embedder,
+        session_factory=lambda: db_transactional_session,
+        embed_batch_size=2,
+        max_concurrency=2,
+    )
+    uow = AsyncSQLAlchemyUnitOfWork(
+        session_factory=lambda: db_transactional_session, embedding_pipeline=pipeline
+    )
+    contents = ["gatos", "perros", "impuestos", "plantilla", "plantilla", "recetas"]
+
+    async with uow:
+        created_ids = await uow.notes.create_many(
+            (NoteCreate(title="Nota", content=content) for content in contents), user_id=user_id
+        )
+        assert pipeline.pending == 0  # Nada se encola antes del commit
+        await uow.commit()
+
+    assert pipeline.pending == len(contents)
+    await pipeline.drain()
+
+    # Las dos notas "plantilla" comparten content_hash: un solo embedding para ambas.
+    assert len(recording_embedder.texts) == 5
+    assert pipeline.stats.embedded == 6
+    assert pipeline.stats.deduplicated == 1
+    assert pipeline.stats.embedder_calls == 3
+    assert recording_embedder.max_in_flight == 2
+
+    rows = (
+        await db_transactional_session.execute(
+            select(NoteModel.id, NoteModel.embedding, NoteModel.embedding_content_hash)
+            .where(NoteModel.id.in_(created_ids))
+        )
+    ).all()
+    for row in rows:
+        expected = embedder.embed_text(embedding_text("Nota", contents[created_ids.index(row.id)]))
+        assert list(row.embedding) == pytest.approx(expected, abs=1e-6)
+        assert row.embedding_content_hash is not None
+
+    # Reencolar notas sin cambios no llama al modelo.
+    pipeline.enqueue(created_ids)
+    await pipeline.drain()
+    assert len(recording_embedder.texts) == 5
+    assert pipeline.stats.unchanged == 6
+
+    # Editar el contenido sí vuelve a encolar y recalcular la nota.
+    async with uow:
+        await uow.notes.update(created_ids[0], NoteUpdate(content="leones"), user_id=user_id)
+        await uow.notes.update(created_ids[1], NoteUpdate(type="idea"), user_id=user_id)
+        await uow.commit()
+    assert pipeline.pending == 1
+    await pipeline.drain()
+    assert recording_embedder.texts[-1] == embedding_text("Nota", "leones")
+
+    async with uow:
+        results = await uow.notes.search_semantic(
+            user_id=user_id, query_vector=embedder.embed_text("Nota leones"), k=1
+        )
+    assert [result.note.id for result in results] == [created_ids[0]]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_cached_embedder_persists_embeddings_across_processes(
+    db_transactional_session: AsyncSession, test_user: UserProfileModel
+):
+    """La tabla embedding_cache sirve textos ya calculados a un LRU vacío (otro proceso)."""
+    recording_embedder = RecordingEmbedder()
+    texts = [f"texto cacheado {uuid.uuid4()}", f"otro texto {uuid.uuid4()}"]
+
+    first = CachedEmbedder(recording_embedder, session_factory=lambda: db_transactional_session)
+    vectors = await first.embed(texts)
+    assert first.stats.misses == 2
+
+    second = CachedEmbedder(recording_embedder, session_factory=lambda: db_transactional_session)
+    cached_vectors = await second.embed([texts[1], texts[0], "  " + texts[0]])
+
+    assert len(recording_embedder.texts) == 2  # El modelo no se vuelve a llamar
+    assert second.stats.store_hits == 2
+    assert second.stats.hit_rate == 1.0
+    assert cached_vectors[0] == pytest.approx(vectors[1], abs=1e-6)
+    assert cached_vectors[1] == cached_vectors[2] == pytest.approx(vectors[0], abs=1e-6)
+
+    # El pipeline usa la caché como cualquier embedder: una nota con un texto ya
+    # calculado no llama al modelo.
+    pipeline = EmbeddingPipeline(second, session_factory=lambda: db_transactional_session)
+    uow = AsyncSQLAlchemyUnitOfWork(
+        session_factory=lambda: db_transactional_session, embedding_pipeline=pipeline
+    )
+    async with uow:
+        await uow.notes.create(NoteCreate(title=None, content=texts[0]), user_id=test_user.user_id)
+        await uow.commit()
+    await pipeline.drain()
+
+    assert pipeline.stats.embedded == 1
+    assert len(recording_embedder.texts) == 2
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_embedding_pipeline_backfills_stale_notes_and_ignores_rolled_back_writes(
+    db_transactional_session: AsyncSession, test_user: UserProfileModel
+):
+    user_id = test_user.user_id
+    pipeline = EmbeddingPipeline(
+        HashingEmbedder(), session_factory=lambda: db_transactional_session
+    )
+    uow = AsyncSQLAlchemyUnitOfWork(
+        session_factory=lambda: db_transactional_session, embedding_pipeline=pipeline
+    )
+
+    # Notas escritas sin pasar por la UoW (p. ej. desde el repositorio síncrono).
+    async with uow:
+        created_ids = await uow.notes.create_many(
+            [NoteCreate(title="A", content="uno"), NoteCreate(title="B", content="dos")],
+            user_id=user_id,
+        )
+        await uow.notes.session.commit()
+
+    assert await pipeline.enqueue_stale() >= 2
+    await pipeline.drain()
+    assert await pipeline.enqueue_stale() == 0
+    embeddings = (
+        await db_transactional_session.scalars(
+            select(NoteModel.embedding).where(NoteModel.id.in_(created_ids))
+        )
+    ).all()
+    assert all(embedding is not None for embedding in embeddings)
+
+    # Lo revertido no se encola (al final: revierte también la transacción del test).
+    async with uow:
+        await uow.notes.create(NoteCreate(title="Descartada", content="x"), user_id=user_id)
+        await uow.rollback()
+    assert pipeline.pending == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_note_cache_with_uow(
+    db_transactional_session: AsyncSession, test_user: UserProfileModel
+):
+    """Caché de get_by_id con la UoW asíncrona: invalidación solo tras el commit."""
+    user_id = test_user.user_id
+    cache = NoteCache()
+    cached_uow = AsyncSQLAlchemyUnitOfWork(
+        session_factory=lambda: db_transactional_session, note_cache=cache
+    )
+    async with cached_uow:
+        note = await cached_uow.notes.create(NoteCreate(title="Original", content="x"), user_id)
+        await cached_uow.commit()
+
+    for _ in range(3):
+        async with cached_uow:
+            assert (await cached_uow.notes.get_by_id(note.id, user_id)).title == "Original"
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+    async with cached_uow:
+        await cached_uow.notes.update(note.id, NoteUpdate(title="Editada"), user_id)
+        assert cache.get((user_id, note.id)) is not None
+        await cached_uow.commit()
+    async with cached_uow:
+        assert (await cached_uow.notes.get_by_id(note.id, user_id)).title == "Editada"
+    assert cache.stats.invalidations == 1
+
+
+async def _wait_until(condition, timeout: float = 2.0) -> None:
+    """Espera a que se cumpla `condition` (los avisos NOTIFY llegan de forma asíncrona)."""
+    for _ in range(int(timeout / 0.02)):
+        if condition():
+            return
+        await asyncio.sleep(0.02)
+    assert condition()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_committed_writes_invalidate_other_workers_note_caches(test_engine_instance):
+    """
+    Dos "workers" con cachés propias: lo que uno confirma se invalida en el otro vía
+    LISTEN/NOTIFY. NOTIFY solo se entrega al confirmar de verdad, así que este test no usa
+    la transacción revertida de los demás y borra sus datos al final.
+    """
+    session_factory = async_sessionmaker(test_engine_instance, expire_on_commit=False)
+    user_id = f"test_user_notify_{uuid.uuid4()}"
+    async with session_factory() as session:
+        session.add(UserProfileModel(user_id=user_id, name="Notify"))
+        await session.commit()
+
+    reader_cache = NoteCache()
+    listener = CacheInvalidationListener(ASYNC_DATABASE_URL)
+    listener.subscribe_note_cache(reader_cache)
+    await listener.start()
+    reader = AsyncSQLAlchemyUnitOfWork(session_factory=session_factory, note_cache=reader_cache)
+    writer = AsyncSQLAlchemyUnitOfWork(
+        session_factory=session_factory, note_cache=NoteCache(), publish_invalidations=True
+    )
+    try:
+        async with writer:
+            note = await writer.notes.create(NoteCreate(title="v1", content="x"), user_id)
+            await writer.commit()
+        await _wait_until(lambda: listener.stats.received == 1)  # Aviso de la creación
+        async with reader:
+            assert (await reader.notes.get_by_id(note.id, user_id)).title == "v1"
+        assert len(reader_cache) == 1
+
+        async with writer:
+            await writer.notes.update(note.id, NoteUpdate(title="v2"), user_id)
+            await writer.rollback()  # Revertido: no se notifica
+        async with writer:
+            await writer.notes.update(note.id, NoteUpdate(title="v2"), user_id)
+            await writer.commit()
+
+        await _wait_until(lambda: len(reader_cache) == 0)
+        assert listener.stats.received == 2  # create + update confirmados
+        async with reader:
+            assert (await reader.notes.get_by_id(note.id, user_id)).title == "v2"
+    finally:
+        await listener.stop()
+        async with session_factory() as session:
+            await session.execute(delete(UserProfileModel).where(UserProfileModel.user_id == user_id))
+            await session.commit()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_uow_records_query_stats_and_stops_n_plus_one_loops(
+    db_transactional_session: AsyncSession, test_user: UserProfileModel
+):
+    user_id = test_user.user_id
+    uow = AsyncSQLAlchemyUnitOfWork(
+        session_factory=lambda: db_transactional_session,
+        query_stats_factory=lambda: QueryStats(repeat_limit=3, strict=True),
+    )
+    async with uow:
+        note_ids = await uow.notes.create_many(
+            [NoteCreate(title=f"Nota {i}", content="x") for i in range(5)], user_id
+        )
+        for note_id in note_ids[:3]:
+            await uow.notes.get_by_id(note_id, user_id)
+        # La cuarta lectura con la misma forma es un N+1: se corta antes de ejecutarla.
+        with pytest.raises(RepeatedStatementError):
+            await uow.notes.get_by_id(note_ids[3], user_id)
+        await uow.commit()
+
+    stats = uow.query_stats
+    assert stats.statements >= 4
+    assert stats.rows >= 5 + 3  # notas insertadas + leídas
+    assert max(stats.shapes.values()) == 4
+    assert stats.slowest and stats.slowest[0].seconds <= stats.seconds
+
+    async with uow:  # Cada bloque 'async with' empieza con contadores nuevos
+        assert await uow.notes.get_by_id(note_ids[4], user_id) is not None
+    assert uow.query_stats.statements == 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_read_only_uow_reads_from_the_replica_and_rejects_writes():
+    """
+    La misma instancia de PostgreSQL hace de primario y de réplica (DB_REPLICA_HOST apunta
+    al mismo servidor): las lecturas van por el motor de la réplica, en transacciones de
+    solo lectura. Los datos se confirman de verdad y se borran al final.
+    """
+    registry = EngineRegistry(Settings(DB_REPLICA_HOST=get_settings().DB_HOST))
+    user_id = f"test_user_replica_{uuid.uuid4()}"
+    try:
+        async with registry.async_session_factory() as session:
+            session.add(UserProfileModel(user_id=user_id, name="Replica"))
+            await session.commit()
+        async with AsyncSQLAlchemyUnitOfWork(registry.async_session_factory) as writer:
+            note = await writer.notes.create(NoteCreate(title="Leída", content="x"), user_id)
+            await writer.commit()
+
+        reader = AsyncSQLAlchemyReadOnlyUnitOfWork(registry.async_read_session_factory)
+        async with reader:
+            assert (await reader.notes.get_by_id(note.id, user_id)).title == "Leída"
+            session = reader._session
+            assert (await session.execute(text("SHOW transaction_read_only"))).scalar() == "on"
+            await reader.commit()
+        assert registry.async_read_engine.pool is not registry.async_engine.pool
+
+        with pytest.raises(DBAPIError, match="read-only transaction"):
+            async with reader:
+                await reader.notes.create(NoteCreate(title="No", content="x"), user_id)
+        async with registry.async_session_factory() as session:
+            count = await session.scalar(
+                select(func.count()).select_from(NoteModel).where(NoteModel.user_id == user_id)
+            )
+        assert count == 1
+    finally:
+        async with registry.async_session_factory() as session:
+            await session.execute(delete(UserProfileModel).where(UserProfileModel.user_id == user_id))
+            await session.commit()
+        await registry.dispose()
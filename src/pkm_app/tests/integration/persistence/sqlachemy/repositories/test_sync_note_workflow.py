@@ -1,17 +1,23 @@
 # tests/integration/persistence/test_sync_note_workflow.py
 
 import pytest
+import threading
+import time
 import uuid
 import logging
+from datetime import datetime, timedelta, timezone
 from typing import Iterator, Optional
 
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, delete, event, select, text, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, Session
 
 # Importaciones de la aplicación
 from src.pkm_app.infrastructure.persistence.sqlalchemy.database import (
     SYNC_DATABASE_URL_STR,
+    sync_connect_args,
 )
+from src.pkm_app.infrastructure.persistence.sqlalchemy.query_stats import instrument_engine
 from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
     Base,
 )
@@ -19,8 +25,17 @@ from src.pkm_app.infrastructure.persistence.sqlalchemy.sync_unit_of_work import
     SyncSQLAlchemyUnitOfWork,
 )
 from src.pkm_app.core.application.dtos import (
+    MetadataPredicate,
     NoteCreate,
+    NoteLinkCreate,
+    NotePage,
+    NoteQuery,
     NoteSchema,
+    NoteSearchFilters,
+    NoteSummaryPage,
+    NoteUpdate,
+    ProjectCreate,
+    ProjectUpdate,
     UserProfileCreate,
 )
 from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
@@ -29,6 +44,22 @@ from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
 from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
     Note as NoteModel,
 )
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Project as ProjectModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Source as SourceModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    NoteLink as NoteLinkModel,
+)
+from src.pkm_app.infrastructure.cache.note_cache import NoteCache
+from src.pkm_app.infrastructure.graph.link_graph_index import LinkGraphIndex, UserLinkGraph
+from src.pkm_app.infrastructure.search.embedders import HashingEmbedder
+
+
+# Embedder local y determinista: los tests de búsqueda semántica no dependen de la red.
+embedder = HashingEmbedder()
 
 
 # --- Fixtures de Pytest ---
@@ -39,7 +70,9 @@ def test_sync_engine_instance():
     """
     Fixture de sesión para crear un motor de base de datos síncrono para las pruebas.
     """
-    engine = create_engine(SYNC_DATABASE_URL_STR, echo=False)
+    engine = instrument_engine(
+        create_engine(SYNC_DATABASE_URL_STR, echo=False, connect_args=sync_connect_args())
+    )
     yield engine
     engine.dispose()
 
@@ -166,3 +199,1149 @@ def test_create_and_retrieve_note_with_sync_uow(
 
     assert retrieved_note_schema.note_metadata is not None
     assert retrieved_note_schema.note_metadata.get("status") == "draft_sync"
+
+
+def test_keywords_are_reused_across_notes_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork, test_sync_user: UserProfileModel
+):
+    """
+    Las keywords existentes se reutilizan y las nuevas se crean en bloque,
+    sin violar `uq_keywords_user_id_name`.
+    """
+    user_id = test_sync_user.user_id
+
+    with sync_uow:
+        first = sync_uow.notes.create(
+            NoteCreate(content="Primera nota", keywords=["shared", "only_first"]),
+            user_id=user_id,
+        )
+        second = sync_uow.notes.create(
+            NoteCreate(content="Segunda nota", keywords=["shared", "only_second", "shared", " "]),
+            user_id=user_id,
+        )
+        sync_uow.sync_commit()
+
+    first_ids = {kw.name: kw.id for kw in first.keywords}
+    second_ids = {kw.name: kw.id for kw in second.keywords}
+    assert set(second_ids) == {"shared", "only_second"}
+    assert first_ids["shared"] == second_ids["shared"]
+
+
+def test_create_many_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork, test_sync_user: UserProfileModel
+):
+    """
+    La ingesta masiva (COPY vía psycopg2) crea notas y keywords en lotes
+    y devuelve los IDs en el orden de entrada.
+    """
+    user_id = test_sync_user.user_id
+    notes_in = [
+        NoteCreate(
+            title=f"Nota masiva {i}",
+            content=f"Contenido\tcon tabulador y salto\nde línea {i}",
+            keywords=["bulk", f"bulk_{i % 3}"],
+        )
+        for i in range(7)
+    ]
+
+    with sync_uow:
+        created_ids = sync_uow.notes.create_many(notes_in, user_id=user_id, batch_size=3)
+        sync_uow.sync_commit()
+
+    assert len(created_ids) == 7
+    with sync_uow:
+        note = sync_uow.notes.get_by_id(note_id=created_ids[4], user_id=user_id)
+
+    assert note is not None
+    assert note.title == "Nota masiva 4"
+    assert note.content == "Contenido\tcon tabulador y salto\nde línea 4"
+    assert {kw.name for kw in note.keywords} == {"bulk", "bulk_1"}
+
+
+def test_list_by_user_keyset_pagination_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork, test_sync_user: UserProfileModel
+):
+    """
+    Recorrer las páginas con cursor devuelve todas las notas una sola vez,
+    en orden (updated_at, id) descendente.
+    """
+    user_id = test_sync_user.user_id
+    with sync_uow:
+        created_ids = sync_uow.notes.create_many(
+            [NoteCreate(content=f"Nota {i}") for i in range(5)], user_id=user_id
+        )
+        sync_uow.sync_commit()
+
+    seen: list[NoteSchema] = []
+    cursor: Optional[str] = None
+    with sync_uow:
+        while True:
+            items = sync_uow.notes.list_by_user(user_id=user_id, limit=2, cursor=cursor)
+            page = NotePage.from_items(items, limit=2)
+            seen.extend(page.items)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+    assert sorted(note.id for note in seen) == sorted(created_ids)
+    keys = [(note.updated_at, note.id) for note in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_full_text_search_ranks_title_matches_first_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork, test_sync_user: UserProfileModel
+):
+    """
+    search_full_text usa websearch_to_tsquery y pondera el título por encima del contenido;
+    search_by_title_or_content usa el mismo índice.
+    """
+    user_id = test_sync_user.user_id
+    with sync_uow:
+        in_content = sync_uow.notes.create(
+            NoteCreate(title="Reunión", content="Hablamos del presupuesto trimestral"),
+            user_id=user_id,
+        )
+        in_title = sync_uow.notes.create(
+            NoteCreate(title="Presupuesto", content="Cifras del trimestre"), user_id=user_id
+        )
+        sync_uow.notes.create(NoteCreate(title="Otra", content="Nada que ver"), user_id=user_id)
+        sync_uow.sync_commit()
+
+    with sync_uow:
+        ranked = sync_uow.notes.search_full_text(user_id=user_id, query="presupuesto")
+        excluded = sync_uow.notes.search_full_text(
+            user_id=user_id, query="presupuesto -trimestral"
+        )
+        by_date = sync_uow.notes.search_by_title_or_content(user_id=user_id, query="presupuesto")
+
+    assert [result.note.id for result in ranked] == [in_title.id, in_content.id]
+    assert ranked[0].score > ranked[1].score
+    assert [result.note.id for result in excluded] == [in_title.id]
+    assert {note.id for note in by_date} == {in_title.id, in_content.id}
+
+
+def test_full_text_search_is_accent_insensitive_and_language_aware_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork, test_sync_user: UserProfileModel
+):
+    """
+    Cada nota se indexa con la configuración de su idioma (metadata o detección) y con
+    unaccent, así que "gestion" encuentra "Gestión" y los plurales se reducen a su raíz.
+    """
+    user_id = test_sync_user.user_id
+    with sync_uow:
+        spanish = sync_uow.notes.create(
+            NoteCreate(title="Gestión", content="Las tareas de gestión del equipo"),
+            user_id=user_id,
+        )
+        english = sync_uow.notes.create(
+            NoteCreate(title="Meetings", content="The team was running the weekly meetings"),
+            user_id=user_id,
+        )
+        tagged = sync_uow.notes.create(
+            NoteCreate(content="Apuntes sueltos", note_metadata={"language": "en-GB"}),
+            user_id=user_id,
+        )
+        sync_uow.sync_commit()
+
+    assert (spanish.language, english.language, tagged.language) == ("es", "en", "en")
+
+    with sync_uow:
+        unaccented = sync_uow.notes.search_full_text(user_id=user_id, query="gestion")
+        stemmed = sync_uow.notes.search_full_text(user_id=user_id, query="meeting")
+
+    assert [result.note.id for result in unaccented] == [spanish.id]
+    assert [result.note.id for result in stemmed] == [english.id]
+
+
+def test_fuzzy_title_and_keyword_lookup_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork, test_sync_user: UserProfileModel
+):
+    """Sugerencias tolerantes a erratas: prefijos incompletos primero, luego por similitud."""
+    user_id = test_sync_user.user_id
+    with sync_uow:
+        budget = sync_uow.notes.create(
+            NoteCreate(title="Presupuesto trimestral", content="...", keywords=["finanzas"]),
+            user_id=user_id,
+        )
+        review = sync_uow.notes.create(
+            NoteCreate(title="Revisión del presupuesto", content="..."), user_id=user_id
+        )
+        sync_uow.notes.create(NoteCreate(title="Lista de lecturas", content="..."), user_id=user_id)
+        sync_uow.sync_commit()
+
+    with sync_uow:
+        prefix = sync_uow.notes.search_titles_fuzzy(user_id=user_id, query="presu")
+        typo = sync_uow.notes.search_titles_fuzzy(user_id=user_id, query="presupeusto")
+        keywords = sync_uow.notes.search_keywords_fuzzy(user_id=user_id, query="finazas")
+        too_short = sync_uow.notes.search_titles_fuzzy(user_id=user_id, query=" pr ")
+        # Umbral de `<%` fijado al abrir la conexión, no por la base de datos (que usa 0.6)
+        threshold = sync_uow.notes.session.execute(
+            text("SHOW pg_trgm.word_similarity_threshold")
+        ).scalar_one()
+
+    assert threshold == "0.4"
+    assert [match.id for match in prefix] == [budget.id, review.id]
+    assert {match.id for match in typo} == {budget.id, review.id}
+    assert all(0 < match.score <= 1 for match in typo)
+    assert [match.keyword.name for match in keywords] == ["finanzas"]
+    assert too_short == []
+
+
+def test_fuzzy_lookup_is_an_exact_top_k_among_many_matches(
+    sync_uow: SyncSQLAlchemyUnitOfWork, test_sync_user: UserProfileModel
+):
+    """Con cientos de coincidencias, las más parecidas salen aunque se hayan creado al final."""
+    user_id = test_sync_user.user_id
+    with sync_uow:
+        sync_uow.notes.create_many(
+            [
+                NoteCreate(title=f"Inventarios del almacén {i}", content="...")
+                for i in range(300)
+            ],
+            user_id=user_id,
+        )
+        exact = sync_uow.notes.create(NoteCreate(title="Inventario", content="..."), user_id)
+        sync_uow.sync_commit()
+
+    with sync_uow:
+        matches = sync_uow.notes.search_titles_fuzzy(user_id=user_id, query="inventario", limit=3)
+        strict = sync_uow.notes.search_titles_fuzzy(
+            user_id=user_id, query="inventario", limit=3, threshold=0.95
+        )
+
+    assert [match.id for match in matches][0] == exact.id
+    assert matches[0].score == 1
+    assert len(matches) == 3
+    assert [match.id for match in strict] == [exact.id]
+
+
+def test_semantic_search_with_filters_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork,
+    test_sync_user: UserProfileModel,
+    db_sync_transactional_session: Session,
+):
+    """Top-k por similitud coseno, restringido al usuario y a los filtros pedidos."""
+    user_id = test_sync_user.user_id
+    project = ProjectModel(user_id=user_id, name="Mascotas")
+    db_sync_transactional_session.add(project)
+    db_sync_transactional_session.flush()
+
+    texts = {
+        "cats": "gatos perros mascotas veterinario",
+        "dogs": "perros paseo parque mascotas",
+        "taxes": "impuestos declaración renta hacienda",
+        "pending": "gatos perros mascotas sin embedding",
+    }
+    with sync_uow:
+        notes = {
+            name: sync_uow.notes.create(
+                NoteCreate(
+                    title=name,
+                    content=content,
+                    project_id=project.id if name == "dogs" else None,
+                ),
+                user_id=user_id,
+            )
+            for name, content in texts.items()
+        }
+        for name in ("cats", "dogs", "taxes"):
+            sync_uow.notes.session.execute(
+                update(NoteModel)
+                .where(NoteModel.id == notes[name].id)
+                .values(embedding=embedder.embed_text(texts[name]))
+            )
+        sync_uow.sync_commit()
+
+    query_vector = embedder.embed_text("gatos y perros")
+    with sync_uow:
+        results = sync_uow.notes.search_semantic(user_id=user_id, query_vector=query_vector, k=2)
+        in_project = sync_uow.notes.search_semantic(
+            user_id=user_id,
+            query_vector=query_vector,
+            filters=NoteSearchFilters(project_id=project.id),
+        )
+        other_user = sync_uow.notes.search_semantic(
+            user_id=f"{user_id}_otro", query_vector=query_vector
+        )
+
+    # La nota sin embedding no aparece aunque su texto sea el más parecido
+    assert [result.note.id for result in results] == [notes["cats"].id, notes["dogs"].id]
+    assert results[0].score > results[1].score
+    assert [result.note.id for result in in_project] == [notes["dogs"].id]
+    assert other_user == []
+
+    with pytest.raises(ValueError):
+        with sync_uow:
+            sync_uow.notes.search_semantic(user_id=user_id, query_vector=[1.0, 0.0])
+
+
+def test_hybrid_search_fuses_full_text_and_semantic_ranks_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork,
+    test_sync_user: UserProfileModel,
+    db_sync_transactional_session: Session,
+):
+    """RRF de ambas búsquedas en un único round trip, con boost opcional por recencia."""
+    user_id = test_sync_user.user_id
+    with sync_uow:
+        budget = sync_uow.notes.create(
+            NoteCreate(
+                title="Presupuesto anual",
+                content="gastos ingresos presupuesto",
+                keywords=["finanzas"],
+            ),
+            user_id=user_id,
+        )
+        lexical_only = sync_uow.notes.create(
+            NoteCreate(title="Presupuesto antiguo", content="borrador"), user_id=user_id
+        )
+        semantic_only = sync_uow.notes.create(
+            NoteCreate(title="Cuentas", content="gastos ingresos ahorro"), user_id=user_id
+        )
+        for note in (budget, semantic_only):
+            sync_uow.notes.session.execute(
+                update(NoteModel)
+                .where(NoteModel.id == note.id)
+                .values(embedding=embedder.embed_text(note.content))
+            )
+        sync_uow.notes.session.execute(
+            update(NoteModel)
+            .where(NoteModel.id == semantic_only.id)
+            .values(updated_at=text("now() - interval '10 years'"))
+        )
+        sync_uow.sync_commit()
+
+    statements: list[str] = []
+    query_vector = embedder.embed_text("gastos ingresos presupuesto")
+    with sync_uow:
+        connection = db_sync_transactional_session.connection()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(connection, "before_cursor_execute", listener)
+        try:
+            results = sync_uow.notes.search_hybrid(
+                user_id=user_id, query="presupuesto", query_vector=query_vector
+            )
+        finally:
+            event.remove(connection, "before_cursor_execute", listener)
+        boosted = sync_uow.notes.search_hybrid(
+            user_id=user_id,
+            query="presupuesto",
+            query_vector=query_vector,
+            recency_half_life_days=30,
+        )
+
+    assert len(statements) == 1
+    assert [result.note.id for result in results][0] == budget.id
+    assert {result.note.id for result in results} == {budget.id, lexical_only.id, semantic_only.id}
+    ranks = {result.note.id: (result.lexical_rank, result.semantic_rank) for result in results}
+    assert ranks[budget.id][0] is not None and ranks[budget.id][1] == 1
+    assert ranks[lexical_only.id][1] is None
+    assert ranks[semantic_only.id] == (None, 2)
+    assert [kw.name for kw in results[0].note.keywords] == ["finanzas"]
+
+    # Recién editada: el boost casi duplica el score; diez años después, no cambia.
+    plain = {result.note.id: result.score for result in results}
+    recency = {result.note.id: result.score for result in boosted}
+    assert recency[budget.id] == pytest.approx(2 * plain[budget.id], rel=1e-3)
+    assert recency[semantic_only.id] == pytest.approx(plain[semantic_only.id], rel=1e-3)
+
+
+def test_note_cache_serves_get_by_id_and_invalidates_after_commit_with_sync_uow(
+    db_sync_transactional_session: Session, test_sync_user: UserProfileModel
+):
+    """
+    get_by_id se sirve desde la caché; una edición no se ve en la caché hasta el commit, y
+    la propia UoW que edita lee siempre de la base de datos.
+    """
+    user_id = test_sync_user.user_id
+    cache = NoteCache()
+    cached_uow = SyncSQLAlchemyUnitOfWork(
+        session_factory=lambda: db_sync_transactional_session, note_cache=cache
+    )
+    with cached_uow:
+        note = cached_uow.notes.create(NoteCreate(title="Original", content="x"), user_id)
+        cached_uow.sync_commit()
+
+    statements: list[str] = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db_sync_transactional_session.connection(), "before_cursor_execute", listener)
+    try:
+        with cached_uow:
+            first = cached_uow.notes.get_by_id(note.id, user_id)
+        queries_first_read = len(statements)
+        with cached_uow:
+            second = cached_uow.notes.get_by_id(note.id, user_id)
+        assert len(statements) == queries_first_read  # Sin consultas: servida por la caché
+    finally:
+        event.remove(db_sync_transactional_session.connection(), "before_cursor_execute", listener)
+    assert first == second
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    with cached_uow:
+        cached_uow.notes.update(note.id, NoteUpdate(title="Editada"), user_id)
+        # Sin confirmar: esta UoW ve su edición, la caché conserva la versión confirmada.
+        assert cached_uow.notes.get_by_id(note.id, user_id).title == "Editada"
+        assert cache.get((user_id, note.id)).title == "Original"
+        cached_uow.sync_commit()
+
+    assert cache.get((user_id, note.id)) is None
+    with cached_uow:
+        assert cached_uow.notes.get_by_id(note.id, user_id).title == "Editada"
+        cached_uow.notes.delete(note.id, user_id)
+        cached_uow.sync_commit()
+    with cached_uow:
+        assert cached_uow.notes.get_by_id(note.id, user_id) is None
+    assert cache.stats.invalidations == 2
+
+
+def test_note_cache_never_stores_uncommitted_notes_with_sync_uow(test_sync_engine_instance):
+    """
+    Una nota creada, o cuyo proyecto se renombra, en una transacción que luego se revierte
+    no llega a la caché compartida: otra UoW no la ve. Con sesiones reales (el rollback de
+    la sesión transaccional de los fixtures revertiría también los datos confirmados).
+    """
+    session_factory = sessionmaker(bind=test_sync_engine_instance, expire_on_commit=False)
+    user_id = f"test_sync_user_cache_{uuid.uuid4()}"
+    with session_factory() as session:
+        session.add(UserProfileModel(user_id=user_id, name="Caché sin confirmar"))
+        session.commit()
+    cache = NoteCache()
+    uow = SyncSQLAlchemyUnitOfWork(session_factory=session_factory, note_cache=cache)
+    try:
+        with uow:
+            project = uow.projects.create(ProjectCreate(name="Original"), user_id)
+            kept = uow.notes.create(
+                NoteCreate(content="confirmada", project_id=project.id), user_id
+            )
+            uow.sync_commit()
+        with uow:
+            assert uow.notes.get_by_id(kept.id, user_id).project.name == "Original"  # En caché
+
+        with uow:
+            created = uow.notes.create(NoteCreate(title="Revertida", content="x"), user_id)
+            bulk_ids = uow.notes.create_many([NoteCreate(content="lote")], user_id)
+            uow.projects.update(project.id, ProjectUpdate(name="Renombrado"), user_id)
+            assert uow.notes.get_by_id(created.id, user_id).title == "Revertida"
+            assert uow.notes.get_by_id(bulk_ids[0], user_id) is not None
+            assert uow.notes.get_by_id(kept.id, user_id).project.name == "Renombrado"
+            uow.sync_rollback()
+
+        assert cache.get((user_id, created.id)) is None
+        assert cache.get((user_id, bulk_ids[0])) is None
+        other_uow = SyncSQLAlchemyUnitOfWork(session_factory=session_factory, note_cache=cache)
+        with other_uow:
+            assert other_uow.notes.get_by_id(created.id, user_id) is None
+            assert other_uow.notes.get_by_id(bulk_ids[0], user_id) is None
+            assert other_uow.notes.get_by_id(kept.id, user_id).project.name == "Original"
+    finally:
+        with session_factory() as session:
+            session.execute(delete(UserProfileModel).where(UserProfileModel.user_id == user_id))
+            session.commit()
+
+
+def test_list_and_search_project_rows_in_a_single_query_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork,
+    test_sync_user: UserProfileModel,
+    db_sync_transactional_session: Session,
+):
+    """
+    Los listados leen columnas (nota, proyecto, fuente y keywords agregadas) en una sola
+    consulta y devuelven lo mismo que get_by_id.
+    """
+    user_id = test_sync_user.user_id
+    project = ProjectModel(user_id=user_id, name="Proyección")
+    source = SourceModel(
+        user_id=user_id, type="web", url="https://example.com/a", link_metadata={"k": 1}
+    )
+    db_sync_transactional_session.add_all([project, source])
+    db_sync_transactional_session.flush()
+
+    with sync_uow:
+        note = sync_uow.notes.create(
+            NoteCreate(
+                title="Nota proyectada",
+                content="Contenido de la nota proyectada",
+                note_metadata={"status": "draft"},
+                project_id=project.id,
+                source_id=source.id,
+                keywords=["zeta", "alfa", "media"],
+            ),
+            user_id=user_id,
+        )
+        bare = sync_uow.notes.create(NoteCreate(content="Sin relaciones"), user_id=user_id)
+        sync_uow.sync_commit()
+
+    statements: list[str] = []
+    listener = lambda *args: statements.append(args[2])
+    with sync_uow:
+        expected = sync_uow.notes.get_by_id(note.id, user_id)
+        expected_bare = sync_uow.notes.get_by_id(bare.id, user_id)
+        connection = db_sync_transactional_session.connection()
+        event.listen(connection, "before_cursor_execute", listener)
+        try:
+            listed = sync_uow.notes.list_by_user(user_id=user_id)
+        finally:
+            event.remove(connection, "before_cursor_execute", listener)
+        by_keyword = sync_uow.notes.search_by_keyword_name("alfa", project.id, user_id)
+        by_keywords = sync_uow.notes.search_by_keyword_names(["alfa", "zeta"], project.id, user_id)
+        by_project = sync_uow.notes.search_by_project(project.id, user_id)
+        by_text = sync_uow.notes.search_by_title_or_content(user_id, "proyectada")
+
+    assert len(statements) == 1
+    assert {item.id: item for item in listed} == {note.id: expected, bare.id: expected_bare}
+    assert [kw.name for kw in expected.keywords] == ["alfa", "media", "zeta"]
+    assert by_keyword == by_project == by_text == [expected]
+    # Filtrar por keyword no recorta las keywords devueltas de la nota.
+    assert by_keywords[0] == expected
+
+
+def test_note_summaries_never_read_full_content_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork,
+    test_sync_user: UserProfileModel,
+    db_sync_transactional_session: Session,
+):
+    """
+    Los resúmenes traen título, fragmento inicial, fechas y nombres de keywords; el
+    contenido solo se lee con substr (fragmento de TOAST), nunca completo.
+    """
+    user_id = test_sync_user.user_id
+    long_content = "Inicio de una nota larga. " + uuid.uuid4().hex * 2000
+    with sync_uow:
+        long_note = sync_uow.notes.create(
+            NoteCreate(title="Larga", content=long_content, keywords=["b", "a"]),
+            user_id=user_id,
+        )
+        short_note = sync_uow.notes.create(NoteCreate(content="Corta"), user_id=user_id)
+        sync_uow.sync_commit()
+
+    statements: list[str] = []
+    listener = lambda *args: statements.append(args[2])
+    with sync_uow:
+        connection = db_sync_transactional_session.connection()
+        event.listen(connection, "before_cursor_execute", listener)
+        try:
+            summaries = sync_uow.notes.list_summaries_by_user(user_id, snippet_length=25)
+        finally:
+            event.remove(connection, "before_cursor_execute", listener)
+        by_keyword = sync_uow.notes.search_summaries_by_keyword_name("a", None, user_id)
+        by_text = sync_uow.notes.search_summaries_by_title_or_content(user_id, "larga")
+        pages = []
+        cursor: Optional[str] = None
+        while True:
+            items = sync_uow.notes.list_summaries_by_user(user_id, limit=1, cursor=cursor)
+            page = NoteSummaryPage.from_items(items, limit=1)
+            pages.append(page)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+    assert len(statements) == 1
+    assert statements[0].count("notes.content") == 1 and "substr(notes.content" in statements[0]
+    assert "note_metadata" not in statements[0]
+    by_id = {summary.id: summary for summary in summaries}
+    assert by_id[long_note.id].snippet == "Inicio de una nota larga."
+    assert by_id[long_note.id].content_truncated is True
+    assert by_id[long_note.id].keywords == ["a", "b"]
+    assert (by_id[short_note.id].snippet, by_id[short_note.id].content_truncated) == (
+        "Corta",
+        False,
+    )
+    assert [summary.id for summary in by_keyword] == [long_note.id]
+    assert len(by_keyword[0].snippet) == 200
+    assert [summary.id for summary in by_text] == [long_note.id]
+    assert [item.id for page in pages for item in page.items] == [item.id for item in summaries]
+
+
+def test_note_writes_take_one_round_trip_and_enforce_ownership_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork,
+    test_sync_user: UserProfileModel,
+    db_sync_transactional_session: Session,
+):
+    """
+    create/update escriben nota, keywords y enlaces en una sola sentencia; la propiedad del
+    proyecto y la fuente la comprueba la base de datos (FK compuestas con user_id).
+    """
+    session = db_sync_transactional_session
+    user_id = test_sync_user.user_id
+    other = UserProfileModel(user_id=f"other_{uuid.uuid4()}", name="Otro")
+    session.add(other)
+    session.flush()
+    project = ProjectModel(user_id=user_id, name="Propio")
+    foreign_project = ProjectModel(user_id=other.user_id, name="Ajeno")
+    foreign_source = SourceModel(user_id=other.user_id, type="web", url="https://example.com/x")
+    session.add_all([project, foreign_project, foreign_source])
+    session.flush()
+
+    statements: list[str] = []
+    listener = lambda *args: statements.append(args[2])
+
+    def count(write):
+        statements.clear()
+        connection = session.connection()
+        event.listen(connection, "before_cursor_execute", listener)
+        try:
+            return write(), len(statements)
+        finally:
+            event.remove(connection, "before_cursor_execute", listener)
+
+    with sync_uow:
+        sync_uow.notes.create(NoteCreate(content="Previa", keywords=["existente"]), user_id)
+        note, created_in = count(
+            lambda: sync_uow.notes.create(
+                NoteCreate(
+                    title="Escritura",
+                    content="Una nota con proyecto",
+                    project_id=project.id,
+                    keywords=["nueva", "existente", "nueva"],
+                ),
+                user_id,
+            )
+        )
+        edited, updated_in = count(
+            lambda: sync_uow.notes.update(
+                note.id,
+                NoteUpdate(note_metadata={"language": "en"}, keywords=["otra", "nueva"]),
+                user_id,
+            )
+        )
+        # Sin el resto del texto en la edición, el idioma obliga a leer la nota antes.
+        retitled, retitled_in = count(
+            lambda: sync_uow.notes.update(note.id, NoteUpdate(title="The new title"), user_id)
+        )
+        keywords_only, keywords_only_in = count(
+            lambda: sync_uow.notes.update(note.id, NoteUpdate(keywords=[]), user_id)
+        )
+
+        with pytest.raises(ValueError, match="Proyecto con id"):
+            sync_uow.notes.create(
+                NoteCreate(content="Ajena", project_id=foreign_project.id), user_id
+            )
+        with pytest.raises(ValueError, match="Fuente con id"):
+            sync_uow.notes.update(note.id, NoteUpdate(source_id=foreign_source.id), user_id)
+        # El rechazo no aborta la transacción y una nota inexistente sigue dando None.
+        assert sync_uow.notes.update(uuid.uuid4(), NoteUpdate(title="x"), user_id) is None
+        assert sync_uow.notes.get_by_id(note.id, user_id) == keywords_only
+        # Fuera del repositorio, la FK compuesta impide apuntar a un proyecto ajeno.
+        with pytest.raises(IntegrityError), session.begin_nested():
+            session.execute(
+                update(NoteModel)
+                .where(NoteModel.id == note.id)
+                .values(project_id=foreign_project.id)
+                .execution_options(synchronize_session=False)
+            )
+
+        session.execute(delete(ProjectModel).where(ProjectModel.id == project.id))
+        orphaned = sync_uow.notes.get_by_id(note.id, user_id)
+        deleted, deleted_in = count(lambda: sync_uow.notes.delete(note.id, user_id))
+        assert sync_uow.notes.delete(note.id, user_id) is False
+
+    assert (created_in, updated_in, retitled_in, keywords_only_in, deleted_in) == (1, 1, 2, 1, 1)
+    assert note.project.id == project.id
+    assert [kw.name for kw in note.keywords] == ["existente", "nueva"]
+    assert [kw.name for kw in edited.keywords] == ["nueva", "otra"]
+    assert edited.keywords[0] == note.keywords[1]
+    assert edited.language == "en" and edited.updated_at >= note.updated_at
+    assert (retitled.title, retitled.language, retitled.keywords) == (
+        "The new title",
+        "en",
+        edited.keywords,
+    )
+    assert keywords_only.keywords == [] and keywords_only.updated_at == retitled.updated_at
+    # Al borrar el proyecto solo se anula project_id (la nota sigue siendo del usuario).
+    assert orphaned.project_id is None and orphaned.user_id == user_id
+    assert deleted is True
+
+
+def test_query_notes_combines_every_filter_in_one_statement_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork,
+    test_sync_user: UserProfileModel,
+    db_sync_transactional_session: Session,
+):
+    """
+    NoteQuery combina texto, proyecto, keywords (all/any), tipo, fechas y metadata en una
+    sola consulta; cada orden se recorre entero con su cursor.
+    """
+    session = db_sync_transactional_session
+    user_id = test_sync_user.user_id
+    project = ProjectModel(user_id=user_id, name="Consultas")
+    session.add(project)
+    session.flush()
+    with sync_uow:
+        create = lambda **fields: sync_uow.notes.create(NoteCreate(**fields), user_id)
+        team = create(
+            title="Reunión de equipo",
+            content="Plan del proyecto",
+            type="permanent",
+            project_id=project.id,
+            keywords=["a", "b"],
+            note_metadata={"status": "draft", "tags": ["x", "y"]},
+        )
+        weekly = create(
+            title="Reunión semanal",
+            content="Notas de la reunión",
+            type="fleeting",
+            keywords=["a"],
+            note_metadata={"status": "done"},
+        )
+        shopping = create(title="Compras", content="Leche", project_id=project.id, keywords=["b"])
+        untitled = create(
+            content="Otra reunión sin título", note_metadata={"status": "draft", "reviewed": True}
+        )
+        sync_uow.sync_commit()
+
+    # Todas se crearon en la misma transacción (mismo now()): se fijan fechas distintas.
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for days, note in enumerate([team, weekly, shopping, untitled]):
+        session.execute(
+            update(NoteModel)
+            .where(NoteModel.id == note.id)
+            .values(created_at=base + timedelta(days=days))
+            .execution_options(synchronize_session=False)
+        )
+
+    def ids(**fields):
+        return [note.id for note in sync_uow.notes.query_notes(user_id, NoteQuery(**fields)).items]
+
+    statements: list[str] = []
+    listener = lambda *args: statements.append(args[2])
+    with sync_uow:
+        connection = session.connection()
+        event.listen(connection, "before_cursor_execute", listener)
+        try:
+            combined = ids(text="reunión", keywords=["a", "b"], type="permanent")
+        finally:
+            event.remove(connection, "before_cursor_execute", listener)
+        assert combined == [team.id]
+        assert sorted(ids(keywords=["b", "a"], keyword_match="any")) == sorted(
+            [team.id, weekly.id, shopping.id]
+        )
+        assert ids(keywords=["a", "b", "zzz"]) == []
+        assert set(ids(project_id=project.id, keywords=["b"])) == {team.id, shopping.id}
+        draft = MetadataPredicate(key="status", value="draft")
+        assert set(ids(metadata=[draft])) == {team.id, untitled.id}
+        not_done = MetadataPredicate(key="status", op="ne", value="done")
+        assert set(ids(metadata=[not_done])) == {team.id, shopping.id, untitled.id}
+        tagged = MetadataPredicate(key="tags", op="contains", value=["x"])
+        reviewed = MetadataPredicate(key="reviewed", op="exists")
+        assert ids(metadata=[tagged]) == [team.id]
+        assert ids(metadata=[draft, reviewed]) == [untitled.id]
+        assert ids(
+            created_after=base + timedelta(days=1),
+            created_before=base + timedelta(days=3),
+            sort="created_desc",
+        ) == [shopping.id, weekly.id]
+        assert ids(sort="created_asc") == [team.id, weekly.id, shopping.id, untitled.id]
+        assert ids(sort="title_asc")[0] == untitled.id  # sin título: clave vacía
+        assert set(ids(text="reunión", sort="relevance")) == {team.id, weekly.id, untitled.id}
+
+        for sort, text_query in [
+            ("updated_desc", None),
+            ("created_desc", None),
+            ("created_asc", None),
+            ("title_asc", None),
+            ("relevance", "reunión"),
+        ]:
+            expected = ids(sort=sort, text=text_query)
+            walked: list[uuid.UUID] = []
+            cursor: Optional[str] = None
+            while True:
+                page = sync_uow.notes.query_notes(
+                    user_id, NoteQuery(sort=sort, text=text_query, limit=1, cursor=cursor)
+                )
+                walked.extend(note.id for note in page.items)
+                if page.next_cursor is None:
+                    break
+                cursor = page.next_cursor
+            assert walked == expected, sort
+
+        with pytest.raises(ValueError, match="Invalid pagination cursor"):
+            sync_uow.notes.query_notes(user_id, NoteQuery(sort="created_desc", cursor=cursor))
+
+    assert len(statements) == 1
+
+
+def test_search_by_keyword_names_matches_all_or_any_without_duplicates_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork,
+    test_sync_user: UserProfileModel,
+    db_sync_transactional_session: Session,
+):
+    """
+    Cada nota aparece una sola vez aunque tenga varias de las keywords: el LIMIT cuenta
+    notas. `all` exige todas las keywords y sin proyecto se busca en todos.
+    """
+    user_id = test_sync_user.user_id
+    project = ProjectModel(user_id=user_id, name="Etiquetas")
+    db_sync_transactional_session.add(project)
+    db_sync_transactional_session.flush()
+
+    with sync_uow:
+        both = sync_uow.notes.create(
+            NoteCreate(content="Con las dos", project_id=project.id, keywords=["a", "b", "c"]),
+            user_id=user_id,
+        )
+        only_a = sync_uow.notes.create(
+            NoteCreate(content="Solo a", project_id=project.id, keywords=["a"]), user_id=user_id
+        )
+        elsewhere = sync_uow.notes.create(
+            NoteCreate(content="Sin proyecto", keywords=["b", "a"]), user_id=user_id
+        )
+        sync_uow.sync_commit()
+
+    with sync_uow:
+        notes = sync_uow.notes
+        any_in_project = notes.search_by_keyword_names(["a", "b"], project.id, user_id)
+        all_in_project = notes.search_by_keyword_names(["a", "b"], project.id, user_id, match="all")
+        all_anywhere = notes.search_by_keyword_names(["b", "a", "b"], None, user_id, match="all")
+        first_page = notes.search_by_keyword_names(["a", "b", "c"], None, user_id, limit=2)
+        missing = notes.search_by_keyword_names(["a", "zzz"], None, user_id, match="all")
+
+    assert {note.id for note in any_in_project} == {both.id, only_a.id}
+    assert len(any_in_project) == 2
+    assert [note.id for note in all_in_project] == [both.id]
+    assert {note.id for note in all_anywhere} == {both.id, elsewhere.id}
+    assert len(first_page) == len({note.id for note in first_page}) == 2
+    assert missing == []
+    # Las keywords devueltas son todas las de la nota, no solo las buscadas.
+    assert [kw.name for kw in all_in_project[0].keywords] == ["a", "b", "c"]
+
+
+def test_link_graph_queries_take_one_round_trip_with_sync_uow(
+    sync_uow: SyncSQLAlchemyUnitOfWork,
+    test_sync_user: UserProfileModel,
+    db_sync_transactional_session: Session,
+):
+    """
+    Backlinks, vecindario a k saltos y camino más corto: una consulta cada uno, con
+    filtros por tipo de enlace y sentido, y límites de profundidad y de enlaces por nota.
+    """
+    user_id = test_sync_user.user_id
+    with sync_uow:
+        a, b, c, d, e, f = (
+            sync_uow.notes.create(NoteCreate(title=title, content=title), user_id=user_id)
+            for title in "ABCDEF"
+        )
+        sync_uow.sync_commit()
+
+    #   F -> A -> B -> C -> D      A -> E (cites)      D -> A (cites)
+    session = db_sync_transactional_session
+    links = {
+        (source.title, target.title): NoteLinkModel(
+            source_note_id=source.id, target_note_id=target.id, link_type=link_type, user_id=user_id
+        )
+        for source, target, link_type in (
+            (f, a, "related"),
+            (a, b, "related"),
+            (b, c, "related"),
+            (c, d, "related"),
+            (a, e, "cites"),
+            (d, a, "cites"),
+        )
+    }
+    session.add_all(links.values())
+    session.flush()
+
+    statements: list[str] = []
+    listener = lambda *args: statements.append(args[2])
+    with sync_uow:
+        connection = session.connection()
+        event.listen(connection, "before_cursor_execute", listener)
+        try:
+            backlinks = sync_uow.links.get_backlinks(a.id, user_id)
+            cited_by = sync_uow.links.get_backlinks(a.id, user_id, link_types=["cites"])
+            around = sync_uow.links.get_neighborhood(a.id, user_id, depth=2)
+            downstream = sync_uow.links.get_neighborhood(
+                a.id, user_id, depth=2, link_types=["related"], direction="outgoing"
+            )
+            narrow = sync_uow.links.get_neighborhood(a.id, user_id, depth=3, max_fanout=1)
+            forward = sync_uow.links.find_shortest_path(a.id, d.id, user_id, direction="outgoing")
+            backward = sync_uow.links.find_shortest_path(d.id, f.id, user_id, direction="incoming")
+            shortcut = sync_uow.links.find_shortest_path(a.id, d.id, user_id)
+            itself = sync_uow.links.find_shortest_path(a.id, a.id, user_id)
+        finally:
+            event.remove(connection, "before_cursor_execute", listener)
+        unreachable = sync_uow.links.find_shortest_path(
+            a.id, d.id, user_id, link_types=["cites"], direction="outgoing"
+        )
+        too_far = sync_uow.links.find_shortest_path(
+            a.id, d.id, user_id, direction="outgoing", max_depth=2
+        )
+        foreign = sync_uow.links.get_neighborhood(a.id, "otro_usuario")
+        with pytest.raises(ValueError):
+            sync_uow.links.get_neighborhood(a.id, user_id, depth=0)
+
+    assert len(statements) == 9
+    assert {link.id for link in backlinks} == {links["F", "A"].id, links["D", "A"].id}
+    assert [link.id for link in cited_by] == [links["D", "A"].id]
+
+    depths = {node.title: node.depth for node in around.nodes}
+    assert around.root_id == a.id and around.nodes[0].id == a.id
+    assert depths == {"A": 0, "B": 1, "E": 1, "F": 1, "D": 1, "C": 2}
+    assert {link.id for link in around.links} == {link.id for link in links.values()}
+    assert {node.title: node.depth for node in downstream.nodes} == {"A": 0, "B": 1, "C": 2}
+    assert {(link.source_note_id, link.target_note_id) for link in downstream.links} == {
+        (a.id, b.id),
+        (b.id, c.id),
+    }
+    # Un enlace por nota: como mucho una nota nueva por salto.
+    assert [node.depth for node in narrow.nodes] == list(range(len(narrow.nodes)))
+
+    assert forward.note_ids == [a.id, b.id, c.id, d.id]
+    assert [link.id for link in forward.links] == [links[tuple(pair)].id for pair in ("AB", "BC", "CD")]
+    assert backward.note_ids == [d.id, c.id, b.id, a.id, f.id]
+    assert shortcut.note_ids == [a.id, d.id] and shortcut.links[0].id == links["D", "A"].id
+    assert itself.note_ids == [a.id] and itself.links == []
+    assert unreachable is None and too_far is None and foreign is None
+
+
+def test_link_graph_index_follows_committed_link_changes_with_sync_uow(
+    test_sync_user: UserProfileModel, db_sync_transactional_session: Session
+):
+    """
+    El índice del grafo se carga una vez y recibe los enlaces creados y borrados (también
+    los que arrastra el borrado de una nota) al confirmar, no antes.
+    """
+    user_id = test_sync_user.user_id
+    session = db_sync_transactional_session
+    index = LinkGraphIndex()
+    uow = SyncSQLAlchemyUnitOfWork(session_factory=lambda: session, link_graph_index=index)
+    with uow:
+        a, b, c, d = (
+            uow.notes.create(NoteCreate(title=title, content="x"), user_id) for title in "ABCD"
+        )
+        uow.sync_commit()
+
+    graph = index.get_or_load(session, user_id)
+    assert graph.link_count == 0
+
+    with uow:
+        ab = uow.links.create_link(
+            NoteLinkCreate(source_note_id=a.id, target_note_id=b.id), user_id
+        )
+        uow.links.create_link(NoteLinkCreate(source_note_id=b.id, target_note_id=c.id), user_id)
+        uow.links.create_link(NoteLinkCreate(source_note_id=d.id, target_note_id=c.id), user_id)
+        with pytest.raises(ValueError):
+            uow.links.create_link(NoteLinkCreate(source_note_id=a.id, target_note_id=b.id), user_id)
+        with pytest.raises(ValueError):
+            uow.links.create_link(
+                NoteLinkCreate(source_note_id=a.id, target_note_id=b.id), "otro_usuario"
+            )
+        with pytest.raises(ValueError):
+            uow.links.create_link(NoteLinkCreate(source_note_id=a.id, target_note_id=a.id), user_id)
+        # Sin commit todavía: el índice no ve los enlaces.
+        assert graph.link_count == 0
+        uow.sync_commit()
+
+    assert index.get_or_load(session, user_id) is graph  # Sin recargar
+    assert graph.link_count == 3
+    assert graph.top_pagerank(1)[0][0] == c.id
+    assert graph.component_of(a.id) == {a.id, b.id, c.id, d.id}
+
+    with uow:
+        assert uow.links.delete_link(ab.id, user_id)
+        assert not uow.links.delete_link(ab.id, user_id)
+        uow.notes.delete(c.id, user_id)
+        uow.sync_commit()
+
+    assert graph.link_count == 0
+    assert graph.node_count == 0
+    assert index.stats.loads == 1
+    reloaded = UserLinkGraph.from_edges(
+        session.execute(
+            select(NoteLinkModel.id, NoteLinkModel.source_note_id, NoteLinkModel.target_note_id)
+            .where(NoteLinkModel.user_id == user_id)
+        ).all()
+    )
+    assert reloaded.link_count == 0
+
+
+def test_project_hierarchy_uses_materialized_paths_with_sync_uow(
+    test_sync_user: UserProfileModel, db_sync_transactional_session: Session
+):
+    """
+    Ancestros y subproyectos en una consulta cada uno; mover un proyecto arrastra su
+    subárbol, y no se admiten ciclos ni padres de otro usuario.
+    """
+    user_id = test_sync_user.user_id
+    session = db_sync_transactional_session
+    cache = NoteCache()
+    uow = SyncSQLAlchemyUnitOfWork(session_factory=lambda: session, note_cache=cache)
+    with uow:
+        work = uow.projects.create(ProjectCreate(name="Trabajo"), user_id)
+        personal = uow.projects.create(ProjectCreate(name="Personal"), user_id)
+        client = uow.projects.create(
+            ProjectCreate(name="Cliente", parent_project_id=work.id), user_id
+        )
+        api = uow.projects.create(ProjectCreate(name="API", parent_project_id=client.id), user_id)
+        docs = uow.projects.create(
+            ProjectCreate(name="Docs", parent_project_id=client.id), user_id
+        )
+        with pytest.raises(ValueError):
+            uow.projects.create(
+                ProjectCreate(name="Ajeno", parent_project_id=work.id), "otro_usuario"
+            )
+        top_note = uow.notes.create(NoteCreate(content="raíz", project_id=work.id), user_id)
+        api_note = uow.notes.create(NoteCreate(content="api", project_id=api.id), user_id)
+        uow.notes.create(NoteCreate(content="otra", project_id=personal.id), user_id)
+        uow.sync_commit()
+
+    statements: list[str] = []
+    listener = lambda *args: statements.append(args[2])
+    with uow:
+        connection = session.connection()
+        event.listen(connection, "before_cursor_execute", listener)
+        try:
+            ancestors = uow.projects.get_ancestors(api.id, user_id)
+            descendants = uow.projects.get_descendants(work.id, user_id)
+        finally:
+            event.remove(connection, "before_cursor_execute", listener)
+        children = uow.projects.get_descendants(work.id, user_id, max_depth=1)
+        subtree_notes = uow.notes.search_by_project(work.id, user_id, include_subprojects=True)
+        own_notes = uow.notes.search_by_project(work.id, user_id)
+        summaries = uow.notes.search_summaries_by_project(
+            work.id, user_id, include_subprojects=True
+        )
+        page = uow.notes.query_notes(
+            user_id, NoteQuery(project_id=client.id, include_subprojects=True)
+        )
+        cached_api_note = uow.notes.get_by_id(api_note.id, user_id)
+
+    assert len(statements) == 2
+    assert [project.id for project in ancestors] == [work.id, client.id]
+    assert [project.id for project in descendants] == [client.id, api.id, docs.id]
+    assert [project.id for project in children] == [client.id]
+    assert {note.id for note in subtree_notes} == {top_note.id, api_note.id}
+    assert [note.id for note in own_notes] == [top_note.id]
+    assert {summary.id for summary in summaries} == {top_note.id, api_note.id}
+    assert [note.id for note in page.items] == [api_note.id]
+    assert cache.get((user_id, api_note.id)) == cached_api_note
+
+    with uow:
+        # Mover Cliente bajo Personal reescribe las rutas de API y Docs.
+        moved = uow.projects.update(
+            client.id, ProjectUpdate(parent_project_id=personal.id), user_id
+        )
+        assert moved.parent_project_id == personal.id
+        for parent_id in (client.id, api.id):
+            with pytest.raises(ValueError, match="subproyectos"):
+                uow.projects.update(client.id, ProjectUpdate(parent_project_id=parent_id), user_id)
+        with pytest.raises(ValueError, match="no encontrado"):
+            uow.projects.update(
+                client.id, ProjectUpdate(parent_project_id=uuid.uuid4()), user_id
+            )
+        assert uow.projects.update(uuid.uuid4(), ProjectUpdate(name="x"), user_id) is None
+        uow.projects.update(api.id, ProjectUpdate(name="API v2"), user_id)
+        uow.sync_commit()
+
+    # Las notas incrustan su proyecto: renombrarlo las invalida en la caché.
+    assert cache.get((user_id, api_note.id)) is None
+    with uow:
+        assert [p.id for p in uow.projects.get_ancestors(api.id, user_id)] == [
+            personal.id,
+            client.id,
+        ]
+        assert uow.projects.get_descendants(work.id, user_id) == []
+        assert uow.notes.get_by_id(api_note.id, user_id).project.name == "API v2"
+        moved_notes = uow.notes.search_by_project(personal.id, user_id, include_subprojects=True)
+        assert api_note.id in {note.id for note in moved_notes}
+        assert len(moved_notes) == 2
+
+        assert uow.projects.delete(client.id, user_id)
+        assert not uow.projects.delete(client.id, user_id)
+        uow.sync_commit()
+
+    with uow:
+        # Los hijos del proyecto borrado pasan a ser raíz.
+        assert uow.projects.get_by_id(api.id, user_id).parent_project_id is None
+        assert uow.projects.get_ancestors(docs.id, user_id) == []
+        assert uow.projects.get_descendants(personal.id, user_id) == []
+    paths = dict(
+        session.execute(
+            select(ProjectModel.id, ProjectModel.path).where(ProjectModel.user_id == user_id)
+        ).all()
+    )
+    assert paths[api.id] == [api.id]
+    assert paths[docs.id] == [docs.id]
+
+
+def _wait_for_lock(backend_pid: int, timeout: float = 5.0) -> bool:
+    """True si la conexión `backend_pid` queda esperando un bloqueo antes de `timeout`."""
+    # Motor propio, sin instrument_engine: el sondeo repite la misma consulta.
+    engine = create_engine(SYNC_DATABASE_URL_STR, echo=False)
+    deadline = time.monotonic() + timeout
+    try:
+        while time.monotonic() < deadline:
+            with engine.connect() as connection:
+                waiting = connection.execute(
+                    text("SELECT wait_event_type = 'Lock' FROM pg_stat_activity WHERE pid = :pid"),
+                    {"pid": backend_pid},
+                ).scalar()
+            if waiting:
+                return True
+            time.sleep(0.05)
+        return False
+    finally:
+        engine.dispose()
+
+
+def test_child_inserted_while_its_parent_moves_gets_the_new_path_with_sync_uow(
+    test_sync_engine_instance,
+):
+    """
+    Dos sesiones con datos confirmados: mientras A mueve un proyecto, B inserta un hijo bajo
+    él. B espera a que A termine y el hijo hereda la ruta nueva (sin el bloqueo del trigger,
+    el hijo copiaba la ruta anterior y el UPDATE del subárbol de A no lo veía).
+    """
+    session_factory = sessionmaker(bind=test_sync_engine_instance, expire_on_commit=False)
+    user_id = f"test_sync_user_projects_{uuid.uuid4()}"
+    with session_factory() as session:
+        session.add(UserProfileModel(user_id=user_id, name="Concurrencia de proyectos"))
+        session.commit()
+    try:
+        setup_uow = SyncSQLAlchemyUnitOfWork(session_factory=session_factory)
+        with setup_uow:
+            target = setup_uow.projects.create(ProjectCreate(name="Destino"), user_id)
+            parent = setup_uow.projects.create(ProjectCreate(name="Movido"), user_id)
+            setup_uow.sync_commit()
+
+        inserted: dict[str, object] = {}
+        backend_pid: list[int] = []
+        pid_known = threading.Event()
+
+        def insert_child() -> None:
+            try:
+                session = session_factory()
+                backend_pid.append(session.execute(text("SELECT pg_backend_pid()")).scalar_one())
+                pid_known.set()
+                child_uow = SyncSQLAlchemyUnitOfWork(session_factory=lambda: session)
+                with child_uow:
+                    inserted["child"] = child_uow.projects.create(
+                        ProjectCreate(name="Hijo", parent_project_id=parent.id), user_id
+                    )
+                    child_uow.sync_commit()
+            except Exception as exc:  # Se comprueba en el hilo principal
+                inserted["error"] = exc
+            finally:
+                pid_known.set()
+
+        move_uow = SyncSQLAlchemyUnitOfWork(session_factory=session_factory)
+        with move_uow:
+            move_uow.projects.update(parent.id, ProjectUpdate(parent_project_id=target.id), user_id)
+            worker = threading.Thread(target=insert_child)
+            worker.start()
+            assert pid_known.wait(timeout=5)
+            blocked = bool(backend_pid) and _wait_for_lock(backend_pid[0])
+            move_uow.sync_commit()
+        worker.join(timeout=10)
+
+        assert not worker.is_alive()
+        assert "error" not in inserted, inserted.get("error")
+        child = inserted["child"]
+        with session_factory() as session:
+            path = session.execute(
+                select(ProjectModel.path).where(ProjectModel.id == child.id)
+            ).scalar_one()
+        assert path == [target.id, parent.id, child.id]
+        assert blocked  # El INSERT del hijo esperó al movimiento del padre
+    finally:
+        with session_factory() as session:
+            session.execute(delete(UserProfileModel).where(UserProfileModel.user_id == user_id))
+            session.commit()
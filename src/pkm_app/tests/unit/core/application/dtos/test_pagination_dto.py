@@ -0,0 +1,90 @@
+import pytest
+from datetime import datetime, timezone
+import uuid
+
+from pkm_app.core.application.dtos.note_dto import NoteSchema
+from pkm_app.core.application.dtos.pagination_dto import NoteCursor, NotePage, NoteQueryCursor
+
+
+def get_utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+VALID_USER_ID = "auth0|valid_user_id_pagination"
+
+
+def make_note(updated_at: datetime) -> NoteSchema:
+    return NoteSchema(
+        id=uuid.uuid4(),
+        user_id=VALID_USER_ID,
+        content="Contenido",
+        created_at=updated_at,
+        updated_at=updated_at,
+    )
+
+
+class TestNoteCursor:
+    def test_encode_decode_roundtrip(self):
+        cursor = NoteCursor(updated_at=get_utc_now(), id=uuid.uuid4())
+        encoded = cursor.encode()
+
+        assert "=" not in encoded  # URL-safe and unpadded
+        assert NoteCursor.decode(encoded) == cursor
+
+    def test_from_note(self):
+        note = make_note(get_utc_now())
+        cursor = NoteCursor.from_note(note)
+        assert cursor.updated_at == note.updated_at
+        assert cursor.id == note.id
+
+    @pytest.mark.parametrize("raw", ["", "not-base64!", "bnVsbA", "WyJ4IiwgInkiXQ"])
+    def test_decode_invalid_cursor(self, raw):
+        with pytest.raises(ValueError, match="Invalid pagination cursor"):
+            NoteCursor.decode(raw)
+
+
+class TestNoteQueryCursor:
+    @pytest.mark.parametrize(
+        ("sort", "key"),
+        [
+            ("updated_desc", get_utc_now()),
+            ("created_asc", get_utc_now()),
+            ("title_asc", "2024-01-01 reunión"),
+            ("relevance", 0.1 + 0.2),
+        ],
+    )
+    def test_encode_decode_roundtrip_keeps_key_type(self, sort, key):
+        cursor = NoteQueryCursor(sort=sort, key=key, id=uuid.uuid4())
+        decoded = NoteQueryCursor.decode(cursor.encode(), sort)
+
+        assert decoded == cursor
+        assert type(decoded.key) is type(key)
+
+    def test_cursor_of_another_sort_is_rejected(self):
+        cursor = NoteQueryCursor(sort="created_desc", key=get_utc_now(), id=uuid.uuid4())
+        with pytest.raises(ValueError, match="Invalid pagination cursor"):
+            NoteQueryCursor.decode(cursor.encode(), "updated_desc")
+
+    def test_list_cursor_is_not_a_query_cursor(self):
+        cursor = NoteCursor(updated_at=get_utc_now(), id=uuid.uuid4())
+        with pytest.raises(ValueError, match="Invalid pagination cursor"):
+            NoteQueryCursor.decode(cursor.encode(), "updated_desc")
+
+
+class TestNotePage:
+    def test_full_page_has_next_cursor(self):
+        notes = [make_note(get_utc_now()) for _ in range(2)]
+        page = NotePage.from_items(notes, limit=2)
+
+        assert page.items == notes
+        assert page.next_cursor is not None
+        assert NoteCursor.decode(page.next_cursor).id == notes[-1].id
+
+    def test_short_page_is_last_page(self):
+        page = NotePage.from_items([make_note(get_utc_now())], limit=2)
+        assert page.next_cursor is None
+
+    def test_empty_page(self):
+        page = NotePage.from_items([], limit=10)
+        assert page.items == []
+        assert page.next_cursor is None
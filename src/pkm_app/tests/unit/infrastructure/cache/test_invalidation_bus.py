@@ -0,0 +1,69 @@
+import json
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+
+from src.pkm_app.core.application.dtos import NoteSchema
+from src.pkm_app.infrastructure.cache.invalidation_bus import (
+    MAX_PAYLOAD_BYTES,
+    CacheInvalidationListener,
+    decode_invalidation_payload,
+    encode_invalidation_payloads,
+    notify_invalidations_stmt,
+)
+from src.pkm_app.infrastructure.cache.note_cache import NoteCache
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.write_tracking import (
+    KEYWORD_ENTITY,
+    NOTE_ENTITY,
+    TouchedEntities,
+)
+
+
+def test_invalidation_payloads_round_trip_and_stay_under_the_notify_limit():
+    ids = [uuid.uuid4() for _ in range(1000)]
+    payloads = encode_invalidation_payloads("user-ñ", NOTE_ENTITY, ids)
+
+    assert len(payloads) > 1
+    assert all(len(payload.encode()) <= MAX_PAYLOAD_BYTES for payload in payloads)
+    messages = [decode_invalidation_payload(payload) for payload in payloads]
+    assert {message.user_id for message in messages} == {"user-ñ"}
+    assert sorted(note_id for message in messages for note_id in message.ids) == sorted(ids)
+
+
+def test_notify_invalidations_stmt_sends_every_payload_in_one_statement():
+    touched = TouchedEntities()
+    assert notify_invalidations_stmt(touched) is None
+
+    touched.add(NOTE_ENTITY, "user-1", [uuid.uuid4(), uuid.uuid4()])
+    touched.add(KEYWORD_ENTITY, "user-1", [uuid.uuid4()])
+    sql = str(notify_invalidations_stmt(touched))
+
+    assert sql.count("pg_notify(") == 2
+
+
+def test_listener_evicts_notified_notes_and_resets_on_malformed_payloads():
+    cache = NoteCache()
+    now = datetime.now(UTC)
+    notes = [
+        NoteSchema(id=uuid.uuid4(), user_id="user-1", content="x", created_at=now, updated_at=now)
+        for _ in range(2)
+    ]
+    for note in notes:
+        cache.put((note.user_id, note.id), note, cache.load_token())
+    listener = CacheInvalidationListener("postgresql+asyncpg://user:pw@localhost/db")
+    listener.subscribe_note_cache(cache)
+
+    payload = json.dumps({"u": "user-1", "e": NOTE_ENTITY, "i": [str(notes[0].id)]})
+    listener._on_notification(None, 0, listener.channel, payload)
+    assert cache.get(("user-1", notes[0].id)) is None
+    assert cache.get(("user-1", notes[1].id)) is notes[1]
+
+    listener._on_notification(None, 0, listener.channel, "no es json")
+    assert len(cache) == 0
+    assert (listener.stats.received, listener.stats.malformed, listener.stats.resets) == (2, 1, 1)
+
+
+def test_encode_invalidation_payloads_rejects_limits_too_small_for_one_id():
+    with pytest.raises(ValueError):
+        encode_invalidation_payloads("user-1", NOTE_ENTITY, [uuid.uuid4()], max_bytes=40)
@@ -0,0 +1,75 @@
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+
+from src.pkm_app.core.application.dtos import NoteSchema
+from src.pkm_app.infrastructure.cache.note_cache import NoteCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _note(title: str = "Nota") -> NoteSchema:
+    now = datetime.now(UTC)
+    return NoteSchema(
+        id=uuid.uuid4(),
+        user_id="user-1",
+        title=title,
+        content="Contenido",
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def _key(note: NoteSchema) -> tuple[str, uuid.UUID]:
+    return (note.user_id, note.id)
+
+
+def test_note_cache_hits_until_ttl_expires():
+    clock = FakeClock()
+    cache = NoteCache(ttl_seconds=10, clock=clock)
+    note = _note()
+
+    assert cache.get(_key(note)) is None
+    cache.put(_key(note), note, cache.load_token())
+    clock.now = 9.9
+    assert cache.get(_key(note)) is note
+    clock.now = 10.0
+    assert cache.get(_key(note)) is None
+
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.expirations) == (1, 2, 1)
+    assert cache.stats.hit_rate == pytest.approx(1 / 3)
+
+
+def test_note_cache_evicts_least_recently_used_entries():
+    cache = NoteCache(max_entries=2)
+    first, second, third = _note("1"), _note("2"), _note("3")
+
+    cache.put(_key(first), first, cache.load_token())
+    cache.put(_key(second), second, cache.load_token())
+    cache.get(_key(first))  # "first" pasa a ser la más reciente
+    cache.put(_key(third), third, cache.load_token())
+
+    assert cache.get(_key(second)) is None
+    assert cache.get(_key(first)) is first
+    assert cache.stats.evictions == 1
+    assert len(cache) == 2
+
+
+def test_note_cache_invalidation_discards_loads_started_before_it():
+    cache = NoteCache()
+    note = _note()
+    cache.put(_key(note), note, cache.load_token())
+
+    token = cache.load_token()  # lectura en curso...
+    cache.invalidate([_key(note)])  # ...mientras otra UoW confirma una edición
+    cache.put(_key(note), note, token)
+
+    assert cache.get(_key(note)) is None
+    assert cache.stats.invalidations == 1
@@ -0,0 +1,159 @@
+import uuid
+
+import pytest
+
+from src.pkm_app.infrastructure.graph.link_graph_index import (
+    LinkGraphIndex,
+    NodeDegree,
+    UserLinkGraph,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.write_tracking import (
+    LinkChange,
+)
+
+USER_ID = "user_graph"
+
+
+def _notes(count: int) -> list[uuid.UUID]:
+    return [uuid.uuid4() for _ in range(count)]
+
+
+def _edges(pairs: list[tuple[uuid.UUID, uuid.UUID]]) -> list[tuple[uuid.UUID, ...]]:
+    return [(uuid.uuid4(), source, target) for source, target in pairs]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_pagerank_sums_to_one_and_ranks_the_most_cited_note_first():
+    a, b, c, d = _notes(4)
+    graph = UserLinkGraph.from_edges(_edges([(a, c), (b, c), (d, c), (c, a)]))
+
+    scores = graph.pagerank()
+
+    assert sum(scores.values()) == pytest.approx(1.0)
+    assert graph.top_pagerank(2)[0][0] == c
+    assert graph.top_pagerank(2)[1][0] == a
+    # Sin enlaces entrantes: solo la parte de teletransporte.
+    assert scores[b] == pytest.approx(scores[d])
+
+
+def test_pagerank_handles_notes_without_outgoing_links():
+    a, b, c = _notes(3)
+    graph = UserLinkGraph.from_edges(_edges([(a, b), (a, c)]))
+
+    scores = graph.pagerank()
+
+    assert sum(scores.values()) == pytest.approx(1.0)
+    assert scores[b] == pytest.approx(scores[c])
+    assert scores[b] > scores[a]
+
+
+def test_degrees_and_hubs():
+    hub, a, b, c = _notes(4)
+    graph = UserLinkGraph.from_edges(_edges([(hub, a), (hub, b), (hub, c), (a, hub)]))
+
+    assert graph.degree(hub) == NodeDegree(incoming=1, outgoing=3)
+    assert graph.degree(uuid.uuid4()) == NodeDegree(0, 0)
+    assert graph.top_degree(1) == [(hub, 4)]
+    assert graph.top_degree(1, direction="incoming")[0][1] == 1
+    assert graph.node_count == 4
+    assert graph.link_count == 4
+
+
+def test_components_ignore_link_direction():
+    a, b, c, d, e = _notes(5)
+    graph = UserLinkGraph.from_edges(_edges([(a, b), (c, b), (d, e)]))
+
+    assert [set(component) for component in graph.components()] == [{a, b, c}, {d, e}]
+    assert [set(component) for component in graph.components(min_size=3)] == [{a, b, c}]
+    assert len(graph.components(limit=1)) == 1
+    assert graph.component_of(c) == {a, b, c}
+
+
+def test_incremental_changes_update_queries_and_drop_unlinked_notes():
+    a, b, c = _notes(3)
+    edges = _edges([(a, b)])
+    graph = UserLinkGraph.from_edges(edges)
+    assert graph.component_of(c) == set()
+
+    new_link = uuid.uuid4()
+    graph.apply([LinkChange(USER_ID, new_link, b, c)])
+    assert graph.component_of(a) == {a, b, c}
+    assert graph.degree(b) == NodeDegree(1, 1)
+
+    # Crear y borrar en la misma transacción no deja rastro.
+    transient = uuid.uuid4()
+    graph.apply([LinkChange(USER_ID, transient, c, a), LinkChange(USER_ID, transient)])
+    assert graph.link_count == 2
+
+    graph.apply([LinkChange(USER_ID, edges[0][0]), LinkChange(USER_ID, uuid.uuid4())])
+    assert graph.link_count == 1
+    assert graph.node_count == 2
+    assert graph.component_of(a) == set()
+    assert set(graph.pagerank()) == {b, c}
+
+
+def test_many_appends_grow_the_edge_buffers():
+    notes = _notes(100)
+    graph = UserLinkGraph()
+    graph.apply(
+        LinkChange(USER_ID, uuid.uuid4(), notes[i], notes[i + 1]) for i in range(len(notes) - 1)
+    )
+
+    assert graph.link_count == 99
+    assert graph.components() == [notes]
+    assert graph.nbytes > 0
+
+
+def test_index_applies_changes_to_loaded_graphs_and_reports_memory():
+    a, b, c = _notes(3)
+    index = LinkGraphIndex()
+    index.put(USER_ID, UserLinkGraph.from_edges(_edges([(a, b)])), index.load_token(USER_ID))
+
+    index.apply(
+        [LinkChange(USER_ID, uuid.uuid4(), b, c), LinkChange("other_user", uuid.uuid4(), a, c)]
+    )
+
+    graph = index.get(USER_ID)
+    assert graph is not None and graph.link_count == 2
+    assert index.get("other_user") is None
+    assert set(index.memory_usage()) == {USER_ID}
+    assert index.memory_usage()[USER_ID] == graph.nbytes
+    assert index.stats.applied_changes == 1
+
+
+def test_index_discards_loads_that_raced_with_changes():
+    a, b = _notes(2)
+    index = LinkGraphIndex()
+
+    token = index.load_token(USER_ID)
+    index.apply([LinkChange(USER_ID, uuid.uuid4(), a, b)])
+    index.put(USER_ID, UserLinkGraph(), token)
+    assert index.get(USER_ID) is None
+
+    token = index.load_token(USER_ID)
+    index.clear()
+    index.put(USER_ID, UserLinkGraph(), token)
+    assert index.get(USER_ID) is None
+
+    index.put(USER_ID, UserLinkGraph(), index.load_token(USER_ID))
+    assert index.get(USER_ID) is not None
+
+
+def test_index_expires_and_evicts_graphs():
+    clock = FakeClock()
+    index = LinkGraphIndex(max_users=1, ttl_seconds=10, clock=clock)
+    index.put("first", UserLinkGraph(), index.load_token("first"))
+    index.put("second", UserLinkGraph(), index.load_token("second"))
+    assert index.get("first") is None
+    assert index.stats.evictions == 1
+
+    clock.now = 10
+    assert index.get("second") is None
+    assert index.stats.expirations == 1
@@ -1,328 +1,320 @@
-import pytest
-import os
-import sys  # Añadido para manipular sys.modules
+import subprocess
+import sys
+from pathlib import Path
 from unittest import mock
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.engine import URL
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
 
-# Mockear las variables de entorno antes de que database.py las cargue
-DEFAULT_ENV_VARS = {
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.pkm_app.infrastructure.config.settings import Settings
+from src.pkm_app.infrastructure.persistence.sqlalchemy import database
+from src.pkm_app.infrastructure.persistence.sqlalchemy.database import (
+    EngineRegistry,
+    LazySessionFactory,
+    async_engine_options,
+    engine_options,
+    session_settings,
+    sync_engine_options,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.metrics import (
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.query_stats import (
+    _before_cursor_execute,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[7]
+
+DB_SETTINGS = {
     "DB_USER": "test_user",
     "DB_PASSWORD": "test_password",
     "DB_HOST": "test_host",
-    "DB_PORT": "1234",
+    "DB_PORT": 1234,
     "DB_NAME": "test_db",
 }
 
 
-@pytest.fixture(autouse=True)
-def mock_env_vars(monkeypatch):
-    """Mockea las variables de entorno para todos los tests en este módulo."""
-    for key, value in DEFAULT_ENV_VARS.items():
-        monkeypatch.setenv(key, value)
-    # Mockear load_dotenv a nivel global para todos los tests que importen 'database'
-    # Esto debe hacerse antes de la primera importación de 'database'
-    monkeypatch.setattr("dotenv.load_dotenv", lambda: None)
+def make_settings(**overrides) -> Settings:
+    """Settings sin .env: solo los valores dados (y el entorno para lo que no se pase)."""
+    return Settings(_env_file=None, **{**DB_SETTINGS, **overrides})
 
 
-@pytest.fixture
-def mock_sqlalchemy_creators(monkeypatch):
-    """Mockea create_async_engine y async_sessionmaker."""
-    mock_engine_creator = mock.MagicMock()
-    monkeypatch.setattr("sqlalchemy.ext.asyncio.create_async_engine", mock_engine_creator)
+def expected_url(drivername: str) -> str:
+    return URL.create(
+        drivername=drivername,
+        username="test_user",
+        password="test_password",
+        host="test_host",
+        port=1234,
+        database="test_db",
+    ).render_as_string(hide_password=False)
+
+
+def test_importing_database_does_not_load_settings_or_drivers():
+    """Importar el módulo no lee la configuración ni importa los drivers."""
+    code = (
+        "import sys\n"
+        "from src.pkm_app.infrastructure.persistence.sqlalchemy import database\n"
+        "loaded = {'asyncpg', 'psycopg2', 'pydantic_settings', "
+        "'src.pkm_app.infrastructure.config.settings'} & set(sys.modules)\n"
+        "assert not loaded, loaded\n"
+        "assert not database.engines.initialized\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=PROJECT_ROOT)
 
-    mock_session_maker_creator_func = mock.MagicMock(spec=async_sessionmaker)
 
-    # Lo que async_sessionmaker(...) devuelve (el callable AsyncSessionLocal)
-    mock_async_session_local_callable = mock.Mock(spec=async_sessionmaker)  # spec para el callable
+def test_database_urls_are_built_from_settings():
+    registry = EngineRegistry(make_settings())
 
-    # Lo que AsyncSessionLocal() devuelve (la instancia de sesión)
-    mock_async_session_instance = mock.AsyncMock(spec=AsyncSession)
-    # Configurar __aenter__ para que devuelva la propia instancia de sesión mockeada
-    mock_async_session_instance.__aenter__.return_value = mock_async_session_instance
+    assert registry.async_url == expected_url("postgresql+asyncpg")
+    assert registry.sync_url == expected_url("postgresql+psycopg2")
 
-    # Asegurar que los métodos a ser awaited sean AsyncMocks
-    mock_async_session_instance.rollback = mock.AsyncMock()
-    mock_async_session_instance.close = mock.AsyncMock()
 
-    mock_async_session_local_callable.return_value = mock_async_session_instance
-    mock_session_maker_creator_func.return_value = mock_async_session_local_callable
+def test_missing_settings_raise_value_error_on_first_use_not_on_creation():
+    registry = EngineRegistry(make_settings(DB_USER="", DB_NAME=""))
 
-    monkeypatch.setattr(
-        "sqlalchemy.ext.asyncio.async_sessionmaker", mock_session_maker_creator_func
+    assert not registry.initialized
+    with pytest.raises(ValueError, match="Faltan variables de entorno para la base de datos"):
+        registry.async_engine
+    with pytest.raises(ValueError, match="Faltan variables de entorno para la base de datos"):
+        registry.sync_session_factory
+
+
+def test_engine_options_come_from_settings():
+    settings = make_settings(
+        DB_POOL_SIZE=3,
+        DB_MAX_OVERFLOW=7,
+        DB_POOL_TIMEOUT=2.5,
+        DB_POOL_RECYCLE=600,
+        DB_POOL_PRE_PING=False,
+        DB_ECHO=True,
+        DB_STATEMENT_CACHE_SIZE=0,
     )
 
-    return (
-        mock_engine_creator,
-        mock_session_maker_creator_func,
-        mock_async_session_local_callable,
-        mock_async_session_instance,
+    assert engine_options(settings) == {
+        "echo": True,
+        "pool_size": 3,
+        "max_overflow": 7,
+        "pool_timeout": 2.5,
+        "pool_recycle": 600,
+        "pool_pre_ping": False,
+    }
+    assert async_engine_options(settings) == {
+        **engine_options(settings),
+        "connect_args": {"statement_cache_size": 0, "server_settings": session_settings()},
+    }
+
+
+def test_connections_open_with_the_session_settings():
+    settings = make_settings()
+
+    assert session_settings()["pg_trgm.word_similarity_threshold"] == "0.4"
+    assert session_settings()["hnsw.iterative_scan"] == "relaxed_order"
+    assert session_settings()["hnsw.ef_search"] == "100"
+    assert "default_transaction_read_only" not in session_settings()
+    options = sync_engine_options(settings)["connect_args"]["options"]
+    assert "-c pg_trgm.word_similarity_threshold=0.4" in options
+    read_only = sync_engine_options(settings, read_only=True)["connect_args"]["options"]
+    assert read_only.endswith("-c default_transaction_read_only=on")
+    server_settings = async_engine_options(settings, read_only=True)["connect_args"][
+        "server_settings"
+    ]
+    assert server_settings == session_settings(read_only=True)
+    assert server_settings["default_transaction_read_only"] == "on"
+
+
+def test_engines_are_built_once_with_the_pool_settings():
+    registry = EngineRegistry(
+        make_settings(
+            DB_POOL_SIZE=3,
+            DB_MAX_OVERFLOW=7,
+            DB_POOL_TIMEOUT=2.5,
+            DB_POOL_RECYCLE=600,
+            DB_ECHO=True,
+            DB_PREPARED_STATEMENT_CACHE_SIZE=0,
+        )
     )
 
+    sync_engine = registry.sync_engine
+    async_engine = registry.async_engine
+
+    assert registry.initialized
+    assert registry.sync_engine is sync_engine
+    assert registry.async_engine is async_engine
+    for engine in (sync_engine, async_engine):
+        assert engine.echo is True
+        assert engine.pool.size() == 3
+        assert engine.pool._max_overflow == 7
+        assert engine.pool._timeout == 2.5
+        assert engine.pool._recycle == 600
+        assert engine.pool._pre_ping is True
+    assert async_engine.url.query["prepared_statement_cache_size"] == "0"
 
-def import_database_module():
-    """
-    Importa y devuelve el módulo database.
-    Se asegura de que se recargue si ya está en sys.modules para aplicar mocks
-    o reflejar cambios en el entorno (ej. variables de entorno eliminadas).
-    """
-    import importlib
+    registry.dispose_sync()
 
-    module_name = "pkm_app.infrastructure.persistence.sqlalchemy.database"
+    assert not registry.initialized
+    assert registry.sync_engine is not sync_engine
+    registry.dispose_sync()
 
-    # Los mocks (dotenv, sqlalchemy) deben ser aplicados por las fixtures ANTES de llamar esta función.
 
-    if module_name in sys.modules:
-        # Si el módulo ya fue importado, lo recargamos.
-        reloaded_module = importlib.reload(sys.modules[module_name])
-    else:
-        # Si es la primera vez en este contexto (ej. después de del sys.modules[module_name]), lo importamos.
-        reloaded_module = importlib.import_module(module_name)
-    return reloaded_module
+def test_engines_are_instrumented_unless_disabled():
+    instrumented = EngineRegistry(make_settings())
+    plain = EngineRegistry(make_settings(DB_QUERY_STATS=False))
 
+    for registry, expected in ((instrumented, True), (plain, False)):
+        for engine in (registry.sync_engine, registry.async_engine.sync_engine):
+            assert (
+                event.contains(engine, "before_cursor_execute", _before_cursor_execute) is expected
+            )
+        registry.dispose_sync()
 
-def test_database_url_construction(monkeypatch):
-    """Verifica que ASYNC_DATABASE_URL se construye correctamente."""
-    # monkeypatch.setattr ya se encarga de mockear load_dotenv en mock_env_vars
-    database = import_database_module()
 
-    expected_url = URL.create(
-        drivername="postgresql+asyncpg",
-        username=DEFAULT_ENV_VARS["DB_USER"],
-        password=DEFAULT_ENV_VARS["DB_PASSWORD"],
-        host=DEFAULT_ENV_VARS["DB_HOST"],
-        port=int(DEFAULT_ENV_VARS["DB_PORT"]),
-        database=DEFAULT_ENV_VARS["DB_NAME"],
-    ).render_as_string(hide_password=False)
+def test_engine_pools_are_timed_and_named_for_the_metrics():
+    registry = EngineRegistry(make_settings(DB_REPLICA_HOST="replica_host"))
 
-    assert database.ASYNC_DATABASE_URL == expected_url
+    pools = {
+        "psycopg2": registry.sync_engine.pool,
+        "asyncpg": registry.async_engine.sync_engine.pool,
+        "psycopg2_replica": registry.sync_read_engine.pool,
+        "asyncpg_replica": registry.async_read_engine.sync_engine.pool,
+    }
+    for name, pool in pools.items():
+        expected_class = TimedAsyncAdaptedQueuePool if "asyncpg" in name else TimedQueuePool
+        assert type(pool) is expected_class
+        assert pool.metrics_name == name
+    registry.dispose_sync()
 
 
-def test_missing_env_vars_raises_value_error(monkeypatch):
-    """Verifica que se lanza ValueError si faltan variables de entorno."""
-    module_name = "pkm_app.infrastructure.persistence.sqlalchemy.database"
+def test_session_factories_are_bound_to_the_registry_engines():
+    registry = EngineRegistry(make_settings())
 
-    # Eliminar todas las variables de entorno relevantes
-    for var in DEFAULT_ENV_VARS.keys():
-        monkeypatch.delenv(var, raising=False)
+    async_factory = registry.async_session_factory
+    sync_factory = registry.sync_session_factory
 
-    # Asegurarse de que el módulo database no esté usando una versión cacheada
-    # que podría haber leído las variables de entorno antes de que las elimináramos.
-    if module_name in sys.modules:
-        del sys.modules[module_name]
+    assert registry.async_session_factory is async_factory
+    assert async_factory.kw["bind"] is registry.async_engine
+    assert issubclass(async_factory.class_, AsyncSession)
+    assert async_factory.kw["expire_on_commit"] is False
+    assert async_factory.kw["autoflush"] is False
+    assert sync_factory.kw["bind"] is registry.sync_engine
+    assert issubclass(sync_factory.class_, Session)
+    assert sync_factory.kw["autoflush"] is False
+    registry.dispose_sync()
 
-    with pytest.raises(ValueError, match="Faltan variables de entorno para la base de datos"):
-        # La importación (y por tanto la comprobación de env vars) ocurre aquí.
-        # Como lo eliminamos de sys.modules, import_database_module lo importará "de nuevo".
-        import_database_module()
 
+def test_read_sessions_use_the_replica_when_configured():
+    registry = EngineRegistry(make_settings(DB_REPLICA_HOST="replica_host", DB_REPLICA_PORT=5433))
 
-def test_async_engine_creation(mock_sqlalchemy_creators, monkeypatch):
-    """Verifica que create_async_engine se llama con la URL y echo=True."""
-    mock_engine_creator, _, _, _ = mock_sqlalchemy_creators
+    for read_engine, primary in (
+        (registry.sync_read_engine, registry.sync_engine),
+        (registry.async_read_engine, registry.async_engine),
+    ):
+        assert (read_engine.url.host, read_engine.url.port) == ("replica_host", 5433)
+        assert read_engine.pool is not primary.pool
+        assert not primary.get_execution_options().get("postgresql_readonly")
+    assert registry.async_read_engine is registry.async_read_engine
+    assert registry.async_read_session_factory.kw["bind"] is registry.async_read_engine
+    assert registry.sync_read_session_factory.kw["bind"] is registry.sync_read_engine
+    assert registry.sync_read_session_factory.kw["autoflush"] is False
 
-    # Importar el módulo DESPUÉS de que mock_sqlalchemy_creators haya aplicado los mocks
-    database_module = import_database_module()
+    registry.dispose_sync()
 
-    mock_engine_creator.assert_called_once_with(database_module.ASYNC_DATABASE_URL, echo=True)
+    assert not registry.initialized
 
 
-def test_async_session_local_creation(mock_sqlalchemy_creators, monkeypatch):
-    """Verifica que async_sessionmaker se llama con los parámetros correctos."""
-    mock_engine_creator, mock_session_maker_creator_func, _, _ = mock_sqlalchemy_creators
+def test_read_sessions_fall_back_to_the_primary_pool_without_replica():
+    registry = EngineRegistry(make_settings(DB_REPLICA_HOST=""))
 
-    # El engine que create_async_engine (mockeado) "devolvería"
-    # Necesitamos que el mock_engine_creator.return_value sea algo,
-    # ya que database.py lo usa como 'bind'
-    mock_created_engine = mock.MagicMock()
-    mock_engine_creator.return_value = mock_created_engine
+    assert not registry.has_replica
+    assert registry.sync_read_engine.url.host == "test_host"
+    assert registry.sync_read_engine.pool is registry.sync_engine.pool
+    assert registry.async_read_engine.pool is registry.async_engine.pool
+    assert registry.async_read_engine.get_execution_options()["postgresql_readonly"] is True
+    registry.dispose_sync()
 
-    # Importar el módulo DESPUÉS de que los mocks estén listos
-    import_database_module()
 
-    mock_session_maker_creator_func.assert_called_once_with(
-        bind=mock_created_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
-        autocommit=False,
-    )
+def test_lazy_session_factory_resolves_the_factory_on_each_call():
+    factory = mock.Mock(return_value="session")
+    resolve = mock.Mock(return_value=factory)
+    lazy = LazySessionFactory(resolve)
+
+    resolve.assert_not_called()
+    assert lazy(info={"a": 1}) == "session"
+    assert lazy() == "session"
+    assert resolve.call_count == 2
+    factory.assert_called_with()
 
 
-@pytest.mark.asyncio
-async def test_get_async_db_session_success(mock_sqlalchemy_creators, monkeypatch):
-    """Verifica que get_async_db_session proporciona y cierra una sesión."""
-    _, _, mock_callable_session_local, mock_session_instance = mock_sqlalchemy_creators
+@pytest.fixture
+def mock_async_session_local(monkeypatch):
+    """Sustituye AsyncSessionLocal por un callable que devuelve una sesión mockeada."""
+    session = mock.AsyncMock(spec=AsyncSession)
+    session.__aenter__.return_value = session
+    session_local = mock.Mock(return_value=session)
+    monkeypatch.setattr(database, "AsyncSessionLocal", session_local)
+    return session_local, session
 
-    database_module = import_database_module()
 
-    # Sobrescribir AsyncSessionLocal en el módulo 'database_module' importado
-    # con nuestro callable mockeado.
-    monkeypatch.setattr(database_module, "AsyncSessionLocal", mock_callable_session_local)
+@pytest.mark.asyncio
+async def test_get_async_db_session_success(mock_async_session_local):
+    """Verifica que get_async_db_session proporciona y cierra una sesión."""
+    session_local, session = mock_async_session_local
 
-    retrieved_session = None
-    # Usar el get_async_db_session del módulo importado
-    async for s in database_module.get_async_db_session():
-        retrieved_session = s
-        # s es el resultado de mock_session_instance.__aenter__()
-        # que hemos configurado para que sea mock_session_instance
-        assert s is mock_session_instance
+    async for s in database.get_async_db_session():
+        assert s is session
 
-    assert retrieved_session is not None
-    mock_callable_session_local.assert_called_once()
-    mock_session_instance.__aenter__.assert_called_once()
-    mock_session_instance.close.assert_called_once()
-    mock_session_instance.rollback.assert_not_called()
+    session_local.assert_called_once()
+    session.close.assert_called_once()
+    session.rollback.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_get_async_db_session_exception_rollbacks_and_closes(
-    mock_sqlalchemy_creators, monkeypatch
-):
+async def test_get_async_db_session_exception_rollbacks_and_closes(mock_async_session_local):
     """Verifica que la sesión hace rollback y se cierra en caso de excepción."""
-    _, _, mock_callable_session_local, mock_session_instance = mock_sqlalchemy_creators
-
-    database_module = import_database_module()
-    monkeypatch.setattr(database_module, "AsyncSessionLocal", mock_callable_session_local)
-
-    custom_exception = ValueError("Test Exception")
+    _, session = mock_async_session_local
 
-    agen = database_module.get_async_db_session()
-
-    # Consumir el generador hasta el primer yield para obtener la sesión
-    s = await agen.__anext__()
-    assert s is mock_session_instance
-
-    # Ahora, inyectar la excepción en el generador
-    # Esto debería ser capturado por el bloque `except Exception:` en `get_async_db_session`
+    agen = database.get_async_db_session()
+    assert await agen.__anext__() is session
     with pytest.raises(ValueError, match="Test Exception"):
-        await agen.athrow(custom_exception)
-
-    # Cuando athrow propaga una excepción fuera del generador, este se cierra automáticamente.
-    # No se necesita una llamada explícita a agen.aclose() en este caso específico,
-    # a menos que el generador manejara la excepción de athrow y continuara con StopAsyncIteration.
+        await agen.athrow(ValueError("Test Exception"))
 
-    # Verificaciones
-    mock_callable_session_local.assert_called_once()
-    mock_session_instance.__aenter__.assert_called_once()
-
-    # El rollback y close deben ser llamados por la lógica explícita
-    # en los bloques except y finally de get_async_db_session
-    mock_session_instance.rollback.assert_called_once()
-    mock_session_instance.close.assert_called_once()
+    session.rollback.assert_called_once()
+    session.close.assert_called_once()
 
 
 @pytest.fixture
-def mock_sqlalchemy_sync_creators(monkeypatch):
-    """Mockea create_engine y sessionmaker para la configuración síncrona."""
-    mock_sync_engine_creator = mock.MagicMock(spec=create_engine)
-    monkeypatch.setattr("sqlalchemy.create_engine", mock_sync_engine_creator)
-
-    mock_sync_session_maker_creator_func = mock.MagicMock(spec=sessionmaker)
-
-    mock_sync_session_local_callable = mock.Mock(spec=sessionmaker)
-    mock_sync_session_instance = mock.MagicMock(spec=Session)
+def mock_sync_session_local(monkeypatch):
+    """Sustituye SyncSessionLocal por un callable que devuelve una sesión mockeada."""
+    session = mock.MagicMock(spec=Session)
+    session_local = mock.Mock(return_value=session)
+    monkeypatch.setattr(database, "SyncSessionLocal", session_local)
+    return session_local, session
 
-    # Configurar el comportamiento de la sesión mockeada
-    mock_sync_session_instance.rollback = mock.MagicMock()
-    mock_sync_session_instance.close = mock.MagicMock()
 
-    mock_sync_session_local_callable.return_value = mock_sync_session_instance
-    mock_sync_session_maker_creator_func.return_value = mock_sync_session_local_callable
-
-    monkeypatch.setattr("sqlalchemy.orm.sessionmaker", mock_sync_session_maker_creator_func)
-
-    return (
-        mock_sync_engine_creator,
-        mock_sync_session_maker_creator_func,
-        mock_sync_session_local_callable,
-        mock_sync_session_instance,
-    )
-
-
-def test_sync_database_url_construction(monkeypatch):
-    """Verifica que SYNC_DATABASE_URL_STR se construye correctamente."""
-    database = import_database_module()
-
-    expected_url = URL.create(
-        drivername="postgresql+psycopg2",
-        username=DEFAULT_ENV_VARS["DB_USER"],
-        password=DEFAULT_ENV_VARS["DB_PASSWORD"],
-        host=DEFAULT_ENV_VARS["DB_HOST"],
-        port=int(DEFAULT_ENV_VARS["DB_PORT"]),
-        database=DEFAULT_ENV_VARS["DB_NAME"],
-    ).render_as_string(hide_password=False)
-
-    assert database.SYNC_DATABASE_URL_STR == expected_url
-
-
-def test_sync_engine_creation(mock_sqlalchemy_sync_creators, monkeypatch):
-    """Verifica que create_engine se llama con la URL y echo=True."""
-    mock_sync_engine_creator, _, _, _ = mock_sqlalchemy_sync_creators
-
-    database_module = import_database_module()
-
-    mock_sync_engine_creator.assert_called_once_with(
-        database_module.SYNC_DATABASE_URL_STR, echo=True
-    )
-
-
-def test_sync_session_local_creation(mock_sqlalchemy_sync_creators, monkeypatch):
-    """Verifica que sessionmaker se llama con los parámetros correctos."""
-    mock_sync_engine_creator, mock_sync_session_maker_creator_func, _, _ = (
-        mock_sqlalchemy_sync_creators
-    )
-
-    mock_created_sync_engine = mock.MagicMock()
-    mock_sync_engine_creator.return_value = mock_created_sync_engine
-
-    import_database_module()
-
-    mock_sync_session_maker_creator_func.assert_called_once_with(
-        autocommit=False, autoflush=False, bind=mock_created_sync_engine, class_=Session
-    )
-
-
-def test_get_sync_db_session_success(mock_sqlalchemy_sync_creators, monkeypatch):
+def test_get_sync_db_session_success(mock_sync_session_local):
     """Verifica que get_sync_db_session proporciona y cierra una sesión síncrona."""
-    _, _, mock_callable_sync_session_local, mock_sync_session_instance = (
-        mock_sqlalchemy_sync_creators
-    )
-
-    database_module = import_database_module()
-    monkeypatch.setattr(database_module, "SyncSessionLocal", mock_callable_sync_session_local)
+    session_local, session = mock_sync_session_local
 
-    retrieved_session = None
-    with database_module.get_sync_db_session() as s:
-        retrieved_session = s
-        assert s is mock_sync_session_instance
+    with database.get_sync_db_session() as s:
+        assert s is session
 
-    assert retrieved_session is not None
-    mock_callable_sync_session_local.assert_called_once()
-    mock_sync_session_instance.close.assert_called_once()
-    mock_sync_session_instance.rollback.assert_not_called()
+    session_local.assert_called_once()
+    session.close.assert_called_once()
+    session.rollback.assert_not_called()
 
 
-def test_get_sync_db_session_exception_rollbacks_and_closes(
-    mock_sqlalchemy_sync_creators, monkeypatch
-):
+def test_get_sync_db_session_exception_rollbacks_and_closes(mock_sync_session_local):
     """Verifica que la sesión síncrona hace rollback y se cierra en caso de excepción."""
-    _, _, mock_callable_sync_session_local, mock_sync_session_instance = (
-        mock_sqlalchemy_sync_creators
-    )
-
-    database_module = import_database_module()
-    monkeypatch.setattr(database_module, "SyncSessionLocal", mock_callable_sync_session_local)
-
-    custom_exception = ValueError("Test Sync Exception")
+    _, session = mock_sync_session_local
 
     with pytest.raises(ValueError, match="Test Sync Exception"):
-        with database_module.get_sync_db_session() as s:
-            assert s is mock_sync_session_instance
-            raise custom_exception
+        with database.get_sync_db_session() as s:
+            assert s is session
+            raise ValueError("Test Sync Exception")
 
-    mock_callable_sync_session_local.assert_called_once()
-    mock_sync_session_instance.rollback.assert_called_once()
-    mock_sync_session_instance.close.assert_called_once()
+    session.rollback.assert_called_once()
+    session.close.assert_called_once()
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.pkm_app.core.application.dtos import NoteSearchFilters
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import EMBEDDING_DIMENSIONS
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.hybrid_search import (
+    HYBRID_CANDIDATE_LIMIT,
+    hybrid_search_stmt,
+)
+
+QUERY_VECTOR = [0.0] * (EMBEDDING_DIMENSIONS - 1) + [1.0]
+
+
+def _compile(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+def test_hybrid_search_is_a_single_statement_fusing_both_retrievers():
+    compiled = _compile(hybrid_search_stmt("user-1", "gestión", QUERY_VECTOR, k=10))
+    sql = str(compiled)
+
+    assert sql.startswith("WITH lexical AS")
+    assert "semantic AS" in sql and "fused AS" in sql
+    assert "notes.search_vector @@ websearch_to_tsquery(" in sql
+    assert "ORDER BY notes.embedding <=> " in sql
+    assert "FROM lexical FULL OUTER JOIN semantic ON lexical.id = semantic.id" in sql
+    # Keywords, proyecto y fuente en la misma consulta (joinedload)
+    assert "LEFT OUTER JOIN (note_keywords" in sql
+    assert "power(" not in sql
+    assert list(compiled.params.values()).count(HYBRID_CANDIDATE_LIMIT) == 2
+
+
+def test_hybrid_search_applies_filters_to_both_retrievers_and_recency_boost():
+    filters = NoteSearchFilters(type="idea")
+    sql = str(
+        _compile(
+            hybrid_search_stmt(
+                "user-1", "gestión", QUERY_VECTOR, k=5, filters=filters, recency_half_life_days=7
+            )
+        )
+    )
+
+    assert sql.count("notes.type = ") == 2
+    assert "power(" in sql and "now() - notes.updated_at" in sql
+
+
+def test_hybrid_search_with_blank_query_only_uses_vector_candidates():
+    sql = str(_compile(hybrid_search_stmt("user-1", "  ", QUERY_VECTOR, k=5)))
+
+    assert "websearch_to_tsquery" not in sql.split("semantic AS")[0].split("WHERE")[1]
+    assert "false" in sql
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"query_vector": [1.0, 0.0]},
+        {"k": 0},
+        {"recency_half_life_days": 0},
+    ],
+)
+def test_hybrid_search_rejects_invalid_arguments(kwargs):
+    arguments = {"query_vector": QUERY_VECTOR, "k": 10} | kwargs
+    with pytest.raises(ValueError):
+        hybrid_search_stmt("user-1", "gestión", **arguments)
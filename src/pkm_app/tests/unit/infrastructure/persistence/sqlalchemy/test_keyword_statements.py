@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import Keyword as KeywordModel
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.keyword_statements import (
+    insert_missing_keyword_ids_stmt,
+    missing_keyword_names,
+    normalize_keyword_names,
+    select_keyword_ids_stmt,
+)
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_normalize_keyword_names_dedupes_sorts_and_skips_blank():
+    assert normalize_keyword_names(["b", "a", "b", " ", ""]) == ["a", "b"]
+
+
+def test_insert_missing_keyword_ids_is_single_upsert_with_returning():
+    compiled = insert_missing_keyword_ids_stmt("user-1", ["a", "b", "c"]).compile(
+        dialect=postgresql.dialect()
+    )
+    sql = str(compiled)
+
+    assert sql.count("INSERT INTO keywords") == 1
+    assert "unnest(" in sql
+    assert "ON CONFLICT ON CONSTRAINT uq_keywords_user_id_name DO NOTHING" in sql
+    assert "RETURNING keywords.id, keywords.name" in sql
+    # Un parámetro array por columna, no uno por nombre
+    assert ["a", "b", "c"] in compiled.params.values()
+
+
+def test_select_keyword_ids_filters_by_user_and_names():
+    compiled = select_keyword_ids_stmt("user-1", ["a", "b"]).compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+
+    assert "keywords.user_id = %(user_id_1)s" in sql
+    assert "keywords.name = ANY (" in sql
+    assert ["a", "b"] in compiled.params.values()
+
+
+@pytest.mark.parametrize(
+    "resolved, expected",
+    [
+        ([], ["a", "b"]),
+        (["a"], ["b"]),
+        (["a", "b"], []),
+    ],
+)
+def test_missing_keyword_names(resolved, expected):
+    keywords = [KeywordModel(user_id="user-1", name=name) for name in resolved]
+    assert missing_keyword_names(["a", "b"], keywords) == expected
@@ -0,0 +1,70 @@
+import re
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.pkm_app.core.application.dtos.note_link_dto import MAX_GRAPH_DEPTH
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.link_graph import (
+    backlinks_stmt,
+    check_graph_limits,
+    neighborhood_stmt,
+    shortest_path_stmt,
+)
+
+
+def _compile(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _lateral_step(sql: str) -> str:
+    """Subconsulta LATERAL que da los vecinos de cada nota del nivel anterior."""
+    return sql.split("JOIN LATERAL (", 1)[1].split(") AS step ON true", 1)[0]
+
+
+def _newest_links_first(step: str) -> bool:
+    return re.search(r"ORDER BY \w+\.created_at DESC", step) is not None
+
+
+@pytest.mark.parametrize(
+    "limits",
+    [
+        {"depth": 0},
+        {"depth": MAX_GRAPH_DEPTH + 1},
+        {"depth": 1, "max_fanout": 0},
+        {"depth": 1, "max_nodes": 0},
+    ],
+)
+def test_graph_limits_are_validated(limits):
+    with pytest.raises(ValueError):
+        check_graph_limits(**limits)
+
+
+def test_neighborhood_walks_one_row_per_note_and_level_with_a_fanout_cap():
+    sql = _compile(neighborhood_stmt(uuid.uuid4(), "user-1", 2, ["cites"], "both", 10, 100))
+
+    assert sql.startswith("WITH RECURSIVE walk(note_id, depth, path, link_ids)")
+    assert "SELECT DISTINCT ON (step.neighbor_id)" in sql
+    assert "JOIN LATERAL" in sql and "UNION ALL SELECT note_links.source_note_id" in sql
+    step = _lateral_step(sql)
+    # Tope de enlaces por nota: los más recientes primero, con LIMIT dentro del LATERAL.
+    assert _newest_links_first(step) and "LIMIT" in step
+    # El LATERAL se correlaciona con el nivel anterior: no vuelve a leer walk.
+    assert "FROM note_links, walk" not in sql
+    assert "note_links.link_type = ANY" in sql
+
+
+def test_shortest_path_follows_every_link_and_stops_at_the_first_match():
+    sql = _compile(shortest_path_stmt(uuid.uuid4(), uuid.uuid4(), "user-1", None, "outgoing", 4))
+
+    assert "note_links.source_note_id AS neighbor_id" not in sql
+    assert "link_type" not in sql.split("found AS")[0]
+    step = _lateral_step(sql)
+    assert not _newest_links_first(step) and "LIMIT" not in step
+    assert "WITH ORDINALITY AS step(link_id, position)" in sql
+
+
+def test_backlinks_filter_by_target_and_type():
+    sql = _compile(backlinks_stmt(uuid.uuid4(), "user-1", ["cites", "extends"], 20))
+    assert "note_links.target_note_id = " in sql and "note_links.link_type = ANY" in sql
+    assert "link_type = ANY" not in _compile(backlinks_stmt(uuid.uuid4(), "user-1", [], 20))
@@ -0,0 +1,131 @@
+import importlib.util
+import urllib.request
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.metrics import (
+    TimedQueuePool,
+    instrument_repository,
+    metrics,
+    start_metrics_server,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.query_stats import QueryStats
+from src.pkm_app.infrastructure.persistence.sqlalchemy.sync_unit_of_work import (
+    SyncSQLAlchemyUnitOfWork,
+)
+
+HAS_PROMETHEUS = importlib.util.find_spec("prometheus_client") is not None
+
+
+@instrument_repository
+class FakeRepository:
+    def get(self, value: int) -> int:
+        return value
+
+    async def aget(self, value: int) -> int:
+        return value
+
+    def fail(self) -> None:
+        raise LookupError("no existe")
+
+    def _private(self) -> str:
+        return "sin medir"
+
+
+def sample(name: str, **labels: str) -> float:
+    return metrics().registry.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_instrumented_methods_keep_their_behaviour():
+    repository = FakeRepository()
+
+    assert repository.get(1) == 1
+    assert await repository.aget(2) == 2
+    with pytest.raises(LookupError, match="no existe"):
+        repository.fail()
+    assert FakeRepository.get.__wrapped__.__name__ == "get"
+    assert not hasattr(FakeRepository._private, "__wrapped__")
+
+
+@pytest.mark.skipif(HAS_PROMETHEUS, reason="prometheus-client instalado")
+def test_without_prometheus_client_metrics_are_no_op():
+    assert not metrics().enabled
+    with pytest.raises(RuntimeError, match="prometheus-client"):
+        start_metrics_server(port=0)
+
+
+@pytest.mark.asyncio
+async def test_repository_calls_are_timed_and_counted_by_outcome():
+    pytest.importorskip("prometheus_client")
+    repository = FakeRepository()
+    labels = {"repository": "FakeRepository"}
+    before = sample("pkm_repository_calls_total", **labels, method="get", outcome="ok")
+
+    repository.get(1)
+    await repository.aget(1)
+    with pytest.raises(LookupError):
+        repository.fail()
+
+    assert sample("pkm_repository_calls_total", **labels, method="get", outcome="ok") == before + 1
+    assert sample("pkm_repository_calls_total", **labels, method="aget", outcome="ok") >= 1
+    assert sample("pkm_repository_calls_total", **labels, method="fail", outcome="error") >= 1
+    assert sample("pkm_repository_call_seconds_count", **labels, method="get") >= 1
+
+
+def test_pool_checkouts_and_state_are_exported():
+    pytest.importorskip("prometheus_client")
+    engine = create_engine(
+        "sqlite://", poolclass=TimedQueuePool, pool_size=2, pool_logging_name="test_sqlite"
+    )
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert sample("pkm_pool_checked_out", engine="test_sqlite") == 1
+
+    assert sample("pkm_pool_checkout_seconds_count", engine="test_sqlite") == 1
+    assert sample("pkm_pool_size", engine="test_sqlite") == 2
+    assert sample("pkm_pool_checked_in", engine="test_sqlite") == 1
+    assert sample("pkm_pool_overflow", engine="test_sqlite") == 0
+
+    engine.dispose()  # El pool recreado conserva el nombre y sustituye al anterior
+    assert sample("pkm_pool_checked_in", engine="test_sqlite") == 0
+
+
+def test_unit_of_work_duration_and_statements_are_recorded():
+    pytest.importorskip("prometheus_client")
+    engine = create_engine("sqlite://")
+    uow = SyncSQLAlchemyUnitOfWork(
+        session_factory=sessionmaker(bind=engine), query_stats_factory=QueryStats
+    )
+    before = sample("pkm_unit_of_work_seconds_count", unit_of_work="sync", outcome="error")
+
+    with pytest.raises(ValueError), uow:
+        raise ValueError("fallo")
+
+    assert (
+        sample("pkm_unit_of_work_seconds_count", unit_of_work="sync", outcome="error") == before + 1
+    )
+    assert sample("pkm_unit_of_work_statements_count", unit_of_work="sync") >= 1
+    engine.dispose()
+
+
+def test_metrics_server_serves_the_text_exposition_format():
+    pytest.importorskip("prometheus_client")
+    FakeRepository().get(1)
+    server = start_metrics_server(port=0, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert content_type.startswith("text/plain")
+    assert "# TYPE pkm_repository_call_seconds histogram" in body
+    assert (
+        'pkm_repository_calls_total{method="get",outcome="ok",repository="FakeRepository"}' in body
+    )
@@ -0,0 +1,84 @@
+import json
+import uuid
+
+import pytest
+
+from src.pkm_app.core.application.dtos import NoteCreate
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_bulk_ingest import (
+    NOTE_COPY_COLUMNS,
+    copy_sql,
+    copy_text_buffer,
+    ensure_references_owned,
+    iter_note_batches,
+    note_keyword_records,
+    prepare_note_batch,
+)
+
+
+def test_iter_note_batches_splits_generators():
+    notes = (NoteCreate(content=f"nota {i}") for i in range(5))
+    batches = list(iter_note_batches(notes, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+def test_iter_note_batches_rejects_invalid_batch_size():
+    with pytest.raises(ValueError):
+        list(iter_note_batches([], batch_size=0))
+
+
+def test_prepare_note_batch_builds_records_in_copy_column_order():
+    project_id = uuid.uuid4()
+    notes = [
+        NoteCreate(
+            title="Título",
+            content="Contenido",
+            project_id=project_id,
+            note_metadata={"a": 1},
+            keywords=["b", "a", "a", ""],
+        ),
+        NoteCreate(content="Sin extras"),
+    ]
+
+    batch = prepare_note_batch(notes, "user-1")
+
+    assert len(batch.note_ids) == 2
+    first = dict(zip(NOTE_COPY_COLUMNS, batch.note_records[0], strict=True))
+    assert first["id"] == batch.note_ids[0]
+    assert first["user_id"] == "user-1"
+    assert first["project_id"] == project_id
+    assert json.loads(first["note_metadata"]) == {"a": 1}
+    second = dict(zip(NOTE_COPY_COLUMNS, batch.note_records[1], strict=True))
+    assert second["note_metadata"] is None
+    assert batch.keyword_names_by_note == [["a", "b"], []]
+    assert batch.keyword_names == ["a", "b"]
+    assert batch.project_ids == {project_id}
+
+
+def test_note_keyword_records_pairs_notes_with_keyword_ids():
+    batch = prepare_note_batch(
+        [NoteCreate(content="x", keywords=["a", "b"]), NoteCreate(content="y", keywords=["a"])],
+        "user-1",
+    )
+    keyword_ids = {"a": uuid.uuid4(), "b": uuid.uuid4()}
+
+    records = note_keyword_records(batch, keyword_ids)
+
+    assert records == [
+        (batch.note_ids[0], keyword_ids["a"]),
+        (batch.note_ids[0], keyword_ids["b"]),
+        (batch.note_ids[1], keyword_ids["a"]),
+    ]
+
+
+def test_ensure_references_owned_raises_for_foreign_project():
+    batch = prepare_note_batch([NoteCreate(content="x", project_id=uuid.uuid4())], "user-1")
+    with pytest.raises(ValueError, match="Proyecto con id"):
+        ensure_references_owned(batch, found_project_ids=[], found_source_ids=[])
+
+
+def test_copy_text_buffer_escapes_special_characters_and_nulls():
+    buffer = copy_text_buffer([("a\tb", None, "línea 1\nlínea 2", "c:\\ruta")])
+    assert buffer.getvalue() == "a\\tb\t\\N\tlínea 1\\nlínea 2\tc:\\\\ruta\n"
+    assert copy_sql("note_keywords", ("note_id", "keyword_id")) == (
+        "COPY note_keywords (note_id, keyword_id) FROM STDIN"
+    )
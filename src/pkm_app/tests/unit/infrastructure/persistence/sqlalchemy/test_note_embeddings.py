@@ -0,0 +1,39 @@
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_embeddings import (
+    embedding_text,
+    stale_embedding_ids_stmt,
+    write_embeddings_stmt,
+)
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_embedding_text_matches_content_hash_expression():
+    # Mismo texto que hashea NOTE_CONTENT_HASH_SQL: coalesce(title, '') || '\n\n' || content
+    assert embedding_text("Título", "Contenido") == "Título\n\nContenido"
+    assert embedding_text(None, "Contenido") == "\n\nContenido"
+
+
+def test_write_embeddings_stmt_only_applies_to_unchanged_content_and_keeps_updated_at():
+    sql = _compile(write_embeddings_stmt())
+
+    assert "notes.content_hash = %(hash)s" in sql
+    assert "embedding_content_hash=%(hash)s" in sql
+    assert "updated_at=notes.updated_at" in sql
+
+
+def test_stale_embedding_ids_stmt_uses_keyset_over_the_partial_index_predicate():
+    after_id = uuid.uuid4()
+    compiled = stale_embedding_ids_stmt(after_id, 100).compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+
+    assert "notes.embedding_content_hash IS DISTINCT FROM notes.content_hash" in sql
+    assert "notes.id > " in sql
+    assert "ORDER BY notes.id" in sql
+    assert after_id in compiled.params.values()
+    assert "notes.id > " not in _compile(stale_embedding_ids_stmt(None, 100))
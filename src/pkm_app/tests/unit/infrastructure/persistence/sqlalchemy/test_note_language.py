@@ -0,0 +1,43 @@
+import pytest
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import DEFAULT_NOTE_LANGUAGE
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_language import (
+    detect_language,
+    normalize_language,
+    resolve_note_language,
+)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("es", "es"),
+        ("es-ES", "es"),
+        ("Español", "es"),
+        ("en_US", "en"),
+        ("english", "en"),
+        ("simple", "simple"),
+        ("fr", "simple"),  # idioma explícito sin configuración propia: sin stemming
+        ("", None),
+        (None, None),
+        (42, None),
+    ],
+)
+def test_normalize_language(value, expected):
+    assert normalize_language(value) == expected
+
+
+def test_detect_language():
+    assert detect_language("Las tareas de gestión del equipo están pendientes") == "es"
+    assert detect_language("The team is working on the quarterly budget") == "en"
+    assert detect_language("¿Qué?") == "es"
+    assert detect_language("Kairos 2026") == DEFAULT_NOTE_LANGUAGE
+
+
+def test_resolve_note_language_prefers_metadata():
+    text = "The team is working on the quarterly budget"
+
+    assert resolve_note_language("Budget", text, {"language": "es"}) == "es"
+    assert resolve_note_language("Budget", text, {"language": " "}) == "en"
+    assert resolve_note_language("Budget", text, None) == "en"
+    assert resolve_note_language(None, "", {}) == DEFAULT_NOTE_LANGUAGE
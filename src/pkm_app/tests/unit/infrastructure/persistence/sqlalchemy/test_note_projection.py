@@ -0,0 +1,131 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import result_tuple
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Keyword as KeywordModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import (
+    Note as NoteModel,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_pagination import (
+    paginate_notes_stmt,
+)
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_projection import (
+    note_columns_stmt,
+    note_from_row,
+    projected_notes_stmt,
+    projected_summaries_stmt,
+    summaries_from_rows,
+    summary_columns_stmt,
+)
+
+
+def _compile(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _split_page(sql):
+    """(SELECT de la página, resto de la consulta exterior)"""
+    head, rest = sql.split("FROM (SELECT ", 1)
+    page, outer = rest.split(") AS page", 1)
+    return page, head + outer
+
+
+def _page(*criteria, skip=0):
+    return paginate_notes_stmt(note_columns_stmt(*criteria), skip=skip, limit=100, cursor=None)
+
+
+def test_projection_paginates_before_joining_and_aggregating_keywords():
+    sql = _compile(projected_notes_stmt(_page(NoteModel.user_id == "user-1", skip=200)))
+    page, outer = _split_page(sql)
+
+    assert "notes.content" in page and "notes.search_vector" not in sql
+    assert "notes.embedding" not in sql
+    assert "ORDER BY notes.updated_at DESC, notes.id DESC" in page and "OFFSET" in page
+    assert "json_agg(json_build_object(" in sql and "ORDER BY keywords.name)" in sql
+    assert "WHERE note_keywords.note_id = page.id" in sql
+    assert "LEFT OUTER JOIN projects ON projects.id = page.project_id" in outer
+    assert "LEFT OUTER JOIN sources ON sources.id = page.source_id" in outer
+    assert outer.rstrip().endswith("ORDER BY page.updated_at DESC, page.id DESC")
+
+
+def test_keyword_filter_join_stays_inside_the_page():
+    page = note_columns_stmt(NoteModel.user_id == "user-1", KeywordModel.name == "a").join(
+        NoteModel.keywords
+    )
+    sql = _compile(projected_notes_stmt(page))
+
+    assert "FROM notes JOIN note_keywords AS note_keywords_1" in _split_page(sql)[0]
+    assert "FROM note_keywords JOIN keywords" in sql
+
+
+def test_note_from_row_validates_columns_without_orm_objects():
+    note_id, keyword_id = uuid.uuid4(), uuid.uuid4()
+    now = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    columns = [column.name for column in projected_notes_stmt(_page()).selected_columns]
+    values = dict.fromkeys(columns)
+    values.update(
+        id=note_id,
+        user_id="user-1",
+        title="Título",
+        content="Contenido",
+        note_metadata={"a": 1},
+        created_at=now,
+        updated_at=now,
+        keywords=[
+            {
+                "id": str(keyword_id),
+                "name": "alfa",
+                "user_id": "user-1",
+                "created_at": now.isoformat(),
+            }
+        ],
+    )
+    row = result_tuple(columns)(tuple(values[name] for name in columns))
+
+    note = note_from_row(row)
+
+    assert (note.id, note.title, note.note_metadata) == (note_id, "Título", {"a": 1})
+    assert note.project is None and note.source is None
+    assert [(keyword.id, keyword.name, keyword.created_at) for keyword in note.keywords] == [
+        (keyword_id, "alfa", now)
+    ]
+
+
+def test_summary_reads_a_content_slice_only_for_the_page():
+    page = paginate_notes_stmt(
+        summary_columns_stmt(NoteModel.user_id == "user-1"), skip=0, limit=20, cursor=None
+    )
+    sql = _compile(projected_summaries_stmt(page, snippet_length=80))
+    inner, outer = _split_page(sql)
+
+    assert "content" not in inner and "note_metadata" not in sql
+    assert "substr(notes.content, " in sql
+    assert "JOIN notes ON notes.id = page.id" in outer
+    assert "array_agg(keywords.name ORDER BY keywords.name)" in sql
+
+
+def test_summaries_from_rows_cuts_snippet_and_flags_truncation():
+    columns = [
+        column.name
+        for column in projected_summaries_stmt(summary_columns_stmt(), 3).selected_columns
+    ]
+    now = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    make_row = result_tuple(columns)
+    base = dict.fromkeys(columns)
+    base.update(user_id="user-1", created_at=now, updated_at=now, keywords=["a"])
+    rows = [
+        make_row(tuple({**base, "id": uuid.uuid4(), "head": head}[name] for name in columns))
+        for head in ("abcd", "abc")
+    ]
+
+    summaries = summaries_from_rows(rows, snippet_length=3)
+
+    assert [(s.snippet, s.content_truncated) for s in summaries] == [
+        ("abc", True),
+        ("abc", False),
+    ]
+    assert summaries[0].keywords == ["a"]
@@ -0,0 +1,85 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.pkm_app.core.application.dtos import MetadataPredicate, NoteQuery
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_query import (
+    keyword_search_stmt,
+    note_query_params,
+    note_query_shape,
+    note_query_stmt,
+)
+
+
+def _compile(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_queries_with_the_same_shape_share_one_statement():
+    first = NoteQuery(
+        text="reunión",
+        project_id=uuid.uuid4(),
+        keywords=["a", "b"],
+        metadata=[MetadataPredicate(key="status", value="draft")],
+    )
+    second = NoteQuery(
+        text="otra cosa",
+        project_id=uuid.uuid4(),
+        keywords=["c", "d", "e"],
+        metadata=[MetadataPredicate(key="priority", value=3)],
+    )
+
+    assert note_query_shape(first) == note_query_shape(second)
+    assert note_query_stmt(note_query_shape(first)) is note_query_stmt(note_query_shape(second))
+    assert note_query_stmt(note_query_shape(first)) is not note_query_stmt(
+        note_query_shape(first.model_copy(update={"keyword_match": "any"}))
+    )
+
+
+def test_values_only_travel_as_parameters():
+    query = NoteQuery(
+        text="reunión",
+        keywords=["proyecto-x", "proyecto-x", " "],
+        type="permanent",
+        created_after=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        metadata=[
+            MetadataPredicate(key="status", op="ne", value="archived"),
+            MetadataPredicate(key="reviewed", op="exists"),
+        ],
+    )
+    sql = _compile(note_query_stmt(note_query_shape(query)))
+    params = note_query_params("user-1", query)
+
+    for value in ("reunión", "proyecto-x", "permanent", "status", "archived", "user-1"):
+        assert value not in sql
+    assert params["keywords"] == ["proyecto-x"] and params["keyword_count"] == 1
+    assert params["metadata_key_1"] == "reviewed" and "metadata_value_1" not in params
+    assert "HAVING count(*) = %(keyword_count)s" in sql
+    assert "LIMIT %(limit)s" in sql
+
+
+def test_blank_keywords_do_not_add_a_keyword_filter():
+    query = NoteQuery(keywords=["", "  "])
+    assert note_query_shape(query).keyword_match is None
+    assert "notes.id IN" not in _compile(note_query_stmt(note_query_shape(query)))
+
+
+def test_cursor_must_match_the_query_sort():
+    query = NoteQuery(sort="created_desc", cursor="bm90LWEtY3Vyc29y")
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        note_query_params("user-1", query)
+
+
+def test_keyword_search_is_a_semi_join_without_duplicate_rows():
+    all_sql = _compile(keyword_search_stmt("user-1", ["b", "a", "a"], "all", None))
+    any_sql = _compile(keyword_search_stmt("user-1", ["a", "b"], "any", uuid.uuid4()))
+
+    # Sin JOIN con note_keywords en la consulta de notas: una fila por nota.
+    for sql in (all_sql, any_sql):
+        assert "notes.id IN (SELECT note_keywords.note_id" in sql
+        assert "JOIN note_keywords" not in sql.split("notes.id IN")[0]
+    assert "HAVING count(*) = " in all_sql and "notes.project_id = " not in all_sql
+    assert "HAVING" not in any_sql and "notes.project_id = " in any_sql
+    assert keyword_search_stmt("user-1", [" "], "all", None) is None
@@ -0,0 +1,36 @@
+from sqlalchemy.dialects import postgresql
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import NOTE_SEARCH_CONFIGS
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.note_search import (
+    full_text_match,
+    ranked_full_text_stmt,
+)
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_full_text_match_uses_search_vector_and_websearch_syntax():
+    sql = _compile(full_text_match("gestión -tareas"))
+
+    assert "notes.search_vector @@ websearch_to_tsquery(" in sql
+    assert "ILIKE" not in sql.upper()
+
+
+def test_ranked_full_text_stmt_orders_by_ts_rank_cd():
+    sql = _compile(ranked_full_text_stmt("user-1", "gestión", skip=0, limit=10))
+
+    assert "ts_rank_cd(notes.search_vector" in sql
+    assert "ORDER BY score DESC, notes.updated_at DESC, notes.id DESC" in sql
+    # search_vector es diferido: no se selecciona como columna de la nota
+    assert "notes.search_vector AS" not in sql
+
+
+def test_full_text_match_uses_the_configuration_of_each_note_language():
+    sql = _compile(full_text_match("gestion"))
+
+    assert sql.count("websearch_to_tsquery(") == len(NOTE_SEARCH_CONFIGS)
+    assert sql.count("notes.language = ") == len(NOTE_SEARCH_CONFIGS)
+    assert " OR " in sql
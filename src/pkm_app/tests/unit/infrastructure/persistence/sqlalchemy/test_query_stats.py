@@ -0,0 +1,84 @@
+import logging
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.query_stats import (
+    SLOWEST_KEPT,
+    QueryStats,
+    RepeatedStatementError,
+    instrument_engine,
+    recording,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = instrument_engine(create_engine("sqlite://"))
+    yield engine
+    engine.dispose()
+
+
+def test_records_statements_rows_time_and_slowest(engine):
+    with engine.connect() as connection, recording() as stats:
+        connection.execute(text("CREATE TABLE t (i INTEGER)"))
+        connection.execute(text("INSERT INTO t VALUES (1), (2), (3)"))
+        for i in range(SLOWEST_KEPT):
+            connection.execute(text(f"SELECT i FROM t WHERE i > {i}")).all()
+
+    assert stats.statements == SLOWEST_KEPT + 2
+    assert stats.rows == 3  # Filas del INSERT (SQLite no da rowcount de los SELECT)
+    assert stats.seconds > 0
+    assert len(stats.slowest) == SLOWEST_KEPT
+    durations = [timing.seconds for timing in stats.slowest]
+    assert durations == sorted(durations, reverse=True)
+    assert sum(durations) <= stats.seconds
+
+
+def test_same_statement_with_other_parameters_counts_as_one_shape(engine, caplog):
+    stats = QueryStats(repeat_limit=3)
+    with engine.connect() as connection, recording(stats):
+        with caplog.at_level(logging.WARNING):
+            for i in range(6):
+                connection.execute(text("SELECT :i"), {"i": i})
+
+    assert stats.shapes == {"SELECT ?": 6}
+    assert stats.repeated() == {"SELECT ?": 6}
+    warnings = [record for record in caplog.records if "N+1" in record.getMessage()]
+    assert len(warnings) == 1  # Un aviso por forma, no por repetición
+
+
+def test_strict_mode_raises_before_executing_the_repeated_statement(engine):
+    executed = []
+    event.listen(engine, "after_cursor_execute", lambda *args: executed.append(args[2]))
+    stats = QueryStats(repeat_limit=2, strict=True)
+
+    with engine.connect() as connection, recording(stats):
+        connection.execute(text("SELECT :i"), {"i": 1})
+        connection.execute(text("SELECT :i"), {"i": 2})
+        with pytest.raises(RepeatedStatementError, match="posible N\\+1"):
+            connection.execute(text("SELECT :i"), {"i": 3})
+
+    assert len(executed) == 2
+
+
+def test_nested_recordings_all_count_and_nothing_is_recorded_outside(engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with recording() as outer:
+            connection.execute(text("SELECT 2"))
+            with recording() as inner:
+                connection.execute(text("SELECT 3"))
+        connection.execute(text("SELECT 4"))
+
+    assert (outer.statements, inner.statements) == (2, 1)
+    assert set(inner.shapes) == {"SELECT 3"}
+
+
+def test_instrument_engine_is_idempotent(engine):
+    instrument_engine(engine)
+
+    with engine.connect() as connection, recording() as stats:
+        connection.execute(text("SELECT 1"))
+
+    assert stats.statements == 1
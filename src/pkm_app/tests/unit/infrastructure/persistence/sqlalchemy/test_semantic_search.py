@@ -0,0 +1,69 @@
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.pkm_app.core.application.dtos import NoteSearchFilters
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import EMBEDDING_DIMENSIONS
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.semantic_search import (
+    DEFAULT_EF_SEARCH,
+    MAX_EF_SEARCH,
+    MAX_SEMANTIC_K,
+    ef_search_stmt,
+    semantic_search_stmt,
+)
+
+QUERY_VECTOR = [0.0] * (EMBEDDING_DIMENSIONS - 1) + [1.0]
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_semantic_search_stmt_orders_by_cosine_distance_inside_limited_subquery():
+    compiled = semantic_search_stmt("user-1", QUERY_VECTOR, k=7).compile(
+        dialect=postgresql.dialect()
+    )
+    sql = str(compiled)
+
+    assert "ORDER BY notes.embedding <=> " in sql
+    assert "notes.user_id = " in sql
+    assert "notes.embedding IS NOT NULL" in sql
+    # Reordenación fuera del recorrido del índice (hnsw.iterative_scan = relaxed_order)
+    assert "ORDER BY nearest.distance" in sql
+    assert 7 in compiled.params.values()
+
+
+def test_semantic_search_stmt_applies_filters_in_the_inner_query():
+    project_id = uuid.uuid4()
+    filters = NoteSearchFilters(project_id=project_id, type="idea", language="en")
+    compiled = semantic_search_stmt("user-1", QUERY_VECTOR, k=5, filters=filters).compile(
+        dialect=postgresql.dialect()
+    )
+    inner = str(compiled).split("AS nearest")[0]
+
+    assert "notes.project_id = " in inner
+    assert "notes.type = " in inner
+    assert "notes.language = " in inner
+    assert project_id in compiled.params.values()
+
+
+def test_semantic_search_stmt_rejects_wrong_dimensions():
+    with pytest.raises(ValueError):
+        semantic_search_stmt("user-1", [1.0, 0.0], k=5)
+
+
+@pytest.mark.parametrize("k", [0, -1, MAX_SEMANTIC_K + 1])
+def test_semantic_search_stmt_rejects_k_out_of_range(k):
+    with pytest.raises(ValueError):
+        semantic_search_stmt("user-1", QUERY_VECTOR, k=k)
+
+
+def test_ef_search_is_only_widened_beyond_the_connection_default():
+    assert ef_search_stmt(DEFAULT_EF_SEARCH) is None
+
+    compiled = ef_search_stmt(DEFAULT_EF_SEARCH + 50).compile(dialect=postgresql.dialect())
+    assert "set_config(" in str(compiled)
+    assert list(compiled.params.values()) == ["hnsw.ef_search", "150", True]
+    capped = list(ef_search_stmt(2 * MAX_EF_SEARCH).compile().params.values())
+    assert capped[1] == str(MAX_EF_SEARCH)
@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.trigram_search import (
+    DEFAULT_SIMILARITY_THRESHOLD,
+    fuzzy_keyword_stmt,
+    fuzzy_title_stmt,
+)
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _split(sql: str) -> tuple[str, str]:
+    """(subconsulta top_k, consulta exterior sin la subconsulta)."""
+    outer_select, rest = sql.split("FROM (", 1)
+    top_k, outer_order = rest.split(") AS top_k", 1)
+    return top_k, outer_select + outer_order
+
+
+def test_fuzzy_title_stmt_is_an_index_ordered_top_k():
+    compiled = fuzzy_title_stmt("user-1", "gestion", limit=10).compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    top_k, ranking = _split(sql)
+
+    assert "<%% notes.title" in top_k
+    assert "<<-> notes.title" in top_k.split("ORDER BY")[1]
+    assert "LIMIT" in top_k
+    # El umbral por defecto lo aplica `<%` (valor por defecto de la base de datos)
+    assert "word_similarity(" not in top_k
+    # El refuerzo de prefijos solo reordena el top-k
+    assert "ORDER BY starts_with(lower(top_k.title)" in ranking
+    assert "LIMIT" not in ranking
+    # Solo se cargan id y título, nunca el contenido
+    assert "notes.content" not in sql
+    assert 10 in compiled.params.values()
+
+
+def test_fuzzy_keyword_stmt_selects_keywords():
+    sql = _compile(fuzzy_keyword_stmt("user-1", "gestion", limit=5))
+
+    assert "<%% keywords.name" in sql
+    assert "<<-> keywords.name" in sql
+    assert "keywords.user_id = " in sql
+
+
+def test_stricter_threshold_is_added_inline():
+    compiled = fuzzy_title_stmt("user-1", "gestion", limit=10, threshold=0.7).compile(
+        dialect=postgresql.dialect()
+    )
+    top_k, _ = _split(str(compiled))
+
+    assert "<%% notes.title" in top_k
+    assert "word_similarity(" in top_k
+    assert 0.7 in compiled.params.values()
+
+
+def test_looser_threshold_replaces_the_trigram_operator():
+    top_k, _ = _split(_compile(fuzzy_title_stmt("user-1", "gestion", limit=10, threshold=0.2)))
+
+    assert "<%%" not in top_k
+    assert "word_similarity(" in top_k
+    assert DEFAULT_SIMILARITY_THRESHOLD > 0.2
+
+
+@pytest.mark.parametrize("threshold", [0, -0.1, 1.5])
+def test_similarity_threshold_out_of_range(threshold):
+    with pytest.raises(ValueError, match="threshold"):
+        fuzzy_title_stmt("user-1", "gestion", limit=10, threshold=threshold)
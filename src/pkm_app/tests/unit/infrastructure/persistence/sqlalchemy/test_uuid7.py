@@ -0,0 +1,33 @@
+import time
+import uuid
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy import models
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import generate_uuid, uuid7
+
+
+def test_uuid7_has_version_variant_and_current_timestamp():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert before <= value.int >> 80 <= after
+    assert generate_uuid().version == 7
+
+
+def test_uuid7_is_strictly_increasing_within_the_same_millisecond():
+    values = [uuid7() for _ in range(10_000)]
+
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_uuid7_stays_increasing_if_the_clock_goes_back(monkeypatch):
+    latest = uuid7()
+    monkeypatch.setattr(models.time, "time_ns", lambda: 0)
+
+    following = uuid7()
+
+    assert following > latest
+    assert following.version == 7
@@ -0,0 +1,42 @@
+import asyncio
+import math
+
+import pytest
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.models import EMBEDDING_DIMENSIONS
+from src.pkm_app.infrastructure.search.embedders import HashingEmbedder
+from src.pkm_app.infrastructure.search.embedding_pipeline import EmbeddingPipeline
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    return sum(x * y for x, y in zip(a, b, strict=True))
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder()
+    vector = embedder.embed_text("Gatos y perros")
+
+    assert len(vector) == EMBEDDING_DIMENSIONS
+    assert math.isclose(math.sqrt(sum(value * value for value in vector)), 1.0)
+    assert HashingEmbedder().embed_text("gatos Y PERROS") == vector
+
+
+def test_hashing_embedder_places_texts_sharing_words_closer():
+    embedder = HashingEmbedder()
+    query = embedder.embed_text("gatos perros")
+
+    assert _cosine(query, embedder.embed_text("perros gatos mascotas")) > _cosine(
+        query, embedder.embed_text("impuestos renta")
+    )
+
+
+def test_hashing_embedder_embeds_batches_in_order():
+    embedder = HashingEmbedder()
+    vectors = asyncio.run(embedder.embed(["uno", "dos"]))
+
+    assert vectors == [embedder.embed_text("uno"), embedder.embed_text("dos")]
+
+
+def test_embedding_pipeline_rejects_embedders_with_other_dimensions():
+    with pytest.raises(ValueError):
+        EmbeddingPipeline(HashingEmbedder(dimensions=8), session_factory=lambda: None)
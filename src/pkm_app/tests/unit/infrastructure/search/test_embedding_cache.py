@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.pkm_app.infrastructure.persistence.sqlalchemy.repositories.embedding_cache_statements import (
+    store_embeddings_stmt,
+)
+from src.pkm_app.infrastructure.search.embedders import HashingEmbedder
+from src.pkm_app.infrastructure.search.embedding_cache import (
+    CachedEmbedder,
+    embedding_text_hash,
+    normalize_embedding_text,
+)
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.calls: list[list[str]] = []
+
+    async def embed(self, texts):
+        self.calls.append(list(texts))
+        return await super().embed(texts)
+
+
+def test_normalize_embedding_text_ignores_whitespace_and_unicode_composition():
+    composed = "Gestión  de\n\nproyectos "
+    decomposed = "Gestio\u0301n de proyectos"
+
+    assert normalize_embedding_text(composed) == "Gestión de proyectos"
+    assert embedding_text_hash(normalize_embedding_text(decomposed)) == embedding_text_hash(
+        normalize_embedding_text(composed)
+    )
+    assert len(embedding_text_hash("x")) == 32
+
+
+def test_cached_embedder_serves_repeated_texts_from_memory():
+    inner = CountingEmbedder()
+    cached = CachedEmbedder(inner, persistent=False)
+
+    first = asyncio.run(cached.embed(["uno", "dos", "uno"]))
+    second = asyncio.run(cached.embed(["dos ", "tres"]))
+
+    assert inner.calls == [["uno", "dos"], ["tres"]]
+    assert first[0] == first[2] == inner.embed_text("uno")
+    assert second[0] == first[1]
+    assert (cached.stats.memory_hits, cached.stats.misses) == (1, 3)
+    assert cached.stats.hit_rate == pytest.approx(0.25)
+    assert cached.stats.lookups == 2
+
+
+def test_cached_embedder_evicts_least_recently_used_entries():
+    inner = CountingEmbedder()
+    cached = CachedEmbedder(inner, persistent=False, max_memory_entries=2)
+
+    asyncio.run(cached.embed(["a", "b"]))
+    asyncio.run(cached.embed(["a", "c"]))  # "a" pasa a ser el más reciente; sale "b"
+    asyncio.run(cached.embed(["a", "b"]))
+
+    assert inner.calls == [["a", "b"], ["c"], ["b"]]
+
+
+def test_store_embeddings_stmt_inserts_all_entries_in_one_statement():
+    stmt = store_embeddings_stmt("m", 2, [(b"\x00" * 32, [1.0, 0.0]), (b"\x01" * 32, [0.0, 1.0])])
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert sql.count("INSERT INTO embedding_cache") == 1
+    assert "ON CONFLICT (model, dimensions, text_hash) DO NOTHING" in sql